@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Fill a database with a synthetic household for demos and benchmarks: accounts,
+loans, investments, an active budget and any number of transactions (10k to
+millions). Paychecks, housing, bills, subscriptions and loan payments follow
+their schedules; the remaining rows are day-to-day spending drawn from weighted
+categories with per-category amount ranges and merchants, plus some side income.
+
+Output is deterministic: the same --seed, --transactions, --years and
+--end-date always produce the same rows. Rows are generated day by day in date
+order and written with batched executemany inserts, so memory stays flat at
+any size.
+
+    python add_sample_data.py                              # 10k transactions into db/finances.db
+    python add_sample_data.py --transactions 1000000 --db /tmp/1m.db
+    python add_sample_data.py --reset --seed 7             # empty the tables first
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+BATCH_SIZE = 50000
+
+ACCOUNTS = [
+    # name, type, bank, initial balance (cents)
+    ('Everyday Checking', 'checking', 'First National Bank', 250000),
+    ('Bills Checking', 'checking', 'First National Bank', 120000),
+    ('High-Yield Savings', 'savings', 'Ally Bank', 1500000),
+    ('Rewards Credit Card', 'credit', 'Chase', 0),
+    ('Brokerage', 'investment', 'Fidelity', 0),
+    ('Wallet', 'cash', None, 20000),
+]
+
+LOANS = [
+    # name, type, balance, original amount, APR, minimum payment (dollars), due day
+    ('Home Mortgage', 'mortgage', 281500.00, 320000.00, 6.5, 2022.00, 1),
+    ('Auto Loan', 'auto', 18450.00, 32000.00, 5.9, 585.00, 15),
+    ('Student Loan', 'student', 24100.00, 40000.00, 4.5, 275.00, 22),
+    ('Rewards Card Balance', 'credit_card', 2380.00, None, 22.9, 75.00, 5),
+]
+
+INVESTMENTS = [
+    # symbol, name, shares, cost basis, current price, type
+    ('VTI', 'Vanguard Total Stock Market ETF', 142.0, 198.40, 287.10, 'etf'),
+    ('VXUS', 'Vanguard Total International Stock ETF', 210.0, 55.20, 64.85, 'etf'),
+    ('BND', 'Vanguard Total Bond Market ETF', 95.0, 76.10, 72.40, 'etf'),
+    ('AAPL', 'Apple Inc.', 30.0, 148.30, 229.90, 'stock'),
+    ('FXAIX', 'Fidelity 500 Index Fund', 61.5, 142.80, 208.60, 'mutual_fund'),
+    ('BTC', 'Bitcoin', 0.12, 29500.00, 67200.00, 'crypto'),
+]
+
+# Scheduled flows: category, description, type, cents, schedule, account index, taxable.
+# 'biweekly' starts on the first Friday; 'monthly:N' is day N of each month.
+PAYCHECK_CENTS = 310000  # Raised for ledgers busier than one household (see SampleGenerator)
+SCHEDULED = [
+    ('Salary', 'Acme Corp Payroll', 'income', PAYCHECK_CENTS, 'biweekly', 0, True),
+    ('Housing', 'Rent - Landlord Properties', 'expense', 185000, 'monthly:1', 1, True),
+    ('Utilities', 'City Power and Light', 'expense', 11200, 'monthly:12', 1, True),
+    ('Utilities', 'Metro Water', 'expense', 4800, 'monthly:18', 1, True),
+    ('Utilities', 'Fiber Internet', 'expense', 7000, 'monthly:3', 1, True),
+    ('Utilities', 'Wireless Phone', 'expense', 8500, 'monthly:9', 3, True),
+    ('Insurance', 'Auto Insurance Premium', 'expense', 14200, 'monthly:20', 1, True),
+    ('Entertainment', 'NETFLIX.COM', 'expense', 1549, 'monthly:7', 3, True),
+    ('Entertainment', 'Spotify Premium', 'expense', 1199, 'monthly:11', 3, True),
+    ('Healthcare', 'Gym Membership', 'expense', 4500, 'monthly:1', 3, True),
+    ('Savings', 'Transfer to savings', 'expense', 50000, 'monthly:2', 0, True),
+]
+LOAN_PAYMENT_CATEGORY = 'Loan Payment'  # Same category the loans page writes
+
+# Day-to-day spending: category, weight, median cents, spread (log-normal sigma), merchants
+SPENDING = [
+    ('Groceries', 22, 6500, 0.6, ['Whole Foods', "Trader Joe's", 'Safeway', 'Costco', 'Kroger', 'Farmers Market']),
+    ('Dining Out', 14, 3200, 0.7, ['Chipotle', 'Olive Garden', 'Local Bistro', 'Sushi House', 'Taco Stand', 'Pizza Place']),
+    ('Coffee', 10, 650, 0.35, ['Starbucks', 'Blue Bottle', 'Corner Cafe', "Peet's Coffee"]),
+    ('Gas', 8, 4800, 0.3, ['Shell', 'Chevron', 'Costco Gas', 'Arco']),
+    ('Shopping', 12, 4500, 1.0, ['Amazon', 'Target', 'Walmart', 'Best Buy', 'IKEA', 'REI']),
+    ('Transportation', 5, 1800, 0.8, ['Uber', 'Lyft', 'Metro Transit', 'City Parking']),
+    ('Entertainment', 6, 2500, 0.8, ['AMC Theatres', 'Steam', 'Ticketmaster', 'Bowling Alley']),
+    ('Healthcare', 3, 3500, 0.9, ['CVS Pharmacy', 'Walgreens', 'Dental Care', 'Urgent Care']),
+    ('Personal Care', 4, 3000, 0.6, ['Hair Salon', 'Barber Shop', 'Sephora', 'Nail Studio']),
+    ('Pets', 3, 4000, 0.7, ['Petco', 'Chewy', 'Vet Clinic']),
+    ('Home Improvement', 3, 7500, 1.0, ['Home Depot', "Lowe's", 'Ace Hardware']),
+    ('Travel', 2, 18000, 1.1, ['Delta Air Lines', 'Marriott', 'Airbnb', 'Hertz']),
+    ('Gifts', 2, 5000, 0.8, ['Etsy', 'Flower Shop', 'Gift Card']),
+    ('Education', 1, 4000, 0.9, ['Coursera', 'Bookstore', 'Udemy']),
+    ('Other', 5, 2500, 1.0, ['Post Office', 'Dry Cleaner', 'Car Wash', 'Bank Fee']),
+]
+# Accounts day-to-day spending is paid from: credit card, everyday checking, cash
+SPENDING_ACCOUNTS = ((3, 55), (0, 35), (5, 10))
+
+# Unscheduled income: category, weight, median cents, spread, description, taxable
+SIDE_INCOME = [
+    ('Freelance', 50, 60000, 0.7, 'Client invoice', True),
+    ('Interest', 20, 1500, 0.5, 'Savings interest', True),
+    ('Refund', 20, 4000, 0.8, 'Store refund', False),
+    ('Gift', 10, 10000, 0.7, 'Birthday gift', False),
+]
+SIDE_INCOME_SHARE = 0.03  # Of the unscheduled rows
+
+def _cents(rng, median, sigma):
+    return max(100, int(rng.lognormvariate(math.log(median), sigma)))
+
+def _weighted_table(weights):
+    """Cumulative weights for rng.choices(..., cum_weights=...)"""
+    total, table = 0, []
+    for weight in weights:
+        total += weight
+        table.append(total)
+    return table
+
+def _scheduled_days(schedule, start, end):
+    if schedule == 'biweekly':
+        day = start + timedelta(days=(4 - start.weekday()) % 7)  # First Friday
+        while day <= end:
+            yield day
+            day += timedelta(days=14)
+        return
+    day_of_month = int(schedule.split(':')[1])
+    year, month = start.year, start.month
+    while True:
+        day = date(year, month, day_of_month)
+        if day > end:
+            return
+        if day >= start:
+            yield day
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+class SampleGenerator:
+    """Deterministic synthetic ledger; rows() yields transaction rows in date order"""
+
+    def __init__(self, transactions, seed=42, end_date=None, years=3):
+        self.transactions = transactions
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.start_date = self.end_date - timedelta(days=int(years * 365) - 1)
+        self.days = (self.end_date - self.start_date).days + 1
+        # Pay grows with the spending volume, so big ledgers still roughly balance
+        self.paycheck = max(PAYCHECK_CENTS, round(self.yearly_spending() * 1.05 / 26))
+
+    def yearly_spending(self):
+        """Expected yearly spending, net of side income, in cents"""
+        def mean(table):
+            # Mean of a log-normal draw is median * e^(sigma^2 / 2)
+            return sum(row[1] * row[2] * math.exp(row[3] ** 2 / 2) for row in table) / sum(row[1] for row in table)
+        rows_per_year = self.transactions / self.days * 365
+        variable = rows_per_year * ((1 - SIDE_INCOME_SHARE) * mean(SPENDING) - SIDE_INCOME_SHARE * mean(SIDE_INCOME))
+        fixed = sum(amount for _, _, kind, amount, schedule, _, _ in SCHEDULED if kind == 'expense') * 12
+        loans = sum(round(loan[5] * 100) for loan in LOANS) * 12
+        return variable + fixed + loans
+
+    def scheduled(self, account_ids):
+        """Scheduled rows by date: paychecks, bills, subscriptions, rent and loan payments"""
+        by_day = {}
+        flows = [(c, d, t, self.paycheck if c == 'Salary' else a, s, account_ids[i], taxable)
+                 for c, d, t, a, s, i, taxable in SCHEDULED]
+        for name, _, _, _, _, minimum, due_day in LOANS:
+            flows.append((LOAN_PAYMENT_CATEGORY, f'Payment to {name}', 'expense', round(minimum * 100),
+                          f'monthly:{min(due_day, 28)}', account_ids[1], True))
+        for category, description, transaction_type, amount, schedule, account_id, taxable in flows:
+            for day in _scheduled_days(schedule, self.start_date, self.end_date):
+                by_day.setdefault(day, []).append((amount, category, description, transaction_type, taxable, account_id))
+        return by_day
+
+    def rows(self, account_ids):
+        """
+        Yield (cents, category, description, date, type, is_taxable, account_id, created_at)
+        tuples, day by day. Scheduled rows count towards the total; the rest is
+        spread evenly over the days.
+        """
+        rng = random.Random(self.seed)
+        scheduled = self.scheduled(account_ids)
+        remaining = max(self.transactions - sum(len(rows) for rows in scheduled.values()), 0)
+        spending_table = _weighted_table([s[1] for s in SPENDING])
+        income_table = _weighted_table([s[1] for s in SIDE_INCOME])
+        account_table = _weighted_table([weight for _, weight in SPENDING_ACCOUNTS])
+        emitted = 0
+
+        for offset in range(self.days):
+            day = self.start_date + timedelta(days=offset)
+            noon = datetime(day.year, day.month, day.day, 12)
+            for amount, category, description, transaction_type, taxable, account_id in scheduled.get(day, ()):
+                if emitted >= self.transactions:
+                    return
+                emitted += 1
+                yield (amount, category, description, day, transaction_type, taxable, account_id, noon)
+
+            # Exactly `remaining` unscheduled rows over the whole range, spread evenly
+            count = remaining * (offset + 1) // self.days - remaining * offset // self.days
+            for _ in range(count):
+                if emitted >= self.transactions:
+                    return
+                emitted += 1
+                created_at = noon + timedelta(seconds=rng.randint(-36000, 36000))
+                if rng.random() < SIDE_INCOME_SHARE:
+                    category, _, median, sigma, description, taxable = rng.choices(SIDE_INCOME, cum_weights=income_table)[0]
+                    yield (_cents(rng, median, sigma), category, description, day, 'income', taxable, account_ids[0], created_at)
+                    continue
+                category, _, median, sigma, merchants = rng.choices(SPENDING, cum_weights=spending_table)[0]
+                account_index = rng.choices(SPENDING_ACCOUNTS, cum_weights=account_table)[0][0]
+                description = f'{rng.choice(merchants)} #{rng.randint(100, 999)}'
+                yield (_cents(rng, median, sigma), category, description, day, 'expense', True,
+                       account_ids[account_index], created_at)
+
+def reset_data(conn):
+    """Delete every row the generator writes, plus the tables derived from transactions and loans"""
+    from utils.categories import current_category_map
+    for table in ('net_worth_snapshot', 'recurring_series', 'recurring_scan', 'loan_payment', 'processed_period',
+                  'transaction', 'category', 'account', 'loan', 'investment', 'budget'):
+        conn.exec_driver_sql(f'DELETE FROM "{table}"')
+    conn.commit()
+    # The in-memory category map would hand out ids of the deleted rows
+    current_category_map().clear()
+
+def _add_reference_data(generator):
+    """Accounts, loans, investments and the active budget. Returns the account ids, in ACCOUNTS order."""
+    from database import db
+    from models.account import Account
+    from models.budget import Budget
+    from models.investment import Investment
+    from models.loan import Loan
+    from utils.tax_calculator import TaxCalculator
+
+    accounts = [
+        Account(name=name, account_type=account_type, bank_name=bank, account_number=f'{1000 + i * 1111}'[-4:],
+                current_balance=initial / 100, initial_balance=initial / 100)
+        for i, (name, account_type, bank, initial) in enumerate(ACCOUNTS)
+    ]
+    db.session.add_all(accounts)
+
+    today = generator.end_date
+    for name, loan_type, balance, original, rate, minimum, due_day in LOANS:
+        db.session.add(Loan(
+            name=name, loan_type=loan_type, balance=balance, original_amount=original, interest_rate=rate,
+            minimum_payment=minimum, due_date=date(today.year, today.month, min(due_day, 28))
+        ))
+    for symbol, name, shares, cost_basis, price, investment_type in INVESTMENTS:
+        db.session.add(Investment(symbol=symbol, name=name, shares=shares, cost_basis=cost_basis,
+                                  current_price=price, investment_type=investment_type))
+
+    scale = generator.paycheck / PAYCHECK_CENTS
+    annual_income = generator.paycheck * 26 / 100
+    taxes = TaxCalculator().calculate_taxes(annual_income, 'w2', 'single', 'CA')
+    monthly_taxes = round(taxes['total_tax_owed'] / 12, 2)
+    monthly_loans = sum(loan[5] for loan in LOANS)
+    allocations = {
+        'housing': 1850.0, 'food': 900.0, 'transportation': 450.0, 'utilities': 320.0, 'healthcare': 150.0,
+        'insurance': 142.0, 'entertainment': 200.0, 'personal_care': 120.0, 'shopping': 350.0,
+        'education': 50.0, 'savings': 500.0, 'emergency_fund': 200.0, 'retirement': 400.0, 'other': 150.0
+    }
+    allocations = {name: round(amount * scale, 2) for name, amount in allocations.items()}
+    Budget.query.filter_by(is_active=True).update({'is_active': False})
+    db.session.add(Budget(
+        name='Sample Household Budget', annual_income=annual_income, employment_type='w2', state_code='CA',
+        monthly_take_home=round(annual_income / 12 - monthly_taxes, 2), monthly_taxes=monthly_taxes,
+        monthly_loan_payments=monthly_loans,
+        monthly_available=round(annual_income / 12 - monthly_taxes - monthly_loans, 2),
+        is_active=True, **allocations
+    ))
+    db.session.commit()
+    return [account.id for account in accounts]
+
+def populate(transactions=10000, seed=42, end_date=None, years=3, batch_size=BATCH_SIZE, reset=False, progress=print):
+    """
+    Write the sample household into the current app's database (call inside an
+    app context, after ensure_schema()). Account balances are set so every
+    account reconciles with its transactions. Returns a summary dict.
+    """
+    from database import db
+    from utils.money import from_cents, to_cents
+
+    generator = SampleGenerator(transactions, seed, end_date, years)
+    started = time.perf_counter()
+    if reset:
+        with db.engine.connect() as conn:
+            reset_data(conn)
+    account_ids = _add_reference_data(generator)
+
+    sql = ('INSERT INTO "transaction" (amount, category, description, date, transaction_type, is_taxable, '
+           'account_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+    net = dict.fromkeys(account_ids, 0)
+    written = 0
+    batch = []
+    with db.engine.connect() as conn:
+        for amount, category, description, day, transaction_type, taxable, account_id, created_at in generator.rows(account_ids):
+            net[account_id] += amount if transaction_type == 'income' else -amount
+            batch.append((amount, category, description, day.isoformat(), transaction_type, int(taxable),
+                          account_id, created_at.isoformat(sep=' ')))
+            if len(batch) >= batch_size:
+                conn.exec_driver_sql(sql, batch)
+                conn.commit()
+                written += len(batch)
+                batch = []
+                progress(f"  {written}/{transactions} transactions")
+        if batch:
+            conn.exec_driver_sql(sql, batch)
+            conn.commit()
+            written += len(batch)
+
+    # Raw inserts skip the flush hook that sets category_id (utils/categories.py)
+    from utils.categories import link_categories
+    link_categories(db.session)
+    db.session.commit()
+
+    # Current balances = initial balance + activity, so the accounts page reconciles
+    from models.account import Account
+    for account in Account.query.filter(Account.id.in_(account_ids)):
+        account.current_balance = from_cents(to_cents(account.initial_balance) + net[account.id])
+    db.session.commit()
+
+    return {
+        'transactions': written,
+        'accounts': len(account_ids),
+        'loans': len(LOANS),
+        'investments': len(INVESTMENTS),
+        'start_date': generator.start_date.isoformat(),
+        'end_date': generator.end_date.isoformat(),
+        'seed': seed,
+        'paycheck': from_cents(generator.paycheck),
+        'seconds': time.perf_counter() - started
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a database with deterministic synthetic sample data')
+    parser.add_argument('--transactions', type=int, default=10000, help='number of transactions to generate')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (same seed, same data)')
+    parser.add_argument('--years', type=float, default=3, help='years of history ending at --end-date')
+    parser.add_argument('--end-date', help='last day of generated history, YYYY-MM-DD (default: today)')
+    parser.add_argument('--db', help='SQLite file to fill instead of the app database (created if missing)')
+    parser.add_argument('--reset', action='store_true', help='delete existing accounts, loans, investments, budgets and transactions first')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='rows per insert batch')
+    args = parser.parse_args()
+
+    from app import create_app
+    from database import ensure_schema
+
+    config = None
+    if args.db:
+        path = os.path.abspath(args.db)
+        config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'DB_DIR': os.path.dirname(path)}
+    app = create_app(config)
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date() if args.end_date else None
+    with app.app_context():
+        ensure_schema()
+        print(f"Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+        summary = populate(args.transactions, args.seed, end_date, args.years, args.batch_size, args.reset)
+    print(f"✓ Added {summary['transactions']} transactions ({summary['start_date']} to {summary['end_date']}), "
+          f"{summary['accounts']} accounts, {summary['loans']} loans and {summary['investments']} investments "
+          f"in {summary['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
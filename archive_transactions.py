@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Move closed years of transactions out of SQLite into memory-mapped columnar
+partitions (see utils/archive.py). Totals, charts and reports keep including
+archived years; the live database and its indexes only hold recent activity.
+
+    python archive_transactions.py --list
+    python archive_transactions.py --year 2022
+    python archive_transactions.py --before 2024 --vacuum   # every year up to 2023
+    python archive_transactions.py --restore 2022
+"""
+
+import argparse
+from datetime import date
+
+from app import create_app
+from database import db, ensure_schema
+from models.transaction import Transaction
+from utils.archive import archive_year, restore_year, transaction_archive
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive closed years of transactions to cold storage')
+    parser.add_argument('--list', action='store_true', help='show archived years and hot rows per year')
+    parser.add_argument('--year', type=int, action='append', default=[], help='archive this year (repeatable)')
+    parser.add_argument('--before', type=int, help='archive every year before this one')
+    parser.add_argument('--restore', type=int, action='append', default=[], help='move an archived year back into SQLite')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows deleted or restored per commit')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to shrink the database file')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        ensure_schema()
+
+        if args.list:
+            year = db.func.strftime('%Y', Transaction.date)
+            hot = db.session.query(year, db.func.count(Transaction.id)).group_by(year).order_by(year).all()
+            print("Hot (SQLite):")
+            for hot_year, count in hot:
+                print(f"  {hot_year}: {count} rows")
+            stats = transaction_archive.stats()
+            print(f"Archived ({stats['directory']}):")
+            for partition in transaction_archive.partitions():
+                print(f"  {partition.year}: {partition.size} rows")
+            print(f"  {stats['bytes_on_disk']} bytes on disk")
+            return
+
+        for year in args.restore:
+            print(f"Restored {restore_year(year, args.batch_size)} rows for {year}")
+
+        years = list(args.year)
+        if args.before:
+            first = db.session.query(db.func.min(Transaction.date)).scalar()
+            if first:
+                years.extend(range(first.year, min(args.before, date.today().year)))
+        for year in sorted(set(years)):
+            print(f"Archived {archive_year(year, args.batch_size)} rows for {year}")
+
+        if args.vacuum:
+            db.session.commit()
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.exec_driver_sql('VACUUM')
+            print("✓ Database vacuumed")
+
+if __name__ == "__main__":
+    main()
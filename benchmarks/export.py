@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Streaming export benchmark.
+
+Fills a temporary database with add_sample_data.py, then downloads
+/export/transactions in every format through the test client, reading the
+body chunk by chunk the way a client would. Reports time, output size and
+peak Python heap (tracemalloc) per format; run it with two --transactions
+sizes to see that peak memory does not grow with the export.
+
+Usage:
+    python benchmarks/export.py
+    python benchmarks/export.py --transactions 1000000 --formats csv xlsx --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def download(client, url):
+    """(seconds, bytes, peak heap bytes) for one streamed download"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} answered {response.status_code}')
+    return seconds, size, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Time streaming exports and measure their peak memory')
+    parser.add_argument('--transactions', type=int, default=200000, help='transactions to generate')
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson', 'xlsx'], help='formats to export')
+    parser.add_argument('--batch-size', type=int, default=1000, help='EXPORT_BATCH_SIZE')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    from app import create_app, init_db
+    from add_sample_data import populate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, "finances.db")}',
+            'DB_DIR': tmp,
+            'EXPORT_BATCH_SIZE': args.batch_size
+        })
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db(app)
+            with app.app_context():
+                populate(args.transactions, args.seed)
+
+        client = app.test_client()
+        results = {'transactions': args.transactions, 'batch_size': args.batch_size, 'formats': {}}
+        for export_format in args.formats:
+            seconds, size, peak = download(client, f'/export/transactions?format={export_format}')
+            results['formats'][export_format] = {
+                'seconds': seconds,
+                'rows_per_second': args.transactions / seconds if seconds else None,
+                'bytes': size,
+                'peak_heap_bytes': peak
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.transactions} transactions, {args.batch_size} rows per batch")
+        print(f"{'format':<8}{'seconds':>10}{'rows/s':>12}{'MB out':>10}{'peak heap MB':>14}")
+        for export_format, timing in results['formats'].items():
+            print(f"{export_format:<8}{timing['seconds']:>10.2f}{timing['rows_per_second']:>12.0f}"
+                  f"{timing['bytes'] / 1e6:>10.1f}{timing['peak_heap_bytes'] / 1e6:>14.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
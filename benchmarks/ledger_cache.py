@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Ledger cache check and benchmark.
+
+Against a copy of a database this:
+  - loads the columnar ledger cache and times the load
+  - runs the consistency check against SQL (exits with status 1 on any mismatch)
+  - times each dashboard time frame summary from the cache and from SQL
+  - prints the memory footprint, including the extrapolated MB per million rows
+
+Usage:
+    python benchmarks/ledger_cache.py --repeat 50
+    python benchmarks/ledger_cache.py --db path/to/finances.db --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def time_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify and benchmark the columnar ledger cache')
+    parser.add_argument('--db', default=os.path.join(ROOT, 'db', 'finances.db'), help='database to copy for the run')
+    parser.add_argument('--repeat', type=int, default=20, help='timed repetitions per query')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    from app import create_app
+    from database import ensure_schema
+    from utils.ledger_cache import ledger_cache
+    from utils.period_summary import TIME_FRAMES, resolve_time_frame, sql_summary_cents
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'finances.db')
+        shutil.copy(args.db, db_path)
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'DB_DIR': tmp})
+        with app.app_context():
+            ensure_schema()
+            if not ledger_cache.enable():
+                return 1
+
+            started = time.perf_counter()
+            ledger_cache.load()
+            load_ms = (time.perf_counter() - started) * 1000
+            mismatches = ledger_cache.verify()
+
+            frames = {}
+            for time_frame in TIME_FRAMES:
+                _, start, end, _ = resolve_time_frame(time_frame)
+                frames[time_frame] = {
+                    'cache_ms': time_ms(lambda: ledger_cache.range_summary(start, end), args.repeat),
+                    'sql_ms': time_ms(lambda: sql_summary_cents(start, end), args.repeat)
+                }
+            results = {
+                'load_ms': load_ms,
+                'consistent': not mismatches,
+                'mismatches': mismatches,
+                'time_frames': frames,
+                'memory': ledger_cache.memory_report()
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        memory = results['memory']
+        print(f"Loaded {memory['rows']} rows in {load_ms:.1f} ms")
+        print(f"Consistency check: {'OK' if not mismatches else 'FAILED'}")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        print(f"{'time frame':<16}{'cache ms':>10}{'sql ms':>10}")
+        for time_frame, timing in frames.items():
+            print(f"{time_frame:<16}{timing['cache_ms']:>10.3f}{timing['sql_ms']:>10.3f}")
+        print(f"Memory: {memory['total_bytes']} bytes ({memory['bytes_per_row']} bytes/row, "
+              f"{memory['mb_per_million_rows']} MB per million rows)")
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Account.get_calculated_balance over large transaction histories"""
+
+import pytest
+
+from database import db
+
+SIZES = [1000, 10000, 100000]
+
+@pytest.mark.parametrize('count', SIZES)
+def bench_calculated_balance_cold(benchmark, account_with_transactions, count):
+    # Every round reloads account.transactions from the database
+    account = account_with_transactions(count)
+
+    def setup():
+        db.session.expire(account, ['transactions'])
+        return (), {}
+
+    rounds = 20 if count >= 100000 else 100
+    benchmark.pedantic(account.get_calculated_balance, setup=setup, rounds=rounds, warmup_rounds=1)
+
+@pytest.mark.parametrize('count', SIZES)
+def bench_calculated_balance_warm(benchmark, account_with_transactions, count):
+    # Transactions already loaded: just the Python summing loop
+    account = account_with_transactions(count)
+    assert len(account.transactions) == count
+    benchmark(account.get_calculated_balance)
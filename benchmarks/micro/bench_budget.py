@@ -0,0 +1,8 @@
+"""Budget.to_dict (allocation totals and remaining budget)"""
+
+import pytest
+
+@pytest.mark.parametrize('annual_income', [42000.0, 85000.0, 400000.0])
+def bench_budget_to_dict(benchmark, make_budget, annual_income):
+    budget = make_budget(annual_income)
+    assert benchmark(budget.to_dict)['annual_income'] == annual_income
@@ -0,0 +1,51 @@
+"""Loan payment, payoff and payment-application math"""
+
+from datetime import date
+
+import pytest
+
+# loan_type, balance, APR, minimum payment, target months (None: the loan type's default)
+LOANS = {
+    'credit_card': ('credit_card', 6800.0, 24.99, 180.0, None),
+    'auto_60': ('auto', 32000.0, 6.9, 450.0, None),
+    'student_120': ('student', 48000.0, 5.5, 300.0, None),
+    'mortgage_360': ('mortgage', 420000.0, 6.75, 2200.0, None),
+    'mortgage_180': ('mortgage', 300000.0, 5.875, 2100.0, 180),
+    'zero_interest_12': ('personal', 2400.0, 0.0, 50.0, 12),
+}
+
+@pytest.fixture(params=sorted(LOANS))
+def scenario(request):
+    return request.param
+
+def build(make_loan, scenario):
+    loan_type, balance, rate, minimum, months = LOANS[scenario]
+    return make_loan(loan_type=loan_type, balance=balance, interest_rate=rate, minimum_payment=minimum,
+                     target_payoff_months=months)
+
+def bench_calculate_monthly_payment(benchmark, make_loan, scenario):
+    loan = build(make_loan, scenario)
+    assert benchmark(loan.calculate_monthly_payment) > 0
+
+def bench_calculate_payoff_summary(benchmark, make_loan, scenario):
+    loan = build(make_loan, scenario)
+    assert benchmark(loan.calculate_payoff_summary)['months_remaining'] > 0
+
+def bench_calculate_payoff_summary_extra_payment(benchmark, make_loan, scenario):
+    loan = build(make_loan, scenario)
+    assert benchmark(loan.calculate_payoff_summary, extra_payment=250)['months_remaining'] > 0
+
+@pytest.mark.parametrize('months', [12, 120, 360])
+def bench_calculate_payoff_date(benchmark, make_loan, months):
+    loan = build(make_loan, 'mortgage_360')
+    assert benchmark(loan.calculate_payoff_date, months) > date.today()
+
+def bench_make_payment(benchmark, make_loan, scenario):
+    # make_payment changes the loan, so every round pays into a fresh one
+    def setup():
+        loan = build(make_loan, scenario)
+        return (loan, loan.calculate_monthly_payment()), {}
+
+    result = benchmark.pedantic(lambda loan, amount: loan.make_payment(amount, date.today()),
+                                setup=setup, rounds=2000, warmup_rounds=20)
+    assert result['new_balance'] < LOANS[scenario][1]
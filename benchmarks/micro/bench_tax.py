@@ -0,0 +1,31 @@
+"""TaxCalculator.calculate_taxes across filers"""
+
+import pytest
+
+from utils.tax_calculator import TaxCalculator
+
+# annual income, employment type, filing status, state, city
+FILERS = {
+    'w2_50k': (50000.0, 'w2', 'single', None, None),
+    'w2_150k_ca': (150000.0, 'w2', 'single', 'CA', None),
+    'w2_250k_ny': (250000.0, 'w2', 'single', 'NY', None),
+    '1099_85k': (85000.0, '1099', 'single', 'CA', None),
+    '1099_high_earner_nyc': (450000.0, '1099', 'single', 'NY', 'NYC'),
+    '1099_600k': (600000.0, '1099', 'single', None, None),
+}
+
+@pytest.mark.parametrize('filer', sorted(FILERS))
+def bench_calculate_taxes(benchmark, filer):
+    income, employment_type, filing_status, state, city = FILERS[filer]
+    calculator = TaxCalculator()
+    result = benchmark(calculator.calculate_taxes, income, employment_type, filing_status, state, city)
+    assert result['annual_income'] == income
+
+@pytest.mark.parametrize('employment_type', ['w2', '1099'])
+def bench_tax_estimate(benchmark, app, employment_type):
+    """Year-to-date estimate with every closed payment period already cached"""
+    from utils.tax_estimate import TaxEstimator
+    estimator = TaxEstimator(employment_type, 'CA')
+    estimator.estimate()
+    result = benchmark(estimator.estimate)
+    assert len(result['schedule']) == 4
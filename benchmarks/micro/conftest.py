@@ -0,0 +1,92 @@
+"""
+Fixtures for the microbenchmarks: a throwaway app and database, factories for
+unsaved Loan and Budget rows, and accounts with many transactions.
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    from app import create_app
+    from database import ensure_schema
+    directory = tmp_path_factory.mktemp('microbench')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory / 'finances.db'}", 'DB_DIR': str(directory)})
+    with app.app_context():
+        ensure_schema()
+        yield app
+
+@pytest.fixture
+def make_loan():
+    """Unsaved Loan with every column the calculations read filled in"""
+    from models.loan import Loan
+
+    def factory(**values):
+        loan = Loan(
+            name=values.pop('name', 'Benchmark loan'),
+            balance=values.pop('balance'),
+            interest_rate=values.pop('interest_rate'),
+            minimum_payment=values.pop('minimum_payment'),
+            loan_type=values.pop('loan_type'),
+            due_date=values.pop('due_date', date.today()),
+            current_month_paid=0.0,
+            total_interest_paid=0.0,
+            total_payments_made=0.0,
+            payment_count=0,
+            **values
+        )
+        return loan
+    return factory
+
+@pytest.fixture
+def make_budget():
+    from models.budget import Budget
+
+    def factory(annual_income=85000.0):
+        monthly = annual_income / 12
+        return Budget(
+            name='Benchmark budget', annual_income=annual_income, employment_type='w2', state_code='CA',
+            housing=monthly * 0.28, food=monthly * 0.10, transportation=monthly * 0.08, utilities=monthly * 0.04,
+            healthcare=monthly * 0.03, insurance=monthly * 0.02, entertainment=monthly * 0.03,
+            personal_care=monthly * 0.02, shopping=monthly * 0.04, education=monthly * 0.01,
+            savings=monthly * 0.05, emergency_fund=monthly * 0.02, retirement=monthly * 0.05, other=monthly * 0.02,
+            monthly_take_home=monthly * 0.75, monthly_taxes=monthly * 0.25, monthly_loan_payments=900.0,
+            monthly_available=monthly * 0.75 - 900.0, is_active=True
+        )
+    return factory
+
+_accounts = {}
+
+@pytest.fixture
+def account_with_transactions(app):
+    """Factory: an account holding `count` transactions (built once per count, reused across benchmarks)"""
+    from database import db
+    from models.account import Account
+
+    def factory(count):
+        if count not in _accounts:
+            account = Account(name=f'{count} transactions', account_type='checking',
+                              current_balance=0.0, initial_balance=1000.0)
+            db.session.add(account)
+            db.session.commit()
+            start = date.today() - timedelta(days=3 * 365)
+            rows = [
+                (100 + i % 50000, 'Groceries' if i % 3 else 'Salary', f'Row {i}',
+                 (start + timedelta(days=i % 1095)).isoformat(), 'income' if i % 10 == 0 else 'expense', account.id)
+                for i in range(count)
+            ]
+            db.session.connection().exec_driver_sql(
+                'INSERT INTO "transaction" (amount, category, description, date, transaction_type, is_taxable, '
+                "account_id, created_at) VALUES (?, ?, ?, ?, ?, 1, ?, datetime('now'))",
+                rows
+            )
+            db.session.commit()
+            _accounts[count] = account.id
+        return db.session.get(Account, _accounts[count])
+    return factory
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the calculation hot paths, with regression checks.
+
+The benchmarks live in benchmarks/micro/ (pytest-benchmark, bench_*.py) and
+time the per-row and per-request math on their own, without routes or
+templates around it:
+
+  - Loan.calculate_monthly_payment, calculate_payoff_summary,
+    calculate_payoff_date and make_payment (credit card up to a 360-month mortgage)
+  - TaxCalculator.calculate_taxes (W-2 and 1099 filers, high earners with city tax)
+  - Account.get_calculated_balance (1k, 10k and 100k transactions, cold and warm)
+  - Budget.to_dict
+
+Record a baseline on a known-good commit, then compare later runs against it;
+compare exits 1 when any benchmark's median got slower by more than
+--threshold percent, so it can gate a CI job:
+
+    python benchmarks/microbench.py baseline
+    python benchmarks/microbench.py compare --threshold 10
+
+Baselines are machine-specific and stay out of git (benchmarks/micro/.benchmarks/).
+Needs pytest-benchmark, which is not an app requirement:
+
+    pip install pytest-benchmark
+
+Usage:
+    python benchmarks/microbench.py run [-k payoff]
+    python benchmarks/microbench.py baseline [--output FILE]
+    python benchmarks/microbench.py compare [--threshold 10] [--against FILE] [--current FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SUITE = os.path.join(HERE, 'micro')
+DEFAULT_BASELINE = os.path.join(SUITE, '.benchmarks', 'baseline.json')
+
+def run_suite(output, keyword=None):
+    """Run the suite, writing pytest-benchmark's JSON report to output"""
+    import pytest
+    args = [SUITE, '-q', '-c', os.path.join(SUITE, 'pytest.ini'), '--rootdir', SUITE,
+            f'--benchmark-json={output}', '--benchmark-sort=fullname',
+            '--benchmark-columns=min,median,max,ops,rounds']
+    if keyword:
+        args += ['-k', keyword]
+    return pytest.main(args)
+
+def load_medians(path):
+    """{benchmark fullname: median seconds} from a pytest-benchmark JSON report"""
+    with open(path) as f:
+        report = json.load(f)
+    return {b['fullname']: b['stats']['median'] for b in report['benchmarks']}
+
+def compare(baseline, current, threshold):
+    """Print every benchmark's change against the baseline; returns the regressions"""
+    regressions = []
+    width = max((len(name) for name in current), default=0)
+    for name in sorted(current):
+        now = current[name]
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<{width}}  {now * 1e6:12.2f} us  (new)")
+            continue
+        change = (now - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append((name, change))
+        print(f"  {name:<{width}}  {before * 1e6:12.2f} -> {now * 1e6:12.2f} us  {change:+7.1f}%{flag}")
+    for name in sorted(set(baseline) - set(current)):
+        print(f"  {name:<{width}}  (missing from this run)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the microbenchmarks and check them against a baseline')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the suite and print the timings')
+    run.add_argument('-k', dest='keyword', help='only benchmarks matching this pytest -k expression')
+
+    baseline = commands.add_parser('baseline', help='run the suite and save the results as the baseline')
+    baseline.add_argument('--output', default=DEFAULT_BASELINE, help='where to save the baseline')
+
+    check = commands.add_parser('compare', help='run the suite (or load --current) and compare to the baseline')
+    check.add_argument('--against', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    check.add_argument('--current', help='compare this JSON report instead of running the suite')
+    check.add_argument('--threshold', type=float, default=10.0, help='allowed slowdown of a median, in percent')
+    check.add_argument('-k', dest='keyword', help='only benchmarks matching this pytest -k expression')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        with tempfile.TemporaryDirectory() as tmp:
+            return run_suite(os.path.join(tmp, 'results.json'), args.keyword)
+
+    if args.command == 'baseline':
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        status = run_suite(args.output)
+        if status == 0:
+            print(f"Baseline saved to {args.output}")
+        return status
+
+    if not os.path.exists(args.against):
+        parser.error(f'no baseline at {args.against}; run "baseline" first')
+    with tempfile.TemporaryDirectory() as tmp:
+        current_path = args.current
+        if current_path is None:
+            current_path = os.path.join(tmp, 'results.json')
+            status = run_suite(current_path, args.keyword)
+            if status != 0:
+                return status
+        baseline_medians = load_medians(args.against)
+        current_medians = load_medians(current_path)
+
+    print(f"\nMedian per call against {args.against} (threshold {args.threshold:g}%):")
+    regressions = compare(baseline_medians, current_medians, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:g}%:")
+        for name, change in regressions:
+            print(f"  {name}: {change:+.1f}%")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Recurring transaction detection benchmark.
+
+Builds a synthetic ledger in a temporary database: random one-off spending plus
+known weekly, biweekly, monthly and annual series. It then times a full detection
+run and an incremental run after a day of new rows, and reports how many of the
+planted series were found (exits with status 1 if any are missed).
+
+Usage:
+    python benchmarks/recurring.py
+    python benchmarks/recurring.py --rows 200000 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+YEARS = 3
+# description, category, type, cents, cadence
+PLANTED = [
+    ('Landlord Properties rent', 'Rent', 'expense', 185000, 'monthly'),
+    ('NETFLIX.COM', 'Entertainment', 'expense', 1549, 'monthly'),
+    ('Spotify Premium', 'Entertainment', 'expense', 1199, 'monthly'),
+    ('City Power and Light', 'Utilities', 'expense', 9500, 'monthly'),
+    ('Acme Corp Payroll', 'Salary', 'income', 310000, 'biweekly'),
+    ('Farmers market', 'Groceries', 'expense', 4200, 'weekly'),
+    ('Car registration', 'Transportation', 'expense', 21000, 'annual'),
+    ('Amazon Prime membership', 'Shopping', 'expense', 13900, 'annual'),
+]
+STEPS = {'weekly': 7, 'biweekly': 14}
+NOISE_CATEGORIES = ['Groceries', 'Dining Out', 'Coffee', 'Shopping', 'Gas', 'Entertainment', 'Healthcare']
+NOISE_WORDS = [
+    'Corner', 'Market', 'Cafe', 'Station', 'Store', 'Bistro', 'Outlet', 'Pharmacy', 'Deli', 'Shop',
+    'Green', 'Blue', 'Golden', 'River', 'Oak', 'Pine', 'Harbor', 'Summit', 'Main', 'Street',
+    'Bakery', 'Grill', 'Books', 'Supply', 'Express', 'Depot', 'Kitchen', 'Garden', 'Plaza', 'Hall'
+]
+
+def planted_rows(rng, first_day, last_day):
+    from utils.recurring import add_months
+    rows = []
+    for description, category, transaction_type, amount, cadence in PLANTED:
+        day, step = first_day + timedelta(days=rng.randint(0, 6)), 0
+        while day <= last_day:
+            # Bills move by a day or two and amounts drift a little
+            jitter = timedelta(days=rng.choice((0, 0, 0, 1, -1))) if cadence != 'weekly' else timedelta()
+            cost = int(amount * rng.uniform(0.97, 1.03)) if category == 'Utilities' else amount
+            rows.append((cost, category, f'{description} {rng.randint(1000, 9999)}', (day + jitter).isoformat(), transaction_type))
+            step += 1
+            if cadence in STEPS:
+                day += timedelta(days=STEPS[cadence])
+            else:
+                day = add_months(first_day, step * (12 if cadence == 'annual' else 1))
+    return rows
+
+def noise_row(rng, first_day, span):
+    # Random merchants (three words out of thirty plus a store number) on random days
+    return (
+        rng.randint(300, 25000),
+        rng.choice(NOISE_CATEGORIES),
+        f"{' '.join(rng.choice(NOISE_WORDS) for _ in range(3))} #{rng.randint(1, 999)}",
+        (first_day + timedelta(days=rng.randint(0, span))).isoformat(),
+        'expense',
+    )
+
+def insert(conn, rows):
+    for start in range(0, len(rows), 50000):
+        conn.exec_driver_sql(
+            'INSERT INTO "transaction" (amount, category, description, date, transaction_type, is_taxable, created_at) '
+            "VALUES (?, ?, ?, ?, ?, 1, datetime('now'))",
+            rows[start:start + 50000]
+        )
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark recurring transaction detection')
+    parser.add_argument('--rows', type=int, default=1000000, help='synthetic transactions to generate')
+    parser.add_argument('--new-rows', type=int, default=200, help='rows added before the incremental run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    from app import create_app
+    from database import db, ensure_schema
+    from utils.recurring import RecurringDetector
+
+    rng = random.Random(args.seed)
+    last_day = date.today()
+    first_day = last_day - timedelta(days=YEARS * 365)
+    span = (last_day - first_day).days
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'finances.db')}", 'DB_DIR': tmp})
+        with app.app_context():
+            ensure_schema()
+            rows = planted_rows(rng, first_day, last_day)
+            rows += [noise_row(rng, first_day, span) for _ in range(max(args.rows - len(rows), 0))]
+            with db.engine.connect() as conn:
+                insert(conn, rows)
+
+            detector = RecurringDetector()
+            started = time.perf_counter()
+            full = detector.rebuild().to_dict()
+            full_s = time.perf_counter() - started
+
+            with db.engine.connect() as conn:
+                insert(conn, [noise_row(rng, last_day - timedelta(days=1), 1) for _ in range(args.new_rows)])
+            started = time.perf_counter()
+            incremental = detector.update().to_dict()
+            incremental_s = time.perf_counter() - started
+
+            series = detector.series(active_only=False)
+            found = {(s.category, s.cadence) for s in series}
+            missed = [p[0] for p in PLANTED if (p[1], p[4]) not in found]
+            results = {
+                'rows': len(rows),
+                'full_s': full_s,
+                'full_scanned_rows': full['scanned_rows'],
+                'incremental_s': incremental_s,
+                'incremental_scanned_rows': incremental['scanned_rows'],
+                'series_found': len(series),
+                'planted': len(PLANTED),
+                'missed': missed,
+                'series': [s.to_dict() for s in series][:20]
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Full detection over {results['rows']} rows: {full_s:.2f}s")
+        print(f"Incremental run after {args.new_rows} new rows: {incremental_s:.2f}s "
+              f"({results['incremental_scanned_rows']} rows read)")
+        print(f"Series found: {results['series_found']} (planted {len(PLANTED)}, missed {len(missed)})")
+        for name in missed:
+            print(f"  missed: {name}")
+        for s in results['series']:
+            print(f"  {s['cadence']:<9}{s['category']:<16}{s['merchant'][:30]:<32}{s['amount']:>10.2f}  next {s['next_date']}")
+    return 1 if missed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
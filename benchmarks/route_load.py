@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+End-to-end route benchmark.
+
+Fills a temporary database with add_sample_data.py (or copies --db), then
+drives the main pages through the app and reports, per route, latency
+percentiles, SQL statements per request and peak process RSS. Two modes:
+
+  - client: the Flask test client, one request at a time (no network, least noise)
+  - http:   a threaded WSGI server on localhost hit by --concurrency client threads
+
+Each route gets one untimed warm-up request first (snapshots, recurring
+detection and caches fill on first use); its time is reported as cold_ms.
+
+Results are JSON so runs can be compared across commits:
+
+    python benchmarks/route_load.py --output before.json
+    git checkout other-branch
+    python benchmarks/route_load.py --compare before.json
+
+Usage:
+    python benchmarks/route_load.py --transactions 100000 --requests 50
+    python benchmarks/route_load.py --mode http --concurrency 8
+    python benchmarks/route_load.py --db /tmp/1m.db --requests 20 --output 1m.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+SQL_HEADER = 'X-SQL-Statements'
+
+def benchmark_routes():
+    from utils.period_summary import TIME_FRAMES
+    custom_end = date.today()
+    custom_start = custom_end - timedelta(days=365)
+    routes = [f'/dashboard?time_frame={time_frame}' for time_frame in TIME_FRAMES]
+    routes.append(f'/dashboard?time_frame=custom&start_date={custom_start}&end_date={custom_end}')
+    routes += ['/transactions', '/accounts', '/loans', '/api/chart_data']
+    return routes
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class RssSampler:
+    """Tracks the process's peak resident set size within a window, sampling every few milliseconds"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def current(self):
+        """Current RSS in bytes (Linux /proc), else the lifetime peak from getrusage, else None"""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            pass
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    def start(self):
+        self.peak = self.current() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current() or 0)
+
+    def stop(self):
+        """End the window; returns its peak RSS in bytes"""
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current() or 0)
+        return self.peak
+
+def install_sql_counter(app):
+    """Count SQL statements per request and report them in a response header"""
+    from flask import g, has_app_context
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_app_context():
+            g.sql_statements = g.get('sql_statements', 0) + 1
+
+    @app.after_request
+    def add_sql_header(response):
+        response.headers[SQL_HEADER] = str(g.get('sql_statements', 0))
+        return response
+
+class TestClientDriver:
+    """Requests through the Flask test client, one at a time"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, int(response.headers.get(SQL_HEADER, 0))
+
+    def run(self, path, count):
+        return [self._timed(path) for _ in range(count)]
+
+    def _timed(self, path):
+        started = time.perf_counter()
+        status, statements = self.get(path)
+        return time.perf_counter() - started, status, statements
+
+    def close(self):
+        pass
+
+class HttpDriver(TestClientDriver):
+    """Requests over HTTP to a threaded WSGI server, from concurrency client threads"""
+
+    def __init__(self, app, concurrency):
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)  # No access log line per request
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.base + path) as response:
+                response.read()
+                return response.status, int(response.headers.get(SQL_HEADER, 0))
+        except urllib.error.HTTPError as e:
+            return e.code, int(e.headers.get(SQL_HEADER, 0))
+
+    def run(self, path, count):
+        return list(self.pool.map(lambda _: self._timed(path), range(count)))
+
+    def close(self):
+        self.pool.shutdown()
+        self.server.shutdown()
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(driver, sampler, routes, requests):
+    results = {}
+    for path in routes:
+        started = time.perf_counter()
+        cold_status, _ = driver.get(path)
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        sampler.start()
+        started = time.perf_counter()
+        samples = driver.run(path, requests)
+        elapsed = time.perf_counter() - started
+        peak = sampler.stop()
+
+        latencies = [seconds for seconds, _, _ in samples]
+        statements = [count for _, _, count in samples]
+        errors = sum(1 for _, status, _ in samples if status >= 400) + (cold_status >= 400)
+        results[path] = {
+            'requests': len(samples),
+            'errors': errors,
+            'cold_ms': cold_ms,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'requests_per_s': len(samples) / elapsed if elapsed else 0.0,
+            'sql_statements': max(statements) if statements else 0,
+            'peak_rss_mb': peak / 1024 / 1024 if peak else None
+        }
+    return results
+
+def print_results(results):
+    meta = results['meta']
+    print(f"{meta['transactions']} transactions, {meta['mode']} mode"
+          f"{' x' + str(meta['concurrency']) if meta['mode'] == 'http' else ''}, "
+          f"{meta['requests']} requests per route, commit {meta['commit'] or '?'}")
+    print(f"{'route':<58}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'cold ms':>9}{'SQL':>6}{'RSS MB':>8}{'err':>5}")
+    for path, r in results['routes'].items():
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] else '-'
+        print(f"{path[:57]:<58}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['cold_ms']:>9.1f}{r['sql_statements']:>6}{rss:>8}{r['errors']:>5}")
+
+def print_comparison(results, baseline):
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('transactions')} transactions):")
+    for key in ('transactions', 'mode', 'concurrency'):
+        if baseline['meta'].get(key) != results['meta'][key]:
+            print(f"  note: {key} differs ({baseline['meta'].get(key)} then, {results['meta'][key]} now)")
+    print(f"{'route':<58}{'p50':>14}{'p95':>14}{'SQL':>10}")
+    for path, r in results['routes'].items():
+        before = baseline['routes'].get(path)
+        if before is None:
+            print(f"{path[:57]:<58}{'(new)':>14}")
+            continue
+
+        def change(key):
+            return f"{(r[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else '-'
+        print(f"{path[:57]:<58}{change('p50_ms'):>14}{change('p95_ms'):>14}"
+              f"{r['sql_statements'] - before['sql_statements']:>+10}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the main routes end to end')
+    parser.add_argument('--transactions', type=int, default=10000, help='sample transactions to generate')
+    parser.add_argument('--seed', type=int, default=42, help='sample data seed')
+    parser.add_argument('--db', help='copy this database instead of generating sample data')
+    parser.add_argument('--requests', type=int, default=30, help='timed requests per route')
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads in http mode')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    from app import create_app, init_db
+    from database import db
+    from add_sample_data import populate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'finances.db')
+        if args.db:
+            shutil.copy(args.db, db_path)
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'DB_DIR': tmp})
+        install_sql_counter(app)
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db(app)
+            with app.app_context():
+                if not args.db:
+                    populate(args.transactions, args.seed)
+                transactions = db.session.execute(db.text('SELECT COUNT(*) FROM "transaction"')).scalar()
+
+        driver = HttpDriver(app, args.concurrency) if args.mode == 'http' else TestClientDriver(app)
+        try:
+            # The app prints debugging output on some pages
+            with contextlib.redirect_stdout(io.StringIO()):
+                routes = measure(driver, RssSampler(), benchmark_routes(), args.requests)
+        finally:
+            driver.close()
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'transactions': transactions,
+            'seed': None if args.db else args.seed,
+            'db': args.db,
+            'mode': args.mode,
+            'concurrency': args.concurrency if args.mode == 'http' else 1,
+            'requests': args.requests
+        },
+        'routes': routes
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    return 1 if any(r['errors'] for r in routes.values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
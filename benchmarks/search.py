@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Transaction search benchmark: LIKE '%term%' scans against the FTS5 index.
+
+Builds a synthetic ledger in a temporary database (1M rows by default), runs the
+migrations (which build the search index), then times each term both ways and
+checks that the FTS results are a subset of the LIKE results (LIKE also matches
+inside words, FTS only matches at word starts).
+
+Usage:
+    python benchmarks/search.py
+    python benchmarks/search.py --rows 200000 --repeat 5 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+CATEGORIES = [
+    'Groceries', 'Rent', 'Utilities', 'Gas', 'Dining Out', 'Coffee', 'Insurance',
+    'Entertainment', 'Healthcare', 'Shopping', 'Salary', 'Freelance', 'Gift', 'Refund'
+]
+MERCHANTS = [
+    'Whole Foods Market', 'Trader Joes', 'Shell Station', 'Starbucks Reserve', 'Netflix',
+    'City Power and Light', 'Amazon Marketplace', 'Blue Bottle Coffee', 'Uber Trip',
+    'Pharmacy Plus', 'Landlord Properties', 'Acme Corp Payroll', 'Client Invoice'
+]
+TERMS = ['coffee', 'whole foods', 'rent', 'starbucks', 'pharm', 'payroll']
+
+def time_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def populate(conn, rows, seed=42):
+    """Insert rows synthetic transactions straight through the driver"""
+    rng = random.Random(seed)
+    first_day = date.today() - timedelta(days=5 * 365)
+    batch = []
+    for _ in range(rows):
+        category = rng.choice(CATEGORIES)
+        income = category in ('Salary', 'Freelance', 'Gift', 'Refund')
+        batch.append((
+            rng.randint(100, 500000),
+            category,
+            f'{rng.choice(MERCHANTS)} #{rng.randint(1, 9999)}',
+            (first_day + timedelta(days=rng.randint(0, 5 * 365))).isoformat(),
+            'income' if income else 'expense',
+        ))
+        if len(batch) == 50000:
+            _insert(conn, batch)
+            batch = []
+    if batch:
+        _insert(conn, batch)
+
+def _insert(conn, batch):
+    conn.exec_driver_sql(
+        'INSERT INTO "transaction" (amount, category, description, date, transaction_type, is_taxable, created_at) '
+        "VALUES (?, ?, ?, ?, ?, 1, datetime('now'))",
+        batch
+    )
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LIKE scans against the FTS5 search index')
+    parser.add_argument('--rows', type=int, default=1000000, help='synthetic transactions to generate')
+    parser.add_argument('--repeat', type=int, default=5, help='timed repetitions per term')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    from app import create_app
+    from database import db, ensure_schema, import_models
+    from models.transaction import Transaction
+    from utils.search import search, search_condition
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'finances.db')}", 'DB_DIR': tmp})
+        with app.app_context():
+            # Tables first, data next, then the migrations so the index build is timed too
+            import_models()
+            db.create_all()
+            started = time.perf_counter()
+            with db.engine.connect() as conn:
+                populate(conn, args.rows)
+            populate_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            ensure_schema()
+            index_s = time.perf_counter() - started
+
+            terms = {}
+            for term in TERMS:
+                like = Transaction.query.filter(db.or_(
+                    Transaction.category.ilike(f'%{term}%'), Transaction.description.ilike(f'%{term}%')
+                ))
+                fts = Transaction.query.filter(search_condition(term))
+                like_ids = {row.id for row in like.with_entities(Transaction.id)}
+                fts_ids = {row.id for row in fts.with_entities(Transaction.id)}
+                terms[term] = {
+                    'like_ms': time_ms(lambda: like.count(), args.repeat),
+                    'fts_ms': time_ms(lambda: fts.count(), args.repeat),
+                    'ranked_page_ms': time_ms(lambda: search(term, per_page=25), args.repeat),
+                    'like_rows': len(like_ids),
+                    'fts_rows': len(fts_ids),
+                    'fts_subset_of_like': fts_ids <= like_ids
+                }
+            results = {'rows': args.rows, 'populate_s': populate_s, 'index_build_s': index_s, 'terms': terms}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Generated {args.rows} rows in {populate_s:.1f}s, built the search index in {index_s:.1f}s")
+        print(f"{'term':<14}{'like ms':>10}{'fts ms':>10}{'ranked ms':>11}{'like rows':>11}{'fts rows':>10}")
+        for term, timing in terms.items():
+            print(f"{term:<14}{timing['like_ms']:>10.1f}{timing['fts_ms']:>10.1f}{timing['ranked_page_ms']:>11.1f}"
+                  f"{timing['like_rows']:>11}{timing['fts_rows']:>10}")
+    return 0 if all(timing['fts_subset_of_like'] for timing in terms.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the application factory.
+
+Each run starts a fresh interpreter and measures:
+  - import:        `import app` (must stay side-effect free and cheap)
+  - create_app:    building the app and registering blueprints
+  - first_request: the first /dashboard request, including the one-time schema check
+
+Usage:
+    python benchmarks/startup_time.py --runs 10 --max-ms 1500
+
+Exits with status 1 when the median import + create_app + first_request time
+exceeds --max-ms, so it can be used as an acceptance check.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app({{'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + {db_path!r}, 'DB_DIR': {db_dir!r}}})
+t2 = time.perf_counter()
+response = application.test_client().get('/dashboard')
+t3 = time.perf_counter()
+print(json.dumps({{
+    'import': (t1 - t0) * 1000,
+    'create_app': (t2 - t1) * 1000,
+    'first_request': (t3 - t2) * 1000,
+    'status': response.status_code
+}}))
+'''
+
+def run_once(db_path):
+    code = CHILD.format(root=ROOT, db_path=db_path, db_dir=os.path.dirname(db_path))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    # The dashboard prints debug lines; the timing JSON is always the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start of the Flask Finance app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if median total exceeds this')
+    parser.add_argument('--db', default=os.path.join(ROOT, 'db', 'finances.db'), help='database to copy for the runs')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'finances.db')
+        if os.path.exists(args.db):
+            shutil.copy(args.db, db_path)
+
+        runs = [run_once(db_path) for _ in range(args.runs)]
+
+    report = {}
+    for phase in ('import', 'create_app', 'first_request'):
+        values = [run[phase] for run in runs]
+        report[phase] = {'median_ms': statistics.median(values), 'max_ms': max(values)}
+    total = statistics.median(run['import'] + run['create_app'] + run['first_request'] for run in runs)
+    report['total_median_ms'] = total
+    print(json.dumps(report, indent=2))
+
+    if args.max_ms is not None and total > args.max_ms:
+        print(f'Startup took {total:.1f}ms, over the {args.max_ms:.1f}ms target')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant load test.
+
+Simulates --tenants users hitting the app at once, each from their own thread:
+every user alternates adding a transaction and loading the dashboard while the
+first user runs a bulk import (one long write transaction). The same load runs
+against one shared database and against per-user databases (MULTI_TENANT), and
+the script reports request latencies, throughput, 5xx responses and writes lost
+to "database is locked" errors for each.
+
+With one shared file, every writer queues behind the import's lock. With
+sharding, only the importing user's own requests should wait.
+
+Usage:
+    python benchmarks/tenants.py
+    python benchmarks/tenants.py --tenants 100 --requests 20 --bulk-rows 200000 --json
+    python benchmarks/tenants.py --mode sharded --engine-cache 32
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+WRITE_DESCRIPTION = 'load test write'
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def latency_summary(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'p99_ms': percentile(samples, 0.99) * 1000,
+        'max_ms': max(samples) * 1000 if samples else 0.0
+    }
+
+def bulk_import(app, tenant_id, rows):
+    """Insert rows transactions for one tenant in a single write transaction"""
+    from database import db
+    from utils.tenants import tenant_context
+    today = date.today()
+    params = [
+        {
+            'amount': 500 + i % 10000,
+            'category': 'Imported',
+            'description': f'bulk import row {i}',
+            'date': (today - timedelta(days=i % 365)).isoformat()
+        }
+        for i in range(rows)
+    ]
+    with tenant_context(app, tenant_id):
+        db.session.execute(db.text(
+            'INSERT INTO "transaction" (amount, category, description, date, transaction_type, is_taxable, created_at) '
+            "VALUES (:amount, :category, :description, :date, 'expense', 1, datetime('now'))"
+        ), params)
+        db.session.commit()
+
+def written_rows(app, tenant_ids):
+    """Rows the load actually wrote, per tenant (None: the shared database)"""
+    from database import db
+    from utils.tenants import tenant_context
+    counts = {}
+    for tenant_id in tenant_ids:
+        with tenant_context(app, tenant_id):
+            counts[tenant_id] = db.session.execute(
+                db.text('SELECT COUNT(*) FROM "transaction" WHERE description = :d'), {'d': WRITE_DESCRIPTION}
+            ).scalar()
+    return counts
+
+def run(mode, args, directory):
+    from app import create_app, init_db
+    from utils.tenants import tenants
+
+    sharded = mode == 'sharded'
+    # MULTI_TENANT only starts with a SECRET_KEY from the environment
+    os.environ.setdefault('SECRET_KEY', secrets.token_hex(32))
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'finances.db')}",
+        'DB_DIR': directory,
+        'MULTI_TENANT': sharded,
+        'TENANT_ENGINE_CACHE': args.engine_cache
+    }
+    app = create_app(config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(app)
+
+    # One logged-in client per tenant (in shared mode they all use the same database)
+    clients, tenant_ids = [], []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.tenants):
+            client = app.test_client()
+            if sharded:
+                client.post('/register', data={'username': f'tenant{i}', 'password': 'load-test-password'})
+                with client.session_transaction() as session:
+                    tenant_ids.append(session['user_id'])
+            client.get('/dashboard')  # First request creates and migrates the tenant's database
+            clients.append(client)
+    setup_s = time.perf_counter() - started
+    if not sharded:
+        tenant_ids = [None]
+
+    writes, reads, errors = [], [], []
+    samples_lock = threading.Lock()
+    barrier = threading.Barrier(args.tenants)  # Importer plus every other tenant start together
+    import_result = {}
+
+    def importer():
+        barrier.wait()
+        began = time.perf_counter()
+        try:
+            bulk_import(app, tenant_ids[0], args.bulk_rows)
+            import_result['seconds'] = time.perf_counter() - began
+        except Exception as e:
+            import_result['error'] = f'{type(e).__name__}: {e}'
+
+    def tenant_load(client):
+        barrier.wait()
+        local_writes, local_reads, local_errors = [], [], 0
+        for i in range(args.requests):
+            began = time.perf_counter()
+            response = client.post('/add_transaction', data={
+                'category': 'Groceries',
+                'transaction_type': 'expense',
+                'amount': '12.34',
+                'date': date.today().isoformat(),
+                'description': WRITE_DESCRIPTION
+            })
+            local_writes.append(time.perf_counter() - began)
+            local_errors += response.status_code >= 500
+            began = time.perf_counter()
+            response = client.get('/dashboard')
+            local_reads.append(time.perf_counter() - began)
+            local_errors += response.status_code >= 500
+        with samples_lock:
+            writes.extend(local_writes)
+            reads.extend(local_reads)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=importer)]
+    threads += [threading.Thread(target=tenant_load, args=(client,)) for client in clients[1:]]
+    started = time.perf_counter()
+    # Failed requests log tracebacks; they are counted below instead
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    counts = written_rows(app, tenant_ids if not sharded else tenant_ids[1:])
+    expected = (args.tenants - 1) * args.requests
+    written = sum(counts.values())
+    results = {
+        'mode': mode,
+        'tenants': args.tenants,
+        'setup_s': setup_s,
+        'elapsed_s': elapsed,
+        'requests_per_s': (len(writes) + len(reads)) / elapsed if elapsed else 0.0,
+        'bulk_import_rows': args.bulk_rows,
+        'bulk_import_s': import_result.get('seconds'),
+        'bulk_import_error': import_result.get('error'),
+        'writes': latency_summary(writes),
+        'dashboard': latency_summary(reads),
+        'server_errors': sum(errors),
+        'writes_expected': expected,
+        'writes_lost': expected - written
+    }
+    if sharded:
+        results['engine_cache'] = tenants.stats()
+        tenants.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test one shared database against per-user databases')
+    parser.add_argument('--tenants', type=int, default=100, help='simulated users, each on its own thread')
+    parser.add_argument('--requests', type=int, default=10, help='write + dashboard pairs per user')
+    parser.add_argument('--bulk-rows', type=int, default=200000, help='rows in the first user\'s bulk import')
+    parser.add_argument('--engine-cache', type=int, default=64, help='TENANT_ENGINE_CACHE for the sharded run')
+    parser.add_argument('--mode', choices=('both', 'shared', 'sharded'), default='both')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+    if args.tenants < 2:
+        parser.error('--tenants must be at least 2')
+
+    modes = ('shared', 'sharded') if args.mode == 'both' else (args.mode,)
+    results = []
+    for mode in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            results.append(run(mode, args, tmp))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for r in results:
+        print(f"{r['mode']}: {r['tenants']} tenants, set-up {r['setup_s']:.1f}s, load {r['elapsed_s']:.1f}s "
+              f"({r['requests_per_s']:.0f} requests/s)")
+        if r['bulk_import_error']:
+            print(f"  bulk import of {r['bulk_import_rows']} rows failed: {r['bulk_import_error']}")
+        else:
+            print(f"  bulk import of {r['bulk_import_rows']} rows: {r['bulk_import_s']:.1f}s")
+        for name in ('writes', 'dashboard'):
+            s = r[name]
+            print(f"  {name:<10} p50 {s['p50_ms']:8.1f} ms  p95 {s['p95_ms']:8.1f} ms  "
+                  f"p99 {s['p99_ms']:8.1f} ms  max {s['max_ms']:8.1f} ms")
+        print(f"  writes lost: {r['writes_lost']} of {r['writes_expected']}, server errors: {r['server_errors']}")
+        if 'engine_cache' in r:
+            c = r['engine_cache']
+            print(f"  engine cache: {c['open_shards']}/{c['max_engines']} open, "
+                  f"{c['opened']} opened, {c['evicted']} evicted")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
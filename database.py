@@ -1,3 +1,92 @@
+import os
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
 
-db = SQLAlchemy()
+class TenantSession(Session):
+    """
+    Session that sends queries for default-bind models to the current tenant's
+    database when one is active (see utils/tenants.py). Models with their own
+    bind key (the users table) keep their engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        tenant_engine = g.get('tenant_engine') if has_app_context() else None
+        if tenant_engine is not None and bind is None and engine is self._db.engines.get(None):
+            return tenant_engine
+        return engine
+
+db = SQLAlchemy(session_options={'class_': TenantSession})
+
+def file_stamp(bind):
+    """(mtime_ns of the database file, of its -wal file) for a file database, None in memory"""
+    path = bind.url.database
+    if not path or path == ':memory:' or path.startswith('file:'):
+        return None
+    stamp = []
+    for name in (path, f'{path}-wal'):
+        try:
+            stamp.append(os.stat(name).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+def session_file_stamp(session=None):
+    """file_stamp() of the database the session's default-bind models live in (the tenant's, if one is active)"""
+    return file_stamp((session or db.session).get_bind())
+
+class FileStampedCache:
+    """
+    Mixin for in-process caches of database rows that session hooks keep
+    current. Writes from another process (run_loan_scheduler.py from cron, the
+    archive and sample-data scripts) fire no hooks here, so the cache remembers
+    the database file stamp it was built against: check_file() clears it once
+    the file has changed, and committed() moves the stamp past this process's
+    own commits. Subclasses provide clear().
+    """
+
+    _file_stamp = None
+    external_changes = 0
+
+    def check_file(self):
+        """Clear the cache if the active database's file changed since it was built. Returns whether it did."""
+        return self._check_stamp(session_file_stamp())
+
+    def _check_stamp(self, stamp):
+        if stamp == self._file_stamp:
+            return False
+        if self._file_stamp is None:
+            self._file_stamp = stamp
+            return False
+        self.clear()
+        self.external_changes += 1
+        self._file_stamp = stamp
+        return True
+
+    def committed(self, session):
+        """after_commit: drop what an outside write made stale before this commit, then accept the commit's own stamp"""
+        before = session.info.get('file_stamp_before_commit')
+        if before is not None:
+            self._check_stamp(before)
+        self._file_stamp = session_file_stamp(session)
+
+@event.listens_for(OrmSession, 'before_commit')
+def _stamp_before_commit(session):
+    session.info['file_stamp_before_commit'] = session_file_stamp(session)
+
+def import_models():
+    """Import every model so db.metadata knows about all tables"""
+    from models import transaction, loan, investment, budget, account, net_worth_snapshot, recurring_series, job, processed_period, loan_payment, category  # noqa: F401
+
+def ensure_schema(engine=None):
+    """
+    Apply pending migrations (see utils/migrations.py) to engine (default: the app's database).
+    PRAGMA user_version records the applied version, so later starts (and every
+    prefork worker) only pay for a single PRAGMA read instead of running DDL.
+    Returns True if the schema was created or upgraded.
+    """
+    from utils.migrations import run_migrations
+    return bool(run_migrations(db, engine=engine))
@@ -1,77 +1,45 @@
 #!/usr/bin/env python3
 """
-Database migration script to add account_id column to transactions table
-and create the accounts table.
+Apply pending database migrations (see utils/migrations.py).
+The app also runs them on its first request; this script is for running
+them ahead of time with progress output or a custom batch size.
+
+    python migrate_db.py              # apply pending migrations
+    python migrate_db.py --status     # show current and latest version
+    python migrate_db.py --batch-size 1000
 """
 
-import sqlite3
-import os
+import argparse
 
-def migrate_database():
-    # Path to database
-    db_path = os.path.join(os.path.dirname(__file__), 'db', 'finances.db')
-    
-    print(f"Migrating database at: {db_path}")
-    
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    try:
-        # Check if account table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='account';
-        """)
-        
-        account_table_exists = cursor.fetchone() is not None
-        
-        if not account_table_exists:
-            print("Creating accounts table...")
-            cursor.execute("""
-                CREATE TABLE account (
-                    id INTEGER PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    account_type VARCHAR(50) NOT NULL,
-                    bank_name VARCHAR(100),
-                    account_number VARCHAR(50),
-                    current_balance FLOAT NOT NULL DEFAULT 0.0,
-                    initial_balance FLOAT NOT NULL DEFAULT 0.0,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            print("✓ Accounts table created")
-        else:
-            print("✓ Accounts table already exists")
-        
-        # Check if account_id column exists in transaction table
-        cursor.execute('PRAGMA table_info("transaction");')
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'account_id' not in columns:
-            print("Adding account_id column to transactions table...")
-            cursor.execute('''
-                ALTER TABLE "transaction" 
-                ADD COLUMN account_id INTEGER 
-                REFERENCES account(id);
-            ''')
-            print("✓ account_id column added to transactions")
+from app import create_app
+from database import db
+from utils.migrations import DEFAULT_BATCH_SIZE, MIGRATIONS, current_version, latest_version, run_migrations
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply pending database migrations')
+    parser.add_argument('--status', action='store_true', help='show the schema version and pending steps')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='rows updated per committed backfill batch')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+        with db.engine.connect() as conn:
+            version = current_version(conn)
+        print(f"Schema version: {version} (latest {latest_version()})")
+
+        if args.status:
+            for step_version, description, _ in MIGRATIONS:
+                state = 'applied' if step_version <= version else 'pending'
+                print(f"  {step_version:>3} {state:<8} {description}")
+            return
+
+        applied = run_migrations(db, batch_size=args.batch_size)
+        if applied:
+            print(f"✓ Applied migrations: {', '.join(str(v) for v in applied)}")
         else:
-            print("✓ account_id column already exists in transactions")
-        
-        # Commit changes
-        conn.commit()
-        print("✓ Database migration completed successfully!")
-        
-    except Exception as e:
-        print(f"❌ Error during migration: {e}")
-        conn.rollback()
-        raise
-    
-    finally:
-        conn.close()
+            print("✓ Database is up to date")
 
 if __name__ == "__main__":
-    migrate_database()
+    main()
@@ -1,4 +1,5 @@
 from database import db
+from utils.money import Money, cents, from_cents, to_cents
 from datetime import datetime
 
 class Account(db.Model):
@@ -7,8 +8,8 @@ class Account(db.Model):
     account_type = db.Column(db.String(50), nullable=False)  # checking, savings, credit, investment, cash
     bank_name = db.Column(db.String(100))
     account_number = db.Column(db.String(50))  # Store last 4 digits for identification
-    current_balance = db.Column(db.Float, nullable=False, default=0.0)
-    initial_balance = db.Column(db.Float, nullable=False, default=0.0)
+    current_balance = db.Column(Money, nullable=False, default=0.0)
+    initial_balance = db.Column(Money, nullable=False, default=0.0)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -19,32 +20,33 @@ class Account(db.Model):
     def __repr__(self):
         return f'<Account {self.name}: ${self.current_balance:.2f}>'
     
-    def get_calculated_balance(self):
-        """Calculate balance based on transactions starting from initial balance"""
-        if not self.transactions:
-            return self.initial_balance
-        
-        balance = self.initial_balance
+    def get_calculated_balance_cents(self):
+        """Initial balance plus signed transaction amounts (archived years included), in exact integer cents"""
+        from utils.archive import transaction_archive
+        balance = to_cents(self.initial_balance) + transaction_archive.account_stamps().get(self.id, (0, 0, 0))[2]
         for transaction in self.transactions:
             if transaction.transaction_type == 'income':
-                balance += transaction.amount
+                balance += to_cents(transaction.amount)
             else:  # expense
-                balance -= transaction.amount
-        
+                balance -= to_cents(transaction.amount)
         return balance
     
+    def get_calculated_balance(self):
+        """Calculate balance based on transactions starting from initial balance"""
+        return from_cents(self.get_calculated_balance_cents())
+    
     def get_balance_difference(self):
         """Get the difference between actual and calculated balance"""
-        calculated = self.get_calculated_balance()
-        return self.current_balance - calculated
+        return from_cents(to_cents(self.current_balance) - self.get_calculated_balance_cents())
     
-    def is_balanced(self, tolerance=0.01):
-        """Check if account balance matches calculated balance within tolerance"""
-        return abs(self.get_balance_difference()) <= tolerance
+    def is_balanced(self):
+        """Check if account balance matches calculated balance (exact, both are whole cents)"""
+        return to_cents(self.current_balance) == self.get_calculated_balance_cents()
     
     def get_transaction_count(self):
-        """Get the number of transactions for this account"""
-        return len(self.transactions)
+        """Get the number of transactions for this account (archived years included)"""
+        from utils.archive import transaction_archive
+        return len(self.transactions) + transaction_archive.account_stamps().get(self.id, (0, 0, 0))[0]
     
     @staticmethod
     def get_total_assets():
@@ -68,3 +70,43 @@ class Account(db.Model):
     def get_net_worth():
         """Calculate net worth from account balances"""
         return Account.get_total_assets() - Account.get_total_liabilities()
+    
+    @staticmethod
+    def get_transaction_stamps(account_ids=None):
+        """
+        Per-account transaction count, highest transaction id and net amount in one query
+        (for every account, or just account_ids).
+        Any insert or delete changes the stamp, so it doubles as a cache version.
+        Archived years are included, so moving rows to cold storage leaves stamps unchanged.
+        Returns dict: {account_id: (count, last_transaction_id, net_cents)}
+        """
+        from models.transaction import Transaction
+        from utils.archive import transaction_archive
+        amount = cents(Transaction.amount)
+        signed_amount = db.case((Transaction.transaction_type == 'income', amount), else_=-amount)
+        rows = db.session.query(
+            Transaction.account_id,
+            db.func.count(Transaction.id),
+            db.func.max(Transaction.id),
+            db.func.sum(signed_amount)
+        ).filter(
+            Transaction.account_id.isnot(None) if account_ids is None else Transaction.account_id.in_(account_ids)
+        ).group_by(Transaction.account_id).all()
+        stamps = transaction_archive.account_stamps()
+        for account_id, count, last_id, net in rows:
+            archived_count, archived_last_id, archived_net = stamps.get(account_id, (0, 0, 0))
+            stamps[account_id] = (count + archived_count, max(last_id, archived_last_id), (net or 0) + archived_net)
+        return stamps
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'account_type': self.account_type,
+            'bank_name': self.bank_name,
+            'account_number': self.account_number,
+            'current_balance': self.current_balance,
+            'initial_balance': self.initial_balance,
+            'is_active': self.is_active,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,35 +1,36 @@
 from database import db
+from utils.money import Money
 from datetime import datetime
 
 class Budget(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
-    annual_income = db.Column(db.Float, nullable=False)
+    annual_income = db.Column(Money, nullable=False)
     employment_type = db.Column(db.String(10), nullable=False)  # w2 or 1099
     state_code = db.Column(db.String(2), nullable=True)
     city_code = db.Column(db.String(10), nullable=True)
     
     # Monthly allocations
-    housing = db.Column(db.Float, default=0)
-    food = db.Column(db.Float, default=0)
-    transportation = db.Column(db.Float, default=0)
-    utilities = db.Column(db.Float, default=0)
-    healthcare = db.Column(db.Float, default=0)
-    insurance = db.Column(db.Float, default=0)
-    entertainment = db.Column(db.Float, default=0)
-    personal_care = db.Column(db.Float, default=0)
-    shopping = db.Column(db.Float, default=0)
-    education = db.Column(db.Float, default=0)
-    savings = db.Column(db.Float, default=0)
-    emergency_fund = db.Column(db.Float, default=0)
-    retirement = db.Column(db.Float, default=0)
-    other = db.Column(db.Float, default=0)
+    housing = db.Column(Money, default=0)
+    food = db.Column(Money, default=0)
+    transportation = db.Column(Money, default=0)
+    utilities = db.Column(Money, default=0)
+    healthcare = db.Column(Money, default=0)
+    insurance = db.Column(Money, default=0)
+    entertainment = db.Column(Money, default=0)
+    personal_care = db.Column(Money, default=0)
+    shopping = db.Column(Money, default=0)
+    education = db.Column(Money, default=0)
+    savings = db.Column(Money, default=0)
+    emergency_fund = db.Column(Money, default=0)
+    retirement = db.Column(Money, default=0)
+    other = db.Column(Money, default=0)
     
     # Calculated fields (stored for performance)
-    monthly_take_home = db.Column(db.Float, nullable=False)
-    monthly_taxes = db.Column(db.Float, nullable=False)
-    monthly_loan_payments = db.Column(db.Float, default=0)
-    monthly_available = db.Column(db.Float, nullable=False)
+    monthly_take_home = db.Column(Money, nullable=False)
+    monthly_taxes = db.Column(Money, nullable=False)
+    monthly_loan_payments = db.Column(Money, default=0)
+    monthly_available = db.Column(Money, nullable=False)
     
     # Metadata
     is_active = db.Column(db.Boolean, default=True)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from database import db
+
+class Category(db.Model):
+    """
+    One transaction category. Spellings that differ only in case or spacing
+    share a row (canonical_name is the case-folded name); name is how it is
+    shown and what Transaction.category holds. Transactions point here through
+    category_id, set by utils/categories.py when they are written.
+    """
+    __tablename__ = 'category'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    canonical_name = db.Column(db.String(100), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Category {self.id}: {self.name}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
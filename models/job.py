@@ -0,0 +1,45 @@
+import json
+from datetime import datetime
+from database import db
+
+class Job(db.Model):
+    """A background job run by utils/jobs.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(100), nullable=False)
+    executor = db.Column(db.String(10), nullable=False)  # thread or process
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, cancelled
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0-1, as of the last status change
+    message = db.Column(db.String(200))
+    params = db.Column(db.Text)  # JSON
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    worker_pid = db.Column(db.Integer)  # Process that owns the job's pool
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    FINISHED = ('succeeded', 'failed', 'cancelled')
+
+    def __repr__(self):
+        return f'<Job {self.id}: {self.job_type} {self.status}>'
+
+    def is_finished(self):
+        return self.status in self.FINISHED
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'executor': self.executor,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'params': json.loads(self.params) if self.params else {},
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -1,28 +1,34 @@
 from datetime import datetime
 from database import db
+from models.loan_payment import LoanPayment
+from utils.jobs import job_type
+from utils.money import Money, from_cents, to_cents
 
 class Loan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    balance = db.Column(db.Float, nullable=False)
-    original_amount = db.Column(db.Float)
+    balance = db.Column(Money, nullable=False)
+    original_amount = db.Column(Money)
     interest_rate = db.Column(db.Float, nullable=False)  # Annual percentage rate
-    minimum_payment = db.Column(db.Float, nullable=False)
+    minimum_payment = db.Column(Money, nullable=False)
     due_date = db.Column(db.Date, nullable=False)
     loan_type = db.Column(db.String(50), nullable=False)  # 'credit_card', 'mortgage', 'auto', 'personal', etc.
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # New fields for enhanced loan management
     target_payoff_months = db.Column(db.Integer)  # User-selected payoff timeline
-    current_month_paid = db.Column(db.Float, default=0.0)  # Amount paid this month
+    current_month_paid = db.Column(Money, default=0.0)  # Amount paid this month
     last_payment_date = db.Column(db.Date)  # Track when last payment was made
     auto_payment_enabled = db.Column(db.Boolean, default=False)  # For automatic payments
     
     # Enhanced tracking fields
-    total_interest_paid = db.Column(db.Float, default=0.0)  # Total interest paid over loan life
-    total_payments_made = db.Column(db.Float, default=0.0)  # Total amount paid towards loan
+    total_interest_paid = db.Column(Money, default=0.0)  # Total interest paid over loan life
+    total_payments_made = db.Column(Money, default=0.0)  # Total amount paid towards loan
     payment_count = db.Column(db.Integer, default=0)  # Number of payments made
     
+    # Every payment with its split (models/loan_payment.py); dynamic, so adding one never loads the rest
+    payments = db.relationship('LoanPayment', backref='loan', lazy='dynamic', cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Loan {self.id}: {self.name} ${self.balance}>'
     
@@ -176,9 +182,10 @@ class Loan(db.Model):
         """Check if this month's payment requirement has been met"""
         return self.current_month_paid >= self.required_monthly_payment()
     
-    def make_payment(self, amount, payment_date=None, account_id=None):
+    def make_payment(self, amount, payment_date=None, account_id=None, transaction=None):
         """
-        Make a payment on this loan and track interest vs principal
+        Make a payment on this loan and track interest vs principal.
+        Records it in the payment history (linked to transaction, if given).
         Returns dict with payment details and updated loan status
         """
         from datetime import date
@@ -195,16 +202,19 @@ class Loan(db.Model):
         interest_portion, principal_portion = self.calculate_interest_breakdown(amount)
         
         # Handle month rollover for payment tracking
-        if (self.last_payment_date is None or 
-            payment_date.month != self.last_payment_date.month or 
-            payment_date.year != self.last_payment_date.year):
+        payment_month = (payment_date.year, payment_date.month)
+        last_month = (self.last_payment_date.year, self.last_payment_date.month) if self.last_payment_date else None
+        if last_month is None or payment_month > last_month:
             # New month, reset current month payment tracking
             self.current_month_paid = 0.0
         
-        # Update payment tracking
+        # Update payment tracking (a back-dated payment from an earlier month
+        # does not count toward this month or move the last payment date back)
         old_balance = self.balance
-        self.current_month_paid += amount
-        self.last_payment_date = payment_date
+        if last_month is None or payment_month >= last_month:
+            self.current_month_paid += amount
+        if self.last_payment_date is None or payment_date > self.last_payment_date:
+            self.last_payment_date = payment_date
         self.total_payments_made += amount
         self.total_interest_paid += interest_portion
         self.payment_count += 1
@@ -212,6 +222,15 @@ class Loan(db.Model):
         # Apply payment to balance
         self.balance = max(0, self.balance - principal_portion)
         actual_principal_applied = old_balance - self.balance
+        self.payments.append(LoanPayment(
+            date=payment_date,
+            amount=amount,
+            interest=interest_portion,
+            principal=actual_principal_applied,
+            balance_after=self.balance,
+            account_id=account_id,
+            transaction=transaction
+        ))
         
         # Calculate if overpaid this month
         required_monthly = self.calculate_monthly_payment()
@@ -291,6 +310,30 @@ class Loan(db.Model):
         denominator = math.log(1 + monthly_rate)
         return numerator / denominator
     
+    def version_stamp(self):
+        """
+        Values that change whenever anything rendered from this loan changes.
+        Loan has no updated_at, so the mutable columns themselves form the stamp;
+        today's date is included because payoff dates are relative to today.
+        """
+        from datetime import date
+        return (
+            self.id, self.name, self.loan_type, self.balance, self.original_amount,
+            self.interest_rate, self.minimum_payment, self.target_payoff_months,
+            self.current_month_paid, self.last_payment_date, self.total_interest_paid,
+            self.total_payments_made, self.payment_count, self.auto_payment_enabled, date.today()
+        )
+    
+    def simulation_input(self):
+        """Plain data for simulate_payoff_strategies(), which runs in another process"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'balance': self.balance,
+            'interest_rate': self.interest_rate,
+            'minimum_payment': self.effective_minimum_payment()
+        }
+    
     def to_dict(self):
         payoff_summary = self.calculate_payoff_summary()
         return {
@@ -303,6 +346,7 @@ class Loan(db.Model):
             'due_date': self.due_date.isoformat(),
             'loan_type': self.loan_type,
             'target_payoff_months': self.target_payoff_months,
+            'auto_payment_enabled': bool(self.auto_payment_enabled),
             
             # Payment calculations
             'monthly_payment': self.calculate_monthly_payment(),
@@ -324,3 +368,91 @@ class Loan(db.Model):
             'estimated_payoff_months': self.recalculate_payoff_timeline() if payoff_summary else None,
             'payoff_date': payoff_summary['payoff_date'].isoformat() if payoff_summary else None
         }
+
+# Which loan gets the extra money first
+PAYOFF_STRATEGIES = {
+    'avalanche': lambda loan: (-loan['interest_rate'], loan['balance']),  # Highest rate first
+    'snowball': lambda loan: (loan['balance'], -loan['interest_rate']),  # Smallest balance first
+}
+
+def _simulate_payoff(loans, extra_payment, order, max_months):
+    """
+    Month-by-month payoff in cents: interest accrues, every loan gets its minimum,
+    then extra_payment plus the minimums of loans already paid off go to loans in
+    the given order (no order: minimums only). Returns the totals and payoff months.
+    """
+    state = [dict(loan, balance=to_cents(loan['balance']), minimum=to_cents(loan['minimum_payment'])) for loan in loans]
+    extra = to_cents(extra_payment)
+    total_interest = total_paid = month = 0
+    payoff = {}
+    while month < max_months and any(loan['balance'] > 0 for loan in state):
+        month += 1
+        available = extra if order else 0
+        for loan in state:
+            if loan['balance'] <= 0:
+                available += loan['minimum'] if order else 0  # Freed-up minimums roll over
+                continue
+            interest = round(loan['balance'] * loan['interest_rate'] / 100 / 12)
+            loan['balance'] += interest
+            total_interest += interest
+            payment = min(loan['minimum'], loan['balance'])
+            loan['balance'] -= payment
+            total_paid += payment
+            if order:
+                available += loan['minimum'] - payment
+        if order:
+            for loan in sorted((loan for loan in state if loan['balance'] > 0), key=order):
+                if available <= 0:
+                    break
+                payment = min(available, loan['balance'])
+                loan['balance'] -= payment
+                total_paid += payment
+                available -= payment
+        for loan in state:
+            if loan['balance'] <= 0 and loan['id'] not in payoff:
+                payoff[loan['id']] = month
+
+    paid_off = all(loan['balance'] <= 0 for loan in state)
+    return {
+        'months': month if paid_off else None,  # None: not paid off within max_months
+        'total_interest': from_cents(total_interest),
+        'total_paid': from_cents(total_paid),
+        'payoff_order': sorted(
+            ({'id': loan['id'], 'name': loan['name'], 'month': payoff.get(loan['id'])} for loan in state),
+            key=lambda item: (item['month'] is None, item['month'] or 0)
+        )
+    }
+
+@job_type('loan_payoff_simulation', executor='process')
+def simulate_payoff_strategies(loans, extra_payment=0.0, sweep_max=0.0, sweep_step=50.0, max_months=600):
+    """
+    Compare paying minimums only with each strategy in PAYOFF_STRATEGIES, all
+    loans at once. loans are Loan.simulation_input() dicts. With sweep_max, each
+    strategy is also run for extra payments 0, sweep_step, ... sweep_max, so the
+    effect of paying more can be charted. Runs in the job process pool.
+    """
+    strategies = {'minimum_only': _simulate_payoff(loans, 0, None, max_months)}
+    for name, order in PAYOFF_STRATEGIES.items():
+        strategies[name] = _simulate_payoff(loans, extra_payment, order, max_months)
+    recommended = min(PAYOFF_STRATEGIES, key=lambda name: (
+        strategies[name]['total_interest'], strategies[name]['months'] or max_months + 1
+    ))
+
+    sweep = []
+    if sweep_max > 0 and sweep_step > 0:
+        steps = min(int(sweep_max // sweep_step), 200)
+        for index in range(steps + 1):
+            amount = index * sweep_step
+            row = {'extra_payment': amount}
+            for name, order in PAYOFF_STRATEGIES.items():
+                outcome = _simulate_payoff(loans, amount, order, max_months)
+                row[name] = {'months': outcome['months'], 'total_interest': outcome['total_interest']}
+            sweep.append(row)
+
+    return {
+        'extra_payment': extra_payment,
+        'strategies': strategies,
+        'recommended': recommended,
+        'interest_saved': round(strategies['minimum_only']['total_interest'] - strategies[recommended]['total_interest'], 2),
+        'sweep': sweep
+    }
@@ -0,0 +1,45 @@
+from datetime import datetime
+from database import db
+from models.transaction import Transaction
+from utils.money import Money
+
+class LoanPayment(db.Model):
+    """
+    One payment on a loan, with its interest/principal split and the balance it
+    left. Written by Loan.make_payment() and utils/loan_payments.py; payments
+    made before the table existed were rebuilt from their transaction
+    descriptions (migration 12). Queries go through utils/loan_history.py.
+    """
+    __tablename__ = 'loan_payment'
+    __table_args__ = (
+        db.Index('ix_loan_payment_loan_date', 'loan_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    amount = db.Column(Money, nullable=False)
+    interest = db.Column(Money, nullable=False, default=0.0)
+    principal = db.Column(Money, nullable=False, default=0.0)
+    balance_after = db.Column(Money)  # None when it could not be reconstructed
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=True, unique=True)  # The Loan Payment expense
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    transaction = db.relationship(Transaction)
+
+    def __repr__(self):
+        return f'<LoanPayment {self.id}: loan {self.loan_id} ${self.amount} on {self.date}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'loan_id': self.loan_id,
+            'date': self.date.isoformat(),
+            'amount': self.amount,
+            'interest': self.interest,
+            'principal': self.principal,
+            'balance_after': self.balance_after,
+            'account_id': self.account_id,
+            'transaction_id': self.transaction_id
+        }
@@ -0,0 +1,47 @@
+from datetime import datetime
+from database import db
+from utils.money import Money, from_cents, to_cents
+
+class NetWorthSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False, unique=True, index=True)  # One row per day
+    
+    # Cumulative transaction totals up to and including snapshot_date
+    total_income = db.Column(Money, nullable=False, default=0.0)
+    total_taxable_income = db.Column(Money, nullable=False, default=0.0)
+    total_expenses = db.Column(Money, nullable=False, default=0.0)
+    
+    # Holdings as last observed on snapshot_date
+    portfolio_value = db.Column(Money, nullable=False, default=0.0)
+    total_invested = db.Column(Money, nullable=False, default=0.0)
+    total_debt = db.Column(Money, nullable=False, default=0.0)
+    account_net_worth = db.Column(Money, nullable=False, default=0.0)  # Account.get_net_worth() for reconciliation
+    
+    # net_balance + portfolio_value - total_debt (same formula as the dashboard)
+    net_worth = db.Column(Money, nullable=False, default=0.0)
+    
+    # Highest Transaction.id folded into the snapshot table (incremental watermark)
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<NetWorthSnapshot {self.snapshot_date}: ${self.net_worth:.2f}>'
+    
+    def net_balance(self):
+        """All-time income minus expenses as of this snapshot"""
+        return from_cents(to_cents(self.total_income) - to_cents(self.total_expenses))
+    
+    def to_dict(self):
+        return {
+            'date': self.snapshot_date.isoformat(),
+            'total_income': self.total_income,
+            'total_taxable_income': self.total_taxable_income,
+            'total_expenses': self.total_expenses,
+            'net_balance': self.net_balance(),
+            'portfolio_value': self.portfolio_value,
+            'total_invested': self.total_invested,
+            'total_debt': self.total_debt,
+            'account_net_worth': self.account_net_worth,
+            'net_worth': self.net_worth
+        }
@@ -0,0 +1,33 @@
+from datetime import datetime
+from database import db
+from utils.money import Money
+
+class ProcessedPeriod(db.Model):
+    """
+    Marks a scheduler task as done for a month (utils/loan_scheduler.py), so
+    restarts and several worker processes never run it twice. loan_id is 0 for
+    tasks covering every loan (the month rollover).
+    """
+    __tablename__ = 'processed_period'
+
+    task = db.Column(db.String(30), primary_key=True)  # month_rollover or auto_payment
+    period = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    loan_id = db.Column(db.Integer, primary_key=True, default=0)
+    loans_updated = db.Column(db.Integer)  # Rollover: loans whose monthly counter was reset
+    amount = db.Column(Money)  # Auto-payment: amount paid (0 when the month was already covered)
+    transaction_id = db.Column(db.Integer)  # Auto-payment: the Loan Payment transaction
+    processed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ProcessedPeriod {self.task} {self.period} loan {self.loan_id}>'
+
+    def to_dict(self):
+        return {
+            'task': self.task,
+            'period': self.period,
+            'loan_id': self.loan_id or None,
+            'loans_updated': self.loans_updated,
+            'amount': self.amount,
+            'transaction_id': self.transaction_id,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None
+        }
@@ -0,0 +1,87 @@
+from datetime import date, datetime
+from database import db
+from utils.money import Money
+
+class RecurringSeries(db.Model):
+    """A detected recurring transaction (rent, subscriptions, paychecks, ...), maintained by utils/recurring.py"""
+    __tablename__ = 'recurring_series'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # transaction_type|category|merchant|amount bucket - one series per key
+    key = db.Column(db.String(300), nullable=False, unique=True)
+    transaction_type = db.Column(db.String(20), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    merchant = db.Column(db.String(200), nullable=False)  # Normalized description
+    description = db.Column(db.Text)  # Description of the latest occurrence, as entered
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=True)
+
+    cadence = db.Column(db.String(20), nullable=False)  # weekly, biweekly, monthly or annual
+    interval_days = db.Column(db.Float, nullable=False)  # Median days between occurrences
+    amount = db.Column(Money, nullable=False)  # Median amount
+    occurrences = db.Column(db.Integer, nullable=False)
+    confidence = db.Column(db.Float, nullable=False)  # Lower of: gaps on cadence, expected occurrences seen
+
+    first_date = db.Column(db.Date, nullable=False)
+    last_date = db.Column(db.Date, nullable=False)
+    next_date = db.Column(db.Date, nullable=False, index=True)  # Expected next occurrence
+
+    needs_rescan = db.Column(db.Boolean, nullable=False, default=False)  # Set when one of its transactions is deleted
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_recurring_series_group', 'transaction_type', 'category'),
+    )
+
+    def __repr__(self):
+        return f'<RecurringSeries {self.merchant}: {self.cadence} ${self.amount}>'
+
+    def is_active(self, today=None):
+        """Still going: the next occurrence is not overdue by more than one interval"""
+        today = today or date.today()
+        return (today - self.next_date).days <= self.interval_days
+
+    def monthly_amount(self):
+        """Average amount per month at this cadence"""
+        return self.amount * 30.44 / self.interval_days if self.interval_days else 0.0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'transaction_type': self.transaction_type,
+            'category': self.category,
+            'merchant': self.merchant,
+            'description': self.description,
+            'account_id': self.account_id,
+            'cadence': self.cadence,
+            'interval_days': self.interval_days,
+            'amount': self.amount,
+            'monthly_amount': round(self.monthly_amount(), 2),
+            'occurrences': self.occurrences,
+            'confidence': self.confidence,
+            'first_date': self.first_date.isoformat(),
+            'last_date': self.last_date.isoformat(),
+            'next_date': self.next_date.isoformat(),
+            'is_active': self.is_active()
+        }
+
+class RecurringScan(db.Model):
+    """Single row: how far utils/recurring.py has scanned the transaction table"""
+    __tablename__ = 'recurring_scan'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Highest Transaction.id folded into recurring_series (incremental watermark)
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    series_count = db.Column(db.Integer, nullable=False, default=0)
+    scanned_rows = db.Column(db.Integer, nullable=False, default=0)  # Rows read by the last run
+    duration_ms = db.Column(db.Float, nullable=False, default=0.0)
+    scanned_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'last_transaction_id': self.last_transaction_id,
+            'series_count': self.series_count,
+            'scanned_rows': self.scanned_rows,
+            'duration_ms': round(self.duration_ms, 1),
+            'scanned_at': self.scanned_at.isoformat() if self.scanned_at else None
+        }
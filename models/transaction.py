@@ -1,11 +1,17 @@
 from datetime import datetime
 from database import db
+from utils.money import Money
 
 class Transaction(db.Model):
+    # AUTOINCREMENT: ids of deleted rows are never handed out again, so "id above
+    # a watermark" always means "added since" (utils/net_worth.py); see migration 14
+    __table_args__ = {'sqlite_autoincrement': True}
+
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
-    date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date())
-    category = db.Column(db.String(100), nullable=False)
+    amount = db.Column(Money, nullable=False)
+    date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date(), index=True)
+    category = db.Column(db.String(100), nullable=False)  # Name of the category below, as shown
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), index=True)  # Set on write (utils/categories.py)
     description = db.Column(db.Text)
     transaction_type = db.Column(db.String(20), nullable=False)  # 'income' or 'expense'
     is_taxable = db.Column(db.Boolean, nullable=False, default=True)  # Whether income is taxable (gifts, refunds, etc. are not)
@@ -21,6 +27,7 @@ class Transaction(db.Model):
             'amount': self.amount,
             'date': self.date.isoformat(),
             'category': self.category,
+            'category_id': self.category_id,
             'description': self.description,
             'transaction_type': self.transaction_type,
             'is_taxable': self.is_taxable,
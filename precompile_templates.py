@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Compile the Jinja templates into Python modules for the fast-start build.
+Frozen builds (and runs with PRECOMPILED_TEMPLATES=1) load templates from
+compiled_templates/ when it exists, so the first render of each page skips
+template parsing and code generation. Re-run after editing any template
+(build_local.sh --fast does this for you).
+"""
+
+import os
+import shutil
+import sys
+
+def precompile_templates(target=None):
+    from app import create_app, basedir
+    target = target or os.path.join(basedir, 'compiled_templates')
+
+    # Compile with the real app environment so custom tags like {% cache %} are known
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'PRECOMPILED_TEMPLATES_DIR': None})
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.makedirs(target)
+
+    compiled = []
+    app.jinja_env.compile_templates(
+        target,
+        zip=None,
+        ignore_errors=False,
+        log_function=compiled.append
+    )
+    print(f"Compiled {sum(1 for line in compiled if line.startswith('Compiled'))} templates into {target}")
+    return target
+
+if __name__ == '__main__':
+    precompile_templates(sys.argv[1] if len(sys.argv) > 1 else None)
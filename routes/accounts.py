@@ -0,0 +1,154 @@
+from flask import Blueprint, render_template, request, url_for
+from datetime import datetime
+from database import db
+from models.transaction import Transaction
+from models.account import Account
+from utils.archive import transaction_archive
+from utils.ledger_cache import ledger_cache
+from utils.money import cents, from_cents, to_cents
+from utils.partials import partial_response
+from utils.reference_cache import get_active_accounts
+
+bp = Blueprint('accounts', __name__)
+
+def transaction_totals():
+    """(total income, total expenses, net) over every transaction, archived years included"""
+    # Integer cent sums, from the ledger cache when enabled
+    if ledger_cache.enabled:
+        income_cents, expense_cents = ledger_cache.totals()
+    else:
+        amount = cents(Transaction.amount)
+        income_cents, expense_cents = db.session.query(
+            db.func.sum(db.case((Transaction.transaction_type == 'income', amount), else_=0)),
+            db.func.sum(db.case((Transaction.transaction_type == 'expense', amount), else_=0))
+        ).one()
+        archived_income, archived_expenses = transaction_archive.totals()
+        income_cents = (income_cents or 0) + archived_income
+        expense_cents = (expense_cents or 0) + archived_expenses
+    return (
+        from_cents(income_cents or 0),
+        from_cents(expense_cents or 0),
+        from_cents((income_cents or 0) - (expense_cents or 0))
+    )
+
+def account_totals(accounts, calculated_net=None):
+    """The page's summary numbers: balances by type, net worth and the reconciliation difference"""
+    totals = {
+        f'{account_type}_total': sum(acc.current_balance for acc in accounts if acc.account_type == account_type)
+        for account_type in ('checking', 'savings', 'credit', 'investment', 'cash')
+    }
+    totals['total_assets'] = totals['checking_total'] + totals['savings_total'] + totals['investment_total'] + totals['cash_total']
+    totals['account_count'] = len(accounts)
+    
+    # Account-based net worth
+    totals['account_net_worth'] = Account.get_net_worth()
+    
+    # Difference between transaction-based and account-based calculations
+    if calculated_net is None:
+        calculated_net = transaction_totals()[2]
+    totals['reconciliation_difference'] = totals['account_net_worth'] - calculated_net
+    return totals
+
+def _account_summary():
+    return account_totals(get_active_accounts())
+
+def _account_row(account):
+    return render_template('partials/account_row.html', account=account,
+                           transaction_stamps=Account.get_transaction_stamps([account.id]))
+
+@bp.route('/accounts')
+def accounts():
+    accounts = get_active_accounts()
+    total_income, total_expenses, calculated_net = transaction_totals()
+    
+    # Per-account transaction stamps: cache versions for account rows and the calculated balances
+    transaction_stamps = Account.get_transaction_stamps()
+    
+    # Get unbalanced accounts (same check as Account.is_balanced, without loading each account's transactions)
+    unbalanced_accounts = [
+        acc for acc in accounts
+        if to_cents(acc.current_balance) != to_cents(acc.initial_balance) + transaction_stamps.get(acc.id, (0, None, 0))[2]
+    ]
+    
+    return render_template('accounts.html',
+                         accounts=accounts,
+                         total_income=total_income,
+                         total_expenses=total_expenses,
+                         calculated_net=calculated_net,
+                         unbalanced_accounts=unbalanced_accounts,
+                         transaction_stamps=transaction_stamps,
+                         **account_totals(accounts, calculated_net))
+
+@bp.route('/add_account', methods=['POST'])
+def add_account():
+    try:
+        name = request.form['name']
+        account_type = request.form['account_type']
+        bank_name = request.form.get('bank_name', '')
+        account_number = request.form.get('account_number', '')
+        current_balance = float(request.form['current_balance'])
+        initial_balance = float(request.form.get('initial_balance', current_balance))
+        
+        account = Account(
+            name=name,
+            account_type=account_type,
+            bank_name=bank_name,
+            account_number=account_number,
+            current_balance=current_balance,
+            initial_balance=initial_balance
+        )
+        
+        db.session.add(account)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('accounts.accounts'), f'Error adding account: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('accounts.accounts'), f'Account "{name}" added successfully!',
+        collection='account', item=account, fragment=lambda: _account_row(account), summary=_account_summary
+    )
+
+@bp.route('/update_account_balance', methods=['POST'])
+def update_account_balance():
+    try:
+        account_id = int(request.form['account_id'])
+        new_balance = float(request.form['current_balance'])
+        
+        account = Account.query.get_or_404(account_id)
+        account.current_balance = new_balance
+        account.updated_at = datetime.utcnow()
+        
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('accounts.accounts'), f'Error updating balance: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('accounts.accounts'), f'Balance updated for "{account.name}"',
+        collection='account', item=account, fragment=lambda: _account_row(account), summary=_account_summary
+    )
+
+@bp.route('/delete_account/<int:account_id>', methods=['POST'])
+def delete_account(account_id):
+    try:
+        account = Account.query.get_or_404(account_id)
+        
+        # Check if account has transactions
+        if account.transactions:
+            # Soft delete - mark as inactive instead of deleting
+            account.is_active = False
+            message, category = f'Account "{account.name}" has been deactivated (has transaction history)', 'warning'
+        else:
+            # Hard delete if no transactions
+            db.session.delete(account)
+            message, category = f'Account "{account.name}" has been deleted', 'success'
+        
+        db.session.commit()
+        
+    except Exception as e:
+        return partial_response(url_for('accounts.accounts'), f'Error deleting account: {str(e)}', 'error')
+    
+    # Either way it leaves the list of active accounts
+    return partial_response(
+        url_for('accounts.accounts'), message, category,
+        collection='account', removed=f'account-{account_id}', summary=_account_summary
+    )
@@ -0,0 +1,437 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from datetime import date, timedelta
+from database import db
+from models.transaction import Transaction
+from utils.ledger_cache import ledger_cache
+from utils.archive import transaction_archive
+from utils.categories import by_category_name
+from utils.events import current_event_bus, format_event
+from utils.money import cents, from_cents
+
+bp = Blueprint('api', __name__)
+
+@bp.route('/api/chart_data')
+def chart_data():
+    chart_type = request.args.get('type', 'spending_by_category')
+    
+    if chart_type == 'spending_by_category':
+        if ledger_cache.enabled:
+            totals = ledger_cache.category_totals('expense')
+            return jsonify({
+                'labels': list(totals),
+                'data': [from_cents(total) for _, total in totals.values()]
+            })
+        
+        # Get spending by category (hot rows grouped by integer category id, plus archived years)
+        categories = db.session.query(
+            Transaction.category_id,
+            db.func.sum(cents(Transaction.amount))
+        ).filter(Transaction.transaction_type == 'expense').group_by(Transaction.category_id)
+        totals = {category: total for category, (total,) in by_category_name(categories).items()}
+        for category, (_, total) in transaction_archive.category_totals('expense').items():
+            totals[category] = totals.get(category, 0) + total
+        
+        return jsonify({
+            'labels': sorted(totals),
+            'data': [from_cents(totals[category]) for category in sorted(totals)]
+        })
+    
+    elif chart_type == 'income_vs_expenses':
+        if ledger_cache.enabled:
+            monthly = ledger_cache.monthly_totals()
+            return jsonify({
+                'labels': [month for month, _, _ in monthly],
+                'income': [from_cents(income) for _, income, _ in monthly],
+                'expenses': [from_cents(expenses) for _, _, expenses in monthly]
+            })
+        
+        # Monthly income vs expenses (hot rows in SQL plus archived years)
+        monthly_data = db.session.query(
+            db.func.strftime('%Y-%m', Transaction.date).label('month'),
+            Transaction.transaction_type,
+            db.func.sum(cents(Transaction.amount))
+        ).group_by('month', Transaction.transaction_type).all()
+        
+        totals = {}
+        for month, (income, expenses) in transaction_archive.monthly_totals().items():
+            totals[month] = [income, expenses]
+        for month, trans_type, amount in monthly_data:
+            month_totals = totals.setdefault(month, [0, 0])
+            month_totals[0 if trans_type == 'income' else 1] += amount
+        
+        months = sorted(totals)
+        return jsonify({
+            'labels': months,
+            'income': [from_cents(totals[month][0]) for month in months],
+            'expenses': [from_cents(totals[month][1]) for month in months]
+        })
+    
+    return jsonify({'error': 'Invalid chart type'})
+
+@bp.route('/api/net_worth_history')
+def net_worth_history():
+    """API endpoint for daily net worth history from the snapshot table"""
+    from utils.net_worth import NetWorthSnapshotter
+    days = request.args.get('days', 365, type=int)
+    snapshotter = NetWorthSnapshotter()
+    start = date.today() - timedelta(days=days - 1) if days > 0 else None
+    history = [snapshot.to_dict() for snapshot in snapshotter.history(start_date=start)]
+    # Stored days end where the scheduler last ran; today comes from current() (no writes in a GET)
+    today = snapshotter.current().to_dict()
+    if history and history[-1]['date'] == today['date']:
+        history[-1] = today
+    else:
+        history.append(today)
+    return jsonify(history)
+
+@bp.route('/api/recurring')
+def recurring_series():
+    """API endpoint listing the stored recurring series (the loan scheduler pass folds in new activity)"""
+    from utils.recurring import RecurringDetector
+    detector = RecurringDetector()
+    scan = detector.last_scan()
+    active_only = request.args.get('all') != '1'
+    series = detector.series(active_only=active_only)
+    return jsonify({
+        'scan': scan.to_dict() if scan is not None else None,
+        'monthly_income': round(sum(s.monthly_amount() for s in series if s.transaction_type == 'income'), 2),
+        'monthly_expenses': round(sum(s.monthly_amount() for s in series if s.transaction_type == 'expense'), 2),
+        'series': [s.to_dict() for s in series]
+    })
+
+@bp.route('/api/forecast')
+def cash_flow_forecast():
+    """API endpoint projecting every account's daily balance 1-24 months ahead, with low-balance alerts"""
+    from utils.forecast import build_forecast
+    months = request.args.get('months', 12, type=int)
+    threshold = request.args.get('threshold', 0.0, type=float)
+    step = max(request.args.get('step', 1, type=int), 1)  # Return every step-th day
+    try:
+        forecast = build_forecast(months=months, threshold=threshold)
+    except ImportError:
+        return jsonify({'error': 'Forecasting needs NumPy (pip install numpy)'}), 503
+    
+    start = forecast['start_date']
+    balances = forecast['balances']
+    total = forecast['total']
+    days = list(range(0, len(total), step))
+    if days[-1] != len(total) - 1:
+        days.append(len(total) - 1)  # Always include the last day
+    
+    accounts = []
+    for index, account in enumerate(forecast['accounts']):
+        lowest_day = int(forecast['lowest_day'][index])
+        accounts.append({
+            'id': account.id,
+            'name': account.name,
+            'account_type': account.account_type,
+            'starting_balance': account.current_balance,
+            'ending_balance': from_cents(int(balances[-1, index])),
+            'lowest_balance': from_cents(int(balances[lowest_day, index])),
+            'lowest_date': (start + timedelta(days=lowest_day)).isoformat(),
+            'balances': [from_cents(int(balances[day, index])) for day in days]
+        })
+    
+    return jsonify({
+        'start_date': start.isoformat(),
+        'end_date': forecast['end_date'].isoformat(),
+        'threshold': threshold,
+        'dates': [(start + timedelta(days=day)).isoformat() for day in days],
+        'accounts': accounts,
+        'total': {
+            'ending_balance': from_cents(int(total[-1])),
+            'lowest_balance': from_cents(int(total.min())),
+            'balances': [from_cents(int(total[day])) for day in days]
+        },
+        'alerts': forecast['alerts'],
+        'assumptions': forecast['assumptions'],
+        'elapsed_ms': round(forecast['elapsed_ms'], 2)
+    })
+
+@bp.route('/api/jobs', methods=['GET', 'POST'])
+def job_list():
+    """API endpoint listing recent background jobs (GET) or starting one (POST {"type": ..., "params": {...}})"""
+    from models.job import Job
+    from utils.jobs import accepted, jobs
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        if not isinstance(payload, dict):
+            return jsonify({'error': 'Body must be a JSON object'}), 400
+        params = payload.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params must be an object'}), 400
+        try:
+            job = jobs.submit(payload.get('type', ''), params)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return accepted(job)
+    
+    query = Job.query
+    if request.args.get('status'):
+        query = query.filter_by(status=request.args['status'])
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    return jsonify([jobs.status(job) for job in query.order_by(Job.id.desc()).limit(limit)])
+
+@bp.route('/api/jobs/<int:job_id>', methods=['GET', 'DELETE'])
+def job_status(job_id):
+    """API endpoint polling a background job; DELETE requests cancellation"""
+    from models.job import Job
+    from utils.jobs import jobs
+    if request.method == 'DELETE':
+        return cancel_job(job_id)
+    return jsonify(jobs.status(Job.query.get_or_404(job_id)))
+
+@bp.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """API endpoint cancelling a background job (queued jobs never start, running ones stop early)"""
+    from models.job import Job
+    from utils.jobs import jobs
+    job = Job.query.get_or_404(job_id)
+    if not jobs.cancel(job):
+        return jsonify(dict(jobs.status(job), error='Job already finished')), 409
+    db.session.refresh(job)
+    return jsonify(jobs.status(job)), 202
+
+@bp.route('/api/recurring/rebuild', methods=['POST'])
+def rebuild_recurring():
+    """API endpoint re-detecting every recurring series from scratch in the background"""
+    from utils.jobs import accepted, jobs
+    return accepted(jobs.submit('recurring_rebuild'))
+
+@bp.route('/api/net_worth/rebuild', methods=['POST'])
+def rebuild_net_worth():
+    """API endpoint rebuilding the daily net worth snapshots in the background"""
+    from utils.jobs import accepted, jobs
+    return accepted(jobs.submit('net_worth_rebuild'))
+
+@bp.route('/api/cache_stats')
+def cache_stats():
+    """API endpoint reporting hit rates of the in-process caches"""
+    from utils.period_summary import current_period_cache
+    from utils.reference_cache import current_reference_cache
+    from utils.tax_estimate import current_tax_estimate_cache
+    from utils.tenants import tenants
+    stats = {
+        'period_summaries': current_period_cache().stats(),
+        'tax_estimates': current_tax_estimate_cache().stats(),
+        'fragments': current_app.jinja_env.fragment_cache.stats(),
+        'ledger': ledger_cache.stats(),
+        'archive': transaction_archive.stats(),
+        'reference_data': current_reference_cache().stats(),
+        'events': current_event_bus().stats()
+    }
+    if tenants.enabled:
+        stats['tenants'] = tenants.stats()
+    return jsonify(stats)
+
+@bp.route('/api/events')
+def event_stream():
+    """Server-Sent Events stream of committed changes (utils/events.py), resumable with Last-Event-ID"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    bus = current_event_bus()
+    subscription = bus.subscribe(last_event_id)
+    heartbeat = current_app.config['EVENT_HEARTBEAT']
+    retry = int(current_app.config['EVENT_RETRY'] * 1000)
+
+    # Runs after the request has ended, so it holds no database session while it waits
+    def stream():
+        try:
+            yield f'retry: {retry}\n\n'
+            while True:
+                item = subscription.get(heartbeat)
+                if item is None:
+                    # Comment line: keeps proxies from timing out and notices a client that went away
+                    yield ': heartbeat\n\n'
+                    continue
+                yield format_event(item)
+                if subscription.closed and subscription.queue.empty():
+                    break
+        finally:
+            bus.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/api/ledger_cache/verify')
+def verify_ledger_cache():
+    """API endpoint comparing the columnar ledger cache with SQL aggregates"""
+    if not ledger_cache.enabled:
+        return jsonify({'enabled': False, 'consistent': None, 'mismatches': []})
+    mismatches = ledger_cache.verify()
+    return jsonify({'enabled': True, 'consistent': not mismatches, 'mismatches': mismatches})
+
+@bp.route('/api/transactions/history')
+def transaction_history():
+    """
+    API endpoint listing transactions from SQLite and the archived years together, newest first.
+    Hot rows dated after the newest archived row come first and are paged in SQL; the partitions
+    are only read for a page that reaches past them.
+    """
+    from datetime import datetime
+    try:
+        start = request.args.get('start_date')
+        end = request.args.get('end_date')
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+    offset = (page - 1) * per_page
+    
+    filters = []
+    if start:
+        filters.append(Transaction.date >= start)
+    if end:
+        filters.append(Transaction.date <= end)
+
+    def count(*conditions):
+        return db.session.query(db.func.count(Transaction.id)).filter(*filters, *conditions).scalar()
+
+    def hot_rows(conditions, skip, limit):
+        query = Transaction.query.filter(*filters, *conditions) \
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).offset(skip).limit(limit)
+        return [dict(t.to_dict(), account_id=t.account_id, archived=False) for t in query]
+
+    newest_archived = transaction_archive.newest_rows(start, end, limit=1)
+    if not newest_archived:
+        rows = hot_rows((), offset, per_page)
+    else:
+        newest_day = datetime.strptime(newest_archived[0]['date'], '%Y-%m-%d').date()
+        newer = count(Transaction.date > newest_day)
+        rows = hot_rows((Transaction.date > newest_day,), offset, per_page) if offset < newer else []
+        if offset + per_page > newer:
+            # Below the newer hot rows, hot rows dated in archived years interleave with the partitions
+            depth = offset + per_page - newer
+            older = hot_rows((Transaction.date <= newest_day,), 0, depth) + \
+                transaction_archive.newest_rows(start, end, limit=depth)
+            older.sort(key=lambda row: (row['date'], row['id']), reverse=True)
+            rows.extend(older[max(offset - newer, 0):depth])
+    
+    return jsonify({
+        'page': page,
+        'per_page': per_page,
+        'total': count() + transaction_archive.count(start, end),
+        'transactions': rows
+    })
+
+@bp.route('/api/search')
+def search_transactions():
+    """API endpoint for ranked full-text search over transaction categories and descriptions"""
+    from datetime import datetime
+    from utils.search import search
+    text = request.args.get('q', '')
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+    
+    filters = []
+    if request.args.get('type'):
+        filters.append(Transaction.transaction_type == request.args['type'])
+    try:
+        if request.args.get('start_date'):
+            filters.append(Transaction.date >= datetime.strptime(request.args['start_date'], '%Y-%m-%d').date())
+        if request.args.get('end_date'):
+            filters.append(Transaction.date <= datetime.strptime(request.args['end_date'], '%Y-%m-%d').date())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    found = search(text, page=page, per_page=per_page, filters=filters)
+    return jsonify({
+        'query': text,
+        'match': found['match'],
+        'page': page,
+        'per_page': per_page,
+        'total': found['total'],
+        'results': [
+            dict(transaction.to_dict(), score=round(score, 4), snippet=snippet)
+            for transaction, score, snippet in found['results']
+        ]
+    })
+
+@bp.route('/api/category_mapping')
+def get_category_mapping():
+    """API endpoint to view current category mapping for debugging"""
+    category_mapping = {
+        'Housing': [
+            'Housing', 'Rent', 'Mortgage', 'Property Tax', 'Home Insurance', 
+            'Home Maintenance', 'HOA', 'Property Management', 'Renter\'s Insurance'
+        ],
+        'Food & Dining': [
+            'Food & Dining', 'Food', 'Groceries', 'Restaurants', 'Dining', 'Coffee', 
+            'Takeout', 'Fast Food', 'Delivery', 'Lunch', 'Dinner', 'Breakfast',
+            'Snacks', 'Alcohol', 'Beer', 'Wine', 'Drinks', 'Cafe', 'Bar'
+        ],
+        'Transportation': [
+            'Transportation', 'Gas', 'Gasoline', 'Fuel', 'Car Payment', 
+            'Auto Payment', 'Public Transit', 'Car Insurance', 'Auto Insurance',
+            'Uber/Lyft', 'Uber', 'Lyft', 'Taxi', 'Car Maintenance', 'Auto Repair',
+            'Oil Change', 'Tires', 'Registration', 'Parking', 'Tolls',
+            'Bus', 'Train', 'Subway', 'Metro'
+        ],
+        'Utilities': [
+            'Utilities', 'Electric', 'Electricity', 'Gas', 'Natural Gas', 'Water', 
+            'Sewer', 'Internet', 'Phone', 'Cell Phone', 'Mobile', 'Cable', 'TV',
+            'Trash', 'Garbage', 'Recycling', 'WiFi', 'Broadband'
+        ],
+        'Healthcare': [
+            'Healthcare', 'Medical', 'Doctor', 'Dental', 'Dentist', 'Pharmacy', 
+            'Health Insurance', 'Vision', 'Eye Care', 'Prescription', 'Medicine',
+            'Hospital', 'Clinic', 'Therapy', 'Mental Health', 'Counseling'
+        ],
+        'Entertainment': [
+            'Entertainment', 'Movies', 'Theater', 'Cinema', 'Games', 'Gaming',
+            'Subscriptions', 'Netflix', 'Spotify', 'Streaming', 'Hobbies', 
+            'Sports', 'Concert', 'Event', 'Books', 'Music', 'TV', 'Video Games'
+        ],
+        'Shopping': [
+            'Shopping', 'Clothing', 'Clothes', 'Electronics', 'Online Shopping',
+            'Amazon', 'Home Goods', 'Furniture', 'Appliances', 'Tools', 'Gifts',
+            'Department Store', 'Retail'
+        ],
+        'Personal Care': [
+            'Personal Care', 'Beauty', 'Cosmetics', 'Haircut', 'Hair', 'Salon',
+            'Spa', 'Massage', 'Gym', 'Fitness', 'Workout', 'Health Club',
+            'Personal Training', 'Yoga'
+        ],
+        'Education': [
+            'Education', 'Tuition', 'School', 'Books', 'Textbooks', 'Courses',
+            'Training', 'Online Course', 'Certification', 'Workshop', 'Seminar'
+        ],
+        'Insurance': [
+            'Insurance', 'Life Insurance', 'Disability Insurance', 
+            'Umbrella Insurance', 'Home Insurance', 'Renters Insurance'
+        ]
+    }
+    
+    return jsonify(category_mapping)
+
+@bp.route('/api/transaction_categories')
+def get_transaction_categories():
+    """API endpoint to view all current transaction categories"""
+    if ledger_cache.enabled:
+        return jsonify([
+            {'category': category, 'transaction_count': count, 'total_amount': from_cents(total)}
+            for category, (count, total) in ledger_cache.category_totals('expense').items()
+        ])
+    
+    categories = db.session.query(
+        Transaction.category_id,
+        db.func.count(Transaction.id).label('count'),
+        db.func.sum(cents(Transaction.amount)).label('total')
+    ).filter(Transaction.transaction_type == 'expense').group_by(Transaction.category_id)
+    
+    totals = by_category_name(categories)
+    for cat, (count, total) in transaction_archive.category_totals('expense').items():
+        hot_count, hot_total = totals.get(cat, (0, 0))
+        totals[cat] = (hot_count + count, hot_total + total)
+    
+    result = []
+    for cat in sorted(totals):
+        count, total = totals[cat]
+        result.append({
+            'category': cat,
+            'transaction_count': count,
+            'total_amount': from_cents(total)
+        })
+    
+    return jsonify(result)
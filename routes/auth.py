@@ -0,0 +1,63 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from datetime import datetime
+from urllib.parse import urlsplit
+from database import db
+from models.user import User
+
+# Only registered when MULTI_TENANT is on (utils/tenants.py)
+bp = Blueprint('auth', __name__)
+
+def _next_url():
+    target = request.values.get('next', '')
+    # Only paths on this site. Browsers read a backslash as a slash and drop tabs and newlines,
+    # so "/\evil.example" would be "//evil.example"
+    normalized = target.replace('\\', '/')
+    if normalized.startswith('/') and not normalized.startswith('//') and not urlsplit(normalized).netloc \
+            and not any(ord(char) < 32 for char in target):
+        return target
+    return url_for('dashboard.dashboard')
+
+def _log_in(user):
+    session.clear()
+    session['user_id'] = user.id
+    session['username'] = user.username
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        user = User.query.filter_by(username=username).first()
+        if user is None or not user.check_password(request.form.get('password', '')):
+            flash('Invalid username or password', 'error')
+            return render_template('login.html', mode='login', username=username), 401
+        user.last_login_at = datetime.utcnow()
+        db.session.commit()
+        _log_in(user)
+        return redirect(_next_url())
+    return render_template('login.html', mode='login')
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        password = request.form.get('password', '')
+        if not username or len(password) < 8:
+            flash('Choose a username and a password of at least 8 characters', 'error')
+            return render_template('login.html', mode='register', username=username), 400
+        if User.query.filter_by(username=username).first() is not None:
+            flash(f'Username "{username}" is taken', 'error')
+            return render_template('login.html', mode='register', username=username), 409
+        user = User(username=username)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        # The user's database is created on their first request
+        _log_in(user)
+        flash(f'Welcome, {username}!', 'success')
+        return redirect(url_for('dashboard.dashboard'))
+    return render_template('login.html', mode='register')
+
+@bp.route('/logout', methods=['POST'])
+def logout():
+    session.clear()
+    return redirect(url_for('auth.login'))
@@ -0,0 +1,201 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from database import db
+from models.transaction import Transaction
+from models.budget import Budget
+from utils.reference_cache import get_loans
+
+bp = Blueprint('budget', __name__)
+
+@bp.route('/budget')
+def budget():
+    # Get existing data for budget calculations
+    loans = get_loans()
+    
+    # Calculate total monthly debt payments using APR-based calculations
+    total_monthly_debt = sum(loan.apr_based_payment() for loan in loans)
+    
+    # Get recent transactions to analyze spending patterns
+    recent_transactions = Transaction.query.filter(
+        Transaction.transaction_type == 'expense'
+    ).order_by(Transaction.date.desc()).limit(100).all()
+    
+    # Analyze spending categories
+    category_spending = {}
+    for transaction in recent_transactions:
+        category = transaction.category or 'Other'
+        category_spending[category] = category_spending.get(category, 0) + transaction.amount
+    
+    return render_template('budget.html', 
+                         loans=loans,
+                         total_monthly_debt=total_monthly_debt,
+                         category_spending=category_spending)
+
+@bp.route('/calculate_budget', methods=['POST'])
+def calculate_budget():
+    from utils.tax_calculator import TaxCalculator
+    try:
+        # Get form data
+        annual_income = float(request.form['annual_income'])
+        employment_type = request.form['employment_type']
+        filing_status = request.form.get('filing_status', 'single')
+        state_code = request.form.get('state_code', '')
+        city_code = request.form.get('city_code', '')
+        
+        # Budget allocations (percentages)
+        housing_percent = float(request.form.get('housing_percent', 30)) / 100
+        transportation_percent = float(request.form.get('transportation_percent', 15)) / 100
+        food_percent = float(request.form.get('food_percent', 12)) / 100
+        utilities_percent = float(request.form.get('utilities_percent', 8)) / 100
+        healthcare_percent = float(request.form.get('healthcare_percent', 5)) / 100
+        entertainment_percent = float(request.form.get('entertainment_percent', 5)) / 100
+        savings_percent = float(request.form.get('savings_percent', 20)) / 100
+        other_percent = float(request.form.get('other_percent', 5)) / 100
+        
+        # Calculate taxes
+        calculator = TaxCalculator()
+        if not state_code:
+            state_code = None
+        if not city_code:
+            city_code = None
+            
+        tax_info = calculator.calculate_taxes(annual_income, employment_type, filing_status, state_code, city_code)
+        
+        # Calculate take-home income
+        monthly_gross = annual_income / 12
+        monthly_taxes = tax_info['total_tax_owed'] / 12
+        monthly_net = monthly_gross - monthly_taxes
+        
+        # Get loan data
+        loans = get_loans()
+        total_monthly_debt = sum(loan.apr_based_payment() for loan in loans)  # Use APR-based payments
+        
+        # Calculate available for allocation after debt payments
+        available_for_budget = monthly_net - total_monthly_debt
+        
+        # Calculate budget allocations
+        budget_breakdown = {
+            'housing': available_for_budget * housing_percent,
+            'transportation': available_for_budget * transportation_percent,
+            'food': available_for_budget * food_percent,
+            'utilities': available_for_budget * utilities_percent,
+            'healthcare': available_for_budget * healthcare_percent,
+            'entertainment': available_for_budget * entertainment_percent,
+            'savings': available_for_budget * savings_percent,
+            'other': available_for_budget * other_percent
+        }
+        
+        # Prepare results
+        budget_result = {
+            'annual_income': annual_income,
+            'monthly_gross': monthly_gross,
+            'monthly_taxes': monthly_taxes,
+            'monthly_net': monthly_net,
+            'monthly_debt': total_monthly_debt,
+            'available_for_budget': available_for_budget,
+            'budget_breakdown': budget_breakdown,
+            'tax_info': tax_info,
+            'loans': loans,
+            'percentages': {
+                'housing': housing_percent * 100,
+                'transportation': transportation_percent * 100,
+                'food': food_percent * 100,
+                'utilities': utilities_percent * 100,
+                'healthcare': healthcare_percent * 100,
+                'entertainment': entertainment_percent * 100,
+                'savings': savings_percent * 100,
+                'other': other_percent * 100
+            }
+        }
+        
+        # Get states and cities for form
+        states = calculator.get_state_list()
+        cities = calculator.get_cities_for_state(state_code) if state_code else []
+        
+        return render_template('budget.html',
+                             budget_result=budget_result,
+                             annual_income=annual_income,
+                             employment_type=employment_type,
+                             filing_status=filing_status,
+                             selected_state=state_code,
+                             selected_city=city_code,
+                             states=states,
+                             cities=cities,
+                             loans=loans,
+                             total_monthly_debt=total_monthly_debt)
+                             
+    except Exception as e:
+        flash(f'Error calculating budget: {str(e)}', 'error')
+        return redirect(url_for('budget.budget'))
+
+@bp.route('/save_budget', methods=['POST'])
+def save_budget():
+    try:
+        # Get form data
+        budget_name = request.form.get('budget_name', 'My Budget Plan')
+        annual_income = float(request.form['annual_income'])
+        employment_type = request.form['employment_type']
+        state_code = request.form.get('state_code') or None
+        city_code = request.form.get('city_code') or None
+        
+        # Get allocation amounts (not percentages)
+        housing = float(request.form.get('housing', 0))
+        food = float(request.form.get('food', 0))
+        transportation = float(request.form.get('transportation', 0))
+        utilities = float(request.form.get('utilities', 0))
+        healthcare = float(request.form.get('healthcare', 0))
+        insurance = float(request.form.get('insurance', 0))
+        entertainment = float(request.form.get('entertainment', 0))
+        personal_care = float(request.form.get('personal_care', 0))
+        shopping = float(request.form.get('shopping', 0))
+        education = float(request.form.get('education', 0))
+        savings = float(request.form.get('savings', 0))
+        emergency_fund = float(request.form.get('emergency_fund', 0))
+        retirement = float(request.form.get('retirement', 0))
+        other = float(request.form.get('other', 0))
+        
+        # Calculate derived values
+        monthly_take_home = float(request.form.get('monthly_take_home', 0))
+        monthly_taxes = float(request.form.get('monthly_taxes', 0))
+        monthly_loan_payments = float(request.form.get('monthly_loan_payments', 0))
+        monthly_available = float(request.form.get('monthly_available', 0))
+        
+        # Deactivate previous active budgets
+        Budget.query.filter_by(is_active=True).update({'is_active': False})
+        
+        # Create new budget
+        budget = Budget(
+            name=budget_name,
+            annual_income=annual_income,
+            employment_type=employment_type,
+            state_code=state_code,
+            city_code=city_code,
+            housing=housing,
+            food=food,
+            transportation=transportation,
+            utilities=utilities,
+            healthcare=healthcare,
+            insurance=insurance,
+            entertainment=entertainment,
+            personal_care=personal_care,
+            shopping=shopping,
+            education=education,
+            savings=savings,
+            emergency_fund=emergency_fund,
+            retirement=retirement,
+            other=other,
+            monthly_take_home=monthly_take_home,
+            monthly_taxes=monthly_taxes,
+            monthly_loan_payments=monthly_loan_payments,
+            monthly_available=monthly_available,
+            is_active=True
+        )
+        
+        db.session.add(budget)
+        db.session.commit()
+        
+        flash('Budget plan saved successfully!', 'success')
+        return redirect(url_for('dashboard.dashboard'))
+        
+    except Exception as e:
+        flash(f'Error saving budget: {str(e)}', 'error')
+        return redirect(url_for('budget.budget'))
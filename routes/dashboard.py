@@ -0,0 +1,328 @@
+from flask import Blueprint, render_template, request, redirect, url_for
+from datetime import date
+from models.transaction import Transaction
+from models.investment import Investment
+from utils.reference_cache import get_active_accounts, get_active_budget, get_loans
+
+bp = Blueprint('dashboard', __name__)
+
+@bp.route('/')
+def index():
+    return redirect(url_for('dashboard.dashboard'))
+
+@bp.route('/dashboard')
+def dashboard():
+    # Heavy modules are imported on first use to keep app start-up fast
+    from utils.net_worth import NetWorthSnapshotter
+    from utils.period_summary import current_period_cache, resolve_time_frame
+    from utils.tax_calculator import TaxCalculator
+    from utils.tax_estimate import TaxEstimator
+    
+    # Get time frame parameters
+    time_frame = request.args.get('time_frame', 'current_month')  # current_month, last_month, last_3_months, last_6_months, year_to_date, custom
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    # Calculate date ranges based on time frame
+    time_frame, period_start, period_end, period_name = resolve_time_frame(time_frame, start_date, end_date)
+    
+    # Today's totals from the last stored snapshot plus activity since (read-only;
+    # the scheduler thread stores the snapshots)
+    snapshot = NetWorthSnapshotter().current()
+    
+    loans = get_loans()
+    investments = Investment.query.all()
+    active_budget = get_active_budget()
+    
+    # Get cached totals for the selected period
+    period_summary = current_period_cache().get(time_frame, period_start, period_end)
+    
+    # Calculate period totals
+    period_income = period_summary['income']
+    period_taxable_income = period_summary['taxable_income']
+    period_expenses = period_summary['expenses']
+    period_net_balance = period_income - period_expenses
+    
+    # Calculate tax amount for the period based on TAXABLE income only, at the effective
+    # rate on the year's actual taxable income so far, annualized (utils/tax_estimate.py)
+    period_tax_amount = 0
+    if active_budget and period_taxable_income > 0:
+        try:
+            estimator = TaxEstimator.for_budget(active_budget)
+            as_of = min(period_end, date.today())
+            period_tax_amount = period_taxable_income * estimator.effective_rate(as_of.year, as_of)
+        except Exception as e:
+            print(f"Error calculating period tax amount: {e}")
+            period_tax_amount = 0
+    
+    # All-time totals and net worth come straight from today's snapshot
+    total_income = snapshot.total_income
+    total_taxable_income = snapshot.total_taxable_income
+    total_expenses = snapshot.total_expenses
+    net_balance = snapshot.net_balance()
+    total_debt = snapshot.total_debt
+    total_invested = snapshot.total_invested
+    current_portfolio_value = snapshot.portfolio_value
+    portfolio_gain_loss = current_portfolio_value - total_invested
+    net_worth = snapshot.net_worth
+    
+    # Tax cost breakdown (if budget exists, get estimated tax info)
+    tax_breakdown = None
+    if active_budget:
+        try:
+            calculator = TaxCalculator()
+            tax_info = calculator.calculate_taxes(
+                active_budget.annual_income, 
+                active_budget.employment_type, 
+                'single',  # Default filing status for now
+                active_budget.state_code, 
+                active_budget.city_code
+            )
+            tax_breakdown = {
+                'annual_income': active_budget.annual_income,
+                'monthly_taxes': active_budget.monthly_taxes,
+                'tax_details': {
+                    'federal_income': tax_info.get('federal_income_tax', 0),
+                    'federal_payroll': tax_info.get('payroll_taxes', {}).get('total_payroll', 0) if active_budget.employment_type == 'w2' else 0,
+                    'self_employment': tax_info.get('self_employment_tax', 0) if active_budget.employment_type == '1099' else 0,
+                    'state_tax': tax_info.get('state_tax_info', {}).get('state_tax', 0),
+                    'local_tax': tax_info.get('local_tax_info', {}).get('local_tax', 0),
+                    'total_annual': tax_info.get('total_tax_owed', 0)
+                },
+                'state_name': tax_info.get('state_tax_info', {}).get('state_name', 'No State Tax'),
+                'city_name': tax_info.get('local_tax_info', {}).get('city_name', 'No Local Tax'),
+                'effective_rate': tax_info.get('effective_tax_rate', 0)
+            }
+        except Exception as e:
+            print(f"Error calculating tax breakdown: {e}")
+            tax_breakdown = None
+
+    # Budget vs Actual Analysis
+    budget_analysis = None
+    if active_budget:
+        print(f"Active budget found: {active_budget.name}")
+        print(f"Period transactions count: {period_summary['transaction_count']}")
+        print(f"Period expense transactions: {period_summary['expense_count']}")
+        
+        # Calculate budget scaling factor based on time period
+        days_in_period = (period_end - period_start).days + 1
+        days_in_month = 30.44  # Average days per month (365.25 / 12)
+        
+        # Don't scale for full month periods (28-31 days) - show full monthly budget
+        if 28 <= days_in_period <= 31:
+            budget_scaling_factor = 1.0
+        else:
+            budget_scaling_factor = days_in_period / days_in_month
+        
+        # Actual spending by category for the period (from the summary cache)
+        actual_spending = period_summary['expenses_by_category']
+        
+        # Map categories to budget categories (comprehensive mapping)
+        category_mapping = {
+            'Housing': [
+                'Housing', 'Rent', 'Mortgage', 'Property Tax', 'Home Insurance', 
+                'Home Maintenance', 'HOA', 'Property Management', 'Renter\'s Insurance'
+            ],
+            'Food & Dining': [
+                'Food & Dining', 'Food', 'Groceries', 'Restaurants', 'Dining', 'Coffee', 
+                'Takeout', 'Fast Food', 'Delivery', 'Lunch', 'Dinner', 'Breakfast',
+                'Snacks', 'Alcohol', 'Beer', 'Wine', 'Drinks', 'Cafe', 'Bar'
+            ],
+            'Transportation': [
+                'Transportation', 'Gas', 'Gasoline', 'Fuel', 'Car Payment', 
+                'Auto Payment', 'Public Transit', 'Car Insurance', 'Auto Insurance',
+                'Uber/Lyft', 'Uber', 'Lyft', 'Taxi', 'Car Maintenance', 'Auto Repair',
+                'Oil Change', 'Tires', 'Registration', 'Parking', 'Tolls',
+                'Bus', 'Train', 'Subway', 'Metro'
+            ],
+            'Utilities': [
+                'Utilities', 'Electric', 'Electricity', 'Gas', 'Natural Gas', 'Water', 
+                'Sewer', 'Internet', 'Phone', 'Cell Phone', 'Mobile', 'Cable', 'TV',
+                'Trash', 'Garbage', 'Recycling', 'WiFi', 'Broadband'
+            ],
+            'Healthcare': [
+                'Healthcare', 'Medical', 'Doctor', 'Dental', 'Dentist', 'Pharmacy', 
+                'Health Insurance', 'Vision', 'Eye Care', 'Prescription', 'Medicine',
+                'Hospital', 'Clinic', 'Therapy', 'Mental Health', 'Counseling'
+            ],
+            'Entertainment': [
+                'Entertainment', 'Movies', 'Theater', 'Cinema', 'Games', 'Gaming',
+                'Subscriptions', 'Netflix', 'Spotify', 'Streaming', 'Hobbies', 
+                'Sports', 'Concert', 'Event', 'Books', 'Music', 'TV', 'Video Games'
+            ],
+            'Shopping': [
+                'Shopping', 'Clothing', 'Clothes', 'Electronics', 'Online Shopping',
+                'Amazon', 'Home Goods', 'Furniture', 'Appliances', 'Tools', 'Gifts',
+                'Department Store', 'Retail'
+            ],
+            'Personal Care': [
+                'Personal Care', 'Beauty', 'Cosmetics', 'Haircut', 'Hair', 'Salon',
+                'Spa', 'Massage', 'Gym', 'Fitness', 'Workout', 'Health Club',
+                'Personal Training', 'Yoga'
+            ],
+            'Education': [
+                'Education', 'Tuition', 'School', 'Books', 'Textbooks', 'Courses',
+                'Training', 'Online Course', 'Certification', 'Workshop', 'Seminar'
+            ],
+            'Insurance': [
+                'Insurance', 'Life Insurance', 'Disability Insurance', 
+                'Umbrella Insurance', 'Home Insurance', 'Renters Insurance'
+            ]
+        }
+        
+        # BUDGET FIX: Calculate proper monthly net available amount FIRST
+        monthly_gross = active_budget.annual_income / 12
+        monthly_net_available = monthly_gross - active_budget.monthly_taxes
+        monthly_debt_payments = sum(loan.apr_based_payment() for loan in loans)  # Use APR-based payment
+        corrected_monthly_budget = monthly_net_available - monthly_debt_payments
+        
+        # Override the broken budget total with the correct calculation
+        corrected_total_budgeted = corrected_monthly_budget * budget_scaling_factor
+        
+        # Track which transaction categories were mapped
+        mapped_categories = set()
+        budget_vs_actual = {}
+        
+        # Define reasonable category percentages for allocation
+        category_percentages = {
+            'Housing': 0.30,        # 30%
+            'Food & Dining': 0.15,  # 15%
+            'Transportation': 0.15, # 15%
+            'Utilities': 0.08,      # 8%
+            'Healthcare': 0.05,     # 5%
+            'Entertainment': 0.05,  # 5%
+            'Shopping': 0.07,       # 7%
+            'Personal Care': 0.03,  # 3%
+            'Education': 0.02,      # 2%
+            'Insurance': 0.05,      # 5%
+        }
+        
+        for budget_category, expense_categories in category_mapping.items():
+            # FIXED: Use proper proportional allocation instead of broken stored values
+            category_percentage = category_percentages.get(budget_category, 0.00)  # Default to 0% if not defined
+            monthly_budget_amount = corrected_monthly_budget * category_percentage
+            scaled_budget_amount = monthly_budget_amount * budget_scaling_factor
+            actual_amount = 0
+            
+            # Check for exact matches (case-insensitive)
+            for transaction_category, amount in actual_spending.items():
+                transaction_category_lower = transaction_category.lower()
+                
+                # Check if transaction category matches any mapped category (case-insensitive)
+                for mapped_category in expense_categories:
+                    if (transaction_category_lower == mapped_category.lower() or 
+                        mapped_category.lower() in transaction_category_lower or
+                        transaction_category_lower in mapped_category.lower()):
+                        actual_amount += amount
+                        mapped_categories.add(transaction_category)
+                        break  # Don't double-count if multiple matches
+            
+            budget_vs_actual[budget_category] = {
+                'budget': scaled_budget_amount,
+                'monthly_budget': monthly_budget_amount,  # Keep corrected reference
+                'actual': actual_amount,
+                'remaining': scaled_budget_amount - actual_amount,
+                'percentage_used': (actual_amount / scaled_budget_amount * 100) if scaled_budget_amount > 0 else 0
+            }
+        
+        # Find unmapped spending (categories that don't fit into budget categories)
+        unmapped_spending = {}
+        total_unmapped = 0
+        for transaction_category, amount in actual_spending.items():
+            if transaction_category not in mapped_categories:
+                unmapped_spending[transaction_category] = amount
+                total_unmapped += amount
+        
+        # BUDGET FIX: Calculate proper monthly net available amount BEFORE debug prints
+        monthly_gross = active_budget.annual_income / 12
+        monthly_net_available = monthly_gross - active_budget.monthly_taxes
+        monthly_debt_payments = sum(loan.apr_based_payment() for loan in loans)  # Use APR-based payment
+        corrected_monthly_budget = monthly_net_available - monthly_debt_payments
+        
+        # Override the broken budget total with the correct calculation
+        corrected_total_budgeted = corrected_monthly_budget * budget_scaling_factor
+        
+        # Debug current budget values - AFTER FIX
+        print(f"DEBUG: BUDGET FIX APPLIED!")
+        print(f"DEBUG: Original broken total allocated: ${active_budget.get_total_allocated():,.2f}")
+        print(f"DEBUG: Annual Income: ${active_budget.annual_income:,.2f}")
+        print(f"DEBUG: Monthly Gross: ${monthly_gross:,.2f}")
+        print(f"DEBUG: Monthly Taxes: ${active_budget.monthly_taxes:,.2f}")
+        print(f"DEBUG: Monthly Net Available: ${monthly_net_available:,.2f}")
+        print(f"DEBUG: Monthly Debt Payments: ${monthly_debt_payments:,.2f}")
+        print(f"DEBUG: CORRECTED Monthly Budget: ${corrected_monthly_budget:,.2f}")
+        print(f"DEBUG: Budget scaling factor: {budget_scaling_factor}")
+        print(f"DEBUG: CORRECTED Total Budgeted: ${corrected_total_budgeted:,.2f}")
+        print(f"DEBUG: LOANS CAUSING HIGH DEBT PAYMENTS:")
+        for loan in loans:
+            min_payment = loan.effective_minimum_payment()
+            apr_payment = loan.apr_based_payment()
+            print(f"DEBUG:   {loan.name}: Balance=${loan.balance:,.2f}, Min Payment=${min_payment:,.2f}, APR Payment=${apr_payment:,.2f}")
+        print(f"DEBUG: *** BUDGET UPDATED WITH APR-BASED PAYMENTS! ***")
+        
+        budget_analysis = {
+            'active_budget': active_budget,
+            'budget_vs_actual': budget_vs_actual,
+            'total_budgeted': corrected_total_budgeted,  # Use corrected amount
+            'monthly_total_budgeted': corrected_monthly_budget,  # Use corrected amount
+            'total_spent': sum(actual_spending.values()),
+            'budget_remaining': corrected_total_budgeted - sum(actual_spending.values()),
+            'unmapped_spending': unmapped_spending,
+            'total_unmapped': total_unmapped,
+            'budget_scaling_factor': budget_scaling_factor,
+            'days_in_period': days_in_period,
+            'period_name': period_name,  # Add period name for display
+            # Add proper budget context
+            'monthly_gross_income': monthly_gross,
+            'monthly_taxes': active_budget.monthly_taxes,
+            'monthly_net_available': monthly_net_available,
+            'monthly_debt_payments': monthly_debt_payments,
+            'monthly_available_for_budget': corrected_monthly_budget,
+            # Debug info
+            'budget_fix_applied': True,
+            'original_broken_total': active_budget.get_total_allocated(),
+            'corrected_total': corrected_monthly_budget
+        }
+        print(f"Budget analysis created with total_budgeted: {budget_analysis['total_budgeted']}")
+        print(f"Active budget total allocation: {active_budget.get_total_allocated()}")
+    else:
+        print("No active budget found")
+    
+    # Get active accounts for transaction form
+    accounts = get_active_accounts()
+    
+    # Get transactions for the selected period (for display in the dashboard)
+    period_transactions_display = Transaction.query.filter(
+        Transaction.date >= period_start,
+        Transaction.date <= period_end
+    ).order_by(Transaction.date.desc()).all()
+    
+    return render_template('dashboard.html',
+                         # Period stats (for top summary cards) - updated variable names
+                         monthly_income=period_income,
+                         monthly_taxable_income=period_taxable_income,
+                         monthly_expenses=period_expenses,
+                         monthly_net_balance=period_net_balance,
+                         monthly_tax_amount=period_tax_amount,
+                         # Time frame information
+                         time_frame=time_frame,
+                         period_name=period_name,
+                         period_start=period_start,
+                         period_end=period_end,
+                         # All-time stats (for net worth calculation)
+                         total_income=total_income,
+                         total_taxable_income=total_taxable_income,
+                         total_expenses=total_expenses,
+                         net_balance=net_balance,
+                         total_debt=total_debt,
+                         total_invested=total_invested,
+                         current_portfolio_value=current_portfolio_value,
+                         portfolio_gain_loss=portfolio_gain_loss,
+                         net_worth=net_worth,
+                         transactions=period_transactions_display,  # Transactions for selected period
+                         loans=loans,
+                         investments=investments,
+                         accounts=accounts,
+                         budget_analysis=budget_analysis,
+                         tax_breakdown=tax_breakdown,
+                         date=date)
@@ -0,0 +1,143 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from calendar import monthrange
+from datetime import date, datetime
+from database import db
+from models.account import Account
+from models.loan import Loan
+from models.transaction import Transaction
+from routes.transactions import date_conditions, filter_conditions
+from utils.archive import transaction_archive
+from utils.export import FORMATS, query_batches
+from utils.money import cents, from_cents
+from utils.reference_cache import get_active_budget
+
+bp = Blueprint('export', __name__)
+
+def _export_response(name, columns, batches, export_format):
+    """Stream batches in export_format as a download named <name>-<today>.<ext>"""
+    writer, mimetype, extension = FORMATS[export_format]
+    if extension == 'xlsx':
+        chunks = writer(columns, batches, sheet=name.replace('_', ' ').title())
+    else:
+        chunks = writer(columns, batches)
+    filename = f'{name}-{date.today().isoformat()}.{extension}'
+    # stream_with_context keeps the request (and its database session) open while the body is sent
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _export_format():
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown format '{export_format}' (use {', '.join(sorted(FORMATS))})")
+    return export_format
+
+def _batch_size():
+    return current_app.config['EXPORT_BATCH_SIZE']
+
+@bp.route('/export/transactions')
+def export_transactions():
+    """
+    Transactions matching the transactions page filters (q, category, type,
+    start_date, end_date), oldest first. Without dates every transaction is
+    exported; archived years are not included.
+    """
+    try:
+        export_format = _export_format()
+        conditions = date_conditions(request.args.get('start_date', ''), request.args.get('end_date', ''))
+        conditions += filter_conditions(request.args.get('q', '').strip(), request.args.get('category', ''),
+                                        request.args.get('type', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    columns = ['id', 'date', 'transaction_type', 'category', 'description', 'amount', 'is_taxable',
+               'account_id', 'account', 'created_at']
+    statement = db.select(
+        Transaction.id, Transaction.date, Transaction.transaction_type, Transaction.category,
+        Transaction.description, Transaction.amount, Transaction.is_taxable,
+        Transaction.account_id, Account.name, Transaction.created_at
+    ).outerjoin(Account, Account.id == Transaction.account_id).where(*conditions).order_by(
+        Transaction.date, Transaction.id
+    )
+    return _export_response('transactions', columns, query_batches(statement, db.session, _batch_size()), export_format)
+
+@bp.route('/export/loans')
+def export_loans():
+    """Every loan with its terms and payment totals"""
+    try:
+        export_format = _export_format()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    fields = ['id', 'name', 'loan_type', 'balance', 'original_amount', 'interest_rate', 'minimum_payment',
+              'due_date', 'target_payoff_months', 'auto_payment_enabled', 'current_month_paid',
+              'last_payment_date', 'total_payments_made', 'total_interest_paid', 'payment_count', 'created_at']
+    statement = db.select(*(getattr(Loan, field) for field in fields)).order_by(Loan.id)
+    return _export_response('loans', fields, query_batches(statement, db.session, _batch_size()), export_format)
+
+def _archived_months(start, end):
+    """{YYYY-MM: (income, taxable income, expenses)} in cents for archived years in [start, end]"""
+    months = {}
+    for year in transaction_archive.years():
+        for month in range(1, 13):
+            first, last = date(year, month, 1), date(year, month, monthrange(year, month)[1])
+            if (start and last < start) or (end and first > end):
+                continue
+            summary = transaction_archive.range_summary(max(first, start or first), min(last, end or last))
+            if summary['transaction_count']:
+                months[first.strftime('%Y-%m')] = (summary['income'], summary['taxable_income'], summary['expenses'])
+    return months
+
+def _tax_summary_rows(monthly, archived, tax_rate):
+    """Monthly rows in dollars, archived months merged in order with the streamed SQL months"""
+    def row(month, income, taxable_income, expenses):
+        return (month, from_cents(income), from_cents(taxable_income), from_cents(income - taxable_income),
+                from_cents(expenses), round(from_cents(taxable_income) * tax_rate, 2))
+
+    pending = sorted(archived.items())
+    for batch in monthly:
+        rows = []
+        for month, income, taxable_income, expenses in batch:
+            income, taxable_income, expenses = income or 0, taxable_income or 0, expenses or 0
+            while pending and pending[0][0] < month:
+                rows.append(row(pending[0][0], *pending.pop(0)[1]))
+            if pending and pending[0][0] == month:
+                cold = pending.pop(0)[1]
+                income, taxable_income, expenses = income + cold[0], taxable_income + cold[1], expenses + cold[2]
+            rows.append(row(month, income, taxable_income, expenses))
+        yield rows
+    if pending:
+        yield [row(month, *totals) for month, totals in pending]
+
+@bp.route('/export/tax_summary')
+def export_tax_summary():
+    """
+    Income, taxable income and expenses per month (start_date/end_date limit the
+    range), with the tax on each month's taxable income at the active budget's
+    effective rate (its yearly taxes over its annual income, as on the dashboard).
+    """
+    try:
+        export_format = _export_format()
+        start_date, end_date = request.args.get('start_date', ''), request.args.get('end_date', '')
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    budget = get_active_budget()
+    tax_rate = budget.monthly_taxes * 12 / budget.annual_income if budget and budget.annual_income > 0 else 0
+
+    amount = cents(Transaction.amount)
+    is_income = Transaction.transaction_type == 'income'
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    statement = db.select(
+        month,
+        db.func.sum(db.case((is_income, amount), else_=0)),
+        db.func.sum(db.case((is_income & Transaction.is_taxable, amount), else_=0)),
+        db.func.sum(db.case((Transaction.transaction_type == 'expense', amount), else_=0))
+    ).where(*date_conditions(start_date, end_date)).group_by(month).order_by(month)
+
+    columns = ['month', 'income', 'taxable_income', 'non_taxable_income', 'expenses', 'estimated_tax']
+    rows = _tax_summary_rows(query_batches(statement, db.session, _batch_size()), _archived_months(start, end), tax_rate)
+    return _export_response('tax_summary', columns, rows, export_format)
@@ -0,0 +1,62 @@
+from flask import Blueprint, render_template, request, url_for
+from database import db
+from models.investment import Investment
+from utils.partials import partial_response
+
+bp = Blueprint('investments', __name__)
+
+def portfolio_summary(investments):
+    """Totals for the portfolio summary cards"""
+    total_invested = sum(investment.total_cost() for investment in investments)
+    current_value = sum(investment.current_value() for investment in investments)
+    return {
+        'total_invested': total_invested,
+        'current_value': current_value,
+        'total_gain_loss': current_value - total_invested,
+        'gain_loss_percent': ((current_value - total_invested) / total_invested * 100) if total_invested > 0 else 0
+    }
+
+def _portfolio_summary():
+    return portfolio_summary(Investment.query.all())
+
+@bp.route('/investments')
+def investments():
+    investments = Investment.query.all()
+    return render_template('investments.html', investments=investments, summary=portfolio_summary(investments))
+
+@bp.route('/add_investment', methods=['POST'])
+def add_investment():
+    try:
+        investment = Investment(
+            symbol=request.form['symbol'],
+            name=request.form['name'],
+            shares=float(request.form['shares']),
+            cost_basis=float(request.form['cost_basis']),
+            current_price=float(request.form['current_price']),
+            investment_type=request.form['investment_type']
+        )
+        db.session.add(investment)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('investments.investments'), f'Error adding investment: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('investments.investments'), 'Investment added successfully!',
+        collection='investment', item=investment,
+        fragment=lambda: render_template('partials/investment_row.html', investment=investment),
+        summary=_portfolio_summary
+    )
+
+@bp.route('/delete_investment/<int:investment_id>', methods=['POST'])
+def delete_investment(investment_id):
+    try:
+        investment = Investment.query.get_or_404(investment_id)
+        db.session.delete(investment)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('investments.investments'), f'Error deleting investment: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('investments.investments'), 'Investment deleted successfully!',
+        collection='investment', removed=f'investment-{investment_id}', summary=_portfolio_summary
+    )
@@ -0,0 +1,303 @@
+from flask import Blueprint, render_template, request, url_for, jsonify
+from datetime import datetime
+from database import db
+from models.transaction import Transaction
+from models.loan import Loan
+from utils.loan_history import EMPTY_TOTALS, payment_totals
+from utils.partials import partial_response
+from utils.reference_cache import get_active_accounts, get_loans
+
+bp = Blueprint('loans', __name__)
+
+def loan_totals(loans, history):
+    """The summary cards: debt, monthly payments and interest paid/projected across all loans"""
+    # Calculate total projected interest for all loans
+    total_projected_interest = 0
+    for loan in loans:
+        summary = loan.calculate_payoff_summary()
+        if summary:
+            total_projected_interest += summary['total_payments'] - loan.balance
+    
+    return {
+        # Total effective monthly payments using the new calculation system
+        'total_monthly_payments': sum(loan.calculate_monthly_payment() for loan in loans),
+        'total_minimum_payments': sum(loan.minimum_payment for loan in loans),
+        'total_debt': sum(loan.balance for loan in loans),
+        'total_interest_paid': sum(history.get(loan.id, EMPTY_TOTALS)['total_interest'] for loan in loans),
+        'total_projected_interest': total_projected_interest
+    }
+
+def _loan_summary():
+    return loan_totals(get_loans(), payment_totals())
+
+def _loan_card(loan):
+    history = payment_totals([loan.id]).get(loan.id, EMPTY_TOTALS)
+    return render_template('partials/loan_card.html', loan=loan, history=history)
+
+@bp.route('/loans')
+def loans():
+    loans = get_loans()
+    # Paid-so-far figures come from the payment history, one grouped query for all loans
+    history = payment_totals()
+    
+    # Get active accounts for payment form
+    accounts = get_active_accounts()
+    
+    return render_template('loans.html', 
+                         loans=loans, 
+                         payment_totals=history,
+                         empty_totals=EMPTY_TOTALS,
+                         accounts=accounts,
+                         **loan_totals(loans, history))
+
+@bp.route('/add_loan', methods=['POST'])
+def add_loan():
+    try:
+        loan = Loan(
+            name=request.form['name'],
+            balance=float(request.form['balance']),
+            interest_rate=float(request.form['interest_rate']),
+            minimum_payment=float(request.form['minimum_payment']),
+            due_date=datetime.strptime(request.form['due_date'], '%Y-%m-%d').date(),
+            loan_type=request.form['loan_type'],
+            auto_payment_enabled=request.form.get('auto_payment_enabled') == 'on'
+        )
+        db.session.add(loan)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('loans.loans'), f'Error adding loan: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('loans.loans'), 'Loan added successfully!',
+        collection='loan', item=loan, fragment=lambda: _loan_card(loan), summary=_loan_summary
+    )
+
+@bp.route('/delete_loan/<int:loan_id>', methods=['POST'])
+def delete_loan(loan_id):
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        db.session.delete(loan)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('loans.loans'), f'Error deleting loan: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('loans.loans'), 'Loan deleted successfully!',
+        collection='loan', removed=f'loan-{loan_id}', summary=_loan_summary
+    )
+
+@bp.route('/update_loan/<int:loan_id>', methods=['POST'])
+def update_loan(loan_id):
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        
+        # Update loan fields
+        loan.name = request.form['name']
+        loan.balance = float(request.form['balance'])
+        loan.interest_rate = float(request.form['interest_rate'])
+        loan.minimum_payment = float(request.form['minimum_payment'])
+        loan.due_date = datetime.strptime(request.form['due_date'], '%Y-%m-%d').date()
+        loan.loan_type = request.form['loan_type']
+        loan.auto_payment_enabled = request.form.get('auto_payment_enabled') == 'on'
+        
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('loans.loans'), f'Error updating loan: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('loans.loans'), f'Loan "{loan.name}" updated successfully!',
+        collection='loan', item=loan, fragment=lambda: _loan_card(loan), summary=_loan_summary
+    )
+
+@bp.route('/get_loan/<int:loan_id>')
+def get_loan(loan_id):
+    """API endpoint to get loan data for editing"""
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        return jsonify({
+            'id': loan.id,
+            'name': loan.name,
+            'balance': loan.balance,
+            'interest_rate': loan.interest_rate,
+            'minimum_payment': loan.minimum_payment,
+            'due_date': loan.due_date.strftime('%Y-%m-%d'),
+            'loan_type': loan.loan_type,
+            'target_payoff_months': loan.target_payoff_months,
+            'auto_payment_enabled': bool(loan.auto_payment_enabled)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/update_payoff_terms/<int:loan_id>', methods=['POST'])
+def update_payoff_terms(loan_id):
+    """Update payoff terms for a loan"""
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        target_months = request.form.get('target_payoff_months')
+        
+        if target_months and target_months.strip():
+            loan.target_payoff_months = int(target_months)
+        else:
+            loan.target_payoff_months = None
+            
+        db.session.commit()
+        
+        # Get updated payment calculations
+        payoff_summary = loan.calculate_payoff_summary()
+        
+        # Return updated payment info
+        return jsonify({
+            'success': True,
+            'required_payment': loan.required_monthly_payment(),
+            'estimated_payoff_months': loan.recalculate_payoff_timeline(),
+            'payoff_summary': payoff_summary,
+            'message': f'Updated payoff terms for {loan.name}'
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/make_loan_payment/<int:loan_id>', methods=['POST'])
+def make_loan_payment(loan_id):
+    """Make a payment on a specific loan"""
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        payment_amount = float(request.form['payment_amount'])
+        account_id = request.form.get('account_id')  # Optional account selection
+        
+        if payment_amount <= 0:
+            return jsonify({'error': 'Payment amount must be positive'}), 400
+        
+        # Transaction record for this payment; the description needs the split, so it is filled in below
+        from datetime import date
+        transaction = Transaction(
+            amount=payment_amount,
+            date=date.today(),
+            category='Loan Payment',
+            transaction_type='expense',
+            is_taxable=False,
+            account_id=int(account_id) if account_id else None
+        )
+        
+        # Make the payment using the enhanced method (also records it in the loan's payment history)
+        payment_details = loan.make_payment(
+            payment_amount, 
+            account_id=transaction.account_id,
+            transaction=transaction
+        )
+        transaction.description = f'Payment on {loan.name} - Interest: ${payment_details["interest_portion"]:.2f}, Principal: ${payment_details["principal_portion"]:.2f}'
+        
+        db.session.add(transaction)
+        db.session.commit()
+        
+        # Prepare detailed response
+        response_data = {
+            'success': True,
+            'payment_details': payment_details,
+            'message': f'Payment of ${payment_amount:.2f} applied to {loan.name}'
+        }
+        
+        if payment_details['overpaid_amount'] > 0:
+            response_data['message'] += f' (${payment_details["overpaid_amount"]:.2f} overpaid, {payment_details["months_ahead"]} months ahead)'
+        
+        return jsonify(response_data)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/api/loans/payments', methods=['POST'])
+def bulk_payments():
+    """
+    Apply many payments (any loans, any dates) in one transaction.
+    Body: {"payments": [{"loan_id", "amount", "date"?, "account_id"?}, ...]}
+    Invalid input rejects the whole batch; otherwise one result per payment.
+    """
+    from utils.loan_payments import apply_payments, parse_payments
+    values = request.get_json(silent=True) or {}
+    payments, errors = parse_payments(values.get('payments'))
+    if errors:
+        return jsonify({'error': 'Invalid payments', 'errors': errors}), 400
+    try:
+        results = apply_payments(payments)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    applied = sum(1 for result in results if result['status'] == 'applied')
+    return jsonify({'applied': applied, 'rejected': len(results) - applied, 'results': results})
+
+@bp.route('/api/loans/schedule')
+def loan_schedule():
+    """API endpoint showing the month-rollover/auto-payment scheduler and what it did this month"""
+    from utils.loan_scheduler import loan_scheduler, period_of
+    from models.processed_period import ProcessedPeriod
+    period = request.args.get('period') or period_of(datetime.now())
+    markers = ProcessedPeriod.query.filter_by(period=period).order_by(ProcessedPeriod.task, ProcessedPeriod.loan_id)
+    return jsonify({
+        'scheduler': loan_scheduler.stats(),
+        'period': period,
+        'processed': [marker.to_dict() for marker in markers]
+    })
+
+@bp.route('/get_loan_status/<int:loan_id>')
+def get_loan_status(loan_id):
+    """Get current status of a loan including payment progress"""
+    try:
+        loan = Loan.query.get_or_404(loan_id)
+        return jsonify(loan.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/api/loans/<int:loan_id>/payments')
+def loan_payment_history(loan_id):
+    """API endpoint paging through a loan's payments, newest first, with running totals"""
+    from utils.loan_history import payment_history
+    loan = Loan.query.get_or_404(loan_id)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+    total, payments = payment_history(loan.id, page, per_page)
+    return jsonify({
+        'loan_id': loan.id,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'payments': payments
+    })
+
+@bp.route('/api/loans/interest')
+@bp.route('/api/loans/<int:loan_id>/interest')
+def loan_cumulative_interest(loan_id=None):
+    """API endpoint for interest paid per month and its running total (one loan, or all of them)"""
+    from utils.loan_history import cumulative_interest
+    if loan_id is not None:
+        Loan.query.get_or_404(loan_id)
+    try:
+        start = request.args.get('start_date')
+        end = request.args.get('end_date')
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    months = cumulative_interest(loan_id, start, end)
+    return jsonify({
+        'loan_id': loan_id,
+        'months': months,
+        'total_interest': months[-1]['cumulative_interest'] if months else 0.0
+    })
+
+@bp.route('/api/loans/payoff_simulation', methods=['POST'])
+def payoff_simulation():
+    """Start an avalanche vs snowball payoff simulation of all loans in the background (202 + job URL)"""
+    from utils.jobs import accepted, jobs
+    values = request.get_json(silent=True) or request.form
+    try:
+        params = {
+            'loans': [loan.simulation_input() for loan in Loan.query.filter(Loan.balance > 0).all()],
+            'extra_payment': float(values.get('extra_payment', 0) or 0),
+            'sweep_max': float(values.get('sweep_max', 0) or 0),
+            'sweep_step': float(values.get('sweep_step', 50) or 50)
+        }
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    if not params['loans']:
+        return jsonify({'error': 'No loans with a balance to simulate'}), 400
+    return accepted(jobs.submit('loan_payoff_simulation', params))
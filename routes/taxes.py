@@ -0,0 +1,97 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+
+bp = Blueprint('taxes', __name__)
+
+@bp.route('/taxes')
+def taxes():
+    from utils.tax_calculator import TaxCalculator
+    calculator = TaxCalculator()
+    states = calculator.get_state_list()
+    return render_template('taxes.html', states=states)
+
+@bp.route('/calculate_taxes', methods=['POST'])
+def calculate_taxes():
+    from utils.tax_calculator import TaxCalculator
+    try:
+        annual_income = float(request.form['annual_income'])
+        employment_type = request.form['employment_type']
+        filing_status = request.form.get('filing_status', 'single')
+        state_code = request.form.get('state_code', '')
+        city_code = request.form.get('city_code', '')
+        
+        # Convert empty strings to None
+        if not state_code:
+            state_code = None
+        if not city_code:
+            city_code = None
+            
+        calculator = TaxCalculator()
+        tax_info = calculator.calculate_taxes(annual_income, employment_type, filing_status, state_code, city_code)
+        
+        # Get lists for form dropdowns
+        states = calculator.get_state_list()
+        cities = calculator.get_cities_for_state(state_code) if state_code else []
+        
+        return render_template('taxes.html', 
+                             tax_info=tax_info, 
+                             annual_income=annual_income, 
+                             employment_type=employment_type,
+                             filing_status=filing_status,
+                             selected_state=state_code,
+                             selected_city=city_code,
+                             states=states,
+                             cities=cities)
+    except Exception as e:
+        flash(f'Error calculating taxes: {str(e)}', 'error')
+        return redirect(url_for('taxes.taxes'))
+
+@bp.route('/api/cities/<state_code>')
+def get_cities_for_state(state_code):
+    from utils.tax_calculator import TaxCalculator
+    calculator = TaxCalculator()
+    cities = calculator.get_cities_for_state(state_code)
+    return jsonify(cities)
+
+@bp.route('/api/taxes/scenarios', methods=['POST'])
+def tax_scenarios():
+    """Start a tax scenario grid (incomes x employment types x states) in the background (202 + job URL)"""
+    from utils.jobs import accepted, jobs
+    from utils.tax_calculator import MAX_TAX_SCENARIOS
+    values = request.get_json(silent=True) or {}
+    try:
+        params = {
+            'income_min': int(values.get('income_min', 20000)),
+            'income_max': int(values.get('income_max', 200000)),
+            'income_step': max(int(values.get('income_step', 1000)), 1),
+            'employment_types': list(values.get('employment_types') or ['w2', '1099']),
+            'state_codes': list(values.get('state_codes') or [None])
+        }
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    count = len(range(max(params['income_min'], 1), params['income_max'] + 1, params['income_step']))
+    if count * len(params['employment_types']) * len(params['state_codes']) > MAX_TAX_SCENARIOS:
+        return jsonify({'error': f'At most {MAX_TAX_SCENARIOS} scenarios per job'}), 400
+    return accepted(jobs.submit('tax_scenarios', params))
+
+@bp.route('/api/taxes/estimate')
+def tax_estimate():
+    """
+    Year-to-date tax estimate from actual taxable transactions: projected annual
+    tax, safe-harbor amounts and the quarterly estimated-payment schedule. The
+    filer defaults to the active budget's; employment_type, state_code and
+    city_code override it.
+    """
+    from utils.reference_cache import get_active_budget
+    from utils.tax_estimate import TaxEstimator
+    estimator = TaxEstimator.for_budget(
+        get_active_budget(),
+        employment_type=request.args.get('employment_type'),
+        state_code=request.args.get('state_code'),
+        city_code=request.args.get('city_code')
+    )
+    if estimator.employment_type not in ('w2', '1099'):
+        return jsonify({'error': "employment_type must be 'w2' or '1099'"}), 400
+    try:
+        return jsonify(estimator.estimate(request.args.get('year', type=int)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
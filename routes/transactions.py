@@ -0,0 +1,234 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from datetime import datetime, date
+from database import db
+from models.transaction import Transaction
+from utils.partials import partial_response
+from utils.reference_cache import get_active_accounts, get_transaction_categories
+from utils.search import category_condition, search_condition
+
+bp = Blueprint('transactions', __name__)
+
+@bp.route('/transactions')
+def transactions():
+    # Get filter parameters
+    category_filter = request.args.get('category', '')
+    search_text = request.args.get('q', '').strip()
+    type_filter = request.args.get('type', '')
+    start_date = request.args.get('start_date', '')
+    end_date = request.args.get('end_date', '')
+    
+    # Get transactions based on filters
+    from datetime import datetime, timedelta
+    from sqlalchemy import extract, func
+    
+    today = datetime.now()
+    current_month_start = today.replace(day=1).date()
+    next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    current_month_end = (next_month - timedelta(days=1)).date()
+    
+    # Build the main transactions query
+    # If date filters are provided, use them; otherwise default to current month
+    if start_date or end_date:
+        # User has specified date filters - search all transactions in that range.
+        # Either end may be left open (from the beginning of time / up to today).
+        recent_query = Transaction.query.filter(*date_conditions(start_date, end_date))
+    else:
+        # No date filters provided - show current month transactions
+        recent_query = Transaction.query.filter(
+            Transaction.date >= current_month_start,
+            Transaction.date <= current_month_end
+        )
+    
+    # Apply search, category and type filters (search and category go through the full-text index)
+    filters = filter_conditions(search_text, category_filter, type_filter)
+    recent_query = recent_query.filter(*filters)
+    
+    recent_transactions = recent_query.order_by(Transaction.date.desc()).all()
+    
+    # Get past transactions grouped by month and year (excluding current month)
+    # Disable monthly history for now
+    past_transactions_by_month = []
+    # past_transactions_by_month = db.session.query(
+    #     extract('year', Transaction.date).label('year'),
+    #     extract('month', Transaction.date).label('month'),
+    #     func.count(Transaction.id).label('count'),
+    #     func.sum(func.case((Transaction.transaction_type == 'income', Transaction.amount), else=0)).label('total_income'),
+    #     func.sum(func.case((Transaction.transaction_type == 'income', func.case((Transaction.is_taxable == True, Transaction.amount), else=0)), else=0)).label('taxable_income'),
+    #     func.sum(func.case((Transaction.transaction_type == 'expense', Transaction.amount), else=0)).label('total_expenses')
+    # ).filter(
+    #     Transaction.date < current_month_start  # Only past months
+    # ).group_by(
+    #     extract('year', Transaction.date),
+    #     extract('month', Transaction.date)
+    # ).order_by(
+    #     extract('year', Transaction.date).desc(),
+    #     extract('month', Transaction.date).desc()
+    # ).all()
+    
+    # Get selected month details if requested
+    selected_year = request.args.get('year', type=int)
+    selected_month = request.args.get('month', type=int)
+    selected_transactions = []
+    
+    if selected_year and selected_month:
+        selected_query = Transaction.query.filter(
+            extract('year', Transaction.date) == selected_year,
+            extract('month', Transaction.date) == selected_month
+        )
+        
+        # Apply filters to selected month transactions
+        selected_query = selected_query.filter(*filters)
+        
+        selected_transactions = selected_query.order_by(Transaction.date.desc()).all()
+    
+    # Get unique categories for filter dropdown
+    categories = get_transaction_categories()
+    
+    # Get active accounts for transaction form
+    accounts = get_active_accounts()
+    
+    # Get month names for display
+    month_names = [
+        'January', 'February', 'March', 'April', 'May', 'June',
+        'July', 'August', 'September', 'October', 'November', 'December'
+    ]
+    
+    return render_template('transactions.html', 
+                         transactions=recent_transactions,  # Current month recent transactions
+                         past_transactions_by_month=past_transactions_by_month,
+                         selected_transactions=selected_transactions,
+                         selected_year=selected_year,
+                         selected_month=selected_month,
+                         month_names=month_names,
+                         categories=categories,
+                         accounts=accounts,
+                         current_filters={
+                             'q': search_text,
+                             'category': category_filter,
+                             'type': type_filter,
+                             'start_date': start_date,
+                             'end_date': end_date
+                         },
+                         date=date)
+
+def date_conditions(start_date, end_date):
+    """Conditions for the start_date/end_date filters (YYYY-MM-DD strings, either may be empty)"""
+    conditions = []
+    if start_date:
+        conditions.append(Transaction.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+    if end_date:
+        conditions.append(Transaction.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+    return conditions
+
+def filter_conditions(search_text, category_filter, type_filter):
+    """Conditions for the search box, category and type filters of the transactions page"""
+    conditions = []
+    search_filter = search_condition(search_text) if search_text else None
+    if search_filter is not None:
+        conditions.append(search_filter)
+    if category_filter:
+        conditions.append(category_condition(category_filter))
+    if type_filter:
+        conditions.append(Transaction.transaction_type == type_filter)
+    return conditions
+
+def current_month_totals():
+    """The unfiltered page's summary cards: this month's income, expenses and net (cached month block)"""
+    from utils.period_summary import current_period_cache, resolve_time_frame
+    time_frame, start, end, _ = resolve_time_frame('current_month')
+    summary = current_period_cache().get(time_frame, start, end)
+    return {
+        'income': summary['income'],
+        'expenses': summary['expenses'],
+        'net': round(summary['income'] - summary['expenses'], 2)
+    }
+
+def _in_current_month(day):
+    today = date.today()
+    return (day.year, day.month) == (today.year, today.month)
+
+@bp.route('/add_transaction', methods=['POST'])
+def add_transaction():
+    try:
+        # Handle category selection (dropdown or custom)
+        use_custom = request.form.get('use_custom') == 'on'
+        if use_custom:
+            category = request.form.get('custom_category', '').strip()
+        else:
+            category = request.form.get('category', '').strip()
+        
+        if not category:
+            category = 'Other'
+        
+        # Handle account selection
+        account_id = request.form.get('account_id')
+        if account_id and account_id != '':
+            account_id = int(account_id)
+        else:
+            account_id = None
+        
+        # Handle is_taxable field (only applies to income transactions)
+        transaction_type = request.form['transaction_type']
+        is_taxable = True  # Default for expenses
+        if transaction_type == 'income':
+            # Check if user explicitly marked as non-taxable, or if category suggests non-taxable
+            is_taxable = request.form.get('is_taxable') == 'on'
+            
+            # Auto-detect non-taxable categories
+            non_taxable_keywords = [
+                'gift', 'refund', 'insurance', 'inheritance', 'settlement', 
+                'prize', 'lottery', 'gambling', 'transfer', 'loan'
+            ]
+            category_lower = category.lower()
+            if any(keyword in category_lower for keyword in non_taxable_keywords):
+                is_taxable = False
+        
+        transaction = Transaction(
+            amount=float(request.form['amount']),
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date(),
+            category=category,
+            description=request.form.get('description', ''),
+            transaction_type=transaction_type,
+            is_taxable=is_taxable,
+            account_id=account_id
+        )
+        db.session.add(transaction)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('transactions.transactions'), f'Error adding transaction: {str(e)}', 'error')
+    
+    def row():
+        # The unfiltered page lists the current month only
+        if not _in_current_month(transaction.date):
+            return ''
+        return render_template('partials/transaction_row.html', transaction=transaction)
+    
+    return partial_response(
+        url_for('transactions.transactions'), 'Transaction added successfully!',
+        collection='transaction', item=transaction, fragment=row, summary=current_month_totals
+    )
+
+@bp.route('/delete_transaction/<int:transaction_id>', methods=['POST'])
+def delete_transaction(transaction_id):
+    try:
+        from utils.net_worth import NetWorthSnapshotter
+        from utils.recurring import RecurringDetector
+        transaction = Transaction.query.get_or_404(transaction_id)
+        NetWorthSnapshotter().record_removed_transaction(transaction)
+        RecurringDetector().record_removed_transaction(transaction)
+        db.session.delete(transaction)
+        db.session.commit()
+    except Exception as e:
+        return partial_response(url_for('transactions.transactions'), f'Error deleting transaction: {str(e)}', 'error')
+    
+    return partial_response(
+        url_for('transactions.transactions'), 'Transaction deleted successfully!',
+        collection='transaction', removed=f'transaction-{transaction_id}', summary=current_month_totals
+    )
+
+@bp.route('/monthly_transactions')
+def monthly_transactions():
+    """Show transactions organized by month and year - DISABLED"""
+    # This feature has been disabled as requested
+    flash('Monthly transactions feature is currently disabled.', 'info')
+    return redirect(url_for('transactions.transactions'))
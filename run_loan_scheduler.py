@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run the loan month rollover and due auto-payments once (see utils/loan_scheduler.py).
+The app does this itself every LOAN_SCHEDULER_INTERVAL seconds while it is
+running; this script is for cron, or for running it with the app stopped.
+Running it again in the same month does nothing that was already done.
+
+    python run_loan_scheduler.py                    # this month, every database
+    python run_loan_scheduler.py --date 2024-06-15  # as if today were that date
+    python run_loan_scheduler.py --status           # what has been done this month
+"""
+
+import argparse
+import contextlib
+import io
+from datetime import date
+
+from app import create_app, init_db
+from models.processed_period import ProcessedPeriod
+from utils.loan_scheduler import loan_scheduler, period_of
+from utils.tenants import tenant_context
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the loan month rollover and auto-payments once')
+    parser.add_argument('--date', type=date.fromisoformat, help='run as of this date (YYYY-MM-DD)')
+    parser.add_argument('--status', action='store_true', help='list what was processed this month and exit')
+    args = parser.parse_args()
+
+    app = create_app()
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(app)
+    loan_scheduler.init_app(app)
+    today = args.date or date.today()
+
+    if args.status:
+        for tenant_id in loan_scheduler._tenant_ids():
+            with tenant_context(app, tenant_id):
+                markers = ProcessedPeriod.query.filter_by(period=period_of(today)).order_by(
+                    ProcessedPeriod.task, ProcessedPeriod.loan_id).all()
+                if tenant_id is not None:
+                    print(f"User {tenant_id}:")
+                if not markers:
+                    print(f"  Nothing processed for {period_of(today)}")
+                for marker in markers:
+                    if marker.task == 'month_rollover':
+                        print(f"  {marker.period} rollover: {marker.loans_updated} loans reset "
+                              f"at {marker.processed_at:%Y-%m-%d %H:%M}")
+                    else:
+                        print(f"  {marker.period} auto-payment on loan {marker.loan_id}: ${marker.amount:.2f}")
+        return
+
+    summaries = loan_scheduler.run_once(today)
+    for tenant_id, summary in summaries.items():
+        prefix = f"User {tenant_id}: " if tenant_id is not None else ''
+        print(f"{prefix}{summary['period']} rollover: {summary['rollover']}")
+        for result in summary['auto_payments']:
+            if result['status'] == 'applied':
+                print(f"  Auto-paid ${result['payment_amount']:.2f} on loan {result['loan_id']} "
+                      f"(balance now ${result['new_balance']:.2f})")
+            else:
+                print(f"  Auto-payment on loan {result['loan_id']} not made: {result['error']}")
+        if not summary['auto_payments']:
+            print("  No auto-payments due")
+    if loan_scheduler.errors:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,24 @@
 // Personal Finance Tracker JavaScript
 
+// CSRF: every same-origin request that changes something carries the page's
+// token (utils/csrf.py). Installed before any page script can call fetch().
+(function installCsrfHeader() {
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    const token = meta ? meta.content : '';
+    if (!token) return;
+    const originalFetch = window.fetch.bind(window);
+    window.fetch = function(resource, options = {}) {
+        const method = (options.method || (resource instanceof Request ? resource.method : 'GET')).toUpperCase();
+        const url = new URL(resource instanceof Request ? resource.url : resource, window.location.href);
+        if (method !== 'GET' && method !== 'HEAD' && url.origin === window.location.origin) {
+            const headers = new Headers(options.headers || (resource instanceof Request ? resource.headers : undefined));
+            headers.set('X-CSRFToken', token);
+            options = { ...options, headers: headers };
+        }
+        return originalFetch(resource, options);
+    };
+})();
+
 document.addEventListener('DOMContentLoaded', function() {
     initializeApp();
 });
@@ -20,6 +39,9 @@ function initializeApp() {
     // Initialize auto-save for forms
     initializeAutoSave();
     
+    // Submit data-partial forms in place
+    initializePartialForms();
+    
     console.log('Personal Finance Tracker initialized successfully');
 }
 
@@ -135,6 +157,130 @@ function initializeAutoSave() {
     });
 }
 
+// Partial Updates
+// Forms marked data-partial post with an HX-Request header. The server answers
+// with just the changed row's HTML plus an X-Partial-Update header
+// ({message, category, collection, removed, summary}), see utils/partials.py,
+// and the page is patched instead of being reloaded.
+function initializePartialForms() {
+    // Delegated, so forms inside rows inserted later are covered too
+    document.addEventListener('submit', function(event) {
+        const form = event.target;
+        if (!form.matches('form[data-partial]') || event.defaultPrevented) return;
+        event.preventDefault();
+        submitPartial(form.action, new FormData(form), form);
+    });
+}
+
+async function submitPartial(url, body = null, form = null) {
+    let response;
+    try {
+        response = await fetch(url, {
+            method: 'POST',
+            body: body,
+            headers: { 'HX-Request': 'true' }
+        });
+    } catch (error) {
+        console.error('Partial update failed:', error);
+        showNotification('Could not reach the server. Please try again.', 'danger');
+        return null;
+    }
+    
+    const update = JSON.parse(response.headers.get('X-Partial-Update') || '{}');
+    if (!response.ok) {
+        showNotification(update.message || `Request failed (${response.status})`, 'danger');
+        return update;
+    }
+    
+    applyPartialUpdate(update, await response.text());
+    if (form) {
+        const modal = form.closest('.modal');
+        if (modal) closeModal(modal.id);
+        form.reset();
+        form.classList.remove('was-validated');
+    }
+    showNotification(update.message, update.category === 'error' ? 'danger' : update.category);
+    return update;
+}
+
+function applyPartialUpdate(update, html) {
+    if (update.removed) {
+        document.querySelectorAll(`[data-row="${update.removed}"]`).forEach(row => row.remove());
+    }
+    
+    if (html && html.trim()) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        const row = template.content.firstElementChild;
+        const existing = document.querySelectorAll(`[data-row="${row.dataset.row}"]`);
+        if (existing.length) {
+            existing.forEach(old => old.replaceWith(row.cloneNode(true)));
+        } else {
+            const container = document.querySelector(`[data-partial-rows="${update.collection}"]`);
+            if (!container) {
+                // The page showed an empty state, so there is no list to add to yet
+                window.location.reload();
+                return;
+            }
+            container.prepend(row);
+        }
+    }
+    
+    applySummary(update.summary || {});
+}
+
+function applySummary(summary) {
+    Object.entries(summary).forEach(([key, value]) => {
+        document.querySelectorAll(`[data-summary="${key}"]`).forEach(element => {
+            element.textContent = formatSummaryValue(value, element.dataset.format);
+        });
+    });
+}
+
+// Live updates pushed from /api/events. handlers maps event names to callbacks
+// taking the event data; a resync (or an event with no handler) reloads the page.
+// The browser reconnects by itself and sends Last-Event-ID, so nothing is missed.
+function subscribeEvents(handlers) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const source = new EventSource('/api/events');
+    const reload = () => {
+        source.close();
+        window.location.reload();
+    };
+    source.addEventListener('resync', reload);
+    ['transactions', 'debt'].forEach(name => {
+        source.addEventListener(name, event => {
+            const handler = handlers[name];
+            if (!handler) {
+                reload();
+                return;
+            }
+            handler(JSON.parse(event.data));
+        });
+    });
+    return source;
+}
+
+// Matches the server-side formatting of the summary cards
+function formatSummaryValue(value, format) {
+    switch (format) {
+        case 'count':
+            return String(value);
+        case 'whole':
+            return '$' + value.toFixed(0);
+        case 'grouped':
+            return '$' + value.toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+        case 'signed':
+            return (value > 0 ? '+' : '') + '$' + value.toFixed(2);
+        case 'percent':
+            return (value >= 0 ? '+' : '') + value.toFixed(2) + '%';
+        default:
+            return '$' + value.toFixed(2);
+    }
+}
+
 // Utility Functions
 function formatCurrency(amount) {
     return new Intl.NumberFormat('en-US', {
@@ -418,6 +564,9 @@ window.FinanceTracker = {
     createBarChart,
     createLineChart,
     fetchAPI,
+    submitPartial,
+    applySummary,
+    subscribeEvents,
     calculateCompoundInterest,
     calculateLoanPayment,
     calculateTaxBracket,
@@ -0,0 +1,44 @@
+"""Fixtures: an app on a throwaway database and a test client for it"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app, init_db
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'finances.db'}",
+        'DB_DIR': str(tmp_path),
+        'ARCHIVE_DIR': str(tmp_path / 'archive'),
+        'LOAN_SCHEDULER_INTERVAL': 0,
+        'TESTING': True
+    })
+    init_db(app)
+    with app.app_context():
+        yield app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def tenant_app(tmp_path, monkeypatch):
+    """An app with MULTI_TENANT on; the shared tenant registry is restored afterwards"""
+    from app import create_app
+    from utils.tenants import tenants
+    monkeypatch.setattr(tenants, 'directory', tenants.directory)
+    monkeypatch.setattr(tenants, 'app', tenants.app)
+    monkeypatch.setenv('SECRET_KEY', 'test-secret-key')
+    app = create_app({
+        'DB_DIR': str(tmp_path),
+        'MULTI_TENANT': True,
+        'LOAN_SCHEDULER_INTERVAL': 0,
+        'TESTING': True
+    })
+    yield app
+    tenants.dispose()
@@ -0,0 +1,31 @@
+"""JSON API input validation"""
+
+def test_search_rejects_bad_dates(client):
+    response = client.get('/api/search?q=rent&end_date=not-a-date')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_job_params_must_be_an_object(client):
+    from models.job import Job
+    response = client.post('/api/jobs', json={'type': 'recurring_rebuild', 'params': ['not', 'a', 'dict']})
+    assert response.status_code == 400
+    assert client.post('/api/jobs', json=['recurring_rebuild']).status_code == 400
+    assert Job.query.count() == 0
+
+def test_recurring_get_only_reads(client):
+    from models.job import Job
+    from models.recurring_series import RecurringScan
+    response = client.get('/api/recurring?rebuild=1')
+    assert response.status_code == 200
+    assert response.get_json()['scan'] is None
+    assert RecurringScan.query.count() == 0
+    assert Job.query.count() == 0
+
+def test_recurring_rebuild_is_a_post(client):
+    from utils.jobs import jobs
+    response = client.post('/api/recurring/rebuild')
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+    jobs._futures[(None, job_id)].result(timeout=10)
+    assert client.get(f'/api/jobs/{job_id}').get_json()['status'] == 'succeeded'
+    assert client.get('/api/recurring').get_json()['scan']['series_count'] == 0
@@ -0,0 +1,35 @@
+"""App factory settings"""
+
+import pytest
+
+from app import DEFAULT_SECRET_KEY, create_app
+
+def multi_tenant_config(tmp_path):
+    return {'DB_DIR': str(tmp_path), 'MULTI_TENANT': True, 'LOAN_SCHEDULER_INTERVAL': 0}
+
+def test_multi_tenant_needs_secret_key_from_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv('SECRET_KEY', raising=False)
+    with pytest.raises(RuntimeError):
+        create_app(multi_tenant_config(tmp_path))
+    with pytest.raises(RuntimeError):
+        create_app(dict(multi_tenant_config(tmp_path), SECRET_KEY='set-in-code'))
+    monkeypatch.setenv('SECRET_KEY', DEFAULT_SECRET_KEY)
+    with pytest.raises(RuntimeError):
+        create_app(multi_tenant_config(tmp_path))
+
+def test_multi_tenant_starts_with_environment_key(tmp_path, monkeypatch):
+    from utils.tenants import tenants
+    # Restored afterwards, so later tests run with MULTI_TENANT off
+    monkeypatch.setattr(tenants, 'directory', tenants.directory)
+    monkeypatch.setattr(tenants, 'app', tenants.app)
+    monkeypatch.setenv('SECRET_KEY', 'a-long-random-value')
+    app = create_app(multi_tenant_config(tmp_path))
+    assert app.config['SECRET_KEY'] == 'a-long-random-value'
+
+def test_precompiled_templates_only_when_enabled(tmp_path):
+    from jinja2 import ChoiceLoader
+    compiled = tmp_path / 'compiled_templates'
+    compiled.mkdir()
+    config = {'DB_DIR': str(tmp_path), 'PRECOMPILED_TEMPLATES_DIR': str(compiled)}
+    assert not isinstance(create_app(dict(config, PRECOMPILED_TEMPLATES=False)).jinja_env.loader, ChoiceLoader)
+    assert isinstance(create_app(dict(config, PRECOMPILED_TEMPLATES=True)).jinja_env.loader, ChoiceLoader)
@@ -0,0 +1,61 @@
+"""Archived years: partition changes made by other processes and the history endpoint"""
+
+import json
+
+from utils.archive import MANIFEST, read_manifest, transaction_archive
+
+def test_partitions_rescanned_after_manifest_change(app, tmp_path, monkeypatch):
+    directory = tmp_path / 'archive'
+    directory.mkdir()
+    assert transaction_archive.partitions() == []
+    scans = []
+    monkeypatch.setattr('utils.archive.os.listdir', lambda path: scans.append(path) or [])
+    transaction_archive.partitions()
+    assert scans == []  # Unchanged directory: cached
+
+    # Another process archived a year
+    (directory / MANIFEST).write_text(json.dumps({'version': 1}))
+    transaction_archive.partitions()
+    assert scans == [str(directory)]
+    assert read_manifest(str(directory))['version'] == 1
+
+def test_history_rejects_bad_dates(client):
+    response = client.get('/api/transactions/history?start_date=2024-13-01')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_history_pages_hot_rows_and_archived_years_together(client, monkeypatch):
+    from datetime import date
+    from database import db
+    from models.transaction import Transaction
+    from utils.archive import Partition, archive_year
+
+    def add(day):
+        transaction = Transaction(amount=1, date=day, category='Food', transaction_type='expense')
+        db.session.add(transaction)
+        db.session.commit()
+        return transaction.id
+
+    this_year = date.today().year
+    archived = [add(date(this_year - 2, 3, 1)), add(date(this_year - 2, 3, 1)), add(date(this_year - 2, 9, 1))]
+    archive_year(this_year - 2, progress=lambda message: None)
+    late = add(date(this_year - 2, 6, 1))  # Entered after its year was archived: stays hot
+    older = add(date(this_year - 3, 1, 1))  # An earlier year that was never archived
+    recent = [add(date(this_year, 1, 1)), add(date(this_year, 1, 2)), add(date(this_year - 1, 5, 1))]
+    expected = [recent[1], recent[0], recent[2], archived[2], late, archived[1], archived[0], older]
+
+    read = []
+    original = Partition.rows_between
+    monkeypatch.setattr(Partition, 'rows_between', lambda self, lo, hi: read.append(hi - lo) or original(self, lo, hi))
+    first = client.get('/api/transactions/history?per_page=3').get_json()
+    assert [row['id'] for row in first['transactions']] == expected[:3]
+    assert first['total'] == 8
+    assert sum(read) == 1  # Only the newest archived row, to know where the hot rows stop
+
+    pages = [client.get(f'/api/transactions/history?per_page=3&page={page}').get_json() for page in (2, 3)]
+    assert [row['id'] for page in pages for row in page['transactions']] == expected[3:]
+    assert [row['archived'] for row in pages[0]['transactions']] == [True, False, True]
+
+    ranged = client.get(f'/api/transactions/history?start_date={this_year - 2}-01-01&end_date={this_year - 2}-12-31')
+    assert [row['id'] for row in ranged.get_json()['transactions']] == expected[3:7]
+    assert ranged.get_json()['total'] == 4
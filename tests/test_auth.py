@@ -0,0 +1,64 @@
+"""Logins with MULTI_TENANT: where a login may send the browser next, and CSRF tokens on posts"""
+
+import pytest
+
+def csrf_token(client):
+    """The token the login page gives this client's session"""
+    client.get('/login')
+    with client.session_transaction() as session:
+        return session['csrf_token']
+
+def register(client, username='alice'):
+    return client.post('/register', data={'username': username, 'password': 'correct horse',
+                                          'csrf_token': csrf_token(client)})
+
+def login(client, next_url, username='alice'):
+    return client.post('/login', data={'username': username, 'password': 'correct horse', 'next': next_url,
+                                       'csrf_token': csrf_token(client)})
+
+@pytest.mark.parametrize('target', [
+    'https://evil.example/', '//evil.example', '/\\evil.example', '\\\\evil.example', '/\t/evil.example'
+])
+def test_login_never_redirects_off_site(tenant_app, target):
+    client = tenant_app.test_client()
+    register(client)
+    client.post('/logout', data={'csrf_token': csrf_token(client)})
+    response = login(client, target)
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/dashboard'
+
+def test_login_follows_local_next(tenant_app):
+    client = tenant_app.test_client()
+    register(client)
+    client.post('/logout', data={'csrf_token': csrf_token(client)})
+    response = login(client, '/loans?tab=2')
+    assert response.headers['Location'] == '/loans?tab=2'
+
+def test_session_cookie_is_same_site(tenant_app):
+    assert tenant_app.config['CSRF_PROTECTION'] is True
+    assert tenant_app.config['SESSION_COOKIE_SAMESITE'] == 'Lax'
+
+def test_post_without_token_is_refused(tenant_app):
+    client = tenant_app.test_client()
+    register(client)
+    response = client.post('/add_account', data={'name': 'Checking', 'account_type': 'checking', 'current_balance': '10'})
+    assert response.status_code == 400
+    response = client.post('/add_account', data={'name': 'Checking', 'account_type': 'checking', 'current_balance': '10'},
+                           headers={'X-CSRFToken': 'not-the-token'})
+    assert response.status_code == 400
+
+def test_post_with_token_field_or_header_is_accepted(tenant_app):
+    client = tenant_app.test_client()
+    register(client)
+    token = csrf_token(client)
+    form = {'name': 'Checking', 'account_type': 'checking', 'current_balance': '10'}
+    assert client.post('/add_account', data=dict(form, csrf_token=token)).status_code == 302
+    assert client.post('/add_account', data=dict(form, name='Savings'),
+                       headers={'X-CSRFToken': token}).status_code == 302
+    page = client.get('/accounts').get_data(as_text=True)
+    assert f'name="csrf_token" value="{token}"' in page
+    assert f'<meta name="csrf-token" content="{token}">' in page
+
+def test_single_user_mode_needs_no_token(client):
+    assert client.post('/add_account', data={'name': 'Checking', 'account_type': 'checking',
+                                              'current_balance': '10'}).status_code == 302
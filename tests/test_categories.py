@@ -0,0 +1,81 @@
+"""Category interning: spellings share one category, rollbacks forget their categories, migration 13 folds spellings"""
+
+import sqlite3
+import time
+
+from sqlalchemy import create_engine
+
+from database import db
+from models.category import Category
+from models.transaction import Transaction
+from utils.categories import current_category_map, intern_category
+from utils.migrations import MigrationContext, category_ids
+
+def add(category, amount=1):
+    transaction = Transaction(amount=amount, category=category, transaction_type='expense')
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
+
+def test_spellings_share_a_category(app):
+    first = add('Groceries')
+    assert (first.category_id, first.category) == intern_category(db.session, 'groceries')
+    for spelling in ('groceries', '  GROCERIES ', 'Groceries\t'):
+        transaction = add(spelling)
+        assert (transaction.category_id, transaction.category) == (first.category_id, 'Groceries')
+    assert add('Dining  out').category == 'Dining out'
+    assert add('').category_id == intern_category(db.session, None)[0]  # Blank names are "Other"
+    assert Category.query.count() == 3
+
+def test_rollback_forgets_new_categories(app):
+    category_id, name = intern_category(db.session, 'Travel')
+    assert name == 'Travel'
+    assert current_category_map().find('travel') is None  # Not committed yet
+    db.session.rollback()
+    assert current_category_map().find('travel') is None
+    assert Category.query.filter_by(canonical_name='travel').count() == 0
+
+    transaction = add('travel')
+    assert transaction.category == 'travel'
+    assert current_category_map().find('travel') == (transaction.category_id, 'travel')
+
+def test_map_reloads_after_another_process_replaces_categories(app):
+    rent = add('Rent')
+    time.sleep(0.01)
+    # e.g. a backup restored by another process: the ids this process knows now mean something else
+    with sqlite3.connect(db.engine.url.database) as conn:
+        conn.execute('DELETE FROM "transaction"')
+        conn.execute('DELETE FROM category')
+        conn.execute("INSERT INTO category (id, name, canonical_name) VALUES (?, 'Food', 'food')", (rent.category_id,))
+    db.session.remove()
+
+    assert add('FOOD').category == 'Food'
+    rent = add('rent')
+    assert db.session.get(Category, rent.category_id).name == 'rent'
+    assert Category.query.count() == 2
+
+def test_migration_13_folds_mixed_spellings(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql('CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, category TEXT NOT NULL)')
+        conn.exec_driver_sql(
+            'CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT NOT NULL, '
+            'canonical_name TEXT NOT NULL UNIQUE, created_at DATETIME)'
+        )
+        spellings = ['Groceries', 'groceries', 'Groceries', ' GROCERIES', 'Rent', '', ' ', 'Dining  Out']
+        conn.exec_driver_sql('INSERT INTO "transaction" (category) VALUES (?)', [(s,) for s in spellings])
+        conn.commit()
+
+        category_ids(MigrationContext(conn, batch_size=3, progress=None))
+
+        categories = {canonical: (category_id, name) for category_id, name, canonical in
+                      conn.exec_driver_sql('SELECT id, name, canonical_name FROM category')}
+        assert {canonical: name for canonical, (_, name) in categories.items()} == {
+            'groceries': 'Groceries', 'rent': 'Rent', 'other': 'Other', 'dining out': 'Dining Out'
+        }
+        rows = conn.exec_driver_sql('SELECT category, category_id FROM "transaction" ORDER BY id').fetchall()
+        assert rows == [
+            ('Groceries', categories['groceries'][0])] * 4 + [
+            ('Rent', categories['rent'][0]), ('Other', categories['other'][0]), ('Other', categories['other'][0]),
+            ('Dining Out', categories['dining out'][0])
+        ]
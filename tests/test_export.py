@@ -0,0 +1,82 @@
+"""Exports: every format parses, honours the page filters and never carries a live formula"""
+
+import csv
+import io
+import json
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+SHEET = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+@pytest.fixture
+def ledger(client):
+    for amount, day, category, kind, description in [
+        (12.5, '2024-01-05', 'Food', 'expense', '=HYPERLINK("http://evil.example","click")'),
+        (40, '2024-01-20', 'Food', 'expense', '-2+3'),
+        (3000, '2024-01-31', 'Salary', 'income', '@SUM(A1)'),
+        (7.25, '2024-02-03', 'Food', 'expense', 'Lunch'),
+        (99, '2023-12-31', 'Food', 'expense', '+1 from last year'),
+    ]:
+        response = client.post('/add_transaction', data={
+            'amount': str(amount), 'date': day, 'category': category, 'transaction_type': kind,
+            'description': description
+        }, headers={'Accept': 'application/json'})
+        assert response.status_code == 200
+    return client
+
+FILTERS = 'type=expense&start_date=2024-01-01&end_date=2024-01-31'
+
+def test_csv_applies_filters_and_neutralises_formulas(ledger):
+    response = ledger.get(f'/export/transactions?{FILTERS}')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['date'], row['amount'], row['description']) for row in rows] == [
+        ('2024-01-05', '12.5', '\'=HYPERLINK("http://evil.example","click")'),
+        ('2024-01-20', '40.0', "'-2+3"),
+    ]
+
+def test_ndjson_applies_filters_and_keeps_text_verbatim(ledger):
+    response = ledger.get(f'/export/transactions?format=ndjson&{FILTERS}&q=hyperlink')
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(row['date'], row['amount'], row['transaction_type']) for row in rows] == [('2024-01-05', 12.5, 'expense')]
+    assert rows[0]['description'].startswith('=HYPERLINK')
+
+def xlsx_rows(data):
+    """Cell values per row of sheet1, with the style index of each text cell"""
+    with zipfile.ZipFile(io.BytesIO(data)) as workbook:
+        assert workbook.testzip() is None
+        sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+        styles = ElementTree.fromstring(workbook.read('xl/styles.xml'))
+    quote_prefixed = [xf.get('quotePrefix') == '1' for xf in styles.find(f'{SHEET}cellXfs')]
+    rows = []
+    for row in sheet.iter(f'{SHEET}row'):
+        cells = []
+        for cell in row:
+            text = cell.find(f'{SHEET}is/{SHEET}t')
+            value = cell.find(f'{SHEET}v')
+            if text is not None:
+                cells.append((text.text, quote_prefixed[int(cell.get('s', 0))]))
+            else:
+                cells.append(value.text if value is not None else None)
+        rows.append(cells)
+    return rows
+
+def test_xlsx_applies_filters_and_marks_formula_text(ledger):
+    response = ledger.get(f'/export/transactions?format=xlsx&category=food&{FILTERS}')
+    rows = xlsx_rows(response.get_data())
+    header, body = rows[0], rows[1:]
+    assert [name for name, _ in header][:6] == ['id', 'date', 'transaction_type', 'category', 'description', 'amount']
+    assert [row[5] for row in body] == ['12.5', '40.0']
+    assert [row[1] for row in body] == ['45296', '45311']  # Date serials for 2024-01-05 and 2024-01-20
+    assert [row[4] for row in body] == [('=HYPERLINK("http://evil.example","click")', True), ('-2+3', True)]
+    assert body[0][3] == ('Food', False)
+
+def test_tax_summary_export(ledger):
+    rows = list(csv.DictReader(io.StringIO(
+        ledger.get('/export/tax_summary?start_date=2024-01-01&end_date=2024-12-31').get_data(as_text=True)
+    )))
+    assert [(row['month'], row['income'], row['expenses']) for row in rows] == [
+        ('2024-01', '3000.0', '52.5'), ('2024-02', '0.0', '7.25')
+    ]
@@ -0,0 +1,25 @@
+"""Background jobs: a cancel sent to another worker process reaches a running job"""
+
+import sqlite3
+
+import pytest
+
+from database import db
+from models.job import Job
+from utils.jobs import CANCEL_POLL_CHECKS, JobCancelled, JobContext, jobs
+
+def test_running_job_sees_cancel_from_another_process(app):
+    job = Job(job_type='net_worth_rebuild', executor='thread', params='{}', status='running')
+    db.session.add(job)
+    db.session.commit()
+    context = JobContext(jobs, (None, job.id))
+    context.check_cancelled()
+
+    # The cancel request was handled by another worker: only the job row knows
+    with sqlite3.connect(db.engine.url.database) as conn:
+        conn.execute('UPDATE job SET cancel_requested = 1 WHERE id = ?', (job.id,))
+    with pytest.raises(JobCancelled):
+        for _ in range(CANCEL_POLL_CHECKS):
+            context.check_cancelled()
+    assert context.cancelled
+    jobs._cancel_requests.discard((None, job.id))
@@ -0,0 +1,59 @@
+"""Ledger cache: commits are applied as deltas, another process's writes trigger a reload"""
+
+import sqlite3
+import time
+from datetime import date
+
+import pytest
+
+from database import db
+from models.transaction import Transaction
+from utils.ledger_cache import ledger_cache
+
+@pytest.fixture
+def ledger(tmp_path):
+    from app import create_app, init_db
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'finances.db'}",
+        'DB_DIR': str(tmp_path),
+        'ARCHIVE_DIR': str(tmp_path / 'archive'),
+        'LOAN_SCHEDULER_INTERVAL': 0,
+        'LEDGER_CACHE': True,
+        'TESTING': True
+    })
+    init_db(app)
+    with app.app_context():
+        yield ledger_cache
+    ledger_cache.disable()
+
+def add_expense(amount, day):
+    transaction = Transaction(amount=amount, date=day, category='Food', transaction_type='expense')
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
+
+def test_commit_is_applied_without_reload(ledger):
+    add_expense(10, date(2024, 3, 1))
+    assert ledger.totals() == (0, 1000)
+    loads = ledger.loads
+    add_expense(5, date(2024, 3, 2))
+    assert ledger.totals() == (0, 1500)
+    assert ledger.loads == loads
+
+def test_cross_process_write_reloads(ledger):
+    transaction = add_expense(10, date(2024, 3, 1))
+    assert ledger.totals() == (0, 1000)
+    changes = ledger.external_changes
+
+    time.sleep(0.01)
+    # Another process (e.g. run_loan_scheduler.py) writes behind the app's back
+    with sqlite3.connect(db.engine.url.database) as conn:
+        conn.execute('UPDATE "transaction" SET amount = 4000 WHERE id = ?', (transaction.id,))
+    db.session.remove()  # As at the end of a request
+
+    assert ledger.totals() == (0, 4000)
+    assert ledger.external_changes == changes + 1
+    assert ledger.verify() == []
+
+    add_expense(1, date(2024, 3, 2))  # The next own commit is still applied as a delta
+    assert ledger.totals() == (0, 4100)
@@ -0,0 +1,23 @@
+"""Scheduler pass: the derived tables pages read are brought up to date here"""
+
+from datetime import date
+
+from database import db
+from models.net_worth_snapshot import NetWorthSnapshot
+from models.recurring_series import RecurringScan, RecurringSeries
+from models.transaction import Transaction
+from utils.loan_scheduler import LoanScheduler
+
+def test_run_once_updates_snapshots_and_recurring_series(app):
+    for month in range(1, 7):
+        db.session.add(Transaction(amount=15.0, date=date(2024, month, 3), category='Subscriptions',
+                                   description=f'Netflix #{month}', transaction_type='expense'))
+    db.session.commit()
+
+    scheduler = LoanScheduler()
+    scheduler.init_app(app)
+    summaries = scheduler.run_once()
+    assert None in summaries
+    assert RecurringScan.query.one().last_transaction_id == db.session.query(db.func.max(Transaction.id)).scalar()
+    assert RecurringSeries.query.filter_by(merchant='netflix').count() == 1
+    assert NetWorthSnapshot.query.filter_by(snapshot_date=date.today()).count() == 1
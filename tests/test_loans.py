@@ -0,0 +1,60 @@
+"""Loan write routes: payment, edit and delete all reach the database"""
+
+from datetime import date, timedelta
+
+from database import db
+from models.loan import Loan
+
+def add_loan(**values):
+    loan = Loan(name='Car', balance=1000.0, interest_rate=6.0, minimum_payment=100.0,
+                due_date=date.today(), loan_type='auto', current_month_paid=0.0,
+                total_interest_paid=0.0, total_payments_made=0.0, payment_count=0)
+    for key, value in values.items():
+        setattr(loan, key, value)
+    db.session.add(loan)
+    db.session.commit()
+    return loan.id
+
+def test_make_loan_payment(client):
+    loan_id = add_loan()
+    response = client.post(f'/make_loan_payment/{loan_id}', data={'payment_amount': '150'})
+    assert response.status_code == 200, response.get_json()
+    db.session.expire_all()
+    loan = db.session.get(Loan, loan_id)
+    assert loan.payment_count == 1
+    assert loan.balance < 1000.0
+    assert loan.payments.count() == 1
+
+def test_update_loan(client):
+    loan_id = add_loan()
+    response = client.post(f'/update_loan/{loan_id}', data={
+        'name': 'Truck', 'balance': '800', 'interest_rate': '5', 'minimum_payment': '90',
+        'due_date': date.today().isoformat(), 'loan_type': 'auto'
+    }, headers={'Accept': 'application/json'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    loan = db.session.get(Loan, loan_id)
+    assert (loan.name, loan.balance, loan.minimum_payment) == ('Truck', 800.0, 90.0)
+
+def test_delete_loan(client):
+    loan_id = add_loan()
+    response = client.post(f'/delete_loan/{loan_id}', headers={'Accept': 'application/json'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Loan, loan_id) is None
+
+def test_backdated_payment_keeps_this_month(client):
+    today = date.today()
+    last_month = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    loan_id = add_loan(current_month_paid=100.0, last_payment_date=today)
+    response = client.post('/api/loans/payments', json={'payments': [
+        {'loan_id': loan_id, 'amount': 50, 'date': last_month.isoformat()}
+    ]})
+    assert response.status_code == 200, response.get_json()
+    db.session.expire_all()
+    loan = db.session.get(Loan, loan_id)
+    assert (loan.current_month_paid, loan.last_payment_date) == (100.0, today)
+    assert loan.payment_count == 1
+
+    loan.make_payment(25.0, payment_date=last_month)
+    assert (loan.current_month_paid, loan.last_payment_date) == (100.0, today)
@@ -0,0 +1,84 @@
+"""Migration steps: interrupted backfills resume on the next run, money columns become cents"""
+
+import pytest
+from sqlalchemy import create_engine
+
+from utils.migrations import MigrationContext, add_is_taxable
+
+class Interrupted(Exception):
+    pass
+
+def test_interrupted_is_taxable_backfill_resumes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql(
+            'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, category TEXT, transaction_type TEXT)'
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO "transaction" (category, transaction_type) VALUES (?, ?)',
+            [('Gift', 'income')] * 6 + [('Salary', 'income')]
+        )
+        conn.commit()
+
+        def stop_after_first_batch(description, done, total):
+            raise Interrupted()
+        with pytest.raises(Interrupted):
+            add_is_taxable(MigrationContext(conn, batch_size=2, progress=stop_after_first_batch))
+
+        add_is_taxable(MigrationContext(conn, batch_size=2, progress=None))
+        rows = conn.exec_driver_sql('SELECT category, is_taxable FROM "transaction" ORDER BY id').fetchall()
+        assert rows == [('Gift', 0)] * 6 + [('Salary', 1)]
+        assert conn.exec_driver_sql('SELECT COUNT(*) FROM migration_progress').scalar() == 0
+
+        # Finished: a later run leaves users' own choices alone
+        conn.exec_driver_sql('UPDATE "transaction" SET is_taxable = 1')
+        conn.commit()
+        add_is_taxable(MigrationContext(conn, batch_size=2, progress=None))
+        assert conn.exec_driver_sql('SELECT MIN(is_taxable) FROM "transaction"').scalar() == 1
+
+def float_money_db(conn):
+    """Tables as they were before migration 7: money in REAL dollar columns"""
+    conn.exec_driver_sql(
+        'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, amount FLOAT NOT NULL, category TEXT)'
+    )
+    conn.exec_driver_sql(
+        'INSERT INTO "transaction" (amount, category) VALUES (?, ?)',
+        [(1.005, 'Food'), (-2.675, 'Refund'), (0.1 + 0.2, 'Fees'), (1234567.89, 'Salary'), (19.99, 'Books')]
+    )
+    conn.exec_driver_sql('CREATE TABLE account (id INTEGER PRIMARY KEY, current_balance FLOAT, initial_balance FLOAT)')
+    conn.exec_driver_sql(
+        'INSERT INTO account (current_balance, initial_balance) VALUES (?, ?)', [(10.005, None), (-0.005, 5.0)]
+    )
+    conn.commit()
+
+def test_money_to_cents_converts_float_columns(tmp_path):
+    from utils.migrations import money_to_cents
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.connect() as conn:
+        float_money_db(conn)
+        money_to_cents(MigrationContext(conn, batch_size=2, progress=None))
+
+        columns = {row[1]: row for row in conn.exec_driver_sql('PRAGMA table_info("transaction")')}
+        assert columns['amount'][2] == 'BIGINT' and columns['amount'][3] == 1  # Still NOT NULL
+        assert 'amount_cents' not in columns
+        amounts = conn.exec_driver_sql('SELECT amount FROM "transaction" ORDER BY id').scalars().all()
+        assert amounts == [101, -268, 30, 123456789, 1999]
+        balances = conn.exec_driver_sql('SELECT current_balance, initial_balance FROM account ORDER BY id').fetchall()
+        assert balances == [(1001, None), (-1, 500)]
+
+        # Already converted: a second run changes nothing
+        context = MigrationContext(conn, batch_size=2, progress=None)
+        assert not context.convert_to_cents('transaction', 'amount')
+        money_to_cents(context)
+        assert conn.exec_driver_sql('SELECT amount FROM "transaction" ORDER BY id').scalars().all() == amounts
+
+def test_money_to_cents_needs_sqlite_3_35(tmp_path, monkeypatch):
+    from utils.migrations import money_to_cents
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    monkeypatch.setattr(MigrationContext, 'sqlite_version', lambda self: (3, 34, 1))
+    with engine.connect() as conn:
+        float_money_db(conn)
+        with pytest.raises(RuntimeError, match=r'SQLite 3\.35\.0 or newer .* SQLite 3\.34\.1'):
+            money_to_cents(MigrationContext(conn, batch_size=2, progress=None))
+        columns = [row[1] for row in conn.exec_driver_sql('PRAGMA table_info("transaction")')]
+        assert columns == ['id', 'amount', 'category']  # Nothing was changed
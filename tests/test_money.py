@@ -0,0 +1,27 @@
+"""Money: dollars to integer cents round half away from zero, the same way for every input type"""
+
+from decimal import Decimal
+
+import pytest
+
+from utils.money import from_cents, to_cents
+
+@pytest.mark.parametrize('dollars, cents', [
+    (1.005, 101), (2.675, 268), (0.005, 1), (10.005, 1001), (0.1 + 0.2, 30),
+    (-1.005, -101), (-2.675, -268), (-0.005, -1), (-0.004, 0),
+    ('1.005', 101), ('-1.005', -101), (Decimal('-2.345'), -235), (7, 700), (0, 0),
+])
+def test_to_cents_rounds_half_away_from_zero(dollars, cents):
+    assert to_cents(dollars) == cents
+
+@pytest.mark.parametrize('cents, dollars', [(101, 1.01), (-101, -1.01), (-1, -0.01), (0, 0.0), (123456789, 1234567.89)])
+def test_from_cents(cents, dollars):
+    assert from_cents(cents) == dollars
+
+@pytest.mark.parametrize('dollars', [0.01, -0.01, 19.99, -19.99, 1234567.89, -0.5])
+def test_round_trip(dollars):
+    assert from_cents(to_cents(dollars)) == dollars
+
+def test_none_passes_through():
+    assert to_cents(None) is None
+    assert from_cents(None) is None
@@ -0,0 +1,76 @@
+"""Net worth snapshots: deleted ids are not reused and pages never write snapshots"""
+
+from datetime import date
+
+from database import db
+from models.net_worth_snapshot import NetWorthSnapshot
+from utils.net_worth import NetWorthSnapshotter
+
+def add_expense(client, amount):
+    response = client.post('/add_transaction', data={
+        'amount': str(amount), 'date': date.today().isoformat(), 'category': 'Food',
+        'transaction_type': 'expense'
+    }, headers={'Accept': 'application/json'})
+    assert response.status_code == 200
+    return response.get_json()['row']['id']
+
+def test_deleted_id_not_reused(client):
+    add_expense(client, 10)
+    second = add_expense(client, 20)
+    NetWorthSnapshotter().update()
+    client.post(f'/delete_transaction/{second}', headers={'Accept': 'application/json'})
+    assert add_expense(client, 500) > second
+
+    db.session.expire_all()
+    assert NetWorthSnapshotter().current().net_worth == -510.0
+    assert NetWorthSnapshotter().update().net_worth == -510.0
+
+def test_dashboard_does_not_write_snapshots(client):
+    add_expense(client, 10)
+    assert client.get('/dashboard').status_code == 200
+    history = client.get('/api/net_worth_history').get_json()
+    assert history[-1]['net_worth'] == -10.0
+    assert NetWorthSnapshot.query.count() == 0
+
+class JobContext:
+    def progress(self, fraction, message=None):
+        pass
+
+def test_rebuild_keeps_archived_years(app):
+    from add_sample_data import populate
+    from utils.archive import archive_year
+    from utils.net_worth import rebuild_net_worth_snapshots
+    populate(2000, seed=3, progress=lambda message: None)
+    before = NetWorthSnapshotter().update()
+    totals = (before.total_income, before.total_taxable_income, before.total_expenses, before.net_worth)
+
+    assert archive_year(date.today().year - 2, progress=lambda message: None) > 0
+    rebuild_net_worth_snapshots(JobContext())
+    db.session.expire_all()
+    after = NetWorthSnapshotter().latest()
+    assert (after.total_income, after.total_taxable_income, after.total_expenses, after.net_worth) == totals
+    NetWorthSnapshot.query.delete()
+    assert NetWorthSnapshotter().current().net_worth == before.net_worth
+
+def test_refold_keeps_holdings_history_and_archived_years(app):
+    from add_sample_data import populate
+    from utils.archive import archive_year
+    from utils.net_worth import REFOLD_TOTALS
+    populate(2000, seed=4, progress=lambda message: None)
+    before = NetWorthSnapshotter().update()
+    totals = (before.total_income, before.total_expenses, before.net_worth)
+    archive_year(date.today().year - 2, progress=lambda message: None)
+    oldest = NetWorthSnapshot.query.order_by(NetWorthSnapshot.snapshot_date).first()
+    oldest.portfolio_value = 1234.0
+    # What migration 14 does to snapshots whose totals may be off
+    NetWorthSnapshot.query.update({NetWorthSnapshot.last_transaction_id: REFOLD_TOTALS,
+                                   NetWorthSnapshot.total_income: 0})
+    db.session.commit()
+
+    assert NetWorthSnapshotter().current().total_income == totals[0]
+    after = NetWorthSnapshotter().update()
+    assert (after.total_income, after.total_expenses, after.net_worth) == totals
+    db.session.expire_all()
+    oldest = NetWorthSnapshot.query.order_by(NetWorthSnapshot.snapshot_date).first()
+    assert oldest.portfolio_value == 1234.0
+    assert oldest.total_income + oldest.total_expenses > 0
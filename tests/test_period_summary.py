@@ -0,0 +1,49 @@
+"""Period summaries: this process's writes evict by date, another process's writes are picked up"""
+
+import sqlite3
+import time
+from datetime import date
+
+from database import db
+from models.transaction import Transaction
+from utils.period_summary import current_period_cache
+from utils.tax_estimate import current_tax_estimate_cache
+
+def add_income(amount, day):
+    transaction = Transaction(amount=amount, date=day, category='Salary', transaction_type='income', is_taxable=True)
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
+
+def write_behind_the_apps_back(category_id):
+    """An insert from another process (e.g. run_loan_scheduler.py): no session hooks run"""
+    time.sleep(0.01)
+    with sqlite3.connect(db.engine.url.database) as conn:
+        conn.execute(
+            "INSERT INTO \"transaction\" (amount, date, category, category_id, transaction_type, is_taxable)"
+            " VALUES (?, ?, 'Salary', ?, 'income', 1)", (50000, '2024-01-20', category_id)
+        )
+    db.session.remove()  # As at the end of a request
+
+def test_own_commit_keeps_other_months(app):
+    add_income(100, date(2024, 1, 10))
+    cache = current_period_cache()
+    assert cache.summarize(date(2024, 1, 1), date(2024, 2, 29))['income'] == 100
+    changes = cache.external_changes
+    add_income(7, date(2024, 2, 10))
+    assert cache.stats()['cached_months'] == 1  # February evicted, January kept
+    assert cache.summarize(date(2024, 1, 1), date(2024, 2, 29))['income'] == 107
+    assert cache.external_changes == changes
+
+def test_cross_process_write_clears_summaries_and_tax_periods(app):
+    transaction = add_income(100, date(2024, 1, 10))
+    cache = current_period_cache()
+    taxes = current_tax_estimate_cache()
+    assert cache.get('custom', date(2024, 1, 1), date(2024, 1, 31))['income'] == 100
+    assert taxes.period_totals(2024, 1)['income'] == 10000
+    changes = cache.external_changes, taxes.external_changes  # The caches are shared with earlier tests
+
+    write_behind_the_apps_back(transaction.category_id)
+    assert cache.get('custom', date(2024, 1, 1), date(2024, 1, 31))['income'] == 600
+    assert taxes.period_totals(2024, 1)['income'] == 60000
+    assert (cache.external_changes, taxes.external_changes) == (changes[0] + 1, changes[1] + 1)
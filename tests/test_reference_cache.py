@@ -0,0 +1,25 @@
+"""Reference cache: writes made by another process are picked up"""
+
+import sqlite3
+import time
+
+from database import db
+from tests.test_loans import add_loan
+from utils.reference_cache import current_reference_cache, get_loans
+
+def test_cross_process_write_reloads(app):
+    loan_id = add_loan(name='Car')
+    with app.app_context():  # A new request: fresh flask.g
+        assert [loan.name for loan in get_loans()] == ['Car']
+    with app.app_context():  # A new request: fresh flask.g
+        assert [loan.name for loan in get_loans()] == ['Car']  # Cached
+    changes = current_reference_cache().external_changes  # The cache is shared with earlier tests
+
+    time.sleep(0.01)
+    # Another process (e.g. run_loan_scheduler.py) writes behind the app's back
+    with sqlite3.connect(db.engine.url.database) as conn:
+        conn.execute('UPDATE loan SET name = ? WHERE id = ?', ('Truck', loan_id))
+    db.session.remove()  # As at the end of a request; the next one starts with a new session
+    with app.app_context():  # A new request: fresh flask.g
+        assert [loan.name for loan in get_loans()] == ['Truck']
+    assert current_reference_cache().external_changes == changes + 1
@@ -0,0 +1,30 @@
+"""Sample data: a reset leaves nothing behind from the previous run"""
+
+from database import db
+from add_sample_data import populate
+from models.category import Category
+from models.loan import Loan
+from models.loan_payment import LoanPayment
+from models.processed_period import ProcessedPeriod
+from models.transaction import Transaction
+from utils.loan_scheduler import run_schedule
+
+def quiet(message):
+    pass
+
+def test_reset_clears_derived_tables(app):
+    populate(200, seed=1, progress=quiet)
+    run_schedule()
+    Loan.query.first().make_payment(50.0)
+    db.session.commit()
+    assert LoanPayment.query.count() and ProcessedPeriod.query.count()
+
+    populate(200, seed=2, reset=True, progress=quiet)
+    db.session.expire_all()
+    assert LoanPayment.query.count() == 0
+    assert ProcessedPeriod.query.count() == 0
+    # Every transaction points at a category row of this run
+    orphans = Transaction.query.outerjoin(Category, Category.id == Transaction.category_id).filter(
+        Category.id.is_(None)
+    ).count()
+    assert orphans == 0
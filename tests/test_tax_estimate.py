@@ -0,0 +1,118 @@
+"""Tax estimates: payment period boundaries, Schedule AI installments, the safe harbor and per-period eviction"""
+
+from datetime import date
+
+import pytest
+
+from database import db
+from models.transaction import Transaction
+from utils.tax_estimate import TaxEstimator, current_tax_estimate_cache, due_date, period_of, period_range
+
+class FlatTax(TaxEstimator):
+    """12.5% federal (20% in all) on every dollar, so the expected numbers can be worked out by hand"""
+
+    def taxes(self, annual_income):
+        if annual_income <= 0:
+            return 0.0, 0.0, 0.0
+        return annual_income * 0.2, annual_income * 0.125, annual_income
+
+def earn(amount, day):
+    db.session.add(Transaction(amount=amount, date=day, category='Salary', transaction_type='income', is_taxable=True))
+    db.session.commit()
+
+@pytest.fixture
+def estimator(app):
+    current_tax_estimate_cache().clear()
+    return FlatTax()
+
+@pytest.mark.parametrize('day, period', [
+    (date(2023, 1, 1), 1), (date(2023, 3, 31), 1), (date(2023, 4, 1), 2), (date(2023, 5, 31), 2),
+    (date(2023, 6, 1), 3), (date(2023, 8, 31), 3), (date(2023, 9, 1), 4), (date(2023, 12, 31), 4),
+])
+def test_period_boundaries(day, period):
+    assert period_of(day) == period
+    start, end = period_range(day.year, period)
+    assert start <= day <= end
+
+def test_due_dates():
+    assert [due_date(2023, period) for period in range(1, 5)] == [
+        date(2023, 4, 15), date(2023, 6, 15), date(2023, 9, 15), date(2024, 1, 15)
+    ]
+
+@pytest.mark.parametrize('today, complete, days', [
+    (date(2023, 3, 30), [False, False, False, False], 89),
+    (date(2023, 3, 31), [True, False, False, False], 90),
+    (date(2023, 4, 1), [True, False, False, False], 91),
+    (date(2023, 5, 31), [True, True, False, False], 151),
+    (date(2023, 6, 1), [True, True, False, False], 152),
+    (date(2023, 8, 31), [True, True, True, False], 243),
+    (date(2023, 12, 31), [True, True, True, True], 365),
+])
+def test_schedule_at_period_boundaries(estimator, today, complete, days):
+    earn(10000, date(2023, 1, 15))
+    result = estimator.estimate(2023, today=today)
+    assert [period['complete'] for period in result['schedule']] == complete
+    assert result['year_to_date']['days'] == days
+    projection = round(10000 * 365 / days, 2)
+    assert result['projection']['annual_taxable_income'] == projection
+    if complete[0]:
+        assert result['schedule'][0]['annualized_income'] == 40000  # Schedule AI: Q1 income x 4
+    open_periods = [period for period in result['schedule'] if not period['complete']]
+    assert all(period['annualized_income'] == projection for period in open_periods)
+
+def test_schedule_ai_installments(estimator):
+    earn(10000, date(2023, 1, 15))
+    earn(30000, date(2023, 7, 15))
+    earn(20000, date(2023, 10, 15))
+    result = estimator.estimate(2023, today=date(2023, 12, 31))
+    assert result['safe_harbor']['method'] == 'current_year'
+    assert result['safe_harbor']['required_annual_payment'] == 6750  # 90% of 12.5% of 60,000
+    schedule = result['schedule']
+    assert [period['annualized_income'] for period in schedule] == [40000, 24000, 60000, 60000]
+    # Lumpy income: the annualized installment is below the even quarter until the income arrives
+    assert [period['installment'] for period in schedule] == [1125, 225, 3712.5, 1687.5]
+    assert sum(period['installment'] for period in schedule) == 6750
+
+def test_prior_year_safe_harbor_when_lower(estimator):
+    earn(20000, date(2022, 6, 1))
+    earn(60000, date(2023, 1, 15))
+    safe_harbor = estimator.estimate(2023, today=date(2023, 12, 31))['safe_harbor']
+    assert safe_harbor['prior_year_tax'] == 2500
+    assert safe_harbor['prior_year_payment'] == 2500  # 100% below $150,000 AGI
+    assert safe_harbor['current_year_payment'] == 6750
+    assert (safe_harbor['method'], safe_harbor['required_annual_payment']) == ('prior_year', 2500)
+    installments = [period['installment'] for period in estimator.estimate(2023, today=date(2023, 12, 31))['schedule']]
+    assert installments == [625, 625, 625, 625]
+
+def test_current_year_safe_harbor_when_lower(estimator):
+    earn(100000, date(2022, 6, 1))
+    earn(40000, date(2023, 1, 15))
+    safe_harbor = estimator.estimate(2023, today=date(2023, 12, 31))['safe_harbor']
+    assert safe_harbor['prior_year_payment'] == 12500
+    assert (safe_harbor['method'], safe_harbor['required_annual_payment']) == ('current_year', 4500)
+
+@pytest.mark.parametrize('prior_income, prior_payment', [(150000, 18750), (200000, 27500)])
+def test_high_income_prior_year_safe_harbor(estimator, prior_income, prior_payment):
+    earn(prior_income, date(2022, 6, 1))
+    earn(400000, date(2023, 1, 15))
+    safe_harbor = estimator.estimate(2023, today=date(2023, 12, 31))['safe_harbor']
+    # 110% of last year's tax only once last year's AGI is above $150,000
+    assert safe_harbor['prior_year_payment'] == prior_payment
+    assert (safe_harbor['method'], safe_harbor['required_annual_payment']) == ('prior_year', prior_payment)
+
+def test_write_evicts_only_its_period(estimator):
+    earn(10000, date(2022, 2, 1))
+    earn(10000, date(2023, 2, 1))
+    cache = current_tax_estimate_cache()
+    first = estimator.estimate(2023, today=date(2023, 12, 31))
+    assert cache.stats()['cached_periods'] == 8  # This year and last year's four periods
+    invalidations = cache.invalidations
+
+    earn(5000, date(2023, 7, 4))
+    assert cache.stats()['cached_periods'] == 7
+    assert cache.invalidations == invalidations + 1
+    misses = cache.misses
+    second = estimator.estimate(2023, today=date(2023, 12, 31))
+    assert cache.misses == misses + 1  # Only period 3 is summed again
+    assert second['schedule'][2]['taxable_income'] == 5000
+    assert second['projection']['annual_taxable_income'] == first['projection']['annual_taxable_income'] + 5000
@@ -0,0 +1,506 @@
+"""
+Cold storage for closed years of transactions.
+
+archive_year() moves every transaction of a finished year out of SQLite into a
+partition directory of NumPy .npy column files (db/archive/transactions/<year>/),
+which are opened with mmap so only the pages a query touches are read. The
+module-level transaction_archive is the read side: aggregates over the cold
+partitions in the same shapes (cents) as the SQL and ledger-cache paths, so
+callers can union hot and cold results. Archived rows are read-only; restore_year()
+moves a partition back into SQLite. Both bump a version in the directory's
+manifest.json, so every process re-scans its partitions after either runs.
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime
+from database import db
+from models.transaction import Transaction
+from utils.money import cents, from_cents
+
+# Bumped in ARCHIVE_DIR by every partition write or removal, so other processes re-scan
+MANIFEST = 'manifest.json'
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1)
+
+# Numeric columns, one .npy file each; rows are sorted by (day, id)
+COLUMNS = {
+    'id': 'int64',
+    'day': 'int32',            # days since 1970-01-01
+    'amount': 'int64',         # cents
+    'is_income': 'bool',
+    'is_taxable': 'bool',
+    'account_id': 'int32',     # -1 when the transaction has no account
+    'category': 'int32',       # code into meta.json categories
+    'created_at': 'int64',     # seconds since 1970-01-01, -1 when unknown
+}
+
+def _np():
+    import numpy
+    return numpy
+
+class Partition:
+    """One archived year: memory-mapped columns plus its category dictionary"""
+
+    def __init__(self, path):
+        np = _np()
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.year = self.meta['year']
+        self.categories = self.meta['categories']
+        self.columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in COLUMNS}
+        self.size = len(self.columns['id'])
+
+    def slice(self, start=None, end=None):
+        np = _np()
+        day = self.columns['day']
+        lo = int(np.searchsorted(day, start.toordinal() - EPOCH_ORDINAL, side='left')) if start else 0
+        hi = int(np.searchsorted(day, end.toordinal() - EPOCH_ORDINAL, side='right')) if end else self.size
+        return lo, hi
+
+    def descriptions(self, lo, hi):
+        """Descriptions for rows lo..hi, sliced out of the UTF-8 blob by offset"""
+        np = _np()
+        offsets = np.load(os.path.join(self.path, 'description_offsets.npy'), mmap_mode='r')
+        blob = np.load(os.path.join(self.path, 'description.npy'), mmap_mode='r')
+        is_null = np.load(os.path.join(self.path, 'description_null.npy'), mmap_mode='r')
+        return [
+            None if is_null[i] else bytes(blob[int(offsets[i]):int(offsets[i + 1])]).decode('utf-8')
+            for i in range(lo, hi)
+        ]
+
+    def rows(self, start=None, end=None):
+        """Archived transactions in the range as dicts shaped like Transaction.to_dict()"""
+        return self.rows_between(*self.slice(start, end))
+
+    def rows_between(self, lo, hi):
+        """Rows lo..hi (positions in (day, id) order) as dicts shaped like Transaction.to_dict()"""
+        c = self.columns
+        descriptions = self.descriptions(lo, hi)
+        rows = []
+        for i in range(lo, hi):
+            created = int(c['created_at'][i])
+            rows.append({
+                'id': int(c['id'][i]),
+                'amount': from_cents(int(c['amount'][i])),
+                'date': date.fromordinal(int(c['day'][i]) + EPOCH_ORDINAL).isoformat(),
+                'category': self.categories[int(c['category'][i])],
+                'description': descriptions[i - lo],
+                'transaction_type': 'income' if c['is_income'][i] else 'expense',
+                'is_taxable': bool(c['is_taxable'][i]),
+                'account_id': None if c['account_id'][i] < 0 else int(c['account_id'][i]),
+                'created_at': None if created < 0 else datetime.utcfromtimestamp(created).isoformat(),
+                'archived': True
+            })
+        return rows
+
+class TransactionArchive:
+    """Read side of the cold partitions, shared by every request in the process"""
+
+    def __init__(self, directory=None):
+        self._lock = threading.Lock()
+        self.directory = directory
+        self._partitions = None  # year -> Partition, loaded on first use
+        self._stamp = None  # _directory_stamp() the partitions were loaded at
+        self._account_stamps = None
+
+    def configure(self, directory):
+        with self._lock:
+            self.directory = directory
+            self._partitions = None
+            self._account_stamps = None
+
+    def refresh(self):
+        """Forget loaded partitions (and their mmaps) after partitions are written or removed"""
+        with self._lock:
+            self._partitions = None
+            self._account_stamps = None
+
+    def _directory_stamp(self):
+        """(directory mtime, manifest version); changes when any process adds, replaces or removes a partition"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return None
+        return os.stat(self.directory).st_mtime_ns, read_manifest(self.directory)['version']
+
+    def partitions(self):
+        """
+        Archived years, oldest first (NumPy is only imported when a partition exists).
+        Re-scanned when the directory stamp changes, e.g. after archive_transactions.py ran.
+        """
+        with self._lock:
+            stamp = self._directory_stamp()
+            if stamp != self._stamp:
+                self._partitions = None
+                self._account_stamps = None
+            if self._partitions is None:
+                self._stamp = stamp
+                found = {}
+                if self.directory and os.path.isdir(self.directory):
+                    for name in sorted(os.listdir(self.directory)):
+                        path = os.path.join(self.directory, name)
+                        if name.isdigit() and os.path.exists(os.path.join(path, 'meta.json')):
+                            found[int(name)] = Partition(path)
+                self._partitions = found
+            return [self._partitions[year] for year in sorted(self._partitions)]
+
+    def years(self):
+        return [partition.year for partition in self.partitions()]
+
+    def _overlapping(self, start=None, end=None):
+        return [
+            partition for partition in self.partitions()
+            if (start is None or partition.year >= start.year) and (end is None or partition.year <= end.year)
+        ]
+
+    def range_summary(self, start, end):
+        """Same shape as utils.period_summary summaries (cents), over archived rows only"""
+        summary = {
+            'income': 0, 'taxable_income': 0, 'expenses': 0,
+            'transaction_count': 0, 'expense_count': 0, 'expenses_by_category': {}
+        }
+        for partition in self._overlapping(start, end):
+            np = _np()
+            lo, hi = partition.slice(start, end)
+            if hi <= lo:
+                continue
+            c = partition.columns
+            amount = c['amount'][lo:hi]
+            is_income = c['is_income'][lo:hi]
+            is_expense = ~is_income
+            summary['income'] += int(amount[is_income].sum())
+            summary['taxable_income'] += int(amount[is_income & c['is_taxable'][lo:hi]].sum())
+            summary['expenses'] += int(amount[is_expense].sum())
+            summary['transaction_count'] += hi - lo
+            summary['expense_count'] += int(is_expense.sum())
+            codes = c['category'][lo:hi][is_expense]
+            totals = np.bincount(codes, weights=amount[is_expense], minlength=len(partition.categories))
+            counts = np.bincount(codes, minlength=len(partition.categories))
+            by_category = summary['expenses_by_category']
+            for code in np.nonzero(counts)[0]:
+                name = partition.categories[code]
+                by_category[name] = by_category.get(name, 0) + int(round(totals[code]))
+        return summary
+
+    def category_totals(self, transaction_type='expense'):
+        """{category: (count, cents)} over archived rows for one transaction type"""
+        result = {}
+        for partition in self.partitions():
+            np = _np()
+            c = partition.columns
+            mask = c['is_income'][:] if transaction_type == 'income' else ~c['is_income'][:]
+            codes = c['category'][mask]
+            totals = np.bincount(codes, weights=c['amount'][mask], minlength=len(partition.categories))
+            counts = np.bincount(codes, minlength=len(partition.categories))
+            for code in np.nonzero(counts)[0]:
+                name = partition.categories[code]
+                count, total = result.get(name, (0, 0))
+                result[name] = (count + int(counts[code]), total + int(round(totals[code])))
+        return result
+
+    def daily_totals(self):
+        """{date: (income, taxable income, expenses)} in cents over archived rows"""
+        result = {}
+        for partition in self.partitions():
+            np = _np()
+            c = partition.columns
+            if partition.size == 0:
+                continue
+            days, index = np.unique(c['day'][:], return_inverse=True)
+            amount = c['amount'][:]
+            is_income = c['is_income'][:]
+            income = np.bincount(index, weights=np.where(is_income, amount, 0))
+            taxable = np.bincount(index, weights=np.where(is_income & c['is_taxable'][:], amount, 0))
+            expenses = np.bincount(index, weights=np.where(is_income, 0, amount))
+            for i, day in enumerate(days):
+                result[date.fromordinal(int(day) + EPOCH_ORDINAL)] = (
+                    int(round(income[i])), int(round(taxable[i])), int(round(expenses[i]))
+                )
+        return result
+
+    def monthly_totals(self):
+        """{YYYY-MM: (income cents, expense cents)} over archived rows"""
+        result = {}
+        for partition in self.partitions():
+            np = _np()
+            c = partition.columns
+            if partition.size == 0:
+                continue
+            months = c['day'][:].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+            first = months[0]
+            index = months - first
+            income = np.bincount(index, weights=np.where(c['is_income'], c['amount'], 0))
+            expenses = np.bincount(index, weights=np.where(c['is_income'], 0, c['amount']))
+            for offset in np.nonzero(np.bincount(index))[0]:
+                month = str(np.datetime64(int(first + offset), 'M'))
+                result[month] = (int(round(income[offset])), int(round(expenses[offset])))
+        return result
+
+    def totals(self):
+        """(income cents, expense cents) over archived rows"""
+        income = expenses = 0
+        for partition in self.partitions():
+            c = partition.columns
+            income += int(c['amount'][c['is_income'][:]].sum())
+            expenses += int(c['amount'][~c['is_income'][:]].sum())
+        return income, expenses
+
+    def account_stamps(self):
+        """{account_id: (count, last_transaction_id, net_cents)} over archived rows (computed once per refresh)"""
+        if self._account_stamps is not None:
+            return dict(self._account_stamps)
+        result = {}
+        for partition in self.partitions():
+            np = _np()
+            c = partition.columns
+            has_account = c['account_id'][:] >= 0
+            accounts = c['account_id'][has_account]
+            signed = np.where(c['is_income'][has_account], c['amount'][has_account], -c['amount'][has_account])
+            ids = c['id'][has_account]
+            for account_id in np.unique(accounts):
+                rows = accounts == account_id
+                count, last_id, net = result.get(int(account_id), (0, 0, 0))
+                result[int(account_id)] = (
+                    count + int(rows.sum()),
+                    max(last_id, int(ids[rows].max())),
+                    net + int(signed[rows].sum())
+                )
+        self._account_stamps = result
+        return dict(result)
+
+    def count(self, start=None, end=None):
+        """Archived rows dated in the range (all of them by default)"""
+        total = 0
+        for partition in self._overlapping(start, end):
+            lo, hi = partition.slice(start, end)
+            total += hi - lo
+        return total
+
+    def rows(self, start=None, end=None):
+        rows = []
+        for partition in self._overlapping(start, end):
+            rows.extend(partition.rows(start, end))
+        return rows
+
+    def newest_rows(self, start=None, end=None, limit=None):
+        """Archived rows in the range newest first (by date, then id), at most limit of them"""
+        rows = []
+        for partition in reversed(self._overlapping(start, end)):
+            lo, hi = partition.slice(start, end)
+            if limit is not None:
+                lo = max(lo, hi - (limit - len(rows)))
+            rows.extend(reversed(partition.rows_between(lo, hi)))
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    def stats(self):
+        partitions = self.partitions()
+        return {
+            'directory': self.directory,
+            'years': [partition.year for partition in partitions],
+            'rows': sum(partition.size for partition in partitions),
+            'bytes_on_disk': sum(
+                os.path.getsize(os.path.join(partition.path, name))
+                for partition in partitions for name in os.listdir(partition.path)
+            )
+        }
+
+def read_manifest(directory):
+    """The archive manifest ({'version': n}); version 0 before anything was archived"""
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': 0}
+
+def _bump_manifest(directory):
+    """Record a partition change (atomic replace, so readers never see a partial file)"""
+    manifest = read_manifest(directory)
+    manifest.update(version=manifest['version'] + 1, updated_at=datetime.utcnow().isoformat())
+    tmp_path = os.path.join(directory, f'{MANIFEST}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST))
+
+transaction_archive = TransactionArchive()
+
+def init_archive(app):
+    transaction_archive.configure(app.config.get('ARCHIVE_DIR'))
+    return transaction_archive
+
+# ---------------------------------------------------------------------------
+# Writing partitions
+# ---------------------------------------------------------------------------
+
+def _hot_rows(start, end):
+    day = db.cast(db.func.julianday(Transaction.date) - 2440587.5, db.Integer)
+    return db.session.query(
+        Transaction.id,
+        day,
+        cents(Transaction.amount),
+        Transaction.transaction_type,
+        Transaction.is_taxable,
+        Transaction.account_id,
+        Transaction.category,
+        Transaction.description,
+        Transaction.created_at
+    ).filter(Transaction.date >= start, Transaction.date <= end).order_by(Transaction.date, Transaction.id).all()
+
+def _partition_rows(partition):
+    """An existing partition back as row tuples (for merging late additions into a year)"""
+    c = partition.columns
+    descriptions = partition.descriptions(0, partition.size)
+    return [
+        (
+            int(c['id'][i]), int(c['day'][i]), int(c['amount'][i]),
+            'income' if c['is_income'][i] else 'expense', bool(c['is_taxable'][i]),
+            None if c['account_id'][i] < 0 else int(c['account_id'][i]),
+            partition.categories[int(c['category'][i])], descriptions[i],
+            None if c['created_at'][i] < 0 else datetime.utcfromtimestamp(int(c['created_at'][i]))
+        )
+        for i in range(partition.size)
+    ]
+
+def _write_partition(path, year, rows):
+    """Write rows (sorted by day, id) as a partition directory, atomically replacing any existing one"""
+    np = _np()
+    categories = []
+    codes = {}
+    def code(name):
+        if name not in codes:
+            codes[name] = len(categories)
+            categories.append(name)
+        return codes[name]
+
+    encoded = [(row[7] or '').encode('utf-8') for row in rows]
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    if rows:
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+    columns = {
+        'id': [row[0] for row in rows],
+        'day': [row[1] for row in rows],
+        'amount': [row[2] for row in rows],
+        'is_income': [row[3] == 'income' for row in rows],
+        'is_taxable': [bool(row[4]) for row in rows],
+        'account_id': [-1 if row[5] is None else row[5] for row in rows],
+        'category': [code(row[6]) for row in rows],
+        'created_at': [-1 if row[8] is None else int((row[8] - EPOCH).total_seconds()) for row in rows],
+    }
+
+    tmp_path = f'{path}.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(tmp_path, f'{name}.npy'), np.array(columns[name], dtype=dtype))
+    np.save(os.path.join(tmp_path, 'description.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(os.path.join(tmp_path, 'description_offsets.npy'), offsets)
+    np.save(os.path.join(tmp_path, 'description_null.npy'), np.array([row[7] is None for row in rows], dtype=bool))
+    meta = {
+        'year': year,
+        'rows': len(rows),
+        'categories': categories,
+        'income_cents': sum(row[2] for row in rows if row[3] == 'income'),
+        'expense_cents': sum(row[2] for row in rows if row[3] != 'income'),
+        'archived_at': datetime.utcnow().isoformat()
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    # Read it back before anything is deleted from SQLite
+    written = Partition(tmp_path)
+    if written.size != len(rows) or int(written.columns['amount'].sum()) != sum(row[2] for row in rows):
+        raise RuntimeError(f'Archive partition for {year} failed verification')
+    del written
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+    return meta
+
+def archive_year(year, batch_size=1000, progress=print):
+    """
+    Move every transaction dated in a closed year into its cold partition.
+    Re-running for a year merges rows added since (or left behind by an
+    interrupted run) into the existing partition.
+    Returns the number of rows moved out of SQLite.
+    """
+    if year >= date.today().year:
+        raise ValueError(f'{year} is not closed yet; only past years can be archived')
+    if not transaction_archive.directory:
+        raise ValueError('ARCHIVE_DIR is not configured')
+
+    # All-time totals live in the net worth snapshots; fold everything in before rows leave SQLite
+    from utils.net_worth import NetWorthSnapshotter
+    NetWorthSnapshotter().update()
+
+    hot = _hot_rows(date(year, 1, 1), date(year, 12, 31))
+    if not hot:
+        return 0
+
+    path = os.path.join(transaction_archive.directory, str(year))
+    existing = [p for p in transaction_archive.partitions() if p.year == year]
+    merged = {row[0]: row for row in (_partition_rows(existing[0]) if existing else [])}
+    merged.update({row[0]: tuple(row) for row in hot})  # SQLite copy wins if a row is in both
+    rows = sorted(merged.values(), key=lambda row: (row[1], row[0]))
+    existing = None
+
+    os.makedirs(transaction_archive.directory, exist_ok=True)
+    transaction_archive.refresh()  # Release mmaps of the partition being replaced
+    meta = _write_partition(path, year, rows)
+    _bump_manifest(transaction_archive.directory)
+    transaction_archive.refresh()
+    progress(f"Wrote {meta['rows']} rows to {path}")
+
+    from utils.period_summary import note_transaction_dates
+    ids = [row[0] for row in hot]
+    days = {date.fromordinal(row[1] + EPOCH_ORDINAL) for row in hot}
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        Transaction.query.filter(Transaction.id.in_(batch)).delete(synchronize_session=False)
+        # Bulk deletes skip the flush hook; cached period summaries for the year must go
+        note_transaction_dates(db.session, days)
+        db.session.commit()
+        progress(f"Removed {min(i + batch_size, len(ids))}/{len(ids)} archived rows from SQLite")
+    return len(ids)
+
+def restore_year(year, batch_size=1000, progress=print):
+    """Move an archived year back into SQLite and delete its partition. Returns rows restored."""
+    partitions = [p for p in transaction_archive.partitions() if p.year == year]
+    if not partitions:
+        return 0
+    rows = _partition_rows(partitions[0])
+    path = partitions[0].path
+    partitions = None
+    from utils.categories import intern_category
+    from utils.period_summary import note_transaction_dates
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        # (category_id, name) of each archived spelling; bulk inserts skip the flush hook that sets them
+        categories = {name: intern_category(db.session, name) for name in {row[6] for row in batch}}
+        db.session.execute(db.insert(Transaction), [
+            {
+                'id': row[0],
+                'date': date.fromordinal(row[1] + EPOCH_ORDINAL),
+                'amount': from_cents(row[2]),
+                'transaction_type': row[3],
+                'is_taxable': row[4],
+                'account_id': row[5],
+                'category_id': categories[row[6]][0],
+                'category': categories[row[6]][1],
+                'description': row[7],
+                'created_at': row[8]
+            }
+            for row in batch
+        ])
+        note_transaction_dates(db.session, {date.fromordinal(row[1] + EPOCH_ORDINAL) for row in batch})
+        db.session.commit()
+        progress(f"Restored {min(i + batch_size, len(rows))}/{len(rows)} rows")
+    transaction_archive.refresh()
+    shutil.rmtree(path)
+    _bump_manifest(transaction_archive.directory)
+    transaction_archive.refresh()
+    return len(rows)
@@ -0,0 +1,167 @@
+"""
+Category interning: the category table (models/category.py) and an in-memory
+id <-> name map over it.
+
+Every transaction write goes through intern_category(): the typed name is
+folded to its canonical form (case-folded, spaces collapsed), looked up in the
+map, and the category row is inserted only the first time that name is seen.
+The transaction gets the category's id and its display name, so "groceries"
+and "Groceries " land in the same category as "Groceries". Grouping then runs
+on the integer category_id (served by ix_transaction_category_id) and the map
+turns ids back into names without a join.
+
+Names interned inside a database transaction only reach the shared map when
+it commits; a rollback forgets them along with the category rows. The map is
+reloaded when the database file changes outside this process's commits
+(database.FileStampedCache), so ids are never taken from a replaced database.
+"""
+
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from database import FileStampedCache, db, session_file_stamp
+from models.category import Category
+from models.transaction import Transaction
+from utils.tenants import tenant_cache
+
+def display_name(name):
+    """A category as typed, with surrounding and repeated spaces removed"""
+    return ' '.join((name or '').split())
+
+def canonical_name(name):
+    """The key spellings of one category share"""
+    return display_name(name).casefold()
+
+class CategoryMap(FileStampedCache):
+    """Thread-safe id <-> name map of the category table, loaded on first use"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {}  # id -> name
+        self._ids = {}  # canonical name -> id
+        self._loaded = False
+        self.loads = 0
+
+    def _load(self, session):
+        rows = session.execute(db.select(Category.id, Category.name, Category.canonical_name)).all()
+        with self._lock:
+            self._names = {category_id: name for category_id, name, _ in rows}
+            self._ids = {canonical: category_id for category_id, _, canonical in rows}
+            self._loaded = True
+            self.loads += 1
+
+    def _ensure_loaded(self, session):
+        self._check_stamp(session_file_stamp(session))
+        if not self._loaded:
+            self._load(session)
+
+    def find(self, canonical, session=None):
+        """(id, name) of a committed category, or None"""
+        self._ensure_loaded(session or db.session)
+        with self._lock:
+            category_id = self._ids.get(canonical)
+            return (category_id, self._names[category_id]) if category_id is not None else None
+
+    def names(self, category_ids=(), session=None):
+        """{id: name}, reloaded once if any of category_ids is unknown (added by another process)"""
+        session = session or db.session
+        self._ensure_loaded(session)
+        if any(category_id not in self._names for category_id in category_ids if category_id is not None):
+            self._load(session)
+        with self._lock:
+            return dict(self._names)
+
+    def add(self, categories):
+        """Record committed categories: {canonical: (id, name)}"""
+        with self._lock:
+            for canonical, (category_id, name) in categories.items():
+                self._ids[canonical] = category_id
+                self._names[category_id] = name
+
+    def clear(self):
+        with self._lock:
+            self._names, self._ids, self._loaded = {}, {}, False
+
+    def stats(self):
+        with self._lock:
+            return {'categories': len(self._names), 'loads': self.loads, 'external_changes': self.external_changes}
+
+# Shared by every request and thread in this process
+category_map = CategoryMap()
+
+def current_category_map():
+    """The map for the active database: category_map, or the user's own with MULTI_TENANT (utils/tenants.py)"""
+    return tenant_cache('categories', CategoryMap, category_map)
+
+def category_names(category_ids=(), session=None):
+    """{category id: name}; pass the ids about to be looked up so a stale map is reloaded"""
+    return current_category_map().names(category_ids, session)
+
+def by_category_name(rows, session=None):
+    """Rows of (category_id, *values) from an integer GROUP BY as {category name: values}"""
+    rows = list(rows)
+    names = category_names([row[0] for row in rows], session)
+    return {names.get(row[0], 'Other'): tuple(row[1:]) for row in rows}
+
+def intern_category(session, name):
+    """(category id, display name) for name, inserting its category row the first time it is seen"""
+    canonical = canonical_name(name) or 'other'
+    found = current_category_map().find(canonical, session)
+    if found is not None:
+        return found
+    pending = session.info.setdefault('new_categories', {})
+    if canonical in pending:
+        return pending[canonical]
+
+    with session.no_autoflush:
+        # Another writer may have added it since the map was loaded; its name wins
+        session.execute(
+            sqlite_insert(Category)
+            .values(name=display_name(name) or 'Other', canonical_name=canonical)
+            .on_conflict_do_nothing(index_elements=['canonical_name'])
+        )
+        found = session.execute(
+            db.select(Category.id, Category.name).where(Category.canonical_name == canonical)
+        ).one()
+    pending[canonical] = tuple(found)
+    return pending[canonical]
+
+def link_categories(session):
+    """
+    Intern the categories of rows written with raw SQL (category_id still NULL),
+    point them at their category and rename them to its spelling. Returns the
+    number of rows linked; the caller commits.
+    """
+    spellings = [row[0] for row in session.execute(
+        db.select(Transaction.category).where(Transaction.category_id.is_(None)).distinct()
+    )]
+    linked = 0
+    for spelling in spellings:
+        category_id, name = intern_category(session, spelling)
+        linked += session.execute(
+            db.update(Transaction)
+            .where(Transaction.category_id.is_(None), Transaction.category == spelling)
+            .values(category_id=category_id, category=name)
+        ).rowcount
+    return linked
+
+@event.listens_for(Session, 'before_flush')
+def _intern_transaction_categories(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Transaction) or obj.category is None:
+            continue
+        if obj in session.new or inspect(obj).attrs.category.history.has_changes():
+            obj.category_id, obj.category = intern_category(session, obj.category)
+
+@event.listens_for(Session, 'after_commit')
+def _remember_new_categories(session):
+    pending = session.info.pop('new_categories', None)
+    categories = current_category_map()
+    categories.committed(session)
+    if pending:
+        categories.add(pending)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_new_categories(session):
+    session.info.pop('new_categories', None)
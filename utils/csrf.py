@@ -0,0 +1,51 @@
+"""
+Cross-site request forgery protection for hosted (MULTI_TENANT) installs.
+
+Each session gets a random token. Every POST, PUT, PATCH or DELETE must echo it,
+either as the csrf_token form field (csrf_field() in templates) or as the
+X-CSRFToken header, which static/js/main.js adds to every same-origin fetch
+(data-partial forms included) from the csrf-token meta tag in base.html.
+Requests with a JSON body are let through: a browser cannot send one to another
+site without a CORS preflight, which this app never grants.
+
+CSRF_PROTECTION defaults to MULTI_TENANT; with it off csrf_token() and
+csrf_field() render nothing.
+"""
+
+import hmac
+import secrets
+from flask import abort, current_app, request, session
+from markupsafe import Markup, escape
+
+SESSION_KEY = 'csrf_token'
+FIELD = 'csrf_token'
+HEADER = 'X-CSRFToken'
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+def csrf_token():
+    """This session's token (created on first use), or '' with protection off"""
+    if not current_app.config.get('CSRF_PROTECTION'):
+        return ''
+    if SESSION_KEY not in session:
+        session[SESSION_KEY] = secrets.token_urlsafe(32)
+    return session[SESSION_KEY]
+
+def csrf_field():
+    """Hidden form input carrying the token"""
+    token = csrf_token()
+    return Markup(f'<input type="hidden" name="{FIELD}" value="{escape(token)}">') if token else ''
+
+def _check_csrf():
+    """before_request: reject unsafe requests without this session's token"""
+    if request.method not in UNSAFE_METHODS or request.is_json:
+        return None
+    expected = session.get(SESSION_KEY)
+    sent = request.headers.get(HEADER) or request.form.get(FIELD)
+    if not expected or not sent or not hmac.compare_digest(expected, sent):
+        abort(400, description='Missing or invalid CSRF token; reload the page and try again')
+    return None
+
+def init_csrf(app):
+    app.jinja_env.globals.update(csrf_token=csrf_token, csrf_field=csrf_field)
+    if app.config.get('CSRF_PROTECTION'):
+        app.before_request(_check_csrf)
@@ -0,0 +1,285 @@
+"""
+In-process publish/subscribe bus behind the /api/events Server-Sent Events stream.
+
+Session listeners collect a compact delta of what each transaction wrote and
+publish it once the commit succeeds (a rollback drops it):
+
+  - transactions: {'added': [...], 'removed': [...]}, each row
+    {id, date, amount, type, category, taxable, description, account_id};
+    an edited transaction is its old row removed plus its new row added
+    (rows inserted in bulk have no id)
+  - debt: {'changes': [{loan_id, delta}], 'payments': [...]}, the change in
+    each loan's balance plus any new loan_payment rows
+  - resync: something changed that a delta cannot describe (a bulk UPDATE or
+    DELETE, or a client that fell behind); clients reload
+
+Every event gets an id '<epoch>-<seq>'. The last EVENT_HISTORY events are
+kept, so a client reconnecting with Last-Event-ID is sent what it missed; an
+id from before a restart (other epoch) or older than the history gets a
+resync instead. Each client has its own queue of at most EVENT_QUEUE_SIZE
+events; a client that lets it fill up is dropped with a resync rather than
+holding memory or slowing down the writer.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from database import db
+from models.loan import Loan
+from models.loan_payment import LoanPayment
+from models.transaction import Transaction
+from utils.money import cents, from_cents, to_cents
+from utils.tenants import tenant_cache
+
+DEFAULT_HISTORY = 500
+DEFAULT_QUEUE_SIZE = 100
+
+class Subscription:
+    """One connected client: a bounded queue of (id, event, data) tuples"""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def get(self, timeout):
+        """Next event, or None after timeout seconds without one"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBus:
+    """Thread-safe fan-out of committed changes to every subscribed client"""
+
+    def __init__(self, history=DEFAULT_HISTORY, queue_size=DEFAULT_QUEUE_SIZE):
+        self._lock = threading.Lock()
+        self._epoch = format(int(time.time() * 1000), 'x')
+        self._seq = 0
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self.history_size = history
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+
+    def configure(self, history, queue_size):
+        with self._lock:
+            self._history = deque(self._history, maxlen=history)
+            self.history_size = history
+            self.queue_size = queue_size
+
+    def publish(self, name, data):
+        """Send one event to every subscriber; returns its id"""
+        with self._lock:
+            self._seq += 1
+            item = (f'{self._epoch}-{self._seq}', name, data)
+            self._history.append(item)
+            self.published += 1
+            for subscription in list(self._subscribers):
+                self._offer(subscription, item)
+        return item[0]
+
+    def _offer(self, subscription, item):
+        """Queue item for one subscriber, dropping it with a resync if its queue is full (lock held)"""
+        if subscription.closed:
+            return
+        try:
+            subscription.queue.put_nowait(item)
+        except queue.Full:
+            self._subscribers.discard(subscription)
+            subscription.closed = True
+            self.dropped += 1
+            # Make room so the client learns why it stopped getting deltas
+            try:
+                subscription.queue.get_nowait()
+            except queue.Empty:
+                pass
+            subscription.queue.put_nowait((item[0], 'resync', {'reason': 'overflow'}))
+
+    def subscribe(self, last_event_id=None):
+        """
+        New subscription. With last_event_id, the events after it are queued
+        first, or a resync when they are no longer all in the history.
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if last_event_id:
+                missed = self._missed_since(last_event_id)
+                if missed is None or len(missed) > self.queue_size:
+                    subscription.queue.put_nowait((f'{self._epoch}-{self._seq}', 'resync', {'reason': 'gap'}))
+                else:
+                    for item in missed:
+                        subscription.queue.put_nowait(item)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _missed_since(self, last_event_id):
+        """History items after last_event_id, or None when some are gone (lock held)"""
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq >= self._seq:
+            return []
+        oldest = self._seq - len(self._history) + 1
+        if seq + 1 < oldest:
+            return None
+        return list(self._history)[seq + 1 - oldest:]
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped': self.dropped,
+                'last_event_id': f'{self._epoch}-{self._seq}',
+                'history': len(self._history)
+            }
+
+# Shared by every request and thread in this process
+event_bus = EventBus()
+
+def init_events(app):
+    event_bus.configure(app.config['EVENT_HISTORY'], app.config['EVENT_QUEUE_SIZE'])
+
+def current_event_bus():
+    """The bus for the active database: event_bus, or the user's own with MULTI_TENANT (utils/tenants.py)"""
+    return tenant_cache('events', lambda: EventBus(event_bus.history_size, event_bus.queue_size), event_bus)
+
+def format_event(item):
+    """One event in text/event-stream framing"""
+    event_id, name, data = item
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+# Collecting deltas
+
+def _transaction_row(values):
+    """Compact delta row from a Transaction or a bulk insert parameter dict"""
+    get = values.get if isinstance(values, dict) else lambda key, default=None: getattr(values, key, default)
+    day = get('date')
+    return {
+        'id': get('id'),
+        'date': day.isoformat() if day else None,
+        'amount': from_cents(to_cents(get('amount') or 0)),
+        'type': get('transaction_type'),
+        'category': get('category'),
+        'taxable': bool(get('is_taxable', True)),
+        'description': get('description'),
+        'account_id': get('account_id')
+    }
+
+TRANSACTION_COLUMNS = ('id', 'date', 'amount', 'transaction_type', 'category', 'is_taxable', 'description', 'account_id')
+
+def _pending(session):
+    return session.info.setdefault('event_deltas', {
+        'added': [], 'removed': [], 'debt': [], 'payments': [], 'old_balances': {},
+        'loan_updates': False, 'resync': None
+    })
+
+def _changed_ids(session, model):
+    """Ids of model rows this flush will update or delete"""
+    ids = []
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, model) and (obj in session.deleted or session.is_modified(obj)):
+            identity = inspect(obj).identity
+            if identity:
+                ids.append(identity[0])
+    return ids
+
+@event.listens_for(Session, 'before_flush')
+def _collect_old_rows(session, flush_context, instances):
+    """
+    Read the stored rows about to change. An attribute set after a commit has
+    no old value in its history (the commit expired it unread), so the
+    database is the only place that still has it.
+    """
+    transaction_ids = _changed_ids(session, Transaction)
+    loan_ids = _changed_ids(session, Loan)
+    if not transaction_ids and not loan_ids:
+        return
+    deltas = _pending(session)
+    with session.no_autoflush:
+        if transaction_ids:
+            columns = [getattr(Transaction, key) for key in TRANSACTION_COLUMNS]
+            rows = session.execute(db.select(*columns).where(Transaction.id.in_(transaction_ids)))
+            deltas['removed'].extend(_transaction_row(dict(zip(TRANSACTION_COLUMNS, row))) for row in rows)
+        if loan_ids:
+            rows = session.execute(db.select(Loan.id, cents(Loan.balance)).where(Loan.id.in_(loan_ids)))
+            deltas['old_balances'].update({loan_id: balance for loan_id, balance in rows})
+
+@event.listens_for(Session, 'after_flush')
+def _collect_event_deltas(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _pending(session)['added'].append(_transaction_row(obj))
+        elif isinstance(obj, Loan):
+            _pending(session)['debt'].append({'loan_id': obj.id, 'delta': from_cents(to_cents(obj.balance or 0))})
+        elif isinstance(obj, LoanPayment):
+            _pending(session)['payments'].append(obj.to_dict())
+    old_balances = session.info.get('event_deltas', {}).get('old_balances', {})
+    for obj in session.deleted:
+        if isinstance(obj, Loan):
+            balance = old_balances.pop(inspect(obj).identity[0], 0)
+            _pending(session)['debt'].append({'loan_id': obj.id, 'delta': -from_cents(balance or 0)})
+    for obj in session.dirty:
+        if not isinstance(obj, (Transaction, Loan)) or not session.is_modified(obj):
+            continue
+        if isinstance(obj, Transaction):
+            _pending(session)['added'].append(_transaction_row(obj))
+        else:
+            change = to_cents(obj.balance or 0) - (old_balances.pop(obj.id, None) or 0)
+            if change:
+                _pending(session)['debt'].append({'loan_id': obj.id, 'delta': from_cents(change)})
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_event_deltas(orm_execute_state):
+    """Bulk statements skip the flush hooks; inserts still carry their rows"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    model = mapper.class_ if mapper is not None else None
+    if model not in (Transaction, Loan, LoanPayment):
+        return
+    deltas = _pending(orm_execute_state.session)
+    rows = orm_execute_state.parameters
+    if orm_execute_state.is_insert and isinstance(rows, list):
+        if model is Transaction:
+            deltas['added'].extend(_transaction_row(row) for row in rows)
+        elif model is LoanPayment:
+            for row in rows:
+                deltas['payments'].append(dict(row, date=row['date'].isoformat()))
+                deltas['debt'].append({'loan_id': row['loan_id'], 'delta': -row['principal']})
+        else:
+            deltas['resync'] = 'bulk insert'
+    elif model is Loan and orm_execute_state.is_update:
+        # utils/loan_payments.py moves balances with UPDATE; its loan_payment rows carry the changes
+        deltas['loan_updates'] = True
+    else:
+        deltas['resync'] = 'bulk update'
+
+@event.listens_for(Session, 'after_commit')
+def _publish_event_deltas(session):
+    deltas = session.info.pop('event_deltas', None)
+    if not deltas:
+        return
+    deltas.pop('old_balances')
+    bus = current_event_bus()
+    if deltas['resync'] or (deltas['loan_updates'] and not deltas['payments']):
+        bus.publish('resync', {'reason': deltas['resync'] or 'loans'})
+        return
+    if deltas['added'] or deltas['removed']:
+        bus.publish('transactions', {'added': deltas['added'], 'removed': deltas['removed']})
+    if deltas['debt'] or deltas['payments']:
+        bus.publish('debt', {'changes': deltas['debt'], 'payments': deltas['payments']})
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_event_deltas(session):
+    session.info.pop('event_deltas', None)
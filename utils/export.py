@@ -0,0 +1,195 @@
+"""
+Streaming exports (routes/export.py).
+
+An export is a list of column names plus an iterator of row batches, normally
+the partitions of a yield_per query, so only one batch is ever in memory. Each
+format turns that into a generator of output chunks, one or more per batch:
+
+    csv      header line, then RFC 4180 rows
+    ndjson   one JSON object per line
+    xlsx     a single-sheet workbook; the zip is written to an in-memory sink
+             that is drained after every batch (entries use data descriptors,
+             so nothing has to be seeked back to), cells are inline strings
+
+Dates and datetimes are ISO strings in CSV and NDJSON and real date cells in XLSX.
+Text that a spreadsheet would read as a formula (starting with =, +, -, @, a tab
+or a carriage return) gets a leading apostrophe in CSV and the quote-prefix
+(always text) style in XLSX, so a description like =HYPERLINK(...) is shown,
+not run. NDJSON is left verbatim.
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+# First characters that make a spreadsheet treat a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _looks_like_formula(value):
+    return isinstance(value, str) and value.startswith(FORMULA_PREFIXES)
+
+def _inert(value):
+    """Text a spreadsheet would evaluate, prefixed with an apostrophe; other values unchanged"""
+    return "'" + value if _looks_like_formula(value) else value
+
+def write_csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([[_inert(_text(value)) for value in row] for row in batch])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def write_ndjson(columns, batches):
+    for batch in batches:
+        yield ''.join(
+            json.dumps({column: _text(value) for column, value in zip(columns, row)}) + '\n'
+            for row in batch
+        )
+
+def _text(value):
+    """Dates as ISO strings; everything else as is"""
+    return value.isoformat() if isinstance(value, date) else value
+
+class _Sink:
+    """Write-only, unseekable file for zipfile; take() hands over what was written so far"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Cell formats: 0 general, 1 date, 2 date and time, 3 text shown as typed (never a formula)
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="49" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1" quotePrefix="1"/>'
+        '</cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def _cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value!r}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c s="2"><v>{serial!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - EXCEL_EPOCH.date()).days}</v></c>'
+    text = str(value)
+    style = ' s="3"' if _looks_like_formula(text) else ''
+    text = escape(_INVALID_XML.sub('', text))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _row(values):
+    return '<row>' + ''.join(_cell(value) for value in values) + '</row>'
+
+def write_xlsx(columns, batches, sheet='Export'):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content.replace('{sheet}', escape(sheet[:31])))
+        # force_zip64: the sheet's size is not known up front and may pass 4 GB
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as worksheet:
+            worksheet.write((SHEET_START + _row(columns)).encode())
+            for batch in batches:
+                worksheet.write(''.join(_row(row) for row in batch).encode())
+                yield sink.take()
+            worksheet.write(SHEET_END.encode())
+    yield sink.take()
+
+# format -> (writer, mimetype, file extension); 'json' is accepted as an alias of 'ndjson'
+FORMATS = {
+    'csv': (write_csv, 'text/csv', 'csv'),
+    'ndjson': (write_ndjson, 'application/x-ndjson', 'ndjson'),
+    'xlsx': (write_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+FORMATS['json'] = FORMATS['ndjson']
+
+def query_batches(statement, session, batch_size):
+    """Row batches of a select, fetched batch_size rows at a time"""
+    result = session.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
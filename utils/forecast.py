@@ -0,0 +1,215 @@
+"""
+Cash-flow forecast: day-by-day projected balance of every active account.
+
+Scheduled flows are laid out as a (days x accounts) matrix of integer cent
+deltas and turned into balances with one cumulative sum:
+
+    - recurring series (utils/recurring.py) on their projected dates, as last
+      stored by the loan scheduler pass (nothing is written here)
+    - loan payments from Loan.calculate_monthly_payment() on each due day,
+      until the projected payoff
+    - variable spending: the active budget's spending allocations (or, with no
+      budget, recent spending) not already covered by recurring series, spread
+      evenly over the days
+    - variable income: recent income not explained by recurring series
+
+Flows without an account land on the default account (the largest checking
+account). Needs NumPy.
+"""
+
+import calendar
+import time
+from datetime import date, timedelta
+from database import db
+from models.account import Account
+from models.budget import Budget
+from models.loan import Loan
+from models.transaction import Transaction
+from utils.money import cents, from_cents, to_cents
+from models.recurring_series import RecurringScan
+from utils.recurring import RecurringDetector, add_months
+
+MAX_MONTHS = 24
+ASSET_TYPES = ('checking', 'savings', 'cash')
+LOAN_PAYMENT_CATEGORY = 'Loan Payment'  # Written by routes/loans.py; loans are projected from the Loan rows instead
+HISTORY_DAYS = 90  # Window for variable income and (without a budget) variable spending
+DAYS_PER_MONTH = 365 / 12
+# Budget allocations that move money to savings rather than spend it
+NON_SPENDING_ALLOCATIONS = ('savings', 'emergency_fund', 'retirement')
+
+def _np():
+    import numpy
+    return numpy
+
+def _on_day(year, month_index, day):
+    """date in month (month_index months after January of year) on day, clamped to the month's end"""
+    year, month = year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+def occurrence_dates(series, start, end):
+    """Projected dates of a recurring series between start and end (inclusive)"""
+    first = max(series.next_date, start)  # An overdue occurrence is expected right away
+    dates = []
+    step = 0
+    day = first
+    while day <= end:
+        dates.append(day)
+        step += 1
+        if series.cadence == 'monthly':
+            day = max(add_months(series.next_date, step), first + timedelta(days=1))
+        elif series.cadence == 'annual':
+            day = max(add_months(series.next_date, 12 * step), first + timedelta(days=1))
+        else:
+            day = first + timedelta(days=round(series.interval_days) * step)
+    return dates
+
+def loan_payment_schedule(loan, start, end):
+    """
+    (date, cents) payments on the loan's due day of month from start to end,
+    with interest accrued monthly and the last payment capped at the payoff amount.
+    """
+    payment = to_cents(loan.calculate_monthly_payment())
+    balance = to_cents(loan.balance)
+    if payment <= 0 or balance <= 0:
+        return []
+    monthly_rate = loan.interest_rate / 100 / 12
+
+    month_index = start.month - 1
+    paid_this_month = (
+        loan.last_payment_date is not None
+        and (loan.last_payment_date.year, loan.last_payment_date.month) == (start.year, start.month)
+        and loan.is_current_month_satisfied()
+    )
+    if _on_day(start.year, month_index, loan.due_date.day) < start or paid_this_month:
+        month_index += 1
+
+    schedule = []
+    due = _on_day(start.year, month_index, loan.due_date.day)
+    while due <= end and balance > 0:
+        balance += round(balance * monthly_rate)
+        amount = min(payment, balance)
+        schedule.append((due, amount))
+        balance -= amount
+        month_index += 1
+        due = _on_day(start.year, month_index, loan.due_date.day)
+    return schedule
+
+def _monthly_history(transaction_type, today):
+    """Average monthly amount (cents) over the last HISTORY_DAYS, loan payments excluded"""
+    total = db.session.query(db.func.sum(cents(Transaction.amount))).filter(
+        Transaction.transaction_type == transaction_type,
+        Transaction.category != LOAN_PAYMENT_CATEGORY,
+        Transaction.date > today - timedelta(days=HISTORY_DAYS),
+        Transaction.date <= today
+    ).scalar() or 0
+    return total * DAYS_PER_MONTH / HISTORY_DAYS
+
+def _budget_spending(budget):
+    """Monthly spending allocations of a budget, in cents"""
+    saved = sum(to_cents(getattr(budget, column) or 0) for column in NON_SPENDING_ALLOCATIONS)
+    return to_cents(budget.get_total_allocated()) - saved
+
+def build_forecast(months=12, threshold=0.0, today=None):
+    """
+    Project every active account forward months months (at most MAX_MONTHS).
+    Returns dict with the dates, per-account and total balance series (cents
+    arrays), the low-balance alerts and the assumptions used.
+    """
+    np = _np()
+    started = time.perf_counter()
+    today = today or date.today()
+    months = max(1, min(int(months), MAX_MONTHS))
+    end = add_months(today, months)
+    days = (end - today).days + 1
+
+    accounts = Account.query.filter_by(is_active=True).order_by(Account.id).all()
+    if not accounts:
+        accounts = [Account(id=None, name='Unassigned', account_type='checking', current_balance=0.0)]
+    checking = [account for account in accounts if account.account_type == 'checking'] or accounts
+    default_account = max(checking, key=lambda account: account.current_balance)
+    column = {account.id: index for index, account in enumerate(accounts)}
+    default_column = column[default_account.id]
+
+    # Dated flows are collected as (day offset, account column, cents) and added in one pass
+    offsets, columns, amounts = [], [], []
+
+    def add_flow(day, account_id, amount):
+        offsets.append((day - today).days)
+        columns.append(column.get(account_id, default_column))
+        amounts.append(amount)
+
+    # Stored series only; detection runs off the request path (utils/loan_scheduler.py)
+    scan = RecurringScan.query.first()
+    series = [s for s in RecurringDetector().series(active_only=True, today=today) if s.category != LOAN_PAYMENT_CATEGORY]
+    recurring = {'income': 0.0, 'expense': 0.0}
+    for s in series:
+        sign = 1 if s.transaction_type == 'income' else -1
+        amount = sign * to_cents(s.amount)
+        for day in occurrence_dates(s, today, end):
+            add_flow(day, s.account_id, amount)
+        recurring[s.transaction_type] += to_cents(s.monthly_amount())
+
+    loans = Loan.query.filter(Loan.balance > 0).all()
+    loan_monthly = 0
+    for loan in loans:
+        for day, amount in loan_payment_schedule(loan, today, end):
+            add_flow(day, None, -amount)
+        loan_monthly += to_cents(loan.calculate_monthly_payment())
+
+    budget = Budget.query.filter_by(is_active=True).first()
+    spending = _budget_spending(budget) if budget else _monthly_history('expense', today)
+    variable_spending = max(0.0, spending - recurring['expense'])
+    variable_income = max(0.0, _monthly_history('income', today) - recurring['income'])
+
+    deltas = np.zeros((days, len(accounts)), dtype=np.int64)
+    if offsets:
+        np.add.at(deltas, (np.array(offsets), np.array(columns)), np.array(amounts, dtype=np.int64))
+    # Variable flows accrue daily from tomorrow; whole cents, the remainder carried so totals stay exact
+    daily_net = (variable_income - variable_spending) / DAYS_PER_MONTH
+    accrued = np.floor(np.arange(1, days) * daily_net + 0.5).astype(np.int64)
+    deltas[1:, default_column] += np.diff(accrued, prepend=0)
+
+    starting = np.array([to_cents(account.current_balance) for account in accounts], dtype=np.int64)
+    balances = starting + np.cumsum(deltas, axis=0)
+    total = balances.sum(axis=1)
+
+    # Low-balance alerts: first day each asset account drops below the threshold
+    alerts = []
+    threshold_cents = to_cents(threshold)
+    lowest_day = balances.argmin(axis=0)
+    below = balances < threshold_cents
+    first_below = below.argmax(axis=0)
+    for index, account in enumerate(accounts):
+        if account.account_type not in ASSET_TYPES or not below[:, index].any():
+            continue
+        alerts.append({
+            'account_id': account.id,
+            'account_name': account.name,
+            'date': (today + timedelta(days=int(first_below[index]))).isoformat(),
+            'balance': from_cents(int(balances[first_below[index], index])),
+            'lowest_balance': from_cents(int(balances[lowest_day[index], index])),
+            'lowest_date': (today + timedelta(days=int(lowest_day[index]))).isoformat()
+        })
+    alerts.sort(key=lambda alert: alert['date'])
+
+    return {
+        'start_date': today,
+        'end_date': end,
+        'accounts': accounts,
+        'balances': balances,
+        'total': total,
+        'lowest_day': lowest_day,
+        'alerts': alerts,
+        'assumptions': {
+            'recurring_series': len(series),
+            'recurring_scanned_at': scan.scanned_at.isoformat() if scan and scan.scanned_at else None,
+            'monthly_recurring_income': from_cents(round(recurring['income'])),
+            'monthly_recurring_expenses': from_cents(round(recurring['expense'])),
+            'monthly_loan_payments': from_cents(loan_monthly),
+            'monthly_variable_income': from_cents(round(variable_income)),
+            'monthly_variable_spending': from_cents(round(variable_spending)),
+            'budget': budget.name if budget else None,
+            'default_account_id': default_account.id
+        },
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
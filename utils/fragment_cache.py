@@ -0,0 +1,169 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+class MemoryBackend:
+    """In-process LRU store for rendered fragments"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class FileSystemBackend:
+    """Stores rendered fragments as files so they survive restarts and are shared between workers"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.html')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        # Write to a temp file first so readers never see a half-written fragment
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.html'):
+                os.remove(os.path.join(self.directory, name))
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.html'))
+
+class FragmentCache:
+    """Front for a fragment backend: an in-process LRU layered over an optional second-level backend"""
+
+    def __init__(self, max_entries=512, backend=None):
+        self.memory = MemoryBackend(max_entries)
+        self.backend = backend  # e.g. FileSystemBackend; None keeps everything in memory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(name, deps):
+        """Key from the fragment name and its dependencies (ids, updated_at and other version stamps)"""
+        return hashlib.sha1(repr((name, tuple(deps))).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'memory_entries': len(self.memory),
+                'backend': type(self.backend).__name__ if self.backend is not None else None
+            }
+
+class FragmentCacheExtension(Extension):
+    """
+    Adds {% cache name, dep1, dep2, ... %}...{% endcache %} to Jinja.
+    The block is rendered once per distinct (name, deps) and served from
+    environment.fragment_cache afterwards, so deps must include everything
+    the block renders from (row id plus updated_at or other version stamp).
+    """
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        deps = []
+        while parser.stream.skip_if('comma'):
+            deps.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_cache_support', [name, nodes.List(deps)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, name, deps, caller):
+        from utils.tenants import current_tenant_id
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+
+        tenant_id = current_tenant_id()
+        if tenant_id is not None:
+            name = (tenant_id, name)  # Users' databases reuse the same row ids
+        key = cache.make_key(name, deps)
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = caller()
+            cache.set(key, str(rendered))
+        return Markup(rendered)
+
+def init_fragment_cache(app):
+    """Install the {% cache %} tag on the app's Jinja environment using app.config settings"""
+    backend = None
+    if app.config.get('FRAGMENT_CACHE_BACKEND') == 'filesystem':
+        directory = app.config.get('FRAGMENT_CACHE_DIR') or os.path.join(app.instance_path, 'fragment_cache')
+        backend = FileSystemBackend(directory)
+
+    cache = FragmentCache(app.config.get('FRAGMENT_CACHE_SIZE', 512), backend)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = cache
+    return cache
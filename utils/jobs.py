@@ -0,0 +1,277 @@
+"""
+Background jobs.
+
+Heavy work (payoff simulations, tax scenario grids, full rebuilds) runs outside
+the request: the route creates a Job row, hands the work to a concurrent.futures
+pool and answers 202 with the job's URL, and the client polls /api/jobs/<id>.
+
+Job types are registered where the work lives:
+
+    @job_type('net_worth_rebuild')                      # thread pool
+    def rebuild(context, **params): ...
+
+    @job_type('loan_payoff_simulation', executor='process')
+    def simulate(**params): ...
+
+Thread jobs run inside an app context, may use the database, and get a
+JobContext for progress reports and cancellation checks. Process jobs are for
+CPU-bound work: they take and return plain JSON-able data and must not touch
+the database. Status lives in the job table; live progress is kept in memory and
+merged in by status(). With MULTI_TENANT each user has their own job table, so
+jobs are tracked by (tenant id, job id) and run against the submitter's database.
+"""
+
+import json
+import os
+import threading
+import traceback
+from collections import namedtuple
+from datetime import datetime
+from functools import partial
+from database import db
+from models.job import Job
+from utils.tenants import current_tenant_id, tenant_context
+
+JobType = namedtuple('JobType', 'name executor func')
+
+# A running thread job re-reads Job.cancel_requested every this many cancellation checks,
+# so a cancel sent to another worker process reaches it too
+CANCEL_POLL_CHECKS = 20
+
+JOB_TYPES = {}
+# Modules that register job types; imported the first time a type is looked up
+JOB_MODULES = ('models.loan', 'utils.tax_calculator', 'utils.net_worth', 'utils.recurring')
+
+def job_type(name, executor='thread'):
+    """Register a function as a job type run on the 'thread' or 'process' pool"""
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unknown executor '{executor}'")
+
+    def decorator(func):
+        JOB_TYPES[name] = JobType(name, executor, func)
+        return func
+    return decorator
+
+def get_job_type(name):
+    if name not in JOB_TYPES:
+        import importlib
+        for module in JOB_MODULES:
+            importlib.import_module(module)
+    if name not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{name}'")
+    return JOB_TYPES[name]
+
+class JobCancelled(Exception):
+    """Raised inside a thread job when cancellation was requested"""
+
+class JobContext:
+    """What a thread job gets: progress reporting and cancellation checks"""
+
+    def __init__(self, runner, key):
+        self.runner = runner
+        self.key = key
+        self.job_id = key[1]
+        self._checks = 0
+
+    @property
+    def cancelled(self):
+        if self.key in self.runner._cancel_requests:
+            return True
+        self._checks += 1
+        if self._checks % CANCEL_POLL_CHECKS == 1 and self._cancel_requested_in_db():
+            self.runner._cancel_requests.add(self.key)
+            return True
+        return False
+
+    def _cancel_requested_in_db(self):
+        """Job.cancel_requested as committed, read on its own connection (the job's session may hold an older snapshot)"""
+        engine = db.session.get_bind(mapper=Job.__mapper__)
+        with engine.connect() as connection:
+            return bool(connection.execute(
+                db.select(Job.cancel_requested).where(Job.id == self.job_id)
+            ).scalar())
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, done, total=None, message=None):
+        """Report progress (done out of total, or a 0-1 fraction); raises JobCancelled if cancelled"""
+        fraction = done / total if total else done
+        self.runner._progress[self.key] = (max(0.0, min(float(fraction), 1.0)), message)
+        self.check_cancelled()
+
+class JobRunner:
+    """Submits jobs to lazily created thread and process pools and records their outcome"""
+
+    def __init__(self):
+        self.app = None
+        self.max_threads = 4
+        self.max_processes = 2
+        self._pools = {}
+        # All keyed by (tenant id, job id); the tenant id is None without MULTI_TENANT
+        self._futures = {}
+        self._progress = {}  # -> (fraction, message) while running
+        self._cancel_requests = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.max_threads = app.config.get('JOB_THREADS', self.max_threads)
+        self.max_processes = app.config.get('JOB_PROCESSES', self.max_processes)
+
+    def _pool(self, executor):
+        with self._lock:
+            pool = self._pools.get(executor)
+            if pool is None:
+                import concurrent.futures
+                if executor == 'process':
+                    import multiprocessing
+                    # spawn: a forked copy of a threaded web server is not safe
+                    pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.max_processes, mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_threads, thread_name_prefix='job'
+                    )
+                self._pools[executor] = pool
+            return pool
+
+    def submit(self, name, params=None):
+        """Create the Job row and queue the work. Returns the Job (status queued)."""
+        spec = get_job_type(name)
+        params = params or {}
+        job = Job(job_type=name, executor=spec.executor, params=json.dumps(params), worker_pid=os.getpid())
+        db.session.add(job)
+        db.session.commit()
+
+        key = (current_tenant_id(), job.id)
+        if spec.executor == 'process':
+            future = self._pool('process').submit(spec.func, **params)
+        else:
+            future = self._pool('thread').submit(self._run_in_thread, key, spec.func, params)
+        self._futures[key] = future
+        future.add_done_callback(partial(self._done, key, spec.executor))
+        return job
+
+    def _run_in_thread(self, key, func, params):
+        with tenant_context(self.app, key[0]):
+            if key in self._cancel_requests:
+                self._finish(key, 'cancelled')
+                return
+            self._update(key[1], status='running', started_at=datetime.utcnow())
+            try:
+                result = func(JobContext(self, key), **params)
+            except JobCancelled:
+                db.session.rollback()
+                self._finish(key, 'cancelled')
+            except Exception as e:
+                db.session.rollback()
+                traceback.print_exc()
+                self._finish(key, 'failed', error=f'{type(e).__name__}: {e}')
+            else:
+                self._finish(key, 'succeeded', result=result)
+
+    def _done(self, key, executor, future):
+        """Future callback: records process job outcomes, and cancellations before a job started"""
+        self._futures.pop(key, None)
+        if executor == 'thread' and not future.cancelled():
+            return  # _run_in_thread recorded the outcome
+        with tenant_context(self.app, key[0]):
+            if future.cancelled() or key in self._cancel_requests:
+                self._finish(key, 'cancelled')  # A running process cannot be stopped; its result is dropped
+            elif future.exception() is not None:
+                error = future.exception()
+                self._finish(key, 'failed', error=f'{type(error).__name__}: {error}')
+            else:
+                self._finish(key, 'succeeded', result=future.result())
+
+    def _update(self, job_id, **values):
+        Job.query.filter_by(id=job_id).update(values, synchronize_session=False)
+        db.session.commit()
+
+    def _finish(self, key, status, result=None, error=None):
+        progress, message = self._progress.pop(key, (0.0, None))
+        self._update(
+            key[1],
+            status=status,
+            progress=1.0 if status == 'succeeded' else progress,
+            message=message,
+            result=json.dumps(result, default=str) if result is not None else None,
+            error=error,
+            finished_at=datetime.utcnow()
+        )
+        self._cancel_requests.discard(key)
+
+    def status(self, job):
+        """job.to_dict() with live progress, and running process jobs shown as running"""
+        data = job.to_dict()
+        if job.is_finished():
+            return data
+        key = (current_tenant_id(), job.id)
+        if key in self._progress:
+            data['progress'], message = self._progress[key]
+            data['message'] = message or data['message']
+        future = self._futures.get(key)
+        if future is not None and future.running() and data['status'] == 'queued':
+            data['status'] = 'running'
+        return data
+
+    def cancel(self, job):
+        """Request cancellation. Returns False if the job already finished."""
+        if job.is_finished():
+            return False
+        key = (current_tenant_id(), job.id)
+        self._cancel_requests.add(key)
+        job.cancel_requested = True
+        db.session.commit()
+        future = self._futures.get(key)
+        if future is not None:
+            future.cancel()  # Only succeeds while queued; running thread jobs stop at their next progress()
+        elif job.worker_pid == os.getpid():
+            self._finish(key, 'cancelled')  # Unknown to this runner (e.g. already lost)
+        return True
+
+    def recover_interrupted(self):
+        """Mark jobs whose owning process is gone as failed (run once the schema is current)"""
+        tenant_id = current_tenant_id()
+        unfinished = Job.query.filter(Job.status.in_(('queued', 'running'))).all()
+        for job in unfinished:
+            if (tenant_id, job.id) in self._futures or (job.worker_pid != os.getpid() and _process_alive(job.worker_pid)):
+                continue
+            job.status = 'failed'
+            job.error = 'Interrupted: the app stopped before the job finished'
+            job.finished_at = datetime.utcnow()
+        if unfinished:
+            db.session.commit()
+
+    def shutdown(self, wait=True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools = {}
+
+def _process_alive(pid):
+    # os.kill() terminates processes on Windows; the desktop build is a single process anyway
+    if not pid or os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but owned by someone else (or not checkable on this platform)
+    return True
+
+jobs = JobRunner()
+
+def accepted(job):
+    """202 Accepted response for a submitted job, pointing at its status URL"""
+    from flask import jsonify, url_for
+    response = jsonify(jobs.status(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('api.job_status', job_id=job.id)
+    return response
+
+def init_jobs(app):
+    jobs.init_app(app)
@@ -0,0 +1,393 @@
+"""
+Optional in-memory columnar copy of the transaction ledger.
+
+When LEDGER_CACHE is enabled (and NumPy is installed) every transaction is held
+as one row across parallel NumPy arrays sorted by date, so range and group-by
+aggregates are a searchsorted() slice plus a bincount() instead of a SQL query.
+The arrays are loaded once at startup and kept current by applying each
+committed transaction write as a delta. Bulk statements that bypass the ORM
+unit of work trigger a full reload instead, and so does a write from another
+process, seen as a change of the database file (database.FileStampedCache).
+"""
+
+import threading
+from datetime import date
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import FileStampedCache, db
+from models.transaction import Transaction
+from utils.money import cents, to_cents
+
+np = None  # NumPy is imported by LedgerCache.enable() so start-up never pays for it
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+# Column name -> NumPy dtype; amounts are exact int64 cents
+COLUMNS = {
+    'id': 'int64',
+    'day': 'int32',            # days since 1970-01-01
+    'amount': 'int64',         # cents
+    'is_income': 'bool',
+    'is_taxable': 'bool',
+    'account_id': 'int32',     # -1 when the transaction has no account
+    'category': 'int32',       # code into LedgerCache.categories
+}
+
+def day_number(value):
+    return value.toordinal() - EPOCH_ORDINAL
+
+class LedgerColumns:
+    """One immutable generation of the column arrays; writers build a new one and swap it in"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.size = len(arrays['id'])
+
+    def __getattr__(self, name):
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def slice(self, start, end):
+        """Row range [lo, hi) covering days start..end inclusive (arrays are sorted by day)"""
+        lo = int(np.searchsorted(self.arrays['day'], day_number(start), side='left')) if start else 0
+        hi = int(np.searchsorted(self.arrays['day'], day_number(end), side='right')) if end else self.size
+        return lo, hi
+
+class LedgerCache(FileStampedCache):
+    """Columnar transaction ledger with exact cent aggregates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns = None
+        self.enabled = False
+        self.categories = []   # code -> name
+        self._category_codes = {}  # name -> code
+        self.loads = 0
+        self.deltas_applied = 0
+        self.queries = 0
+
+    def enable(self):
+        """Turn the cache on if NumPy is available. Returns whether it is enabled."""
+        global np
+        try:
+            import numpy as np
+        except ImportError:  # The cache is optional; routes fall back to SQL
+            print("Ledger cache disabled: NumPy is not installed")
+            return False
+        self.enabled = True
+        return True
+
+    def disable(self):
+        with self._lock:
+            self.enabled = False
+            self._columns = None
+
+    # ----- loading and maintenance -----
+
+    def _code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self._category_codes[category] = code
+        return code
+
+    def _build(self, rows):
+        """Arrays from (id, day, cents, type, is_taxable, account_id, category) tuples"""
+        if not rows:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        ids, days, amounts, types, taxable, accounts, categories = zip(*rows)
+        return {
+            'id': np.array(ids, dtype=np.int64),
+            'day': np.array(days, dtype=np.int32),
+            'amount': np.array(amounts, dtype=np.int64),
+            'is_income': np.array([t == 'income' for t in types], dtype=bool),
+            'is_taxable': np.array(taxable, dtype=bool),
+            'account_id': np.array([-1 if a is None else a for a in accounts], dtype=np.int32),
+            'category': np.array([self._code(c) for c in categories], dtype=np.int32),
+        }
+
+    def _archived_arrays(self):
+        """Columns of the cold partitions, with categories re-coded into this cache's dictionary"""
+        from utils.archive import transaction_archive
+        arrays = []
+        for partition in transaction_archive.partitions():
+            remap = np.array([self._code(name) for name in partition.categories] or [0], dtype=np.int32)
+            arrays.append({
+                name: (remap[partition.columns[name]] if name == 'category' else np.asarray(partition.columns[name]))
+                for name in COLUMNS
+            })
+        return arrays
+
+    def load(self):
+        """
+        Read the whole ledger: hot rows in one query (day numbers computed by
+        SQLite, no ORM objects) plus the archived cold partitions.
+        """
+        if not self.enabled:
+            return
+        day = db.cast(db.func.julianday(Transaction.date) - UNIX_EPOCH_JULIAN_DAY, db.Integer)
+        rows = db.session.query(
+            Transaction.id,
+            day,
+            cents(Transaction.amount),
+            Transaction.transaction_type,
+            Transaction.is_taxable,
+            Transaction.account_id,
+            Transaction.category
+        ).order_by(Transaction.date, Transaction.id).all()
+        with self._lock:
+            arrays = self._build(rows)
+            archived = self._archived_arrays()
+            if archived:
+                arrays = {name: np.concatenate([part[name] for part in archived] + [arrays[name]]) for name in COLUMNS}
+                order = np.lexsort((arrays['id'], arrays['day']))
+                arrays = {name: values[order] for name, values in arrays.items()}
+            self._columns = LedgerColumns(arrays)
+            self.loads += 1
+
+    def ensure_loaded(self):
+        if not self.enabled:
+            return
+        self.check_file()
+        if self._columns is None:
+            self.load()
+
+    def invalidate(self):
+        """Drop the arrays; the next read reloads them"""
+        with self._lock:
+            self._columns = None
+
+    clear = invalidate
+
+    def apply(self, changes):
+        """
+        Apply committed changes: {transaction_id: row tuple, or None if deleted}.
+        Removed/updated ids are filtered out, then new rows are inserted at their
+        searchsorted position so the arrays stay sorted by day.
+        """
+        with self._lock:
+            current = self._columns
+            if current is None or not changes:
+                return
+            arrays = current.arrays
+            keep = ~np.isin(arrays['id'], np.fromiter(changes.keys(), dtype=np.int64))
+            if not keep.all():
+                arrays = {name: values[keep] for name, values in arrays.items()}
+
+            added = sorted((row for row in changes.values() if row is not None), key=lambda row: (row[1], row[0]))
+            if added:
+                new = self._build(added)
+                positions = np.searchsorted(arrays['day'], new['day'], side='right')
+                arrays = {name: np.insert(arrays[name], positions, new[name]) for name in arrays}
+
+            self._columns = LedgerColumns(arrays)
+            self.deltas_applied += 1
+
+    def columns(self):
+        """Current column generation, loading it if needed (None when disabled)"""
+        self.ensure_loaded()
+        self.queries += 1
+        return self._columns
+
+    # ----- aggregates (all money in cents) -----
+
+    def range_summary(self, start, end):
+        """Same shape as utils.period_summary summaries, for days start..end inclusive"""
+        cols = self.columns()
+        lo, hi = cols.slice(start, end)
+        amount = cols.amount[lo:hi]
+        is_income = cols.is_income[lo:hi]
+        is_expense = ~is_income
+        expense_amounts = np.where(is_expense, amount, 0)
+
+        by_category = {}
+        if hi > lo:
+            codes = cols.category[lo:hi]
+            # float64 weights are exact for totals below 2**53 cents
+            totals = np.bincount(codes, weights=expense_amounts, minlength=len(self.categories))
+            counts = np.bincount(codes[is_expense], minlength=len(self.categories))
+            for code in np.nonzero(counts)[0]:
+                by_category[self.categories[code]] = int(round(totals[code]))
+
+        return {
+            'income': int(amount[is_income].sum()),
+            'taxable_income': int(amount[is_income & cols.is_taxable[lo:hi]].sum()),
+            'expenses': int(expense_amounts.sum()),
+            'transaction_count': hi - lo,
+            'expense_count': int(is_expense.sum()),
+            'expenses_by_category': by_category
+        }
+
+    def category_totals(self, transaction_type='expense'):
+        """{category: (count, cents)} over the whole ledger for one transaction type, sorted by name like SQL GROUP BY"""
+        cols = self.columns()
+        mask = cols.is_income if transaction_type == 'income' else ~cols.is_income
+        codes = cols.category[mask]
+        totals = np.bincount(codes, weights=cols.amount[mask], minlength=len(self.categories))
+        counts = np.bincount(codes, minlength=len(self.categories))
+        return dict(sorted(
+            (self.categories[code], (int(counts[code]), int(round(totals[code]))))
+            for code in np.nonzero(counts)[0]
+        ))
+
+    def monthly_totals(self):
+        """[(YYYY-MM, income cents, expense cents)] for every month with activity, oldest first"""
+        cols = self.columns()
+        if cols.size == 0:
+            return []
+        months = cols.day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        first = months[0]  # Sorted by day, so the first row has the earliest month
+        index = months - first
+        income = np.bincount(index, weights=np.where(cols.is_income, cols.amount, 0))
+        expenses = np.bincount(index, weights=np.where(cols.is_income, 0, cols.amount))
+        active = np.bincount(index)
+        return [
+            (str(np.datetime64(int(first + offset), 'M')), int(round(income[offset])), int(round(expenses[offset])))
+            for offset in np.nonzero(active)[0]
+        ]
+
+    def totals(self):
+        """(income cents, expense cents) over the whole ledger"""
+        cols = self.columns()
+        return int(cols.amount[cols.is_income].sum()), int(cols.amount[~cols.is_income].sum())
+
+    # ----- diagnostics -----
+
+    def verify(self, start=None, end=None):
+        """
+        Compare the cached aggregates with the same aggregates computed by SQL
+        (plus the archived cold partitions, which the cache also holds).
+        Returns a list of mismatch descriptions (empty when consistent).
+        """
+        from utils.archive import transaction_archive
+        from utils.period_summary import stored_summary_cents
+        mismatches = []
+        cols = self.columns()
+        if cols is None:
+            return ['ledger cache is not enabled']
+
+        sql_count = db.session.query(db.func.count(Transaction.id)).scalar() + transaction_archive.count()
+        if sql_count != cols.size:
+            mismatches.append(f'row count: cache {cols.size}, sql {sql_count}')
+
+        bounds = db.session.query(db.func.min(Transaction.date), db.func.max(Transaction.date)).one()
+        years = transaction_archive.years()
+        start = start or (date(years[0], 1, 1) if years else bounds[0])
+        end = end or bounds[1] or (date(years[-1], 12, 31) if years else None)
+        if start and end:
+            cached = self.range_summary(start, end)
+            expected = stored_summary_cents(start, end)
+            for key, value in expected.items():
+                if cached[key] != value:
+                    mismatches.append(f'{key} {start}..{end}: cache {cached[key]}, sql {value}')
+
+        month = db.func.strftime('%Y-%m', Transaction.date)
+        amount = cents(Transaction.amount)
+        sql_months = db.session.query(
+            month,
+            db.func.sum(db.case((Transaction.transaction_type == 'income', amount), else_=0)),
+            db.func.sum(db.case((Transaction.transaction_type == 'income', 0), else_=amount))
+        ).group_by(month).all()
+        expected_months = {row[0]: (row[1], row[2]) for row in sql_months}
+        for key, (income, expenses) in transaction_archive.monthly_totals().items():
+            hot_income, hot_expenses = expected_months.get(key, (0, 0))
+            expected_months[key] = (hot_income + income, hot_expenses + expenses)
+        if [(key, *expected_months[key]) for key in sorted(expected_months)] != self.monthly_totals():
+            mismatches.append('monthly totals differ')
+        return mismatches
+
+    def memory_report(self):
+        """Bytes held per column, in total and extrapolated per million rows"""
+        cols = self._columns
+        rows = cols.size if cols is not None else 0
+        bytes_per_row = sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values()) if np is not None else 0
+        column_bytes = {name: int(cols.arrays[name].nbytes) for name in COLUMNS} if cols is not None else {}
+        return {
+            'rows': rows,
+            'categories': len(self.categories),
+            'column_bytes': column_bytes,
+            'total_bytes': sum(column_bytes.values()),
+            'bytes_per_row': bytes_per_row,
+            'mb_per_million_rows': round(bytes_per_row * 1_000_000 / (1024 * 1024), 1)
+        }
+
+    def stats(self):
+        stats = {
+            'enabled': self.enabled,
+            'loaded': self._columns is not None,
+            'loads': self.loads,
+            'deltas_applied': self.deltas_applied,
+            'external_changes': self.external_changes,
+            'queries': self.queries
+        }
+        if self.enabled:
+            stats['memory'] = self.memory_report()
+        return stats
+
+ledger_cache = LedgerCache()
+
+def init_ledger_cache(app):
+    """Enable and load the cache when app.config['LEDGER_CACHE'] is set"""
+    if not app.config.get('LEDGER_CACHE') or not ledger_cache.enable():
+        return None
+    with app.app_context():
+        ledger_cache.ensure_loaded()
+    return ledger_cache
+
+def _ledger_row(transaction):
+    return (
+        transaction.id,
+        day_number(transaction.date),
+        to_cents(transaction.amount),
+        transaction.transaction_type,
+        bool(transaction.is_taxable),
+        transaction.account_id,
+        transaction.category
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _collect_ledger_changes(session, flush_context):
+    if not ledger_cache.enabled:
+        return
+    changes = None
+    # new/dirty/deleted still describe this flush here, and new rows already have ids
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            changes = session.info.setdefault('ledger_changes', {})
+            changes[obj.id] = _ledger_row(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            changes = session.info.setdefault('ledger_changes', {})
+            changes[obj.id] = _ledger_row(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            changes = session.info.setdefault('ledger_changes', {})
+            changes[obj.id] = None
+
+@event.listens_for(Session, 'do_orm_execute')
+def _detect_bulk_ledger_writes(orm_execute_state):
+    """Bulk INSERT/UPDATE/DELETE statements skip the flush hooks, so reload after they commit"""
+    if not ledger_cache.enabled or orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Transaction:
+        orm_execute_state.session.info['ledger_reload'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apply_ledger_changes(session):
+    changes = session.info.pop('ledger_changes', None)
+    if ledger_cache.enabled:
+        ledger_cache.committed(session)
+    if session.info.pop('ledger_reload', False):
+        ledger_cache.invalidate()
+    elif changes:
+        ledger_cache.apply(changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_ledger_changes(session):
+    session.info.pop('ledger_changes', None)
+    session.info.pop('ledger_reload', None)
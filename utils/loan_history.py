@@ -0,0 +1,100 @@
+"""
+Loan payment history queries over the loan_payment table (models/loan_payment.py).
+
+The loans page used to show the totals kept on each loan row
+(total_payments_made, total_interest_paid, payment_count), which only stay
+right if every write remembers to update them. These are computed from the
+payment rows instead:
+
+  - payment_totals(): every loan's totals in one GROUP BY
+  - payment_history(): a page of one loan's payments, each with the running
+    totals up to it (SUM() OVER (ORDER BY date, id)), read through the
+    (loan_id, date) index
+  - cumulative_interest(): interest per month with its running total, for one
+    loan or all of them
+
+Sums are taken in cents, so they are exact.
+"""
+
+from database import db
+from models.loan_payment import LoanPayment
+from utils.money import cents, from_cents
+
+EMPTY_TOTALS = {'payments': 0, 'total_paid': 0.0, 'total_interest': 0.0, 'total_principal': 0.0, 'last_payment_id': None}
+
+def payment_totals(loan_ids=None):
+    """{loan_id: {'payments', 'total_paid', 'total_interest', 'total_principal', 'last_payment_id'}} for loans with payments"""
+    query = db.session.query(
+        LoanPayment.loan_id,
+        db.func.count(LoanPayment.id),
+        db.func.sum(cents(LoanPayment.amount)),
+        db.func.sum(cents(LoanPayment.interest)),
+        db.func.sum(cents(LoanPayment.principal)),
+        db.func.max(LoanPayment.id)
+    ).group_by(LoanPayment.loan_id)
+    if loan_ids is not None:
+        query = query.filter(LoanPayment.loan_id.in_(loan_ids))
+    return {
+        loan_id: {
+            'payments': count,
+            'total_paid': from_cents(paid),
+            'total_interest': from_cents(interest),
+            'total_principal': from_cents(principal),
+            'last_payment_id': last_id
+        }
+        for loan_id, count, paid, interest, principal, last_id in query
+    }
+
+def payment_history(loan_id, page=1, per_page=50):
+    """(total, one page of the loan's payments newest first, each with running totals up to and including it)"""
+    order = (LoanPayment.date, LoanPayment.id)
+    running = db.select(
+        LoanPayment,
+        db.func.sum(cents(LoanPayment.amount)).over(order_by=order).label('cumulative_paid'),
+        db.func.sum(cents(LoanPayment.interest)).over(order_by=order).label('cumulative_interest'),
+        db.func.sum(cents(LoanPayment.principal)).over(order_by=order).label('cumulative_principal'),
+        db.func.row_number().over(order_by=order).label('number')
+    ).where(LoanPayment.loan_id == loan_id).subquery()
+
+    # The window runs over all of the loan's payments before the page is cut out
+    payment = db.aliased(LoanPayment, running)
+    rows = db.session.execute(
+        db.select(payment, running.c.cumulative_paid, running.c.cumulative_interest,
+                  running.c.cumulative_principal, running.c.number)
+        .order_by(running.c.date.desc(), running.c.id.desc())
+        .limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    total = db.session.query(db.func.count(LoanPayment.id)).filter(LoanPayment.loan_id == loan_id).scalar()
+    return total, [
+        dict(row.to_dict(), number=number, cumulative_paid=from_cents(paid),
+             cumulative_interest=from_cents(interest), cumulative_principal=from_cents(principal))
+        for row, paid, interest, principal, number in rows
+    ]
+
+def cumulative_interest(loan_id=None, start_date=None, end_date=None):
+    """Interest and principal paid per month (YYYY-MM), oldest first, with the running interest total"""
+    month = db.func.strftime('%Y-%m', LoanPayment.date).label('month')
+    interest = db.func.sum(cents(LoanPayment.interest))
+    query = db.select(
+        month,
+        db.func.count(LoanPayment.id),
+        interest,
+        db.func.sum(cents(LoanPayment.principal)),
+        db.func.sum(interest).over(order_by=month)
+    ).group_by(month).order_by(month)
+    if loan_id is not None:
+        query = query.where(LoanPayment.loan_id == loan_id)
+    if start_date:
+        query = query.where(LoanPayment.date >= start_date)
+    if end_date:
+        query = query.where(LoanPayment.date <= end_date)
+    return [
+        {
+            'month': row_month,
+            'payments': count,
+            'interest': from_cents(month_interest),
+            'principal': from_cents(principal),
+            'cumulative_interest': from_cents(running)
+        }
+        for row_month, count, month_interest, principal, running in db.session.execute(query)
+    ]
@@ -0,0 +1,177 @@
+"""
+Bulk loan payments applied with atomic SQL.
+
+Loan.make_payment() reads the loan, changes its counters in Python and writes
+them back, so two payments committed at the same time can overwrite each
+other. apply_payments() instead changes every counter in place
+(SET total_payments_made = total_payments_made + :amount, ...), guarded by the
+balance the interest/principal split was computed from: if another writer got
+there first the loan is read again and the split recomputed. The first UPDATE
+takes SQLite's write lock, so after it no one else can change the loans until
+the caller commits.
+
+Payments are applied in date order (input order within a day), with the same
+rules as make_payment(): payments are capped at the balance, this month's
+interest is paid first, current_month_paid restarts in a new month, and a
+back-dated payment from an earlier month leaves current_month_paid and
+last_payment_date as they are. The
+Loan Payment transactions for the whole batch are inserted in one statement,
+and their loan_payment history rows in another.
+"""
+
+from datetime import date
+from database import db
+from models.loan import Loan
+from models.loan_payment import LoanPayment
+from models.transaction import Transaction
+from utils.categories import intern_category
+from utils.money import cents, from_cents, to_cents
+from utils.period_summary import note_transaction_dates
+
+MAX_BULK_PAYMENTS = 1000
+LOAN_PAYMENT_CATEGORY = 'Loan Payment'
+# Re-reads of a loan whose balance changed between our read and our UPDATE
+MAX_RETRIES = 3
+
+def parse_payments(items):
+    """
+    Validate a list of {loan_id, amount, date?, account_id?} dicts.
+    Returns (payments, errors); errors is a list of {'index', 'error'}.
+    """
+    if not isinstance(items, list) or not items:
+        return [], [{'index': None, 'error': 'payments must be a non-empty list'}]
+    if len(items) > MAX_BULK_PAYMENTS:
+        return [], [{'index': None, 'error': f'At most {MAX_BULK_PAYMENTS} payments per request'}]
+    payments, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('payment must be an object')
+            amount = to_cents(item['amount'])
+            if amount is None or amount <= 0:
+                raise ValueError('Payment amount must be positive')
+            account_id = item.get('account_id')
+            payments.append({
+                'index': index,
+                'loan_id': int(item['loan_id']),
+                'amount': amount,
+                'date': date.fromisoformat(item['date']) if item.get('date') else date.today(),
+                'account_id': int(account_id) if account_id not in (None, '') else None
+            })
+        except KeyError as e:
+            errors.append({'index': index, 'error': f'Missing field {e.args[0]}'})
+        except (TypeError, ValueError, ArithmeticError) as e:
+            errors.append({'index': index, 'error': str(e)})
+    return payments, errors
+
+def _split(balance, interest_rate, amount):
+    """(amount, interest, principal) in cents for a payment, as in Loan.make_payment()"""
+    amount = min(amount, balance)
+    interest = round(balance * interest_rate / 1200)
+    principal = min(max(0, amount - interest), balance)
+    return amount, interest, principal
+
+def _apply_one(payment):
+    """Apply one payment with a guarded atomic UPDATE. Returns the result dict."""
+    for _ in range(MAX_RETRIES):
+        row = db.session.execute(
+            db.select(cents(Loan.balance), Loan.interest_rate, Loan.name).where(Loan.id == payment['loan_id'])
+        ).first()
+        if row is None:
+            return {'status': 'rejected', 'error': 'Loan not found'}
+        balance, interest_rate, name = row
+        if balance <= 0:
+            return {'status': 'rejected', 'error': 'Loan is already paid off'}
+        amount, interest, principal = _split(balance, interest_rate, payment['amount'])
+
+        # Months compare as YYYY-MM text; a back-dated payment from an earlier month
+        # leaves this month's counter and the latest payment date alone
+        last_month = db.func.strftime('%Y-%m', Loan.last_payment_date)
+        payment_month = payment['date'].strftime('%Y-%m')
+        month_paid = db.func.coalesce(cents(Loan.current_month_paid), 0)
+        updated = db.session.execute(
+            db.update(Loan)
+            .where(Loan.id == payment['loan_id'], cents(Loan.balance) == balance)
+            .values(
+                balance=cents(Loan.balance) - principal,
+                total_payments_made=db.func.coalesce(cents(Loan.total_payments_made), 0) + amount,
+                total_interest_paid=db.func.coalesce(cents(Loan.total_interest_paid), 0) + interest,
+                payment_count=db.func.coalesce(Loan.payment_count, 0) + 1,
+                current_month_paid=db.case(
+                    (db.or_(Loan.last_payment_date.is_(None), last_month < payment_month), amount),
+                    (last_month == payment_month, month_paid + amount),
+                    else_=month_paid
+                ),
+                last_payment_date=db.case(
+                    (db.or_(Loan.last_payment_date.is_(None), Loan.last_payment_date < payment['date']),
+                     payment['date']),
+                    else_=Loan.last_payment_date
+                )
+            )
+            .returning(cents(Loan.balance), cents(Loan.current_month_paid), Loan.payment_count)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if updated is not None:
+            return {
+                'status': 'applied',
+                'loan_name': name,
+                'payment_amount': from_cents(amount),
+                'interest_portion': from_cents(interest),
+                'principal_portion': from_cents(principal),
+                'new_balance': from_cents(updated[0]),
+                'current_month_paid': from_cents(updated[1]),
+                'payment_count': updated[2]
+            }
+    return {'status': 'rejected', 'error': 'Loan changed concurrently, try again'}
+
+def apply_payments(payments, label='Payment'):
+    """
+    Apply parsed payments (see parse_payments) and insert their transactions,
+    in the caller's transaction; the caller commits. Returns one result per
+    payment, in input order. label starts each transaction's description.
+    """
+    results = [None] * len(payments)
+    transactions = []
+    category_id, category = intern_category(db.session, LOAN_PAYMENT_CATEGORY)
+    for position, payment in sorted(enumerate(payments), key=lambda item: (item[1]['date'], item[0])):
+        result = _apply_one(payment)
+        result.update({'index': payment['index'], 'loan_id': payment['loan_id'],
+                       'date': payment['date'].isoformat(), 'account_id': payment['account_id']})
+        results[position] = result
+        if result['status'] == 'applied':
+            transactions.append((result, {
+                'amount': result['payment_amount'],
+                'date': payment['date'],
+                'category': category,
+                'category_id': category_id,
+                'description': f"{label} on {result['loan_name']} - Interest: ${result['interest_portion']:.2f}, "
+                               f"Principal: ${result['principal_portion']:.2f}",
+                'transaction_type': 'expense',
+                'is_taxable': False,
+                'account_id': payment['account_id']
+            }))
+
+    if transactions:
+        ids = db.session.execute(
+            db.insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+            [row for _, row in transactions]
+        ).scalars().all()
+        for (result, _), transaction_id in zip(transactions, ids):
+            result['transaction_id'] = transaction_id
+        db.session.execute(db.insert(LoanPayment), [
+            {
+                'loan_id': result['loan_id'],
+                'date': row['date'],
+                'amount': result['payment_amount'],
+                'interest': result['interest_portion'],
+                'principal': result['principal_portion'],
+                'balance_after': result['new_balance'],
+                'account_id': row['account_id'],
+                'transaction_id': result['transaction_id']
+            }
+            for result, row in transactions
+        ])
+        note_transaction_dates(db.session, {row['date'] for _, row in transactions})
+    for result in results:
+        result.pop('loan_name', None)
+    return results
@@ -0,0 +1,230 @@
+"""
+Monthly loan housekeeping: month rollover and automatic payments.
+
+Loan.current_month_paid used to be reset only when the next payment crossed a
+month boundary, so a loan nobody had paid yet this month still showed last
+month's total. run_schedule() does, for the current month:
+
+  1. Rollover: one UPDATE zeroes current_month_paid for every loan whose last
+     payment is before the 1st of the month.
+  2. Auto-payments: every loan with auto_payment_enabled, a balance and a due
+     day (the day of month of its due_date) that has come is paid what is left
+     of this month's required payment, all in one apply_payments() batch
+     (see utils/loan_payments.py). A loan already covered by manual payments
+     is marked done without paying.
+
+Each step is recorded in processed_period (task, YYYY-MM, loan) in the same
+transaction as its writes, and the marker is inserted first, so a restart or a
+second worker process skips work that was already done. Months that passed
+while the app was not running are not paid retroactively.
+
+LoanScheduler.run_once() also stores the day's net worth snapshot
+(NetWorthSnapshotter.update() in utils/net_worth.py) and folds new transactions
+into the recurring series (RecurringDetector.update() in utils/recurring.py)
+after the schedule, so the dashboard and the forecast only read them.
+
+The app runs it every LOAN_SCHEDULER_INTERVAL seconds (0 turns it off) on a
+daemon thread started with the first request; run_loan_scheduler.py runs it once
+from the command line (cron). With MULTI_TENANT every user's database is processed.
+"""
+
+import calendar
+import os
+import threading
+import traceback
+from datetime import date, datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import db
+from models.loan import Loan
+from models.processed_period import ProcessedPeriod
+from utils.loan_payments import apply_payments
+from utils.money import cents, to_cents
+
+ROLLOVER = 'month_rollover'
+AUTO_PAYMENT = 'auto_payment'
+AUTO_PAYMENT_LABEL = 'Automatic payment'
+
+def period_of(day):
+    return day.strftime('%Y-%m')
+
+def due_day(loan, day):
+    """The loan's due date moved into day's month (clamped to shorter months)"""
+    last = calendar.monthrange(day.year, day.month)[1]
+    return day.replace(day=min(loan.due_date.day, last))
+
+def _claim(task, period, loan_id=0, **values):
+    """Insert the marker unless it exists; True if this call inserted it"""
+    result = db.session.execute(
+        sqlite_insert(ProcessedPeriod.__table__)
+        .values(task=task, period=period, loan_id=loan_id, processed_at=datetime.utcnow(), **values)
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount == 1
+
+def _marker(task, period, loan_id=0):
+    return db.and_(ProcessedPeriod.task == task, ProcessedPeriod.period == period, ProcessedPeriod.loan_id == loan_id)
+
+def roll_over_month(today=None):
+    """Reset this month's paid counters once per month. Returns loans reset, or None if already done."""
+    today = today or date.today()
+    period = period_of(today)
+    if not _claim(ROLLOVER, period):
+        db.session.rollback()
+        return None
+    reset = db.session.execute(
+        db.update(Loan)
+        .where(
+            db.or_(Loan.last_payment_date.is_(None), Loan.last_payment_date < today.replace(day=1)),
+            db.func.coalesce(cents(Loan.current_month_paid), -1) != 0
+        )
+        .values(current_month_paid=0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.execute(db.update(ProcessedPeriod).where(_marker(ROLLOVER, period)).values(loans_updated=reset))
+    db.session.commit()
+    return reset
+
+def due_auto_payments(today=None):
+    """(loan, amount in cents) for each auto-paid loan due by today and not yet processed this month"""
+    today = today or date.today()
+    done = {
+        loan_id for (loan_id,) in db.session.query(ProcessedPeriod.loan_id)
+        .filter(ProcessedPeriod.task == AUTO_PAYMENT, ProcessedPeriod.period == period_of(today))
+    }
+    loans = Loan.query.filter(Loan.auto_payment_enabled == True, Loan.balance > 0).order_by(Loan.id).all()
+    return [
+        (loan, to_cents(loan.remaining_payment_this_month()))
+        for loan in loans
+        if loan.id not in done and due_day(loan, today) <= today
+    ]
+
+def run_auto_payments(today=None):
+    """Pay every due auto-payment for this month in one transaction. Returns the payment results."""
+    today = today or date.today()
+    period = period_of(today)
+    due = due_auto_payments(today)
+    # Claiming takes the write lock; a loan another process claimed first is skipped.
+    # Loans already covered this month keep their marker with amount 0.
+    to_pay = [
+        (loan, amount) for loan, amount in due
+        if _claim(AUTO_PAYMENT, period, loan.id, amount=0) and amount > 0
+    ]
+    payments = [
+        {'index': i, 'loan_id': loan.id, 'amount': amount, 'date': due_day(loan, today), 'account_id': None}
+        for i, (loan, amount) in enumerate(to_pay)
+    ]
+    results = apply_payments(payments, label=AUTO_PAYMENT_LABEL) if payments else []
+    for result in results:
+        marker = _marker(AUTO_PAYMENT, period, result['loan_id'])
+        if result['status'] == 'applied':
+            db.session.execute(db.update(ProcessedPeriod).where(marker).values(
+                amount=result['payment_amount'], transaction_id=result['transaction_id']
+            ))
+        else:
+            # Try again on the next run
+            db.session.execute(db.delete(ProcessedPeriod).where(marker))
+    db.session.commit()
+    return results
+
+def run_schedule(today=None):
+    """Rollover, then auto-payments, for today's month. Returns a summary."""
+    today = today or date.today()
+    reset = roll_over_month(today)
+    results = run_auto_payments(today)
+    return {
+        'period': period_of(today),
+        'rollover': 'already done' if reset is None else f'{reset} loans reset',
+        'loans_reset': reset,
+        'auto_payments': results
+    }
+
+class LoanScheduler:
+    """Runs run_schedule() every interval seconds on a daemon thread"""
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.errors = 0
+        self.last_run_at = None
+        self.last_summary = None
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = float(app.config.get('LOAN_SCHEDULER_INTERVAL', 0) or 0)
+
+    def start(self):
+        """Start the thread (no-op when the interval is 0 or it is already running)"""
+        with self._lock:
+            if self.interval <= 0 or self._thread is not None:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='loan-scheduler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _loop(self):
+        # Run straight away so a month boundary crossed while the app was down is handled
+        while True:
+            self.run_once()
+            if self._stop.wait(self.interval):
+                return
+
+    def _tenant_ids(self):
+        """Every user database with MULTI_TENANT, else just the app's own database (None)"""
+        from utils.tenants import tenants
+        if not tenants.enabled:
+            return [None]
+        names = os.listdir(tenants.directory) if os.path.isdir(tenants.directory) else []
+        return sorted(int(name[:-3]) for name in names if name.endswith('.db') and name[:-3].isdigit())
+
+    def run_once(self, today=None):
+        """One pass over every database (schedule, net worth snapshots, recurring series). Returns {tenant id: summary}."""
+        from utils.net_worth import NetWorthSnapshotter
+        from utils.recurring import RecurringDetector
+        from utils.tenants import tenant_context
+        summaries = {}
+        for tenant_id in self._tenant_ids():
+            try:
+                with tenant_context(self.app, tenant_id):
+                    summary = run_schedule(today)
+                    NetWorthSnapshotter().update(today)
+                    RecurringDetector().update()
+            except Exception:
+                self.errors += 1
+                print(f"Loan scheduler failed for {'user ' + str(tenant_id) if tenant_id else 'the database'}:")
+                traceback.print_exc()
+                continue
+            summaries[tenant_id] = summary
+            if summary['loans_reset'] or summary['auto_payments']:
+                print(f"Loan scheduler {summary['period']}: {summary['rollover']}, "
+                      f"{len(summary['auto_payments'])} auto-payments")
+        self.runs += 1
+        self.last_run_at = datetime.utcnow()
+        self.last_summary = summaries
+        return summaries
+
+    def stats(self):
+        return {
+            'running': self._thread is not None,
+            'interval_s': self.interval,
+            'runs': self.runs,
+            'errors': self.errors,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None
+        }
+
+loan_scheduler = LoanScheduler()
+
+def start_loan_scheduler(app):
+    """Start the periodic run for app (called on its first request)"""
+    loan_scheduler.init_app(app)
+    return loan_scheduler.start()
@@ -0,0 +1,500 @@
+"""
+Versioned schema migrations.
+
+The applied version is stored in PRAGMA user_version. run_migrations() reads it
+once; when the database is current that single PRAGMA is the whole cost. Pending
+steps run in order and bump user_version after each one, so an interrupted run
+resumes where it stopped. Backfills go through backfill_in_batches(), which
+commits every batch so the write lock is only ever held for one batch. A
+backfill registered with start_backfill() also commits its position with each
+batch (in migration_progress), so a rerun continues it instead of skipping it.
+
+To change the schema, add a function decorated with @migration(next_version, ...).
+Steps must be idempotent: a brand new database gets every table from create_all()
+and then runs every step.
+"""
+
+import re
+import time
+
+DEFAULT_BATCH_SIZE = 5000
+# Position of resumable backfills still in progress: name -> next rowid
+PROGRESS_TABLE = 'migration_progress'
+# ALTER TABLE ... DROP COLUMN and RENAME COLUMN (migration 7)
+MIN_SQLITE_DROP_COLUMN = (3, 35, 0)
+
+MIGRATIONS = []
+
+def migration(version, description):
+    """Register a migration step"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda step: step[0])
+        return func
+    return decorator
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def print_progress(description, done, total):
+    print(f"  {description}: {done}/{total} rows ({(done / total * 100) if total else 100:.0f}%)")
+
+class MigrationContext:
+    """What a step gets: the connection plus batching and schema helpers"""
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE, progress=print_progress):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def execute(self, sql, params=None):
+        return self.conn.exec_driver_sql(sql, params or ())
+
+    def columns(self, table):
+        return [row[1] for row in self.execute(f'PRAGMA table_info("{table}")').fetchall()]
+
+    def table_exists(self, table):
+        return self.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+
+    def add_column(self, table, column, definition):
+        """ALTER TABLE ADD COLUMN unless present (constant time in SQLite). Returns True if added."""
+        if column in self.columns(table):
+            return False
+        self.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} {definition}')
+        self.conn.commit()
+        return True
+
+    def create_index(self, name, table, columns):
+        self.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({columns})')
+        self.conn.commit()
+
+    def batches(self, table, description, start=None):
+        """
+        Yield (start, end) rowid ranges covering the table (from rowid start, if
+        given), committing and reporting progress after each one. Each batch is a
+        primary key range scan, so the database is never locked for longer than one batch.
+        """
+        bounds = self.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}"').fetchone()
+        if bounds[0] is None:
+            return
+        low, high = bounds
+        total = high - low + 1
+        start = max(low, start or low)
+        while start <= high:
+            end = start + self.batch_size
+            yield start, end
+            self.conn.commit()
+            if self.progress:
+                self.progress(description, min(end, high + 1) - low, total)
+            start = end
+
+    def start_backfill(self, name):
+        """Mark a resumable backfill as pending; the marker commits with the caller's next commit"""
+        self.execute(f'CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (name TEXT PRIMARY KEY, next_rowid INTEGER NOT NULL)')
+        self.execute(f'INSERT OR IGNORE INTO {PROGRESS_TABLE} (name, next_rowid) VALUES (?, 0)', (name,))
+
+    def backfill_position(self, name):
+        """The rowid a pending backfill continues from, or None when it is not pending"""
+        if not self.table_exists(PROGRESS_TABLE):
+            return None
+        row = self.execute(f'SELECT next_rowid FROM {PROGRESS_TABLE} WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def backfill_in_batches(self, table, set_clause, where=None, params=(), description=None, resume=None):
+        """
+        Run UPDATE table SET set_clause WHERE where one rowid batch at a time.
+        With resume (a name passed to start_backfill()), start from its recorded
+        position and record the next one in each batch's commit; the marker is
+        removed at the end. Returns the number of rows updated.
+        """
+        condition = f' AND ({where})' if where else ''
+        sql = f'UPDATE "{table}" SET {set_clause} WHERE rowid >= ? AND rowid < ?{condition}'
+        first = self.backfill_position(resume) if resume else None
+        updated = 0
+        for start, end in self.batches(table, description or f'Backfilling {table}', first):
+            updated += self.execute(sql, (start, end) + tuple(params)).rowcount
+            if resume:
+                self.execute(f'UPDATE {PROGRESS_TABLE} SET next_rowid = ? WHERE name = ?', (end, resume))
+        if resume:
+            self.execute(f'DELETE FROM {PROGRESS_TABLE} WHERE name = ?', (resume,))
+            self.conn.commit()
+        return updated
+
+    def sqlite_version(self):
+        """Version of the SQLite library behind this connection, as a tuple of ints"""
+        return tuple(int(part) for part in self.execute('SELECT sqlite_version()').scalar().split('.'))
+
+    def require_sqlite(self, minimum, needed_for):
+        """Stop before changing anything when the SQLite library is older than minimum"""
+        version = self.sqlite_version()
+        if version < minimum:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, minimum))} or newer is needed for {needed_for}, but Python is using "
+                f"SQLite {'.'.join(map(str, version))}. Upgrade Python (or its sqlite3 library) and run the migration again."
+            )
+
+    def convert_to_cents(self, table, column):
+        """
+        Turn a REAL dollar column into an INTEGER cents column (utils.money.Money).
+        The cents are written to a new column in batches using the same rounding as
+        the app (to_cents), then the old column is dropped and the new one renamed.
+        Returns True if the column was converted.
+        """
+        from utils.money import to_cents
+        info = {row[1]: row for row in self.execute(f'PRAGMA table_info("{table}")').fetchall()}
+        if column not in info or 'INT' in (info[column][2] or '').upper():
+            return False
+
+        self.require_sqlite(MIN_SQLITE_DROP_COLUMN, f'converting {table}.{column} to cents (DROP/RENAME COLUMN)')
+        not_null = bool(info[column][3])
+        new_column = f'{column}_cents'
+        self.add_column(table, new_column, 'BIGINT NOT NULL DEFAULT 0' if not_null else 'BIGINT')
+        for start, end in self.batches(table, f'Converting {table}.{column} to cents'):
+            rows = self.execute(
+                f'SELECT rowid, {column} FROM "{table}" WHERE rowid >= ? AND rowid < ? AND {column} IS NOT NULL',
+                (start, end)
+            ).fetchall()
+            if rows:
+                self.conn.exec_driver_sql(
+                    f'UPDATE "{table}" SET {new_column} = ? WHERE rowid = ?',
+                    [(to_cents(value), rowid) for rowid, value in rows]
+                )
+
+        self.execute(f'ALTER TABLE "{table}" DROP COLUMN {column}')
+        self.execute(f'ALTER TABLE "{table}" RENAME COLUMN {new_column} TO {column}')
+        self.conn.commit()
+        return True
+
+def current_version(conn):
+    return conn.exec_driver_sql('PRAGMA user_version').scalar() or 0
+
+def _set_version(conn, version):
+    conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+    conn.commit()
+
+def run_migrations(db, batch_size=DEFAULT_BATCH_SIZE, progress=print_progress, engine=None):
+    """
+    Bring the database (engine, default db.engine) up to latest_version().
+    Returns the list of versions applied (empty when already current).
+    """
+    engine = engine if engine is not None else db.engine
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version >= latest_version():
+        return []
+
+    # New tables come from the models; the steps below handle everything create_all() cannot
+    from database import import_models
+    import_models()
+    db.metadata.create_all(bind=engine)  # Default-bind tables only; the users bind is set up by utils/tenants.py
+
+    applied = []
+    with engine.connect() as conn:
+        context = MigrationContext(conn, batch_size, progress)
+        for step_version, description, func in MIGRATIONS:
+            if step_version <= version:
+                continue
+            started = time.perf_counter()
+            print(f"Applying migration {step_version}: {description}")
+            func(context)
+            conn.commit()
+            _set_version(conn, step_version)
+            applied.append(step_version)
+            print(f"✓ Migration {step_version} applied in {time.perf_counter() - started:.2f}s")
+    return applied
+
+# ---------------------------------------------------------------------------
+# Migration steps
+# ---------------------------------------------------------------------------
+
+@migration(1, 'Base tables')
+def base_tables(context):
+    """Tables come from create_all(); version 1 marks databases created that way"""
+
+@migration(2, 'transaction.account_id')
+def add_account_id(context):
+    # The account table itself comes from create_all()
+    context.add_column('transaction', 'account_id', 'INTEGER REFERENCES account(id)')
+
+# Categories whose income is never taxable; matched case-insensitively
+NON_TAXABLE_CATEGORIES = [
+    'gift', 'refund', 'insurance payout', 'loan', 'transfer', 'inheritance',
+    'insurance reimbursement', 'tax refund', 'legal settlement', 'prize', 'lottery', 'gambling'
+]
+NON_TAXABLE_KEYWORDS = [
+    'gift', 'refund', 'insurance', 'inheritance', 'settlement',
+    'prize', 'lottery', 'gambling', 'transfer'
+]
+
+@migration(3, 'transaction.is_taxable with non-taxable income backfill')
+def add_is_taxable(context):
+    if 'is_taxable' not in context.columns('transaction'):
+        # The marker commits with the column, so an interrupted backfill is resumed on the next run
+        context.start_backfill('transaction.is_taxable')
+        context.add_column('transaction', 'is_taxable', 'BOOLEAN NOT NULL DEFAULT 1')
+    elif context.backfill_position('transaction.is_taxable') is None:
+        return  # Already backfilled - never overwrite choices users have made since
+
+    # One pass over the table instead of one UPDATE per category spelling
+    placeholders = ', '.join('?' for _ in NON_TAXABLE_CATEGORIES)
+    keyword_conditions = ' OR '.join('LOWER(category) LIKE ?' for _ in NON_TAXABLE_KEYWORDS)
+    updated = context.backfill_in_batches(
+        'transaction',
+        'is_taxable = 0',
+        where=f"transaction_type = 'income' AND (LOWER(category) IN ({placeholders}) OR {keyword_conditions})",
+        params=NON_TAXABLE_CATEGORIES + [f'%{keyword}%' for keyword in NON_TAXABLE_KEYWORDS],
+        description='Marking non-taxable income',
+        resume='transaction.is_taxable'
+    )
+    print(f"  Income transactions marked as non-taxable: {updated}")
+
+@migration(4, 'Loan payoff tracking columns')
+def add_loan_columns(context):
+    context.add_column('loan', 'target_payoff_months', 'INTEGER')
+    context.add_column('loan', 'current_month_paid', 'REAL DEFAULT 0.0')
+    context.add_column('loan', 'last_payment_date', 'DATE')
+    context.add_column('loan', 'auto_payment_enabled', 'BOOLEAN DEFAULT 0')
+
+@migration(5, 'Loan payment history counters')
+def add_loan_enhanced_fields(context):
+    context.add_column('loan', 'total_interest_paid', 'REAL DEFAULT 0.0')
+    context.add_column('loan', 'total_payments_made', 'REAL DEFAULT 0.0')
+    context.add_column('loan', 'payment_count', 'INTEGER DEFAULT 0')
+
+@migration(6, 'Index transaction.date')
+def index_transaction_date(context):
+    context.create_index('ix_transaction_date', 'transaction', 'date')
+
+# Money columns stored as integer cents from version 7 on (utils.money.Money)
+MONEY_COLUMNS = {
+    'transaction': ['amount'],
+    'account': ['current_balance', 'initial_balance'],
+    'loan': [
+        'balance', 'original_amount', 'minimum_payment', 'current_month_paid',
+        'total_interest_paid', 'total_payments_made'
+    ],
+    'budget': [
+        'annual_income', 'housing', 'food', 'transportation', 'utilities', 'healthcare',
+        'insurance', 'entertainment', 'personal_care', 'shopping', 'education', 'savings',
+        'emergency_fund', 'retirement', 'other', 'monthly_take_home', 'monthly_taxes',
+        'monthly_loan_payments', 'monthly_available'
+    ],
+    'net_worth_snapshot': [
+        'total_income', 'total_taxable_income', 'total_expenses', 'portfolio_value',
+        'total_invested', 'total_debt', 'account_net_worth', 'net_worth'
+    ],
+}
+
+@migration(7, 'Store money as integer cents')
+def money_to_cents(context):
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            context.convert_to_cents(table, column)
+
+@migration(8, 'Full-text search index on transaction category and description')
+def transaction_search_index(context):
+    # External-content FTS5 table: the text lives in "transaction", the index only stores tokens
+    context.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS transaction_fts USING fts5(
+            category, description,
+            content='transaction', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    context.execute("""
+        CREATE TRIGGER IF NOT EXISTS transaction_fts_insert AFTER INSERT ON "transaction" BEGIN
+            INSERT INTO transaction_fts(rowid, category, description)
+            VALUES (new.id, new.category, new.description);
+        END
+    """)
+    context.execute("""
+        CREATE TRIGGER IF NOT EXISTS transaction_fts_delete AFTER DELETE ON "transaction" BEGIN
+            INSERT INTO transaction_fts(transaction_fts, rowid, category, description)
+            VALUES ('delete', old.id, old.category, old.description);
+        END
+    """)
+    context.execute("""
+        CREATE TRIGGER IF NOT EXISTS transaction_fts_update AFTER UPDATE OF category, description ON "transaction" BEGIN
+            INSERT INTO transaction_fts(transaction_fts, rowid, category, description)
+            VALUES ('delete', old.id, old.category, old.description);
+            INSERT INTO transaction_fts(rowid, category, description)
+            VALUES (new.id, new.category, new.description);
+        END
+    """)
+    context.conn.commit()
+
+    # Index existing rows batch by batch (rows inserted from here on go through the trigger)
+    if context.execute('SELECT COUNT(*) FROM transaction_fts_docsize').scalar():
+        # Partly indexed by an interrupted run: rebuild from the content table in one pass
+        context.execute("INSERT INTO transaction_fts(transaction_fts) VALUES ('rebuild')")
+        return
+    for start, end in context.batches('transaction', 'Indexing transactions for search'):
+        context.execute(
+            'INSERT INTO transaction_fts(rowid, category, description) '
+            'SELECT id, category, description FROM "transaction" WHERE rowid >= ? AND rowid < ?',
+            (start, end)
+        )
+
+@migration(9, 'Recurring series tables')
+def recurring_series_tables(context):
+    """recurring_series and recurring_scan come from create_all(); utils/recurring.py fills them on first use"""
+
+@migration(10, 'Background job table')
+def job_table(context):
+    """The job table comes from create_all() (see utils/jobs.py)"""
+
+@migration(11, 'Loan scheduler processed-period markers')
+def processed_period_table(context):
+    """The processed_period table comes from create_all() (see utils/loan_scheduler.py)"""
+
+# "Payment on Car - Interest: $12.34, Principal: $56.78" (routes/loans.py, utils/loan_payments.py)
+LOAN_PAYMENT_DESCRIPTION = re.compile(
+    r'^(?:Payment|Automatic payment) on (?P<name>.+) - Interest: \$(?P<interest>-?[\d.]+), Principal: \$(?P<principal>-?[\d.]+)$'
+)
+
+@migration(12, 'Loan payment history rebuilt from Loan Payment transactions')
+def loan_payment_history(context):
+    """
+    loan_payment comes from create_all(). Existing payments only survive as
+    transaction descriptions, so parse those batch by batch, matching the loan
+    by name (loans renamed, deleted or sharing a name are skipped). balance_after
+    is worked back from each loan's current balance.
+    """
+    from utils.money import to_cents
+    loans = {}
+    for loan_id, name in context.execute('SELECT id, name FROM loan').fetchall():
+        loans[name] = None if name in loans else loan_id  # Ambiguous names match nothing
+    if not any(loans.values()):
+        return
+
+    recorded = skipped = 0
+    for start, end in context.batches('transaction', 'Rebuilding loan payment history'):
+        rows = context.execute(
+            'SELECT id, date, amount, account_id, description FROM "transaction" '
+            "WHERE rowid >= ? AND rowid < ? AND category = 'Loan Payment'",
+            (start, end)
+        ).fetchall()
+        payments = []
+        for transaction_id, day, amount, account_id, description in rows:
+            match = LOAN_PAYMENT_DESCRIPTION.match(description or '')
+            loan_id = loans.get(match['name']) if match else None
+            if loan_id is None:
+                skipped += 1
+                continue
+            # Transactions were recorded uncapped; the split is what reached the loan
+            interest, principal = to_cents(match['interest']), to_cents(match['principal'])
+            payments.append((loan_id, day, min(amount, interest + principal), interest, principal,
+                             account_id, transaction_id))
+        if payments:
+            # INSERT OR IGNORE on the unique transaction_id makes a re-run after an interruption safe
+            context.conn.exec_driver_sql(
+                'INSERT OR IGNORE INTO loan_payment '
+                '(loan_id, date, amount, interest, principal, account_id, transaction_id, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)',
+                payments
+            )
+            recorded += len(payments)
+
+    # The newest payment left the current balance; each older one left that plus the principal paid since
+    context.execute("""
+        UPDATE loan_payment SET balance_after = rebuilt.balance_after
+        FROM (
+            SELECT loan_payment.id,
+                   loan.balance + COALESCE(SUM(loan_payment.principal) OVER (
+                       PARTITION BY loan_payment.loan_id ORDER BY loan_payment.date DESC, loan_payment.id DESC
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ), 0) AS balance_after
+            FROM loan_payment JOIN loan ON loan.id = loan_payment.loan_id
+            WHERE loan_payment.balance_after IS NULL
+        ) AS rebuilt
+        WHERE loan_payment.id = rebuilt.id
+    """)
+    print(f"  Loan payments recorded: {recorded}, transactions not matched to a loan: {skipped}")
+
+@migration(13, 'Category table with transaction.category_id')
+def category_ids(context):
+    """
+    category comes from create_all(). Every spelling in use is folded to its
+    canonical name (utils/categories.py); the most used spelling of each becomes
+    the category's name. category_id is then filled in batches, and the few rows
+    spelled differently are renamed to match (each rename also updates the
+    search index through its trigger, so untouched rows are left alone).
+    """
+    from utils.categories import canonical_name, display_name
+    context.add_column('transaction', 'category_id', 'INTEGER REFERENCES category(id)')
+    context.create_index('ix_transaction_category_id', 'transaction', 'category_id')
+
+    spellings = context.execute('SELECT category, COUNT(*) FROM "transaction" GROUP BY category').fetchall()
+    names = {}
+    for spelling, count in sorted(spellings, key=lambda row: (-row[1], row[0] or '')):
+        names.setdefault(canonical_name(spelling) or 'other', display_name(spelling) or 'Other')
+    if names:
+        context.conn.exec_driver_sql(
+            'INSERT OR IGNORE INTO category (name, canonical_name, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+            [(name, canonical) for canonical, name in names.items()]
+        )
+
+    # Categories already there (an interrupted run) keep their id and name
+    categories = {canonical: (category_id, name) for category_id, name, canonical in
+                  context.execute('SELECT id, name, canonical_name FROM category').fetchall()}
+    context.execute('DROP TABLE IF EXISTS temp.category_spelling')
+    context.execute('CREATE TEMP TABLE category_spelling (spelling TEXT PRIMARY KEY, category_id INTEGER, name TEXT)')
+    rows = []
+    for spelling, _ in spellings:
+        canonical = canonical_name(spelling) or 'other'
+        rows.append((spelling,) + categories[canonical])
+    if rows:
+        context.conn.exec_driver_sql('INSERT INTO temp.category_spelling VALUES (?, ?, ?)', rows)
+
+    context.backfill_in_batches(
+        'transaction',
+        'category_id = (SELECT category_id FROM temp.category_spelling WHERE spelling = "transaction".category)',
+        where='category_id IS NULL',
+        description='Linking transactions to categories'
+    )
+    renamed = context.backfill_in_batches(
+        'transaction',
+        'category = (SELECT name FROM temp.category_spelling WHERE spelling = "transaction".category)',
+        where='category IN (SELECT spelling FROM temp.category_spelling WHERE name <> spelling)',
+        description='Renaming category spellings'
+    )
+    context.execute('DROP TABLE temp.category_spelling')
+    print(f"  Categories: {len(categories)}, transactions renamed to their category's spelling: {renamed}")
+
+@migration(14, 'Transaction ids never reused (AUTOINCREMENT)')
+def transaction_autoincrement(context):
+    """
+    Without AUTOINCREMENT SQLite hands the highest id out again once that row is
+    deleted, and a row reusing it hides below the net worth snapshot watermark.
+    AUTOINCREMENT cannot be added in place, so "transaction" is rebuilt from the
+    model in one transaction: copy the rows (ids unchanged, so the search index
+    still matches), drop the old table, rename, and recreate its indexes and
+    triggers. Snapshots may have missed a row that reused an id: they are kept
+    (with their holdings history) and flagged so the next NetWorthSnapshotter.update()
+    refolds their totals from SQLite and the archived years.
+    """
+    from sqlalchemy.schema import CreateTable
+    from models.transaction import Transaction
+    table_sql = context.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transaction'"
+    ).scalar()
+    if 'AUTOINCREMENT' in table_sql.upper():
+        return
+
+    dependents = [sql for (sql,) in context.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'transaction' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ).fetchall()]
+    create = str(CreateTable(Transaction.__table__).compile(dialect=context.conn.dialect))
+    columns = ', '.join(f'"{column}"' for column in context.columns('transaction'))
+    context.execute('DROP TABLE IF EXISTS transaction_rebuild')
+    context.execute(create.replace('CREATE TABLE "transaction"', 'CREATE TABLE transaction_rebuild', 1))
+    context.execute(f'INSERT INTO transaction_rebuild ({columns}) SELECT {columns} FROM "transaction"')
+    context.execute('DROP TABLE "transaction"')
+    context.execute('ALTER TABLE transaction_rebuild RENAME TO "transaction"')
+    for sql in dependents:
+        context.execute(sql)
+    context.execute('UPDATE net_worth_snapshot SET last_transaction_id = -1')  # utils.net_worth.REFOLD_TOTALS
+    context.conn.commit()
@@ -0,0 +1,52 @@
+"""
+Fixed-point money.
+
+Money columns store whole cents in a 64-bit INTEGER column, so SQLite sums
+them with exact integer arithmetic. Models and templates still see dollars
+(cents / 100), which keeps existing formatting and arithmetic working. Code
+that needs exact totals or comparisons should work in cents: select
+cents(column) in SQL, or convert with to_cents() in Python.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.types import BigInteger, TypeDecorator
+from database import db
+
+_CENT = Decimal(1)
+
+def to_cents(value):
+    """Dollars (float, int, str or Decimal) to integer cents, rounding half away from zero"""
+    if value is None:
+        return None
+    # str() gives the shortest repr of a float, so 1.005 rounds to 101 rather than 100
+    return int((Decimal(str(value)) * 100).quantize(_CENT, rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    """Integer cents to dollars"""
+    if cents is None:
+        return None
+    return int(cents) / 100
+
+class Money(TypeDecorator):
+    """Dollar amount stored as int64 cents"""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return from_cents(value)
+
+def cents(expression):
+    """SQL expression for the raw cents behind a Money column or expression (no conversion to dollars)"""
+    return db.type_coerce(expression, BigInteger)
+
+def cents_array(statement, count=-1):
+    """
+    Run a statement selecting a single cents() column and load the result straight
+    into a NumPy int64 array. Totals computed from it (arr.sum()) are exact.
+    """
+    import numpy as np
+    result = db.session.execute(statement)
+    return np.fromiter((row[0] or 0 for row in result), dtype=np.int64, count=count)
@@ -0,0 +1,290 @@
+from datetime import date, timedelta
+from database import db
+from models.transaction import Transaction
+from models.loan import Loan
+from models.investment import Investment
+from models.account import Account
+from models.net_worth_snapshot import NetWorthSnapshot
+from utils.jobs import job_type
+from utils.money import cents, from_cents, to_cents
+
+# last_transaction_id of snapshots whose income/expense totals must be refolded from
+# the ledger before use (set by migration 14); their holdings history is kept
+REFOLD_TOTALS = -1
+
+class NetWorthSnapshotter:
+    """Keep one NetWorthSnapshot per day, folding in only activity since the last snapshot"""
+
+    def _daily_totals_query(self):
+        """Per-day income, taxable income and expense sums in integer cents"""
+        amount = cents(Transaction.amount)
+        income = db.case((Transaction.transaction_type == 'income', amount), else_=0)
+        taxable = db.case(
+            ((Transaction.transaction_type == 'income') & (Transaction.is_taxable == True), amount),
+            else_=0
+        )
+        expense = db.case((Transaction.transaction_type == 'expense', amount), else_=0)
+        return db.session.query(
+            Transaction.date,
+            db.func.sum(income),
+            db.func.sum(taxable),
+            db.func.sum(expense)
+        ).group_by(Transaction.date)
+
+    def _current_holdings(self):
+        """Portfolio, debt and account totals as they stand right now (small tables, SQL aggregates)"""
+        portfolio_value = db.session.query(
+            db.func.sum(Investment.shares * Investment.current_price)
+        ).scalar() or 0.0
+        total_invested = db.session.query(
+            db.func.sum(Investment.shares * Investment.cost_basis)
+        ).scalar() or 0.0
+        total_debt = db.session.query(db.func.sum(Loan.balance)).scalar() or 0.0
+        return {
+            'portfolio_value': portfolio_value,
+            'total_invested': total_invested,
+            'total_debt': total_debt,
+            'account_net_worth': Account.get_net_worth()
+        }
+
+    def _shift_from(self, from_date, income, taxable, expenses):
+        """Add a transaction delta (in cents) to every existing snapshot on or after from_date"""
+        if not (income or taxable or expenses):
+            return
+        NetWorthSnapshot.query.filter(NetWorthSnapshot.snapshot_date >= from_date).update({
+            NetWorthSnapshot.total_income: cents(NetWorthSnapshot.total_income) + income,
+            NetWorthSnapshot.total_taxable_income: cents(NetWorthSnapshot.total_taxable_income) + taxable,
+            NetWorthSnapshot.total_expenses: cents(NetWorthSnapshot.total_expenses) + expenses,
+            NetWorthSnapshot.net_worth: cents(NetWorthSnapshot.net_worth) + (income - expenses)
+        }, synchronize_session=False)
+
+    @staticmethod
+    def _with_archived_days(daily, today):
+        """daily plus the per-day totals of archived transactions (utils/archive.py), in cents"""
+        from utils.archive import transaction_archive
+        merged = dict(daily)
+        for day, (income, taxable, expenses) in transaction_archive.daily_totals().items():
+            if day > today:
+                continue
+            hot = merged.get(day, (0, 0, 0))
+            merged[day] = (hot[0] + income, hot[1] + taxable, hot[2] + expenses)
+        return merged
+
+    def latest(self):
+        return NetWorthSnapshot.query.order_by(NetWorthSnapshot.snapshot_date.desc()).first()
+
+    def update(self, today=None):
+        """
+        Bring the snapshot table up to date and return today's snapshot.
+        Only transactions with an id above the stored watermark, or dated after the
+        last snapshot, are read. Missing days are backfilled with a single bulk insert.
+        An empty table is built from the archived years plus every row in SQLite.
+        """
+        today = today or date.today()
+        last = self.latest()
+        if last and last.last_transaction_id == REFOLD_TOTALS:
+            self.refold_totals()
+            last = self.latest()
+        last_id = last.last_transaction_id if last else 0
+        max_id = db.session.query(db.func.max(Transaction.id)).scalar() or 0
+
+        # Back-dated rows added since the last run shift the existing history forward
+        if last and max_id > last_id:
+            backdated = self._daily_totals_query().filter(
+                Transaction.id > last_id,
+                Transaction.date <= last.snapshot_date
+            ).all()
+            for day, income, taxable, expenses in backdated:
+                self._shift_from(day, income or 0, taxable or 0, expenses or 0)
+            db.session.flush()
+            db.session.refresh(last)
+
+        # Days that have no snapshot yet
+        new_days_query = self._daily_totals_query().filter(Transaction.date <= today)
+        if last:
+            new_days_query = new_days_query.filter(Transaction.date > last.snapshot_date)
+        daily = {day: (income or 0, taxable or 0, expenses or 0) for day, income, taxable, expenses in new_days_query.all()}
+        if not last:
+            # A first build (or a rebuild) starts from the archived years, which are no longer in SQLite
+            daily = self._with_archived_days(daily, today)
+
+        holdings = self._current_holdings()
+
+        if last:
+            start = last.snapshot_date + timedelta(days=1)
+            running_income = to_cents(last.total_income)
+            running_taxable = to_cents(last.total_taxable_income)
+            running_expenses = to_cents(last.total_expenses)
+            carried = {
+                'portfolio_value': last.portfolio_value,
+                'total_invested': last.total_invested,
+                'total_debt': last.total_debt,
+                'account_net_worth': last.account_net_worth
+            }
+        else:
+            start = min(daily) if daily else today
+            running_income = running_taxable = running_expenses = 0
+            carried = holdings
+
+        new_rows = []
+        day = start
+        while day <= today:
+            income, taxable, expenses = daily.get(day, (0, 0, 0))
+            running_income += income
+            running_taxable += taxable
+            running_expenses += expenses
+            # Holdings have no history; past days carry the last observed values forward
+            day_holdings = holdings if day == today else carried
+            new_rows.append({
+                'snapshot_date': day,
+                'total_income': from_cents(running_income),
+                'total_taxable_income': from_cents(running_taxable),
+                'total_expenses': from_cents(running_expenses),
+                'portfolio_value': day_holdings['portfolio_value'],
+                'total_invested': day_holdings['total_invested'],
+                'total_debt': day_holdings['total_debt'],
+                'account_net_worth': day_holdings['account_net_worth'],
+                'net_worth': from_cents(
+                    running_income - running_expenses
+                    + to_cents(day_holdings['portfolio_value']) - to_cents(day_holdings['total_debt'])
+                ),
+                'last_transaction_id': max_id
+            })
+            day += timedelta(days=1)
+
+        if new_rows:
+            db.session.execute(db.insert(NetWorthSnapshot), new_rows)
+        elif last:
+            # Today's row already exists - refresh holdings that may have changed since
+            last.portfolio_value = holdings['portfolio_value']
+            last.total_invested = holdings['total_invested']
+            last.total_debt = holdings['total_debt']
+            last.account_net_worth = holdings['account_net_worth']
+            last.net_worth = from_cents(
+                to_cents(last.total_income) - to_cents(last.total_expenses)
+                + to_cents(last.portfolio_value) - to_cents(last.total_debt)
+            )
+            last.last_transaction_id = max_id
+
+        db.session.commit()
+        return NetWorthSnapshot.query.filter_by(snapshot_date=today).first() or self.latest()
+
+    def refold_totals(self):
+        """
+        Recompute every snapshot's income, taxable income and expense totals from
+        the archived years plus the rows in SQLite, keeping the holdings each day
+        recorded. Used when the stored totals cannot be trusted (migration 14).
+        """
+        daily = self._with_archived_days({
+            day: (income or 0, taxable or 0, expenses or 0)
+            for day, income, taxable, expenses in self._daily_totals_query().all()
+        }, date.max)
+        max_id = db.session.query(db.func.max(Transaction.id)).scalar() or 0
+        days = sorted(daily)
+        position = 0
+        running_income = running_taxable = running_expenses = 0
+        rows = []
+        for snapshot in NetWorthSnapshot.query.order_by(NetWorthSnapshot.snapshot_date):
+            while position < len(days) and days[position] <= snapshot.snapshot_date:
+                income, taxable, expenses = daily[days[position]]
+                running_income += income
+                running_taxable += taxable
+                running_expenses += expenses
+                position += 1
+            rows.append({
+                'id': snapshot.id,
+                'total_income': from_cents(running_income),
+                'total_taxable_income': from_cents(running_taxable),
+                'total_expenses': from_cents(running_expenses),
+                'net_worth': from_cents(
+                    running_income - running_expenses
+                    + to_cents(snapshot.portfolio_value) - to_cents(snapshot.total_debt)
+                ),
+                'last_transaction_id': max_id
+            })
+        if rows:
+            db.session.execute(db.update(NetWorthSnapshot), rows)
+        db.session.flush()
+        db.session.expire_all()
+        return len(rows)
+
+    def current(self, today=None):
+        """
+        Today's totals without writing anything: the last stored snapshot plus the
+        transactions update() would fold in next, with holdings as they stand now.
+        Returns an unsaved NetWorthSnapshot. Pages call this; update() runs from
+        the scheduler thread (utils/loan_scheduler.py) and the write paths.
+        """
+        today = today or date.today()
+        last = NetWorthSnapshot.query.filter(NetWorthSnapshot.snapshot_date <= today).order_by(
+            NetWorthSnapshot.snapshot_date.desc()
+        ).first()
+        if last and last.last_transaction_id == REFOLD_TOTALS:
+            last = None  # Its totals are stale until update() refolds them; count everything
+        amount = cents(Transaction.amount)
+        pending = db.session.query(
+            db.func.sum(db.case((Transaction.transaction_type == 'income', amount), else_=0)),
+            db.func.sum(db.case(
+                ((Transaction.transaction_type == 'income') & (Transaction.is_taxable == True), amount), else_=0
+            )),
+            db.func.sum(db.case((Transaction.transaction_type == 'expense', amount), else_=0)),
+            db.func.max(Transaction.id)
+        ).filter(Transaction.date <= today)
+        if last:
+            # Added since the watermark (back-dated or not), or dated after the last snapshot
+            pending = pending.filter(db.or_(
+                Transaction.id > last.last_transaction_id, Transaction.date > last.snapshot_date
+            ))
+        income, taxable, expenses, max_id = pending.one()
+        if not last:
+            archived = self._with_archived_days({}, today).values()
+            income = (income or 0) + sum(day[0] for day in archived)
+            taxable = (taxable or 0) + sum(day[1] for day in archived)
+            expenses = (expenses or 0) + sum(day[2] for day in archived)
+        income = (income or 0) + (to_cents(last.total_income) if last else 0)
+        taxable = (taxable or 0) + (to_cents(last.total_taxable_income) if last else 0)
+        expenses = (expenses or 0) + (to_cents(last.total_expenses) if last else 0)
+        holdings = self._current_holdings()
+        return NetWorthSnapshot(
+            snapshot_date=today,
+            total_income=from_cents(income),
+            total_taxable_income=from_cents(taxable),
+            total_expenses=from_cents(expenses),
+            portfolio_value=holdings['portfolio_value'],
+            total_invested=holdings['total_invested'],
+            total_debt=holdings['total_debt'],
+            account_net_worth=holdings['account_net_worth'],
+            net_worth=from_cents(
+                income - expenses + to_cents(holdings['portfolio_value']) - to_cents(holdings['total_debt'])
+            ),
+            last_transaction_id=max(max_id or 0, last.last_transaction_id if last else 0)
+        )
+
+    def record_removed_transaction(self, transaction):
+        """Back a deleted transaction out of every snapshot that already includes it"""
+        last = self.latest()
+        if not last or transaction.id > last.last_transaction_id or transaction.date > last.snapshot_date:
+            return  # Not folded in yet; once deleted, update() will never see it
+        amount = to_cents(transaction.amount)
+        income = amount if transaction.transaction_type == 'income' else 0
+        taxable = income if transaction.is_taxable else 0
+        expenses = amount if transaction.transaction_type == 'expense' else 0
+        self._shift_from(transaction.date, -income, -taxable, -expenses)
+
+    def history(self, start_date=None, end_date=None):
+        """Daily snapshots between two dates (inclusive), oldest first"""
+        query = NetWorthSnapshot.query
+        if start_date:
+            query = query.filter(NetWorthSnapshot.snapshot_date >= start_date)
+        if end_date:
+            query = query.filter(NetWorthSnapshot.snapshot_date <= end_date)
+        return query.order_by(NetWorthSnapshot.snapshot_date).all()
+
+@job_type('net_worth_rebuild')
+def rebuild_net_worth_snapshots(context):
+    """Drop the daily snapshots and rebuild the whole history from the ledger and the archived years (thread job)"""
+    context.progress(0, message='Clearing snapshots')
+    removed = NetWorthSnapshot.query.delete()
+    context.progress(0.1, message='Rebuilding daily snapshots')
+    snapshot = NetWorthSnapshotter().update()
+    return {'removed': removed, 'snapshots': NetWorthSnapshot.query.count(), 'net_worth': snapshot.net_worth}
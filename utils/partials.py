@@ -0,0 +1,56 @@
+"""
+Partial responses for the write routes.
+
+A plain form post still gets flash() and a redirect, which re-renders the
+whole page. A request that asks for less gets only what changed:
+
+  - HX-Request: true  -> the changed row rendered as an HTML fragment (empty
+    when the row went away), with an X-Partial-Update header carrying
+    {message, category, collection, removed, summary} as JSON
+  - Accept preferring application/json -> the same as a JSON body, with the
+    row as to_dict()
+
+The row fragment and the summary numbers are passed as callables, so a plain
+redirect never computes them. static/js/main.js submits forms marked
+data-partial this way and patches the page: the row with the same data-row is
+replaced (or the new one prepended to [data-partial-rows=collection]), a
+removed row is dropped and every [data-summary=key] element gets its new value.
+"""
+
+import json
+from flask import flash, jsonify, redirect, request
+
+def partial_format():
+    """'fragment', 'json' or None (full-page redirect) for the current request"""
+    if request.headers.get('HX-Request') == 'true':
+        return 'fragment'
+    accept = request.accept_mimetypes
+    if accept.best_match(['text/html', 'application/json']) == 'application/json' \
+            and accept['application/json'] > accept['text/html']:
+        return 'json'
+    return None
+
+def partial_response(redirect_to, message, category='success', collection=None, item=None,
+                     fragment=None, removed=None, summary=None):
+    """
+    Finish a write. redirect_to and message are what a plain post gets (as a
+    flash); item is the changed row (JSON: item.to_dict()), fragment() renders
+    it as HTML, removed is the data-row key of a deleted row and summary()
+    returns the page's affected totals. Errors (category 'error') answer 400.
+    """
+    mode = partial_format()
+    if mode is None:
+        flash(message, category)
+        return redirect(redirect_to)
+
+    status = 400 if category == 'error' else 200
+    update = {'message': message, 'category': category, 'collection': collection, 'removed': removed}
+    if status == 200 and summary is not None:
+        update['summary'] = summary()
+
+    if mode == 'json':
+        body = dict(update, success=status == 200, row=item.to_dict() if item is not None and status == 200 else None)
+        return jsonify(body), status
+
+    html = fragment() if fragment is not None and status == 200 else ''
+    return html, status, {'X-Partial-Update': json.dumps(update), 'Content-Type': 'text/html; charset=utf-8'}
@@ -0,0 +1,299 @@
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from database import FileStampedCache, db
+from models.transaction import Transaction
+from utils.money import cents, from_cents
+# Imported before the listeners below are registered, so the ledger cache applies
+# each commit before cached summaries are invalidated and recomputed from it
+from utils.ledger_cache import ledger_cache
+from utils.archive import transaction_archive
+from utils.categories import category_names
+from utils.tenants import tenant_cache
+
+TIME_FRAMES = ['current_month', 'last_month', 'last_3_months', 'last_6_months', 'year_to_date']
+
+def resolve_time_frame(time_frame, start_date=None, end_date=None, today=None):
+    """
+    Turn a dashboard time_frame (plus optional custom dates) into a date range.
+    Returns tuple: (time_frame, period_start, period_end, period_name)
+    """
+    today = today or datetime.now()
+
+    if time_frame == 'current_month':
+        period_start = today.replace(day=1).date()
+        period_end = ((today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)).date()
+        period_name = "This Month"
+    elif time_frame == 'last_month':
+        first_of_current = today.replace(day=1)
+        first_of_last = (first_of_current - timedelta(days=1)).replace(day=1)
+        period_start = first_of_last.date()
+        period_end = (first_of_current - timedelta(days=1)).date()
+        period_name = "Last Month"
+    elif time_frame == 'last_3_months':
+        period_end = today.date()
+        period_start = (today - timedelta(days=90)).date()
+        period_name = "Last 3 Months"
+    elif time_frame == 'last_6_months':
+        period_end = today.date()
+        period_start = (today - timedelta(days=180)).date()
+        period_name = "Last 6 Months"
+    elif time_frame == 'year_to_date':
+        period_start = today.replace(month=1, day=1).date()
+        period_end = today.date()
+        period_name = "Year to Date"
+    elif time_frame == 'custom' and start_date and end_date:
+        period_start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        period_end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        period_name = f"{period_start.strftime('%m/%d/%Y')} - {period_end.strftime('%m/%d/%Y')}"
+    else:
+        # Default to current month
+        return resolve_time_frame('current_month', today=today)
+
+    return time_frame, period_start, period_end, period_name
+
+# Summaries are built and cached in integer cents, so merging month blocks is exact
+MONEY_KEYS = ('income', 'taxable_income', 'expenses')
+
+def _empty_summary():
+    return {
+        'income': 0,
+        'taxable_income': 0,
+        'expenses': 0,
+        'transaction_count': 0,
+        'expense_count': 0,
+        'expenses_by_category': {}
+    }
+
+def _merge(target, other):
+    """Add one summary into another in place"""
+    for key in ('income', 'taxable_income', 'expenses', 'transaction_count', 'expense_count'):
+        target[key] += other[key]
+    for category, amount in other['expenses_by_category'].items():
+        target['expenses_by_category'][category] = target['expenses_by_category'].get(category, 0) + amount
+    return target
+
+def _in_dollars(summary):
+    """Copy of a cents summary with money values in dollars"""
+    result = dict(summary)
+    for key in MONEY_KEYS:
+        result[key] = from_cents(summary[key])
+    result['expenses_by_category'] = {
+        category: from_cents(amount) for category, amount in summary['expenses_by_category'].items()
+    }
+    return result
+
+def _month_end(year, month):
+    if month == 12:
+        return date(year, 12, 31)
+    return date(year, month + 1, 1) - timedelta(days=1)
+
+def sql_summary_cents(start, end):
+    """Aggregate one date range in SQL (single GROUP BY, integer SUM, no ORM hydration)"""
+    rows = db.session.query(
+        Transaction.transaction_type,
+        Transaction.is_taxable,
+        Transaction.category_id,
+        db.func.sum(cents(Transaction.amount)),
+        db.func.count(Transaction.id)
+    ).filter(
+        Transaction.date >= start,
+        Transaction.date <= end
+    ).group_by(
+        Transaction.transaction_type,
+        Transaction.is_taxable,
+        Transaction.category_id
+    ).all()
+    names = category_names([row[2] for row in rows])
+
+    summary = _empty_summary()
+    for transaction_type, is_taxable, category_id, total, count in rows:
+        category = names.get(category_id, 'Other')
+        total = total or 0
+        summary['transaction_count'] += count
+        if transaction_type == 'income':
+            summary['income'] += total
+            if is_taxable:
+                summary['taxable_income'] += total
+        elif transaction_type == 'expense':
+            summary['expenses'] += total
+            summary['expense_count'] += count
+            by_category = summary['expenses_by_category']
+            by_category[category] = by_category.get(category, 0) + total
+    return summary
+
+def stored_summary_cents(start, end):
+    """Summary of hot SQLite rows plus any archived cold partitions in the range"""
+    summary = sql_summary_cents(start, end)
+    if transaction_archive.years():
+        _merge(summary, transaction_archive.range_summary(start, end))
+    return summary
+
+def _query_cents(start, end):
+    """Summary of one date range, from the columnar ledger cache when it is enabled"""
+    if ledger_cache.enabled:
+        return ledger_cache.range_summary(start, end)
+    return stored_summary_cents(start, end)
+
+def query_summary(start, end):
+    """Summary of one date range straight from SQL, money in dollars"""
+    return _in_dollars(_query_cents(start, end))
+
+class PeriodSummaryCache(FileStampedCache):
+    """
+    Thread-safe cache of income/expense/taxable totals and category breakdowns.
+    Whole calendar months are cached as blocks; each predefined time_frame is cached
+    for its current date range. A transaction write only evicts the month block and
+    the time frames whose range contains that transaction's date. A write from
+    another process (seen as a change of the database file) drops everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._months = {}  # (year, month) -> summary
+        self._frames = {}  # time_frame -> (start, end, summary)
+        self._generation = 0  # Bumped on every invalidation so stale results are never stored
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _month_block(self, year, month):
+        key = (year, month)
+        with self._lock:
+            cached = self._months.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            generation = self._generation
+        summary = _query_cents(date(year, month, 1), _month_end(year, month))
+        with self._lock:
+            if generation == self._generation:
+                self._months[key] = summary
+        return summary
+
+    def _summarize_cents(self, start, end):
+        summary = _empty_summary()
+        cursor = start
+        while cursor <= end:
+            month_end = _month_end(cursor.year, cursor.month)
+            if cursor.day == 1 and month_end <= end:
+                _merge(summary, self._month_block(cursor.year, cursor.month))
+            else:
+                # Partial month at either edge of the range
+                _merge(summary, _query_cents(cursor, min(month_end, end)))
+            cursor = month_end + timedelta(days=1)
+        return summary
+
+    def summarize(self, start, end):
+        """Summary for an arbitrary range: cached whole-month blocks plus partial-month edges"""
+        self.check_file()
+        return _in_dollars(self._summarize_cents(start, end))
+
+    def get(self, time_frame, start, end):
+        """Summary for a dashboard time frame; custom ranges are assembled from month blocks"""
+        if time_frame not in TIME_FRAMES:
+            return self.summarize(start, end)
+        self.check_file()
+
+        with self._lock:
+            cached = self._frames.get(time_frame)
+            if cached is not None and cached[0] == start and cached[1] == end:
+                self.hits += 1
+                return _in_dollars(cached[2])
+            self.misses += 1
+            generation = self._generation
+
+        summary = self._summarize_cents(start, end)
+        with self._lock:
+            if generation == self._generation:
+                self._frames[time_frame] = (start, end, summary)
+        return _in_dollars(summary)
+
+    def invalidate(self, dates):
+        """Evict every cached block whose range contains one of the given dates"""
+        dates = set(dates)
+        if not dates:
+            return
+        with self._lock:
+            self._generation += 1
+            for changed in dates:
+                if self._months.pop((changed.year, changed.month), None) is not None:
+                    self.invalidations += 1
+            for time_frame, (start, end, _) in list(self._frames.items()):
+                if any(start <= changed <= end for changed in dates):
+                    del self._frames[time_frame]
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._months.clear()
+            self._frames.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'external_changes': self.external_changes,
+                'cached_months': len(self._months),
+                'cached_time_frames': sorted(self._frames)
+            }
+
+period_cache = PeriodSummaryCache()
+
+def current_period_cache():
+    """The cache for the active database: period_cache, or the user's own with MULTI_TENANT (utils/tenants.py)"""
+    return tenant_cache('period_summaries', PeriodSummaryCache, period_cache)
+
+def _touched_transaction_dates(session):
+    """Dates of every Transaction inserted, updated or deleted in this flush (old and new values)"""
+    touched = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Transaction) and obj.date:
+            touched.add(obj.date)
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            history = inspect(obj).attrs.date.history
+            touched.update(d for d in (history.deleted or ()) if d)
+            if obj.date:
+                touched.add(obj.date)
+    return touched
+
+def note_transaction_dates(session, dates):
+    """Invalidate these dates when session commits (for bulk inserts, which skip the flush hooks)"""
+    session.info.setdefault('period_summary_dates', set()).update(dates)
+
+# Called with the set of dates after the period summaries are invalidated, for caches built on them
+_date_listeners = []
+
+def on_committed_transaction_dates(func):
+    """Decorator: call func(dates) with the transaction dates of every commit that touched any"""
+    _date_listeners.append(func)
+    return func
+
+@event.listens_for(Session, 'before_flush')
+def _collect_transaction_dates(session, flush_context, instances):
+    touched = _touched_transaction_dates(session)
+    if touched:
+        session.info.setdefault('period_summary_dates', set()).update(touched)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_period_summaries(session):
+    dates = session.info.pop('period_summary_dates', None)
+    cache = current_period_cache()
+    cache.committed(session)
+    if not dates:
+        return
+    cache.invalidate(dates)
+    for listener in _date_listeners:
+        listener(dates)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_period_summary_dates(session):
+    session.info.pop('period_summary_dates', None)
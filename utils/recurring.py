@@ -0,0 +1,294 @@
+"""
+Recurring transaction detection (rent, subscriptions, paychecks, ...).
+
+Transactions are grouped by type, category and normalized description
+("Netflix #4821" and "NETFLIX 04/23" are both "netflix"), then split into
+amount clusters so a $15 and a $60 charge from the same merchant stay apart.
+A cluster is a series when its sorted date gaps settle on one cadence.
+
+Series are stored in recurring_series. update() only re-reads the merchants that
+got new transactions since the last run (RecurringScan holds the watermark; the
+rows are found through the transaction_fts index), so dashboards and forecasts
+read stored series instead of rescanning history.
+Detection covers the transactions in SQLite; archived years are not read.
+"""
+
+import calendar
+import math
+import re
+import statistics
+import time
+from operator import itemgetter
+from datetime import date, datetime, timedelta
+from database import db
+from models.transaction import Transaction
+from models.recurring_series import RecurringSeries, RecurringScan
+from utils.jobs import job_type
+from utils.money import cents, from_cents
+
+# name, period in days, tolerance in days, minimum occurrences
+CADENCES = [
+    ('weekly', 7, 1, 3),
+    ('biweekly', 14, 2, 3),
+    ('monthly', 30.44, 4, 3),
+    ('annual', 365.25, 10, 2),
+]
+MIN_CONFIDENCE = 0.6  # Share of gaps on cadence, and of expected occurrences seen
+AMOUNT_TOLERANCE = 0.15  # Amounts within 15% of their neighbour share a cluster, and of the median in a series
+PAIR_AMOUNT_TOLERANCE = 0.02  # Series seen only twice (annual) need near-identical amounts
+# Rescanning more groups than this at once is done as a full rebuild (one table scan)
+MAX_INCREMENTAL_GROUPS = 500
+# julianday() of the day before date.fromordinal(1)
+ORDINAL_JULIAN_DAY = 1721424.5
+
+_LETTERS = re.compile(r'[^\W\d_]+')
+
+def normalize_description(description):
+    """Merchant key for a description: lowercase words only, numbers and reference codes removed"""
+    return ' '.join(_LETTERS.findall((description or '').lower()))[:200]
+
+def amount_bucket(amount_cents):
+    """Logarithmic bucket of an amount, ~15% wide, used in the series key"""
+    return int(math.log(max(abs(amount_cents), 1), 1 + AMOUNT_TOLERANCE))
+
+def add_months(day, months):
+    """Same day of month, months later (clamped to the end of shorter months)"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def next_occurrence(last_date, cadence, interval_days):
+    if cadence == 'monthly':
+        return add_months(last_date, 1)
+    if cadence == 'annual':
+        return add_months(last_date, 12)
+    return last_date + timedelta(days=round(interval_days))
+
+_by_amount = itemgetter(2)
+
+def _amount_clusters(rows):
+    """Split rows (sorted by amount) wherever an amount jumps by more than AMOUNT_TOLERANCE"""
+    cluster = [rows[0]]
+    for row in rows[1:]:
+        if row[2] > cluster[-1][2] * (1 + AMOUNT_TOLERANCE) + 1:
+            yield cluster
+            cluster = []
+        cluster.append(row)
+    yield cluster
+
+def analyze(rows):
+    """
+    Cadence of one cluster of detection rows (see detect()), or None if it is
+    not recurring. Same-day duplicates count once.
+    """
+    days = sorted({row[1] for row in rows})
+    if len(days) < 2:
+        return None
+    gaps = [later - earlier for earlier, later in zip(days, days[1:])]
+    median_gap = statistics.median(gaps)
+    for name, period, tolerance, min_occurrences in CADENCES:
+        if abs(median_gap - period) > tolerance:
+            continue
+        if len(days) < min_occurrences:
+            return None
+        # Most gaps on cadence, and no long silences (expected vs seen occurrences)
+        on_cadence = sum(1 for gap in gaps if abs(gap - period) <= tolerance) / len(gaps)
+        coverage = len(days) / (round((days[-1] - days[0]) / period) + 1)
+        confidence = min(on_cadence, coverage)
+        if confidence < MIN_CONFIDENCE:
+            return None
+        # Recurring amounts are (nearly) fixed; a pair of dates needs a near-exact amount match
+        amounts = [row[2] for row in rows]
+        spread = AMOUNT_TOLERANCE if len(days) >= 3 else PAIR_AMOUNT_TOLERANCE
+        if max(amounts) - min(amounts) > spread * statistics.median(amounts):
+            return None
+        latest = max(rows, key=lambda row: (row[1], row[0]))
+        last_date = date.fromordinal(days[-1])
+        return {
+            'cadence': name,
+            'interval_days': float(median_gap),
+            'amount_cents': int(statistics.median(amounts)),
+            'occurrences': len(days),
+            'confidence': round(confidence, 3),
+            'first_date': date.fromordinal(days[0]),
+            'last_date': last_date,
+            'next_date': next_occurrence(last_date, name, median_gap),
+            'description': latest[5],
+            'account_id': latest[6]
+        }
+    return None
+
+def detect(rows, targets=None):
+    """
+    Series found in rows of (id, day ordinal, cents, transaction_type, category, description, account_id).
+    targets optionally limits detection to a set of (transaction_type, category, merchant) groups.
+    Returns {key: series values}.
+    """
+    groups = {}
+    merchants = {}
+    for row in rows:
+        description = row[5]
+        merchant = merchants.get(description)
+        if merchant is None:
+            merchant = merchants[description] = normalize_description(description)
+        groups.setdefault((row[3], row[4], merchant), []).append(row)
+
+    found = {}
+    for group_key, group in groups.items():
+        if len(group) < 2 or (targets is not None and group_key not in targets):
+            continue
+        transaction_type, category, merchant = group_key
+        group.sort(key=_by_amount)
+        for cluster in _amount_clusters(group):
+            if len(cluster) < 2:
+                continue
+            series = analyze(cluster)
+            if not series:
+                continue
+            if series['occurrences'] < 3 and len(cluster) < len(group):
+                continue  # Two matching dates only count for a merchant with no other activity
+            key = f"{transaction_type}|{category}|{merchant}|{amount_bucket(series['amount_cents'])}"
+            if key in found and found[key]['occurrences'] >= series['occurrences']:
+                continue
+            series.update(key=key, transaction_type=transaction_type, category=category, merchant=merchant)
+            found[key] = series
+    return found
+
+class RecurringDetector:
+    """Keep recurring_series in step with the transaction table, rescanning only what changed"""
+
+    def _scan_state(self):
+        state = RecurringScan.query.first()
+        if state is None:
+            state = RecurringScan(last_transaction_id=0)
+            db.session.add(state)
+        return state
+
+    def _rows(self, targets=None):
+        """
+        Detection input: every transaction, or only those that can belong to the
+        target (transaction_type, category, merchant) groups. Merchants are looked
+        up through the full-text index, so an incremental run never scans the table.
+        """
+        # Dates come back as day ordinals: integer gaps, and no date parsing for a million rows
+        day = db.cast(db.func.julianday(Transaction.date) - ORDINAL_JULIAN_DAY, db.Integer)
+        query = db.select(
+            Transaction.id, day, cents(Transaction.amount), Transaction.transaction_type,
+            Transaction.category, Transaction.description, Transaction.account_id
+        )
+        if targets is not None:
+            from utils.search import matches, phrases_query
+            conditions = []
+            match_query = phrases_query('description', {merchant for _, _, merchant in targets if merchant})
+            if match_query:
+                conditions.append(matches(match_query))
+            if any(not merchant for _, _, merchant in targets):
+                # Descriptions without letters normalize to an empty merchant
+                conditions.append(db.or_(
+                    Transaction.description.is_(None),
+                    Transaction.description.op('NOT GLOB')('*[a-zA-Z]*')
+                ))
+            query = query.where(
+                db.tuple_(Transaction.transaction_type, Transaction.category).in_(
+                    list({(transaction_type, category) for transaction_type, category, _ in targets})
+                ),
+                db.or_(*conditions)
+            )
+        return db.session.execute(query).all()
+
+    def _store(self, found, targets=None):
+        """Upsert found series, dropping stored ones (in the rescanned groups) that no longer hold"""
+        existing = RecurringSeries.query
+        if targets is not None:
+            existing = existing.filter(db.tuple_(
+                RecurringSeries.transaction_type, RecurringSeries.category, RecurringSeries.merchant
+            ).in_(list(targets)))
+        stored = {series.key: series for series in existing}
+
+        new_rows = []
+        for key, values in found.items():
+            values = dict(values, amount=from_cents(values.pop('amount_cents')), needs_rescan=False)
+            series = stored.pop(key, None)
+            if series is None:
+                new_rows.append(values)
+                continue
+            for column, value in values.items():
+                setattr(series, column, value)
+        for series in stored.values():
+            db.session.delete(series)
+        if new_rows:
+            db.session.execute(db.insert(RecurringSeries), new_rows)
+
+    def _targets(self, last_id):
+        """(transaction_type, category, merchant) groups with new rows or flagged series"""
+        targets = set(
+            db.session.query(RecurringSeries.transaction_type, RecurringSeries.category, RecurringSeries.merchant)
+            .filter(RecurringSeries.needs_rescan == True).distinct().all()
+        )
+        new_rows = db.session.query(
+            Transaction.transaction_type, Transaction.category, Transaction.description
+        ).filter(Transaction.id > last_id).distinct()
+        for transaction_type, category, description in new_rows:
+            targets.add((transaction_type, category, normalize_description(description)))
+        return {tuple(target) for target in targets}
+
+    def update(self, rebuild=False):
+        """
+        Fold transactions added since the last run into recurring_series.
+        Only the merchants of new rows, plus series flagged by
+        record_removed_transaction(), are re-read. Returns the RecurringScan row.
+        """
+        started = time.perf_counter()
+        state = self._scan_state()
+        max_id = db.session.query(db.func.max(Transaction.id)).scalar() or 0
+
+        targets = None
+        if not rebuild and state.last_transaction_id:
+            targets = self._targets(state.last_transaction_id)
+            if not targets:
+                return state
+            if len(targets) > MAX_INCREMENTAL_GROUPS:
+                targets = None
+        elif not rebuild and state.id is not None and not max_id:
+            return state
+
+        rows = self._rows(targets)
+        self._store(detect(rows, targets), targets)
+
+        state.last_transaction_id = max_id
+        state.scanned_rows = len(rows)
+        state.series_count = RecurringSeries.query.count()
+        state.duration_ms = (time.perf_counter() - started) * 1000
+        state.scanned_at = datetime.utcnow()
+        db.session.commit()
+        return state
+
+    def rebuild(self):
+        """Detect every series from scratch"""
+        return self.update(rebuild=True)
+
+    def record_removed_transaction(self, transaction):
+        """Flag the series a deleted transaction may belong to for the next update()"""
+        RecurringSeries.query.filter_by(
+            transaction_type=transaction.transaction_type,
+            category=transaction.category,
+            merchant=normalize_description(transaction.description)
+        ).update({RecurringSeries.needs_rescan: True}, synchronize_session=False)
+
+    def last_scan(self):
+        """The RecurringScan row of the last update(), or None before the first (read-only)"""
+        return RecurringScan.query.first()
+
+    def series(self, active_only=True, today=None):
+        """Stored series, largest monthly amount first"""
+        today = today or date.today()
+        found = RecurringSeries.query.all()
+        if active_only:
+            found = [series for series in found if series.is_active(today)]
+        return sorted(found, key=lambda series: series.monthly_amount(), reverse=True)
+
+@job_type('recurring_rebuild')
+def rebuild_recurring_series(context):
+    """Re-detect every recurring series from scratch (thread job)"""
+    context.progress(0, message='Detecting recurring series')
+    return RecurringDetector().rebuild().to_dict()
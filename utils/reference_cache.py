@@ -0,0 +1,264 @@
+"""
+Cache for the small reference lookups nearly every page repeats: the active
+accounts, the loans, the active budget and the transaction categories.
+
+Two levels:
+
+  - per request (flask.g): a lookup runs at most once per request
+  - across requests: the rows are loaded once in a private session and kept
+    detached; each request gets its own copies with session.merge(load=False),
+    which costs no query, so routes can read and change them like freshly
+    queried rows
+
+Each lookup depends on one or more tables. Committed ORM writes to Account,
+Loan or Budget (and new, deleted or re-categorised Transactions, for the
+category list) bump that table's generation, and a cached lookup is only used
+while the generations it was loaded under are current. A load that races a
+commit is not stored. While the current session has uncommitted writes to a
+lookup's tables the lookup bypasses the cache, so a request always sees its
+own changes.
+
+Writes from another process (run_loan_scheduler.py from cron, the archive and
+sample-data scripts) fire no hooks here, so each entry is also stamped with the
+database file's modification time (and its -wal file's, if any), read before
+the load; an entry is reloaded once the file has changed since.
+
+REFERENCE_CACHE = False turns the cross-request level off. /api/cache_stats
+reports hits and the queries avoided.
+"""
+
+import threading
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from database import db, file_stamp
+from models.account import Account
+from models.budget import Budget
+from models.loan import Loan
+from models.transaction import Transaction
+from utils.categories import category_names
+from utils.tenants import tenant_cache
+
+# Table generation names for the models lookups depend on
+WATCHED = {Account: 'account', Budget: 'budget', Loan: 'loan', Transaction: 'transaction'}
+
+def _active_accounts(session):
+    return session.query(Account).filter_by(is_active=True).order_by(Account.name).all()
+
+def _loans(session):
+    return session.query(Loan).order_by(Loan.id).all()
+
+def _active_budget(session):
+    return session.query(Budget).filter_by(is_active=True).first()
+
+def _categories(session):
+    # DISTINCT over the integer category_id index; names come from the in-memory category map
+    category_ids = [row[0] for row in session.query(Transaction.category_id).distinct() if row[0] is not None]
+    names = category_names(category_ids, session)
+    return sorted(names.get(category_id, 'Other') for category_id in category_ids)
+
+# name -> (loader, tables it reads, whether the value is ORM rows)
+LOOKUPS = {
+    'active_accounts': (_active_accounts, ('account',), True),
+    'loans': (_loans, ('loan',), True),
+    'active_budget': (_active_budget, ('budget',), True),
+    'categories': (_categories, ('transaction',), False),
+}
+
+class ReferenceCache:
+    """Cross-request store of reference lookups, keyed by table generations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generations = {table: 0 for table in WATCHED.values()}
+        self._entries = {}  # lookup name -> (generations and file stamp it was loaded under, value)
+        self.request_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+        self.external_changes = 0  # Entries reloaded because the file changed outside our commits
+
+    def _stamp(self, tables):
+        return tuple(self._generations[table] for table in tables)
+
+    def get(self, name):
+        """The cached value for a lookup, loading it on a miss (rows come back detached)"""
+        loader, tables, _ = LOOKUPS[name]
+        bind = db.session.get_bind(mapper=inspect(Account))
+        on_disk = file_stamp(bind)
+        with self._lock:
+            stamp = (self._stamp(tables), on_disk)
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            if entry is not None and entry[0][0] == stamp[0]:
+                self.external_changes += 1
+            self.misses += 1
+
+        # A private session, so the rows are never expired by a request's commit
+        with Session(bind=bind) as session:
+            value = loader(session)
+            session.expunge_all()
+
+        with self._lock:
+            if self._stamp(tables) == stamp[0]:
+                self._entries[name] = (stamp, value)
+        return value
+
+    def invalidate(self, tables, new_categories=()):
+        """Bump the generation of every table written by a commit"""
+        tables = set(tables)
+        with self._lock:
+            if 'transaction' not in tables and new_categories:
+                # A new transaction only changes the category list if its category is new
+                entry = self._entries.get('categories')
+                if entry is None or not set(new_categories) <= set(entry[1]):
+                    tables.add('transaction')
+            for table in tables:
+                self._generations[table] += 1
+            for name, (_, deps, _) in LOOKUPS.items():
+                if name in self._entries and tables.intersection(deps):
+                    del self._entries[name]
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for table in self._generations:
+                self._generations[table] += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.request_hits + self.hits + self.misses + self.bypassed
+            return {
+                'request_hits': self.request_hits,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'queries_avoided': self.request_hits + self.hits,
+                'hit_rate': ((self.request_hits + self.hits) / lookups) if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'external_changes': self.external_changes,
+                'generations': dict(self._generations),
+                'cached': sorted(self._entries)
+            }
+
+reference_cache = ReferenceCache()
+
+def current_reference_cache():
+    """The cache for the active database: reference_cache, or the user's own with MULTI_TENANT"""
+    return tenant_cache('reference_data', ReferenceCache, reference_cache)
+
+def _lookup(name):
+    """Memoised for the request; shared across requests unless the session has pending writes it reads"""
+    memo = g.setdefault('reference_data', {})
+    if name in memo:
+        cache = current_reference_cache()
+        with cache._lock:
+            cache.request_hits += 1
+        return memo[name]
+
+    loader, tables, is_rows = LOOKUPS[name]
+    cache = current_reference_cache()
+    pending = _pending_tables(db.session())
+    if not current_app.config.get('REFERENCE_CACHE', True) or pending.intersection(tables):
+        with cache._lock:
+            cache.bypassed += 1
+        value = loader(db.session)
+    else:
+        value = cache.get(name)
+        if is_rows:
+            # Request-local copies of the detached rows, without a query
+            if isinstance(value, list):
+                value = [db.session.merge(row, load=False) for row in value]
+            elif value is not None:
+                value = db.session.merge(value, load=False)
+    memo[name] = value
+    return value
+
+def get_active_accounts():
+    """Active accounts ordered by name"""
+    return _lookup('active_accounts')
+
+def get_loans():
+    """Every loan, in id order"""
+    return _lookup('loans')
+
+def get_active_budget():
+    """The active budget, or None"""
+    return _lookup('active_budget')
+
+def get_transaction_categories():
+    """Distinct categories used by transactions, sorted"""
+    return _lookup('categories')
+
+def forget_request_lookups():
+    """Drop this request's memoised lookups (after a write the request wants to re-read)"""
+    if has_app_context():
+        g.pop('reference_data', None)
+
+def _pending_tables(session):
+    """Watched tables this session has written in its open transaction (flushed or not)"""
+    tables = set(session.info.get('reference_tables', ()))
+    if session.info.get('reference_categories'):
+        tables.add('transaction')
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = WATCHED.get(type(obj))
+        if table is not None:
+            tables.add(table)
+    return tables
+
+@event.listens_for(Session, 'after_flush')
+def _collect_reference_writes(session, flush_context):
+    tables = session.info.setdefault('reference_tables', set())
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            session.info.setdefault('reference_categories', set()).add(obj.category)
+        elif type(obj) in WATCHED:
+            tables.add(WATCHED[type(obj)])
+    for obj in session.deleted:
+        if type(obj) in WATCHED:
+            tables.add(WATCHED[type(obj)])
+    for obj in session.dirty:
+        if type(obj) not in WATCHED or not session.is_modified(obj):
+            continue
+        if isinstance(obj, Transaction):
+            if inspect(obj).attrs.category.history.has_changes():
+                tables.add('transaction')
+        else:
+            tables.add(WATCHED[type(obj)])
+    if not tables:
+        del session.info['reference_tables']
+
+@event.listens_for(Session, 'do_orm_execute')
+def _detect_bulk_reference_writes(orm_execute_state):
+    """Bulk INSERT/UPDATE/DELETE statements skip the flush hooks"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = WATCHED.get(mapper.class_) if mapper is not None else None
+    if table is None:
+        return
+    session = orm_execute_state.session
+    rows = orm_execute_state.parameters
+    if table == 'transaction' and orm_execute_state.is_insert and isinstance(rows, list) \
+            and all('category' in row for row in rows):
+        # Bulk inserted transactions only matter if they bring a new category
+        session.info.setdefault('reference_categories', set()).update(row['category'] for row in rows)
+    else:
+        session.info.setdefault('reference_tables', set()).add(table)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_reference_data(session):
+    tables = session.info.pop('reference_tables', ())
+    new_categories = session.info.pop('reference_categories', ())
+    if tables or new_categories:
+        current_reference_cache().invalidate(tables, new_categories)
+        forget_request_lookups()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_reference_writes(session):
+    session.info.pop('reference_tables', None)
+    session.info.pop('reference_categories', None)
@@ -0,0 +1,112 @@
+"""
+Full-text search over transaction categories and descriptions.
+
+transaction_fts is an SQLite FTS5 index over "transaction".category and
+.description (external content, kept in sync by triggers; see migration 8 in
+utils/migrations.py). User input is turned into an FTS5 query here:
+
+    rent                 prefix match on any word starting with "rent"
+    "whole foods"        phrase match
+    category:groceries   restrict a term or phrase to one column
+    coffee -starbucks    exclude a term
+
+Terms are ANDed; results are ranked with bm25, category matches weighted higher.
+"""
+
+import re
+from database import db
+from models.transaction import Transaction
+
+FTS_TABLE = 'transaction_fts'
+COLUMNS = ('category', 'description')
+# bm25 weights per column, in COLUMNS order
+RANK_WEIGHTS = (2.0, 1.0)
+
+_TOKEN = re.compile(r'(-)?(?:(category|description):)?(?:"([^"]*)"|(\S+))', re.IGNORECASE)
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+fts = db.table(FTS_TABLE, db.column('rowid'))
+_fts_name = db.literal_column(FTS_TABLE)
+
+def _quote(words):
+    return '"' + ' '.join(words) + '"'
+
+def build_match_query(text):
+    """
+    FTS5 MATCH expression for free-form user input, or None if nothing searchable
+    remains. Words are reduced to their alphanumeric parts and always quoted, so
+    user input can never produce FTS5 syntax errors.
+    """
+    terms = []
+    exclusions = []
+    for negate, column, phrase, word in _TOKEN.findall(text or ''):
+        words = _WORD.findall(phrase if phrase else word)
+        if not words:
+            continue
+        # Bare words match as prefixes; quoted phrases match exactly
+        expression = _quote(words) if phrase else ' '.join(f'{_quote([w])}*' for w in words)
+        if column:
+            expression = f'{column.lower()} : ({expression})'
+        (exclusions if negate else terms).append(expression)
+    if not terms:
+        return None
+    query = ' AND '.join(terms)
+    for expression in exclusions:
+        query += f' NOT {expression}'
+    return query
+
+def category_match_query(category):
+    """
+    MATCH expression for the category filter: the category's words as a phrase in
+    the category column, the last word as a prefix so partial input keeps matching
+    """
+    words = _WORD.findall(category or '')
+    return f'category : {_quote(words)}*' if words else None
+
+def phrases_query(column, phrases):
+    """MATCH expression for rows whose column contains any of the phrases"""
+    quoted = [_quote(words) for words in (_WORD.findall(phrase) for phrase in phrases) if words]
+    return f'{column} : ({" OR ".join(quoted)})' if quoted else None
+
+def matches(match_query):
+    """Condition on Transaction for rows matching an FTS5 expression (uses the index, no table scan)"""
+    return Transaction.id.in_(
+        db.select(fts.c.rowid).where(_fts_name.op('MATCH')(match_query))
+    )
+
+def search_condition(text):
+    """Condition for free-form search text, or None when the text has no searchable words"""
+    match_query = build_match_query(text)
+    return matches(match_query) if match_query else None
+
+def category_condition(category):
+    """Category filter through the FTS index; falls back to LIKE for categories without words"""
+    match_query = category_match_query(category)
+    if match_query:
+        return matches(match_query)
+    return Transaction.category.ilike(f'%{category}%')
+
+def search(text, page=1, per_page=25, filters=()):
+    """
+    Ranked, paginated search.
+    filters are extra SQLAlchemy conditions on Transaction (type, date range, ...).
+    Returns dict: {'match': fts query, 'total': int, 'results': [(Transaction, score, snippet)]}
+    """
+    match_query = build_match_query(text)
+    if not match_query:
+        return {'match': None, 'total': 0, 'results': []}
+
+    rank = db.func.bm25(_fts_name, *RANK_WEIGHTS)
+    snippet = db.func.snippet(_fts_name, COLUMNS.index('description'), '<mark>', '</mark>', '…', 12)
+    query = db.session.query(Transaction, rank, snippet).join(
+        fts, fts.c.rowid == Transaction.id
+    ).filter(_fts_name.op('MATCH')(match_query), *filters)
+
+    total = query.with_entities(db.func.count()).scalar()
+    # bm25 is negative; lower is a better match
+    rows = query.order_by(rank, Transaction.date.desc()).limit(per_page).offset((page - 1) * per_page).all()
+    return {
+        'match': match_query,
+        'total': total,
+        'results': [(transaction, -score, snippet) for transaction, score, snippet in rows]
+    }
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+def _process_age_seconds(pid):
+    """Seconds since a process started (Linux /proc only; None elsewhere)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(fields[19])  # starttime is field 22; fields here start at field 3
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def bootstrap_seconds(module_started):
+    """
+    Time spent before app.py started running: bootloader extraction (the
+    one-file launcher is our parent process) plus interpreter start-up.
+    module_started is the perf_counter() value taken at the top of app.py.
+    """
+    # One-file builds unpack to a temp dir; one-dir builds run next to the executable
+    bundle_dir = os.path.abspath(getattr(sys, '_MEIPASS', ''))
+    frozen_onefile = getattr(sys, 'frozen', False) and not bundle_dir.startswith(
+        os.path.dirname(os.path.abspath(sys.executable))
+    )
+    age = _process_age_seconds(os.getppid() if frozen_onefile else os.getpid())
+    if age is None:
+        return None
+    return max(0.0, age - (time.perf_counter() - module_started))
+
+class StartupReport:
+    """Collects wall-clock phase timings for `app.py --startup-report`"""
+
+    def __init__(self, module_started, bootstrap=None):
+        self.module_started = module_started
+        self.bootstrap = bootstrap
+        self.phases = []
+        self._mark = module_started
+
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._mark))
+        self._mark = now
+
+    def render(self):
+        lines = ['Startup report']
+        if self.bootstrap is None:
+            lines.append(f"  {'extraction/bootstrap':<22} n/a")
+        else:
+            lines.append(f"  {'extraction/bootstrap':<22} {self.bootstrap * 1000:8.1f} ms")
+        total = self.bootstrap or 0.0
+        for name, seconds in self.phases:
+            lines.append(f'  {name:<22} {seconds * 1000:8.1f} ms')
+            total += seconds
+        lines.append(f"  {'total':<22} {total * 1000:8.1f} ms")
+        return '\n'.join(lines)
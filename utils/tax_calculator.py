@@ -1,3 +1,5 @@
+from utils.jobs import job_type
+
 class TaxCalculator:
     """Calculate tax brackets and withholding estimates for US federal, state, and local taxes"""
     
@@ -419,3 +421,33 @@ class TaxCalculator:
             previous_bracket = bracket_limit
         
         return self.TAX_BRACKETS_SINGLE[-1][1]  # Highest bracket
+
+MAX_TAX_SCENARIOS = 50000
+
+@job_type('tax_scenarios', executor='process')
+def tax_scenarios(income_min, income_max, income_step=1000, employment_types=('w2', '1099'),
+                  state_codes=(None,), filing_status='single'):
+    """
+    Taxes across a grid of incomes x employment types x states, for comparing
+    take-home pay. Runs in the job process pool.
+    """
+    incomes = range(max(int(income_min), 1), int(income_max) + 1, max(int(income_step), 1))
+    if len(incomes) * len(employment_types) * len(state_codes) > MAX_TAX_SCENARIOS:
+        raise ValueError(f'At most {MAX_TAX_SCENARIOS} scenarios per job')
+
+    calculator = TaxCalculator()
+    scenarios = []
+    for state_code in state_codes:
+        for employment_type in employment_types:
+            for income in incomes:
+                info = calculator.calculate_taxes(float(income), employment_type, filing_status, state_code or None)
+                scenarios.append({
+                    'annual_income': income,
+                    'employment_type': employment_type,
+                    'state_code': state_code,
+                    'total_tax_owed': round(info['total_tax_owed'], 2),
+                    'effective_tax_rate': round(info['effective_tax_rate'], 2),
+                    'marginal_tax_rate': info['marginal_tax_rate'],
+                    'take_home': round(income - info['total_tax_owed'], 2)
+                })
+    return {'count': len(scenarios), 'scenarios': scenarios}
@@ -0,0 +1,309 @@
+"""
+Tax estimates from the ledger's actual taxable income.
+
+The year is split into the IRS estimated-tax payment periods (Form 1040-ES):
+
+    1  Jan 1 - Mar 31   due Apr 15     annualized x4     22.5% required so far
+    2  Apr 1 - May 31   due Jun 15     annualized x2.4   45%
+    3  Jun 1 - Aug 31   due Sep 15     annualized x1.5   67.5%
+    4  Sep 1 - Dec 31   due Jan 15     annualized x1     90%
+
+Each period's income and taxable income are summed from the period summary
+month blocks (utils/period_summary.py) and cached here per (year, period). A
+committed transaction evicts only the period containing its date; the other
+periods' totals are reused and TaxCalculator is re-run on the new running
+totals, which costs microseconds.
+
+estimate() annualizes year-to-date taxable income by the days elapsed, runs
+TaxCalculator on it, and builds the quarterly schedule: each installment is the
+smaller of the annualized income installment (Form 2210 Schedule AI) and an
+even quarter of the safe-harbor payment, the lesser of 90% of this year's tax
+and 100% (110% above $150,000 AGI) of last year's tax on last year's actuals.
+"""
+
+import threading
+from datetime import date, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import FileStampedCache
+from utils.money import from_cents, to_cents
+from utils.period_summary import current_period_cache, on_committed_transaction_dates
+from utils.tax_calculator import TaxCalculator
+from utils.tenants import tenant_cache
+
+# first month, last month, annualization factor, share of the year's tax required by the due date
+PAYMENT_PERIODS = [
+    (1, 3, 4.0, 0.225),
+    (4, 5, 2.4, 0.45),
+    (6, 8, 1.5, 0.675),
+    (9, 12, 1.0, 0.90),
+]
+CURRENT_YEAR_SAFE_HARBOR = 0.90
+PRIOR_YEAR_SAFE_HARBOR = 1.00
+HIGH_INCOME_PRIOR_YEAR_SAFE_HARBOR = 1.10
+HIGH_INCOME_AGI = 150000
+
+def period_range(year, period):
+    """(first day, last day) of a payment period (1-4)"""
+    first_month, last_month = PAYMENT_PERIODS[period - 1][:2]
+    next_month = date(year + 1, 1, 1) if last_month == 12 else date(year, last_month + 1, 1)
+    return date(year, first_month, 1), next_month - timedelta(days=1)
+
+def due_date(year, period):
+    """When the estimated payment for a period is due"""
+    return date(year + 1, 1, 15) if period == 4 else date(year, (4, 6, 9)[period - 1], 15)
+
+def period_of(day):
+    for period, (first_month, last_month, _, _) in enumerate(PAYMENT_PERIODS, 1):
+        if first_month <= day.month <= last_month:
+            return period
+
+class TaxEstimateCache(FileStampedCache):
+    """
+    Thread-safe per-(year, payment period) income totals in cents, evicted by
+    transaction date, and cleared by a write from another process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._periods = {}  # (year, period) -> {'income', 'taxable_income', 'transaction_count'}
+        self._generation = 0  # Bumped on every invalidation so stale totals are never stored
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def period_totals(self, year, period, end=None):
+        """Totals of one payment period; end cuts a period still in progress short (not cached)"""
+        start, period_end = period_range(year, period)
+        if end is not None and end < period_end:
+            return self._summarize(start, end)
+        self.check_file()
+        key = (year, period)
+        with self._lock:
+            cached = self._periods.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            generation = self._generation
+        totals = self._summarize(start, period_end)
+        with self._lock:
+            if generation == self._generation:
+                self._periods[key] = totals
+        return totals
+
+    @staticmethod
+    def _summarize(start, end):
+        summary = current_period_cache().summarize(start, end)
+        return {
+            'income': to_cents(summary['income']),
+            'taxable_income': to_cents(summary['taxable_income']),
+            'transaction_count': summary['transaction_count']
+        }
+
+    def invalidate(self, dates):
+        """Evict the payment periods containing any of the given dates"""
+        keys = {(changed.year, period_of(changed)) for changed in dates}
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._periods.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._periods.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'external_changes': self.external_changes,
+                'cached_periods': len(self._periods)
+            }
+
+tax_estimate_cache = TaxEstimateCache()
+
+def current_tax_estimate_cache():
+    """The cache for the active database: tax_estimate_cache, or the user's own with MULTI_TENANT (utils/tenants.py)"""
+    return tenant_cache('tax_estimates', TaxEstimateCache, tax_estimate_cache)
+
+@on_committed_transaction_dates
+def _invalidate_tax_estimates(dates):
+    current_tax_estimate_cache().invalidate(dates)
+
+@event.listens_for(Session, 'after_commit')
+def _stamp_tax_estimates(session):
+    current_tax_estimate_cache().committed(session)
+
+class TaxEstimator:
+    """Tax estimates for one filer (employment type, state and city, usually the active budget's)"""
+
+    def __init__(self, employment_type='1099', state_code=None, city_code=None, filing_status='single'):
+        self.employment_type = employment_type
+        self.state_code = state_code
+        self.city_code = city_code
+        self.filing_status = filing_status
+        self.calculator = TaxCalculator()
+
+    @classmethod
+    def for_budget(cls, budget, **overrides):
+        """Estimator for a budget's filer details (defaults without one), overridden by any non-empty keyword"""
+        values = {
+            'employment_type': budget.employment_type if budget else '1099',
+            'state_code': budget.state_code if budget else None,
+            'city_code': budget.city_code if budget else None
+        }
+        values.update({key: value for key, value in overrides.items() if value})
+        return cls(**values)
+
+    def taxes(self, annual_income):
+        """
+        (total tax, federal tax paid through estimates, adjusted gross income) on
+        an annual income: federal income tax plus self-employment tax for 1099
+        filers (payroll taxes are withheld, so W-2 estimates leave them out)
+        """
+        if annual_income <= 0:
+            return 0.0, 0.0, 0.0
+        info = self.calculator.calculate_taxes(
+            annual_income, self.employment_type, self.filing_status, self.state_code, self.city_code
+        )
+        federal = info['federal_income_tax'] + info.get('self_employment_tax', 0)
+        return info['total_tax_owed'], federal, info.get('adjusted_gross_income', annual_income)
+
+    def _year_totals(self, year, through):
+        """Per-period totals for year, the period containing through cut short and later periods empty"""
+        cache = current_tax_estimate_cache()
+        totals = []
+        for period in range(1, 5):
+            start, end = period_range(year, period)
+            if start > through:
+                totals.append({'income': 0, 'taxable_income': 0, 'transaction_count': 0})
+            else:
+                totals.append(cache.period_totals(year, period, through if through < end else None))
+        return totals
+
+    def prior_year_tax(self, year):
+        """(federal tax, AGI) on the previous year's actual taxable income, or None when it has no transactions"""
+        totals = self._year_totals(year - 1, date(year - 1, 12, 31))
+        if not any(period['transaction_count'] for period in totals):
+            return None
+        _, federal, agi = self.taxes(from_cents(sum(period['taxable_income'] for period in totals)))
+        return federal, agi
+
+    @staticmethod
+    def _days(year, through):
+        """(days elapsed through a day of year, days in year)"""
+        first = date(year, 1, 1).toordinal()
+        return through.toordinal() - first + 1, date(year + 1, 1, 1).toordinal() - first
+
+    def annualized(self, year=None, today=None):
+        """(taxable income so far, annualized taxable income) for a year, up to today"""
+        today = today or date.today()
+        year = year or today.year
+        through = min(today, date(year, 12, 31))
+        if through < date(year, 1, 1):
+            return 0.0, 0.0
+        days, days_in_year = self._days(year, through)
+        taxable = from_cents(sum(period['taxable_income'] for period in self._year_totals(year, through)))
+        return taxable, round(taxable * days_in_year / days, 2)
+
+    def effective_rate(self, year=None, today=None):
+        """Total tax as a share of annualized year-to-date taxable income (0 with no taxable income)"""
+        _, annual_income = self.annualized(year, today)
+        if annual_income <= 0:
+            return 0.0
+        return self.taxes(annual_income)[0] / annual_income
+
+    def estimate(self, year=None, today=None):
+        """Year-to-date actuals, projected annual tax, safe harbor and the quarterly payment schedule"""
+        today = today or date.today()
+        year = year or today.year
+        through = min(today, date(year, 12, 31))
+        if through < date(year, 1, 1):
+            raise ValueError(f'{year} has not started yet')
+        totals = self._year_totals(year, through)
+        days, days_in_year = self._days(year, through)
+        income = from_cents(sum(period['income'] for period in totals))
+        taxable = from_cents(sum(period['taxable_income'] for period in totals))
+        annual_income = round(taxable * days_in_year / days, 2)
+        total_tax, federal_tax, _ = self.taxes(annual_income)
+
+        prior = self.prior_year_tax(year)
+        current_year_payment = federal_tax * CURRENT_YEAR_SAFE_HARBOR
+        safe_harbor = {
+            'current_year_tax': round(federal_tax, 2),
+            'current_year_payment': round(current_year_payment, 2),
+            'prior_year_tax': None,
+            'prior_year_payment': None,
+            'required_annual_payment': round(current_year_payment, 2),
+            'method': 'current_year'
+        }
+        if prior is not None:
+            prior_tax, prior_agi = prior
+            rate = HIGH_INCOME_PRIOR_YEAR_SAFE_HARBOR if prior_agi > HIGH_INCOME_AGI else PRIOR_YEAR_SAFE_HARBOR
+            prior_year_payment = prior_tax * rate
+            safe_harbor.update(prior_year_tax=round(prior_tax, 2), prior_year_payment=round(prior_year_payment, 2))
+            if prior_year_payment < current_year_payment:
+                safe_harbor.update(required_annual_payment=round(prior_year_payment, 2), method='prior_year')
+        required_annual_payment = safe_harbor['required_annual_payment']
+
+        schedule = []
+        cumulative_taxable = 0
+        required_so_far = 0.0
+        for period, (_, _, factor, share) in enumerate(PAYMENT_PERIODS, 1):
+            start, end = period_range(year, period)
+            cumulative_taxable += totals[period - 1]['taxable_income']
+            complete = end <= through
+            if complete:
+                # Schedule AI: income through the period's end, annualized
+                period_annual_income = round(from_cents(cumulative_taxable) * factor, 2)
+                period_federal_tax = self.taxes(period_annual_income)[1]
+            else:
+                # Periods still open use the year-to-date projection
+                period_annual_income, period_federal_tax = annual_income, federal_tax
+            annualized_to_date = period_federal_tax * share
+            regular_to_date = required_annual_payment * period / 4
+            installment = max(0.0, min(annualized_to_date, regular_to_date) - required_so_far)
+            required_so_far += installment
+            schedule.append({
+                'period': period,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'due_date': due_date(year, period).isoformat(),
+                'complete': complete,
+                'income': from_cents(totals[period - 1]['income']),
+                'taxable_income': from_cents(totals[period - 1]['taxable_income']),
+                'annualized_income': period_annual_income,
+                'annualized_required_to_date': round(annualized_to_date, 2),
+                'regular_required_to_date': round(regular_to_date, 2),
+                'installment': round(installment, 2)
+            })
+
+        return {
+            'year': year,
+            'as_of': through.isoformat(),
+            'employment_type': self.employment_type,
+            'state_code': self.state_code,
+            'city_code': self.city_code,
+            'year_to_date': {
+                'income': income,
+                'taxable_income': taxable,
+                'non_taxable_income': round(income - taxable, 2),
+                'days': days,
+                'tax': round(total_tax * days / days_in_year, 2)
+            },
+            'projection': {
+                'annual_taxable_income': annual_income,
+                'total_tax': round(total_tax, 2),
+                'federal_tax': round(federal_tax, 2),
+                'effective_rate': round(total_tax / annual_income * 100, 2) if annual_income > 0 else 0.0
+            },
+            'safe_harbor': safe_harbor,
+            'schedule': schedule
+        }
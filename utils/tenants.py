@@ -0,0 +1,198 @@
+"""
+Per-user databases for multi-tenant hosting (MULTI_TENANT = True).
+
+Each user's finances live in their own SQLite file, TENANT_DB_DIR/<user id>.db,
+so every user has their own write lock: one user's bulk import never waits on,
+or blocks, another user's requests. Logins live in a separate users database
+(the 'users' bind, see models/user.py and routes/auth.py).
+
+Requests pick their shard in a before_request hook and database.TenantSession
+sends every default-bind query to it. Background jobs run against the shard of
+the request that submitted them (tenant_context()).
+
+The router keeps an LRU of open shard engines (TENANT_ENGINE_CACHE); opening one
+more past the limit disposes the least recently used. A shard's schema is
+migrated the first time this process opens it, so a user costs nothing until
+they log in, and existing shards are upgraded lazily.
+
+State that must not be shared between users (period summaries, rendered
+fragments) is kept per shard. The ledger cache and the year archive hold a
+single database's rows and are switched off in this mode.
+
+With MULTI_TENANT off (the default) nothing here is active and the app uses the
+single SQLALCHEMY_DATABASE_URI database.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import sqlalchemy as sa
+from flask import g, has_app_context, jsonify, redirect, request, session, url_for
+from database import db, ensure_schema
+
+DEFAULT_ENGINE_CACHE = 64
+# Endpoints reachable without logging in
+PUBLIC_ENDPOINTS = ('auth.login', 'auth.register', 'static')
+
+class Shard:
+    """One tenant's database: its engine plus per-tenant caches"""
+
+    def __init__(self, tenant_id, engine):
+        self.tenant_id = tenant_id
+        self.engine = engine
+        self.ready = False  # Schema checked by this process
+        self.lock = threading.Lock()
+        self.caches = {}
+
+    def cache(self, name, factory):
+        cache = self.caches.get(name)
+        if cache is None:
+            cache = self.caches.setdefault(name, factory())
+        return cache
+
+class TenantRouter:
+    """Maps user ids to shard engines, keeping at most max_engines open"""
+
+    def __init__(self):
+        self.app = None
+        self.directory = None
+        self.max_engines = DEFAULT_ENGINE_CACHE
+        self._shards = OrderedDict()  # tenant id -> Shard, least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.opened = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def init_app(self, app):
+        self.app = app
+        self.directory = app.config['TENANT_DB_DIR']
+        self.max_engines = max(1, int(app.config.get('TENANT_ENGINE_CACHE', DEFAULT_ENGINE_CACHE)))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, tenant_id):
+        return os.path.join(self.directory, f'{int(tenant_id)}.db')
+
+    def shard(self, tenant_id):
+        """The tenant's shard, opening (and if new, migrating) its database on first use"""
+        tenant_id = int(tenant_id)
+        evicted = None
+        with self._lock:
+            shard = self._shards.get(tenant_id)
+            if shard is not None:
+                self._shards.move_to_end(tenant_id)
+                self.hits += 1
+            else:
+                engine = sa.create_engine(
+                    f'sqlite:///{self.path(tenant_id)}', **self.app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+                )
+                shard = self._shards[tenant_id] = Shard(tenant_id, engine)
+                self.opened += 1
+                if len(self._shards) > self.max_engines:
+                    _, evicted = self._shards.popitem(last=False)
+                    self.evicted += 1
+        if evicted is not None:
+            # Pooled connections close now; ones still in use close when they are returned
+            evicted.engine.dispose()
+        if not shard.ready:
+            self._prepare(shard)
+        return shard
+
+    def _prepare(self, shard):
+        """Migrate the shard's schema and fail jobs a previous run left unfinished (once per opening)"""
+        from utils.jobs import jobs
+        with shard.lock:
+            if shard.ready:
+                return
+            with self.app.app_context():
+                _set_shard(shard)
+                if ensure_schema(shard.engine):
+                    print(f"Tenant database created/verified at: {self.path(shard.tenant_id)}")
+                jobs.recover_interrupted()
+            shard.ready = True
+
+    def activate(self, tenant_id):
+        """Route this app context's queries to tenant_id's database"""
+        shard = self.shard(tenant_id)
+        _set_shard(shard)
+        return shard
+
+    def dispose(self):
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in shards:
+            shard.engine.dispose()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.opened
+            return {
+                'open_shards': len(self._shards),
+                'max_engines': self.max_engines,
+                'hits': self.hits,
+                'opened': self.opened,
+                'evicted': self.evicted,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+def _set_shard(shard):
+    g.tenant_id = shard.tenant_id
+    g.tenant_engine = shard.engine
+    g.tenant_shard = shard
+
+tenants = TenantRouter()
+
+def current_tenant_id():
+    """Id of the user whose database is active, or None (single-user mode, or before login)"""
+    return g.get('tenant_id') if has_app_context() else None
+
+def tenant_cache(name, factory, default):
+    """The active tenant's own instance of a cache (created by factory), or default when none is active"""
+    shard = g.get('tenant_shard') if has_app_context() else None
+    return shard.cache(name, factory) if shard is not None else default
+
+@contextmanager
+def tenant_context(app, tenant_id):
+    """App context with tenant_id's database active (None: the app's own database)"""
+    with app.app_context():
+        if tenant_id is not None:
+            tenants.activate(tenant_id)
+        yield
+
+def _select_tenant():
+    """before_request: route the request to the logged-in user's database"""
+    if request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+    user_id = session.get('user_id')
+    if user_id is None:
+        if request.path.startswith('/api/'):
+            return jsonify({'error': 'Login required'}), 401
+        return redirect(url_for('auth.login', next=request.full_path if request.query_string else request.path))
+    tenants.activate(user_id)
+    return None
+
+def init_users_db(app):
+    """Create the users table (its own database, outside the migrated shards)"""
+    from models import user  # noqa: F401
+    with app.app_context():
+        db.create_all(bind_key='users')
+
+def init_tenants(app):
+    """Turn on per-user databases when app.config['MULTI_TENANT'] is set"""
+    if not app.config.get('MULTI_TENANT'):
+        return None
+    tenants.init_app(app)
+    app.before_request(_select_tenant)
+
+    from routes import auth
+    app.register_blueprint(auth.bp)
+
+    @app.context_processor
+    def inject_current_user():
+        return {'current_username': session.get('username')}
+    return tenants